@@ -68,6 +68,12 @@ macro(draco_set_build_definitions)
   list(APPEND draco_include_paths "${draco_root}" "${draco_root}/src"
               "${draco_build}")
 
+  # Attribute encoders and decoders can run on worker threads.
+  find_package(Threads)
+  if(CMAKE_THREAD_LIBS_INIT)
+    list(APPEND draco_lib_deps ${CMAKE_THREAD_LIBS_INIT})
+  endif()
+
   if(DRACO_TRANSCODER_SUPPORTED)
     draco_setup_eigen()
     draco_setup_filesystem()
@@ -123,6 +123,10 @@ macro(draco_set_default_options)
     NAME DRACO_MAYA_PLUGIN
     HELPSTRING "Build plugin library for Maya."
     VALUE OFF)
+  draco_option(
+    NAME DRACO_PYTHON
+    HELPSTRING "Build the pydraco Python module (requires pybind11)."
+    VALUE OFF)
   draco_option(
     NAME DRACO_TRANSCODER_SUPPORTED
     HELPSTRING "Enable the Draco transcoder."
@@ -232,6 +236,10 @@ macro(draco_set_optional_features)
     set(CMAKE_POSITION_INDEPENDENT_CODE ON)
   endif()
 
+  if(DRACO_PYTHON)
+    set(CMAKE_POSITION_INDEPENDENT_CODE ON)
+  endif()
+
   if(DRACO_TRANSCODER_SUPPORTED)
     draco_enable_feature(FEATURE "DRACO_TRANSCODER_SUPPORTED")
   endif()
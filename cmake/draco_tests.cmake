@@ -38,9 +38,11 @@ list(
     "${draco_src_root}/animation/keyframe_animation_test.cc"
     "${draco_src_root}/attributes/point_attribute_test.cc"
     "${draco_src_root}/compression/attributes/point_d_vector_test.cc"
+    "${draco_src_root}/compression/attributes/quaternion_compression_utils_test.cc"
     "${draco_src_root}/compression/attributes/prediction_schemes/prediction_scheme_normal_octahedron_canonicalized_transform_test.cc"
     "${draco_src_root}/compression/attributes/prediction_schemes/prediction_scheme_normal_octahedron_transform_test.cc"
     "${draco_src_root}/compression/attributes/sequential_integer_attribute_encoding_test.cc"
+    "${draco_src_root}/compression/attributes/space_filling_curve_sequencer_test.cc"
     "${draco_src_root}/compression/bit_coders/rans_coding_test.cc"
     "${draco_src_root}/compression/decode_test.cc"
     "${draco_src_root}/compression/encode_test.cc"
@@ -48,13 +50,17 @@ list(
     "${draco_src_root}/compression/entropy/symbol_coding_test.cc"
     "${draco_src_root}/compression/mesh/mesh_edgebreaker_encoding_test.cc"
     "${draco_src_root}/compression/mesh/mesh_encoder_test.cc"
+    "${draco_src_root}/compression/point_cloud/layered_point_cloud_test.cc"
     "${draco_src_root}/compression/point_cloud/point_cloud_kd_tree_encoding_test.cc"
+    "${draco_src_root}/compression/point_cloud/point_cloud_rate_control_test.cc"
     "${draco_src_root}/compression/point_cloud/point_cloud_sequential_encoding_test.cc"
+    "${draco_src_root}/compression/point_cloud/tiled_point_cloud_test.cc"
     "${draco_src_root}/core/buffer_bit_coding_test.cc"
     "${draco_src_root}/core/math_utils_test.cc"
     "${draco_src_root}/core/quantization_utils_test.cc"
     "${draco_src_root}/core/status_test.cc"
     "${draco_src_root}/core/vector_d_test.cc"
+    "${draco_src_root}/core/vector_quantization_utils_test.cc"
     "${draco_src_root}/io/file_reader_test_common.h"
     "${draco_src_root}/io/file_utils_test.cc"
     "${draco_src_root}/io/file_writer_utils_test.cc"
@@ -63,6 +69,7 @@ list(
     "${draco_src_root}/io/obj_decoder_test.cc"
     "${draco_src_root}/io/obj_encoder_test.cc"
     "${draco_src_root}/io/ply_decoder_test.cc"
+    "${draco_src_root}/io/ply_encoder_test.cc"
     "${draco_src_root}/io/ply_reader_test.cc"
     "${draco_src_root}/io/stl_decoder_test.cc"
     "${draco_src_root}/io/stl_encoder_test.cc"
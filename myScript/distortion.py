@@ -0,0 +1,227 @@
+import math
+import numpy as np
+import ply_header
+
+# Properties of the 3DGS layout grouped like the Draco attributes they are
+# encoded in (see the PLY decoder). Properties outside these groups are compared
+# as groups of their own.
+ATTRIBUTE_GROUPS = {
+    "POSITION": ["x", "y", "z"],
+    "NORMAL": ["nx", "ny", "nz"],
+    "F_DC": [f"f_dc_{i}" for i in range(3)],
+    "F_REST_1": [f"f_rest_{i}" for i in range(0, 9)],
+    "F_REST_2": [f"f_rest_{i}" for i in range(9, 24)],
+    "F_REST_3": [f"f_rest_{i}" for i in range(24, 45)],
+    "OPACITY": ["opacity"],
+    "SCALE": [f"scale_{i}" for i in range(3)],
+    "ROT": [f"rot_{i}" for i in range(4)],
+}
+
+METRICS = ["mae", "rmse", "psnr", "max_error", "mismatches", "nan_delta", "inf_delta"]
+
+class _PlyColumns:
+    # Vertex data of one PLY file, read in blocks of rows. Binary files are
+    # memory-mapped, ASCII files are parsed block by block.
+    def __init__(self, file_path):
+        header = ply_header.read_ply_header(file_path)
+        vertex = header["elements"][0] if header["elements"] else None
+        if vertex is None or vertex["name"] != "vertex":
+            raise ValueError(f"{file_path}: the vertex element must come first")
+        if any(isinstance(t, tuple) for _, t in vertex["properties"]):
+            raise ValueError(f"{file_path}: list properties are not supported")
+        self.names = [name for name, _ in vertex["properties"]]
+        self._types = dict(vertex["properties"])
+        self._header = header
+        self.num_vertices = vertex["count"]
+        ply_format = header["format"]
+        self._file = None
+        self._rows = None
+        if ply_format in ("binary_little_endian", "binary_big_endian"):
+            order = "<" if ply_format == "binary_little_endian" else ">"
+            dtype = np.dtype([(name, order + t) for name, t in vertex["properties"]])
+            self._rows = np.memmap(file_path, dtype=dtype, mode='r',
+                                   offset=header["data_offset"], shape=(self.num_vertices,))
+        elif ply_format == "ascii":
+            self._file = open(file_path, 'rb')
+            self._file.seek(header["data_offset"])
+            self._next_row = 0
+        else:
+            raise ValueError(f"{file_path}: unknown PLY format {ply_format}")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._rows = None
+
+    # Returns rows [start, stop) of |names| as a float64 array. ASCII files can
+    # only be read front to back.
+    def read(self, start, stop, names):
+        if self._rows is not None:
+            block = self._rows[start:stop]
+            return np.column_stack([self._column(block[name], name) for name in names])
+        if start != self._next_row:
+            raise ValueError("ASCII PLY files are read in order")
+        block = np.loadtxt(self._file, dtype=np.float64, max_rows=stop - start, ndmin=2)
+        self._next_row = stop
+        columns = [self.names.index(name) for name in names]
+        # rounded to the property types, like the values of binary files
+        return np.column_stack([self._column(block[:, column].astype(self._types[name]), name)
+                                for column, name in zip(columns, names)])
+
+    # Returns rows |indices| of |names| (binary files only).
+    def take(self, indices, names):
+        if self._rows is None:
+            raise ValueError("aligning points needs binary PLY files")
+        block = self._rows[indices]
+        return np.column_stack([self._column(block[name], name) for name in names])
+
+    # float64 values of one column, dequantized if the file stores quantized
+    # integers (draco_decoder -precision quantized)
+    def _column(self, values, name):
+        return ply_header.dequantize(self._header, name, values).astype(np.float64)
+
+def _group_columns(names_in, names_out):
+    shared = [name for name in names_in if name in set(names_out)]
+    groups = {}
+    grouped = set()
+    for group, props in ATTRIBUTE_GROUPS.items():
+        props = [p for p in props if p in shared]
+        if props:
+            groups[group] = props
+            grouped.update(props)
+    for name in shared:
+        if name not in grouped:
+            groups[name] = [name]
+    return groups
+
+# Orders points by their cell on the position quantization grid of the
+# encoder, computed in float32 like the encoder does.
+def _grid_order(positions, min_point, inverse_delta):
+    values = (positions.astype(np.float32) - min_point) * inverse_delta
+    cells = np.floor(values + np.float32(0.5)).astype(np.int64)
+    return np.lexsort(cells.T[::-1])
+
+# |decoded| quaternions (n, 4) with the sign of each point chosen to be closest
+# to |original|: q and -q are the same rotation, the smallest three quaternion
+# codec (-qr_quaternion) keeps either.
+def _match_quaternion_signs(original, decoded):
+    flip = (np.square(original + decoded).sum(axis=1) < np.square(original - decoded).sum(axis=1))
+    if not flip.any():
+        return decoded
+    return np.where(flip[:, None], -decoded, decoded)
+
+class _Accumulator:
+    def __init__(self):
+        self.count = 0
+        self.sum_abs = 0.0
+        self.sum_sq = 0.0
+        self.max_error = 0.0
+        self.mismatches = 0
+        self.nan = [0, 0]
+        self.inf = [0, 0]
+        self.min_value = math.inf
+        self.max_value = -math.inf
+
+    def add(self, a, b):
+        # mismatches count exact differences, NaNs compare equal to NaNs
+        same = (a == b) | (np.isnan(a) & np.isnan(b))
+        self.mismatches += int(a.size - np.count_nonzero(same))
+        self.nan[0] += int(np.count_nonzero(np.isnan(a)))
+        self.nan[1] += int(np.count_nonzero(np.isnan(b)))
+        self.inf[0] += int(np.count_nonzero(np.isinf(a)))
+        self.inf[1] += int(np.count_nonzero(np.isinf(b)))
+        finite = np.isfinite(a) & np.isfinite(b)
+        if finite.all():
+            diff = np.abs(a - b)
+            values = a
+        else:
+            diff = np.abs(a[finite] - b[finite])
+            values = a[finite]
+        if diff.size:
+            self.count += diff.size
+            self.sum_abs += float(diff.sum())
+            self.sum_sq += float(np.dot(diff.ravel(), diff.ravel()))
+            self.max_error = max(self.max_error, float(diff.max()))
+            self.min_value = min(self.min_value, float(values.min()))
+            self.max_value = max(self.max_value, float(values.max()))
+
+    def result(self):
+        mae = self.sum_abs / self.count if self.count else math.nan
+        rmse = math.sqrt(self.sum_sq / self.count) if self.count else math.nan
+        # peak is the value range of the original values in the group
+        peak = self.max_value - self.min_value
+        if rmse == 0:
+            psnr = math.inf
+        elif self.count and peak > 0:
+            psnr = 20 * math.log10(peak / rmse)
+        else:
+            psnr = math.nan
+        return {"mae": mae, "rmse": rmse, "psnr": psnr, "max_error": self.max_error,
+                "mismatches": self.mismatches,
+                "nan_delta": self.nan[1] - self.nan[0],
+                "inf_delta": self.inf[1] - self.inf[0]}
+
+# Compares the vertex properties of the original and decoded PLY files per
+# attribute group (POSITION, F_DC, the F_REST bands, OPACITY, SCALE, ROT, ...)
+# and returns {group: {metric: value}} with the METRICS. Both files are read
+# in blocks of |block_size| points, so memory does not grow with the scene.
+# Rotations are compared up to the sign of each quaternion.
+#
+# Points are compared by index with align="index", which needs the point order
+# to be kept (sequential encoding, -cl 0). The kd-tree encoding reorders the
+# points, align="position" then pairs the points by their cell on the position
+# quantization grid of |position_bits| (the -qp value); points sharing a cell
+# are paired in file order.
+def compare_ply(original_path, decoded_path, align="index", position_bits=None, block_size=1 << 20):
+    original = _PlyColumns(original_path)
+    decoded = _PlyColumns(decoded_path)
+    try:
+        if original.num_vertices != decoded.num_vertices:
+            raise ValueError(f"{original.num_vertices} points in {original_path}, "
+                             f"{decoded.num_vertices} in {decoded_path}")
+        groups = _group_columns(original.names, decoded.names)
+        accumulators = {group: _Accumulator() for group in groups}
+        names = [name for props in groups.values() for name in props]
+        num_vertices = original.num_vertices
+
+        order_in = order_out = None
+        if align == "position":
+            if not position_bits:
+                raise ValueError("align='position' needs position_bits")
+            positions_in = original.take(slice(None), ["x", "y", "z"])
+            positions_out = decoded.take(slice(None), ["x", "y", "z"])
+            positions_in = positions_in.astype(np.float32)
+            min_point = positions_in.min(axis=0)
+            extent = (positions_in.max(axis=0) - min_point).max()
+            inverse_delta = np.float32((1 << position_bits) - 1) / extent if extent > 0 else np.float32(1)
+            order_in = _grid_order(positions_in, min_point, inverse_delta)
+            order_out = _grid_order(positions_out, min_point, inverse_delta)
+            del positions_in, positions_out
+        elif align != "index":
+            raise ValueError(f"unknown align mode {align}")
+
+        for start in range(0, num_vertices, block_size):
+            stop = min(start + block_size, num_vertices)
+            if order_in is None:
+                block_in = original.read(start, stop, names)
+                block_out = decoded.read(start, stop, names)
+            else:
+                block_in = original.take(order_in[start:stop], names)
+                block_out = decoded.take(order_out[start:stop], names)
+            column = 0
+            for group, props in groups.items():
+                width = len(props)
+                group_in = block_in[:, column:column + width]
+                group_out = block_out[:, column:column + width]
+                if group == "ROT" and width == 4:
+                    group_out = _match_quaternion_signs(group_in, group_out)
+                accumulators[group].add(group_in, group_out)
+                column += width
+        return {group: accumulator.result() for group, accumulator in accumulators.items()}
+    finally:
+        original.close()
+        decoded.close()
+
+# Flattens a compare_ply() result into {"<group>_<metric>": value} columns.
+def flatten(result):
+    return {f"{group}_{metric}": value for group, metrics in result.items() for metric, value in metrics.items()}
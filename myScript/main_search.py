@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+import numpy as np
+import create_render_dir_random
+import rd_search
+
+def main(numToCal, scene_names, budget=40, batch_size=8, num_workers=None, cache_dir=Path("..")/"expData"/"draco_cache",
+         in_process=False, space=rd_search.SEARCH_SPACE):
+    
+    fronts = {}
+    for scene_name in scene_names:
+        front, evaluated = rd_search.search(numToCal, scene_name, budget=budget, batch_size=batch_size, space=space,
+                                            num_workers=num_workers, cache_dir=cache_dir, in_process=in_process)
+        # same layout as the random .npy files, for merge_all_results_random.py
+        save_dir = Path("..")/"expData"/"results"
+        save_dir.mkdir(parents=True, exist_ok=True)
+        np.save(save_dir/f"{scene_name}_pareto.npy", front)
+        for setting in front:
+            size, error = evaluated[tuple(int(v) for v in setting)]
+            print(" ".join(str(int(v)) for v in setting), f"size {int(size)} distortion {error:.3g}")
+        fronts[scene_name] = front
+    return fronts
+                
+if __name__ == "__main__":
+    
+    numToCal = 1
+    scene_names = ["lego"] # ["drjohnson", "playroom", "train", "truck"]
+    budget = 40 # new encode/decode runs per scene
+    batch_size = os.cpu_count() # settings evaluated per round
+    num_workers = os.cpu_count() # encode/decode jobs running at the same time
+    
+    print(f"numToCal: {numToCal}")
+    print(f"scene_names: {scene_names}")
+    print(f"budget: {budget}")
+    print(f"batch_size: {batch_size}")
+    
+    fronts = main(numToCal, scene_names, budget, batch_size, num_workers)
+    for scene_name in scene_names:
+        create_render_dir_random.main(numToCal, [scene_name], fronts[scene_name])
+    print(f"========= Done Search =========")
@@ -1,14 +1,6 @@
-import os
 import pandas as pd
-import itertools
 from pathlib import Path
-import numpy as np
-from plyfile import PlyData, PlyElement
-
-def getNumOf3DGS(file_path):
-    plydata = PlyData.read(str(file_path))
-    return (np.asarray(plydata.elements[0]["x"])).size
-    
+import results_store
 
 def main(numToCal, scene_names, 
         qp_values, 
@@ -22,78 +14,38 @@ def main(numToCal, scene_names,
     GS = qfd_values
     SH = qs_values
     
-    merged_df = pd.DataFrame()
-    
-    # draco
-    for scene_name in scene_names:
-        numOfPoint = getNumOf3DGS(Path(f'..')/"expData"/"raw_ply"/scene_name/"point_cloud.ply")
-        original_file_size=(Path(f'..')/"expData"/"raw_ply"/scene_name/"point_cloud.ply").stat().st_size
-        for qp_value in qp_values:
-            for qn_value in qn_values:
-                for GS_value in GS:
-                    for SH_value in SH:
-                        for cl_value in cl_values:                            
-                            qfr_value = qo_value = qfd_value = GS_value
-                            qr_value = qs_value = SH_value
-                            suffix = f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfd_value}_qo{qfd_value}_qs{qs_value}_qr{qs_value}_cl{cl_value}"
-                            csv_file_path = Path("..")/"expData"/"draco_csv"/scene_name/f"log_{suffix}.csv"
-                            if os.path.exists(csv_file_path):
-                                df = pd.read_csv(csv_file_path)
-                                df = df.iloc[:numToCal]
-                                df['alg'] = 'draco'
-                                df['scene_name'] = scene_name
-                                df['original_size'] = original_file_size
-                                df['numOf3DGS'] = numOfPoint
-                                if merged_df.empty:
-                                    merged_df = df
-                                else:
-                                    merged_df = pd.concat([merged_df, df], axis=0)
-                            else:
-                                continue
-    # gzip
-    if gzip:
-        gzip_compression_levels = [1, 3, 5, 7, 9]
-        for scene_name in scene_names:
-            numOfPoint = getNumOf3DGS(Path(f'..')/"expData"/"raw_ply"/scene_name/"point_cloud.ply")
-            original_file_size=(Path(f'..')/"expData"/"raw_ply"/scene_name/"point_cloud.ply").stat().st_size
+    # every wanted setting, in the order of the loops the CSV files used to be probed in
+    suffixes = []
+    for qp_value in qp_values:
+        for qn_value in qn_values:
+            for GS_value in GS:
+                for SH_value in SH:
+                    for cl_value in cl_values:
+                        qfr_value = qo_value = qfd_value = GS_value
+                        qr_value = qs_value = SH_value
+                        suffixes.append(f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfd_value}_qo{qfd_value}_qs{qs_value}_qr{qs_value}_cl{cl_value}")
+
+    # one indexed query per algorithm instead of a CSV file per setting
+    frames = []
+    with results_store.ResultsStore() as store:
+        # draco
+        frames.append(store.query("draco", scene_names, suffixes, numToCal))
+        # gzip
+        if gzip:
+            gzip_compression_levels = [1, 3, 5, 7, 9]
             qp_value = qn_value = qfd_value = qfr_value = qo_value = qs_value = qr_value = "x"
-            for cl_value in gzip_compression_levels:
-                suffix = f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfr_value}_qo{qo_value}_qs{qs_value}_qr{qr_value}_cl{cl_value}"
-                csv_file_path = Path("..")/"expData"/"gzip_csv"/scene_name/f"log_{suffix}.csv"
-                if os.path.exists(csv_file_path):
-                    df = pd.read_csv(csv_file_path)
-                    df['alg'] = 'gzip'
-                    df['scene_name'] = scene_name
-                    df['original_size'] = original_file_size
-                    df['numOf3DGS'] = numOfPoint
-                    if merged_df.empty:
-                        merged_df = df
-                    else:
-                        merged_df = pd.concat([merged_df, df], axis=0)
-                else:
-                    continue
-    # bzip2
-    if bzip2:
-        bzip2_compression_levels = [1, 3, 5, 7, 9]
-        for scene_name in scene_names:
-            numOfPoint = getNumOf3DGS(Path(f'..')/"expData"/"raw_ply"/scene_name/"point_cloud.ply")
-            original_file_size=(Path(f'..')/"expData"/"raw_ply"/scene_name/"point_cloud.ply").stat().st_size
+            gzip_suffixes = [f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfr_value}_qo{qo_value}_qs{qs_value}_qr{qr_value}_cl{cl_value}"
+                             for cl_value in gzip_compression_levels]
+            frames.append(store.query("gzip", scene_names, gzip_suffixes))
+        # bzip2
+        if bzip2:
+            bzip2_compression_levels = [1, 3, 5, 7, 9]
             qp_value = qn_value = qfd_value = qfr_value = qo_value = qs_value = qr_value = "y"
-            for cl_value in bzip2_compression_levels:
-                suffix = f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfr_value}_qo{qo_value}_qs{qs_value}_qr{qr_value}_cl{cl_value}"
-                csv_file_path = Path("..")/"expData"/"bzip2_csv"/scene_name/f"log_{suffix}.csv"
-                if os.path.exists(csv_file_path):
-                    df = pd.read_csv(csv_file_path)
-                    df['alg'] = 'bzip2'
-                    df['scene_name'] = scene_name
-                    df['original_size'] = original_file_size
-                    df['numOf3DGS'] = numOfPoint
-                    if merged_df.empty:
-                        merged_df = df
-                    else:
-                        merged_df = pd.concat([merged_df, df], axis=0)
-                else:
-                    continue
+            bzip2_suffixes = [f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfr_value}_qo{qo_value}_qs{qs_value}_qr{qr_value}_cl{cl_value}"
+                              for cl_value in bzip2_compression_levels]
+            frames.append(store.query("bzip2", scene_names, bzip2_suffixes))
+    frames = [df for df in frames if not df.empty]
+    merged_df = pd.concat(frames, axis=0) if frames else pd.DataFrame()
     
     if not merged_df.empty:          
         save_dir = Path("..")/"expData"/"results"
@@ -1,71 +1,118 @@
-import torch
-from torch import nn
 import numpy as np
+from numpy.lib import recfunctions
 from plyfile import PlyData, PlyElement
 from pathlib import Path
 import argparse
 # external lib
 # from scene.gaussian_model import GaussianModel
 
+PLY_DTYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "half": "f2", "float16": "f2",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+def read_vertices(path: Path) -> np.ndarray:
+    # Structured array of the vertex element.
+    # A binary little-endian file whose first element is the vertex block (the
+    # 3DGS layout) is memory-mapped as is, other files go through plyfile.
+    with open(path, 'rb') as f:
+        header = []
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{path}: truncated PLY header")
+            line = line.decode('ascii').strip()
+            header.append(line.split())
+            if line == "end_header":
+                break
+        offset = f.tell()
+
+    file_format = next(words[1] for words in header if words and words[0] == "format")
+    elements = [i for i, words in enumerate(header) if words and words[0] == "element"]
+    if file_format == "binary_little_endian" and elements and header[elements[0]][1] == "vertex":
+        count = int(header[elements[0]][2])
+        end = elements[1] if len(elements) > 1 else len(header)
+        properties = [words for words in header[elements[0] + 1:end] if words[0] == "property"]
+        if all(len(words) == 3 and words[1] in PLY_DTYPES for words in properties):
+            dtype = np.dtype([(words[2], "<" + PLY_DTYPES[words[1]]) for words in properties])
+            return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+    return PlyData.read(str(path))["vertex"].data
+
+def sorted_names(names, prefix):
+    return sorted([name for name in names if name.startswith(prefix)], key = lambda x: int(x.split('_')[-1]))
+
+def gather_columns(vertices, names, dtype=np.float32):
+    # one vectorized copy of the named columns into a (P, len(names)) array
+    return recfunctions.structured_to_unstructured(vertices[names], dtype=dtype)
+
+def draco_column_names(vertex_names, sh_degree):
+    # x, y, z, f_dc_*, f_rest_*, opacity, scale_*, rot_*, which is what
+    # load_gaussian_ply + save_gaussian_ply_for_draco write (normals dropped)
+    extra_f_names = sorted_names(vertex_names, "f_rest_")
+    assert len(extra_f_names) == 3 * (sh_degree + 1) ** 2 - 3
+    return (["x", "y", "z"] + [f"f_dc_{i}" for i in range(3)] + extra_f_names + ["opacity"] +
+            sorted_names(vertex_names, "scale_") + sorted_names(vertex_names, "rot"))
+
+def write_float_ply(path: Path, names, values: np.ndarray):
+    # binary little-endian float32 PLY with one property per column of values
+    values = np.ascontiguousarray(values, dtype='<f4')
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {values.shape[0]}"]
+    header += [f"property float {name}" for name in names]
+    header.append("end_header")
+    with open(path, 'wb') as f:
+        f.write(("\n".join(header) + "\n").encode('ascii'))
+        values.tofile(f)
+
+def convert_gaussian_ply_for_draco(load_ply_path: Path, save_ply_path: Path, sh_degree):
+    # Same output as save_gaussian_ply_for_draco(*load_gaussian_ply(...)) in binary,
+    # the SH transpose done by the two of them cancels out, so this is a column reorder.
+    vertices = read_vertices(load_ply_path)
+    names = draco_column_names(vertices.dtype.names, sh_degree)
+    write_float_ply(save_ply_path, names, gather_columns(vertices, names))
+
 def load_gaussian_ply(path: Path, sh_degree) -> list:
-    plydata = PlyData.read(str(path))
+    vertices = read_vertices(path)
+    vertex_names = vertices.dtype.names
 
-    xyz = np.stack((np.asarray(plydata.elements[0]["x"]),
-                    np.asarray(plydata.elements[0]["y"]),
-                    np.asarray(plydata.elements[0]["z"])),  axis=1)
+    xyz = gather_columns(vertices, ["x", "y", "z"])
     
-    opacities = np.asarray(plydata.elements[0]["opacity"])[..., np.newaxis]
-
-    features_dc = np.zeros((xyz.shape[0], 3, 1))
-    features_dc[:, 0, 0] = np.asarray(plydata.elements[0]["f_dc_0"])
-    features_dc[:, 1, 0] = np.asarray(plydata.elements[0]["f_dc_1"])
-    features_dc[:, 2, 0] = np.asarray(plydata.elements[0]["f_dc_2"])
-
-    extra_f_names = [p.name for p in plydata.elements[0].properties if p.name.startswith("f_rest_")]
-    if len(extra_f_names) == 45:
-        pass
-    elif len(extra_f_names) == 0:
-        pass
-    extra_f_names = sorted(extra_f_names, key = lambda x: int(x.split('_')[-1]))
-    # print(extra_f_names)
+    opacities = gather_columns(vertices, ["opacity"])
+
+    features_dc = gather_columns(vertices, ["f_dc_0", "f_dc_1", "f_dc_2"])[..., np.newaxis]
+
+    extra_f_names = sorted_names(vertex_names, "f_rest_")
     assert len(extra_f_names) == 3 * (sh_degree + 1) ** 2 - 3
-    features_extra = np.zeros((xyz.shape[0], len(extra_f_names)))
-    for idx, attr_name in enumerate(extra_f_names):
-        features_extra[:, idx] = np.asarray(plydata.elements[0][attr_name])
     # Reshape (P,F*SH_coeffs) to (P, F, SH_coeffs except DC)
-    features_extra = features_extra.reshape((features_extra.shape[0], 3, (sh_degree + 1) ** 2 - 1))
-
-    scale_names = [p.name for p in plydata.elements[0].properties if p.name.startswith("scale_")]
-    scale_names = sorted(scale_names, key = lambda x: int(x.split('_')[-1]))
-    scales = np.zeros((xyz.shape[0], len(scale_names)))
-    for idx, attr_name in enumerate(scale_names):
-        scales[:, idx] = np.asarray(plydata.elements[0][attr_name])
-
-    rot_names = [p.name for p in plydata.elements[0].properties if p.name.startswith("rot")]
-    rot_names = sorted(rot_names, key = lambda x: int(x.split('_')[-1]))
-    rots = np.zeros((xyz.shape[0], len(rot_names)))
-    for idx, attr_name in enumerate(rot_names):
-        rots[:, idx] = np.asarray(plydata.elements[0][attr_name])
-
-    results = [nn.Parameter(torch.tensor(xyz, dtype=torch.float, device="cuda").requires_grad_(True)), 
-               nn.Parameter(torch.tensor(features_dc, dtype=torch.float, device="cuda").transpose(1, 2).contiguous().requires_grad_(True)),
-               nn.Parameter(torch.tensor(features_extra, dtype=torch.float, device="cuda").transpose(1, 2).contiguous().requires_grad_(True)),
-               nn.Parameter(torch.tensor(opacities, dtype=torch.float, device="cuda").requires_grad_(True)),
-               nn.Parameter(torch.tensor(scales, dtype=torch.float, device="cuda").requires_grad_(True)),
-               nn.Parameter(torch.tensor(rots, dtype=torch.float, device="cuda").requires_grad_(True))
+    features_extra = gather_columns(vertices, extra_f_names).reshape((xyz.shape[0], 3, (sh_degree + 1) ** 2 - 1))
+
+    scales = gather_columns(vertices, sorted_names(vertex_names, "scale_"))
+
+    rots = gather_columns(vertices, sorted_names(vertex_names, "rot"))
+
+    # float32 arrays laid out like the GaussianModel parameters,
+    # features are (P, SH_coeffs, F)
+    results = [xyz,
+               np.ascontiguousarray(features_dc.transpose(0, 2, 1)),
+               np.ascontiguousarray(features_extra.transpose(0, 2, 1)),
+               opacities,
+               scales,
+               rots
                ]
     return results
 
 
 def save_gaussian_ply_for_draco(_xyz, _features_dc, _features_rest, _opacity, _scaling, _rotation, path: Path, ascii=False):
         
-        xyz = _xyz.detach().cpu().numpy()
+        xyz = np.asarray(_xyz)
         normals = np.zeros_like(xyz)
-        f_dc = _features_dc.detach().transpose(1, 2).flatten(start_dim=1).contiguous().cpu().numpy()
-        f_rest = _features_rest.detach().transpose(1, 2).flatten(start_dim=1).contiguous().cpu().numpy()
-        opacities = _opacity.detach().cpu().numpy()
-        scale = _scaling.detach().cpu().numpy()
-        rotation = _rotation.detach().cpu().numpy()
+        f_dc = np.asarray(_features_dc).transpose(0, 2, 1).reshape(xyz.shape[0], -1)
+        f_rest = np.asarray(_features_rest).transpose(0, 2, 1).reshape(xyz.shape[0], -1)
+        opacities = np.asarray(_opacity)
+        scale = np.asarray(_scaling)
+        rotation = np.asarray(_rotation)
 
         # l = ['x', 'y', 'z', 'nx', 'ny', 'nz']
         l = ['x', 'y', 'z']
@@ -80,29 +127,40 @@ def save_gaussian_ply_for_draco(_xyz, _features_dc, _features_rest, _opacity, _s
         for i in range(_rotation.shape[1]):
             l.append('rot_{}'.format(i))
 
-        dtype_full = [(attribute, 'f4') for attribute in l]
-
-        elements = np.empty(xyz.shape[0], dtype=dtype_full)
         # attributes = np.concatenate((xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1)
         attributes = np.concatenate((xyz, f_dc, f_rest, opacities, scale, rotation), axis=1)
-        elements[:] = list(map(tuple, attributes))
-        el = PlyElement.describe(elements, 'vertex')
         
         if ascii:
+            dtype_full = [(attribute, 'f4') for attribute in l]
+            elements = np.ascontiguousarray(attributes, dtype=np.float32).view(dtype_full).reshape(-1)
+            el = PlyElement.describe(elements, 'vertex')
             PlyData([el], text=True).write(str(path))
         else:
-            PlyData([el]).write(str(path))
+            write_float_ply(path, l, attributes)
+
+def convert_scene_dir(load_dir: Path, save_dir: Path, sh_degree):
+    # every .ply under load_dir is written to the same relative path under save_dir
+    ply_paths = sorted(load_dir.rglob("*.ply"))
+    for load_ply_path in ply_paths:
+        output_ply_path = save_dir/load_ply_path.relative_to(load_dir)
+        output_ply_path.parent.mkdir(parents=True, exist_ok=True)
+        convert_gaussian_ply_for_draco(load_ply_path, output_ply_path, sh_degree)
+        print(f"{load_ply_path} -> {output_ply_path}")
+    return ply_paths
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("-i", "--load_ply_path", type=str)
-    parser.add_argument("-o", "--save_ply_path", type=str)
+    parser.add_argument("-i", "--load_ply_path", type=str, help="3DGS .ply, or a directory of scenes")
+    parser.add_argument("-o", "--save_ply_path", type=str, help="output .ply, or the output directory when -i is a directory")
     parser.add_argument("-sh", "--sh_degree", type=int)
     args = parser.parse_args()
 
     load_ply_path = Path(args.load_ply_path)
     output_ply_path = Path(args.save_ply_path)
-    output_ply_path.parent.mkdir(parents=True, exist_ok=True)
 
-    results = load_gaussian_ply(load_ply_path, args.sh_degree)
-    save_gaussian_ply_for_draco(results[0], results[1], results[2], results[3], results[4], results[5], output_ply_path, ascii=True)
+    if load_ply_path.is_dir():
+        if not convert_scene_dir(load_ply_path, output_ply_path, args.sh_degree):
+            print(f"No .ply found under {load_ply_path}")
+    else:
+        output_ply_path.parent.mkdir(parents=True, exist_ok=True)
+        convert_gaussian_ply_for_draco(load_ply_path, output_ply_path, args.sh_degree)
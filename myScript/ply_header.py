@@ -0,0 +1,95 @@
+import numpy as np
+from pathlib import Path
+
+# Reads PLY headers without touching the payload, e.g. to get the number of
+# splats of a multi-gigabyte scene.
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "half": "f2", "float16": "f2",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+_headers = {}
+
+# Returns {"format", "elements", "data_offset", "quantized"} for the PLY file.
+# "elements" is a list of {"name", "count", "properties"} in file order, and
+# every property is (name, numpy type) or (name, (count type, item type)) for
+# list properties. "data_offset" is the byte offset of the payload right after
+# end_header. "quantized" maps the properties written as quantized integers by
+# draco_decoder -precision quantized to their (min value, step), see dequantize.
+# Memoized on (path, size, mtime) so a scene is inspected once per process.
+def read_ply_header(file_path):
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    memo_key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _headers:
+        _headers[memo_key] = _parse_header(file_path)
+    return _headers[memo_key]
+
+def _parse_header(file_path):
+    with open(file_path, 'rb') as f:
+        if f.readline().strip() != b"ply":
+            raise ValueError(f"{file_path} is not a PLY file")
+        ply_format = None
+        elements = []
+        quantized = {}
+        # (min value, step) of the properties following a "comment quantized"
+        pending = []
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{file_path} has no end_header")
+            words = line.decode('ascii', errors='replace').split()
+            if len(words) > 1 and words[:2] == ["comment", "quantized"]:
+                pending = _parse_quantization(words[2:])
+                continue
+            if not words or words[0] in ("comment", "obj_info"):
+                continue
+            if words[0] == "end_header":
+                break
+            if words[0] == "format":
+                ply_format = words[1]
+            elif words[0] == "element":
+                elements.append({"name": words[1], "count": int(words[2]), "properties": []})
+            elif words[0] == "property":
+                if not elements:
+                    raise ValueError(f"{file_path}: property before any element")
+                if words[1] == "list":
+                    prop_type = (PLY_TYPES[words[2]], PLY_TYPES[words[3]])
+                else:
+                    prop_type = PLY_TYPES[words[1]]
+                elements[-1]["properties"].append((words[-1], prop_type))
+                if pending:
+                    quantized[words[-1]] = pending.pop(0)
+        return {"format": ply_format, "elements": elements, "data_offset": f.tell(),
+                "quantized": quantized}
+
+# "comment quantized <first property> <num components> <bits> <range> <min_0>
+# ... <min_n-1>" written by the Draco PLY encoder, as (min value, step) of the
+# next num components properties. Computed in float32 like the Draco
+# dequantizer so dequantized values match a float32 decode exactly.
+def _parse_quantization(words):
+    num_components, bits = int(words[1]), int(words[2])
+    step = np.float32(words[3]) / np.float32((1 << bits) - 1)
+    return [(np.float32(min_value), step) for min_value in words[4:4 + num_components]]
+
+# Float values of the property |name| read as |values|, dequantized when the
+# file stores it quantized.
+def dequantize(header, name, values):
+    if name not in header.get("quantized", {}):
+        return values
+    min_value, step = header["quantized"][name]
+    return np.asarray(values, dtype=np.float32) * step + min_value
+
+def get_element(header, name):
+    for element in header["elements"]:
+        if element["name"] == name:
+            return element
+    raise KeyError(f"no {name} element")
+
+# Number of vertices (splats) of a PLY file, read from its header.
+def vertex_count(file_path):
+    return get_element(read_ply_header(file_path), "vertex")["count"]
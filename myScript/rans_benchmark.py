@@ -0,0 +1,72 @@
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Decode speed of the sequential encoding (-cl 0) with a single rANS stream
+# against -rans_streams N interleaved streams. MB/s is the size of the input
+# .ply over the decode time of draco_decoder (best of numToCal runs).
+
+def run_tool(cmd):
+    ret = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    if ret.returncode != 0:
+        raise RuntimeError(f"{Path(cmd[0]).name} exited with {ret.returncode}: {' '.join(cmd)}")
+
+def read_metrics(file_path):
+    with open(file_path, 'r') as file:
+        return json.load(file)
+
+def encode(build_dir, input_ply, drc, num_streams, extra_flags):
+    run_tool([str(build_dir/"draco_encoder"), "-point_cloud", "-cl", "0",
+              "-rans_streams", str(num_streams),
+              "-i", str(input_ply), "-o", str(drc)] + extra_flags)
+    return drc.stat().st_size
+
+def best_decode_time(build_dir, drc, ply, metrics, numToCal):
+    times = []
+    for i in range(numToCal):
+        run_tool([str(build_dir/"draco_decoder"), "-i", str(drc), "-o", str(ply),
+                  "--metrics-json", str(metrics)])
+        times.append(read_metrics(metrics)["time_us"]["decode"])
+    # the decoder reports whole microseconds, small files can take less
+    return max(min(times), 1)
+
+def benchmark(build_dir, input_ply, stream_counts, numToCal, extra_flags):
+    input_size = input_ply.stat().st_size
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        for num_streams in stream_counts:
+            drc = tmp_dir/f"streams{num_streams}.drc"
+            encode_size = encode(build_dir, input_ply, drc, num_streams, extra_flags)
+            decode_us = best_decode_time(build_dir, drc, tmp_dir/"out.ply",
+                                         tmp_dir/"metrics.json", numToCal)
+            rows.append({"streams": num_streams, "encode_size": encode_size,
+                         "decode_us": decode_us, "mb_per_s": input_size / decode_us})
+    return rows
+
+def print_rows(name, rows):
+    base = rows[0]
+    print(name)
+    print(f"  {'streams':>7} {'size':>10} {'decode us':>10} {'MB/s':>8} {'speedup':>8}")
+    for row in rows:
+        print(f"  {row['streams']:>7} {row['encode_size']:>10} {row['decode_us']:>10} "
+              f"{row['mb_per_s']:>8.1f} {base['decode_us'] / row['decode_us']:>7.2f}x")
+
+if __name__ == "__main__":
+
+    numToCal = 10
+    build_dir = Path("..")/"build_dir"
+    stream_counts = [1, 2, 4, 8]
+    # the bundled point clouds, then the 3DGS scenes if they are around
+    inputs = [Path("..")/"testdata"/name for name in
+              ["point_cloud_test_pos.ply", "point_cloud_test_pos_norm.ply",
+               "test_pos_color.ply", "float_two_att_point_cloud.ply"]]
+    scene_names = ["drjohnson", "playroom", "train", "truck"]
+    inputs += [Path("..")/"expData"/"draco_input"/scene_name/"point_cloud.ply" for scene_name in scene_names]
+    extra_flags = []
+
+    for input_ply in inputs:
+        if not input_ply.exists():
+            continue
+        print_rows(str(input_ply), benchmark(build_dir, input_ply, stream_counts, numToCal, extra_flags))
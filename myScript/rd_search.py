@@ -0,0 +1,209 @@
+import math
+import numpy as np
+import results_store
+import sweep
+
+# Adaptive rate-distortion search over the 10-column settings of
+# main_random.py (qp qn qfd qfr qo qs qr cl qt qg). Instead of a fixed grid or
+# random array, every round fits a log-linear surrogate of encoded size and
+# distortion to the finished settings, and evaluates the neighbours of the
+# current Pareto front that are predicted to grow its hypervolume the most.
+# Settings go through the usual sweep jobs and results store, settings already
+# in the store are reused and do not count against the budget.
+
+SETTING_NAMES = ["qp", "qn", "qfd", "qfr", "qo", "qs", "qr", "cl", "qt", "qg"]
+
+# (low, high) bounds per column, or the name of the column it is tied to. qfr
+# only names the files (the encoder ignores it), so it follows qfd like in
+# main.py. Columns with low == high are fixed.
+SEARCH_SPACE = {
+    "qp": (8, 20),
+    "qn": (1, 1),
+    "qfd": (4, 20),
+    "qfr": "qfd",
+    "qo": (4, 20),
+    "qs": (4, 20),
+    "qr": (4, 20),
+    "cl": (7, 7),
+    "qt": (10, 10),
+    "qg": (8, 8),
+}
+
+# Groups the distortion is averaged over. Normals are not used by 3DGS.
+DISTORTION_GROUPS = ["POSITION", "F_DC", "F_REST_1", "F_REST_2", "F_REST_3", "OPACITY", "SCALE", "ROT"]
+
+# Mean normalized RMSE (rmse / value range, i.e. 10^(-psnr/20)) over the
+# DISTORTION_GROUPS. A group missing from the decoded file counts as fully lost.
+def distortion_of(row):
+    errors = []
+    for group in DISTORTION_GROUPS:
+        psnr = row.get(f"{group}_psnr")
+        if psnr is None or psnr != psnr:
+            errors.append(1.0)
+        else:
+            errors.append(10 ** (-psnr / 20))
+    return float(np.mean(errors))
+
+def pareto_front(points):
+    # indices of the points no other point beats in both size and distortion,
+    # sorted by size
+    order = sorted(range(len(points)), key=lambda i: (points[i][0], points[i][1]))
+    front = []
+    best = math.inf
+    for i in order:
+        if points[i][1] < best:
+            front.append(i)
+            best = points[i][1]
+    return front
+
+def _hypervolume(points, reference):
+    # area dominated by 2D points (minimized on both axes) up to |reference|
+    area = 0.0
+    best = reference[1]
+    for x, y in sorted(points):
+        if x >= reference[0] or y >= best:
+            continue
+        area += (reference[0] - x) * (best - y)
+        best = y
+    return area
+
+def _free_columns(space):
+    return [name for name in SETTING_NAMES if not isinstance(space[name], str) and space[name][0] < space[name][1]]
+
+def _make_setting(values, space):
+    setting = {}
+    for name in SETTING_NAMES:
+        if not isinstance(space[name], str):
+            setting[name] = int(values.get(name, space[name][0]))
+    for name in SETTING_NAMES:
+        if isinstance(space[name], str):
+            setting[name] = setting[space[name]]
+    return tuple(setting[name] for name in SETTING_NAMES)
+
+def _random_settings(rng, count, space):
+    free = _free_columns(space)
+    return [_make_setting({name: rng.integers(space[name][0], space[name][1] + 1) for name in free}, space)
+            for _ in range(count)]
+
+def _neighbours(setting, rng, space, num_random=8):
+    # +-1 and +-2 bits on every free column, plus a few moves of several columns
+    free = _free_columns(space)
+    values = dict(zip(SETTING_NAMES, setting))
+    candidates = []
+    for name in free:
+        for step in (-2, -1, 1, 2):
+            moved = dict(values)
+            moved[name] = min(max(values[name] + step, space[name][0]), space[name][1])
+            candidates.append(_make_setting(moved, space))
+    for _ in range(num_random):
+        moved = dict(values)
+        for name in rng.choice(free, size=min(3, len(free)), replace=False):
+            moved[name] = min(max(values[name] + int(rng.integers(-2, 3)), space[name][0]), space[name][1])
+        candidates.append(_make_setting(moved, space))
+    return candidates
+
+class _Surrogate:
+    # least squares fit of log(size) and log(distortion) on the free columns,
+    # each quantization bit roughly scales both by a constant factor
+    def __init__(self, settings, points, space):
+        self.columns = [SETTING_NAMES.index(name) for name in _free_columns(space)]
+        features = self._features(settings)
+        targets = np.log(np.maximum(np.asarray(points, dtype=np.float64), 1e-12))
+        self.coefficients = np.linalg.lstsq(features, targets, rcond=None)[0]
+
+    def _features(self, settings):
+        settings = np.asarray(settings, dtype=np.float64)
+        return np.column_stack([np.ones(len(settings)), settings[:, self.columns]])
+
+    def predict(self, settings):
+        return np.exp(self._features(settings) @ self.coefficients)
+
+def _evaluate(settings, numToCal, scene_name, num_workers, cache_dir, in_process, store_path):
+    # finished settings (with distortion) come from the store, the others run
+    # as one parallel sweep
+    suffixes = [sweep.make_suffix(*setting[:8]) for setting in settings]
+    with results_store.ResultsStore(store_path) as store:
+        df = store.query("draco", [scene_name], suffixes, numToCal)
+    done = set(df.loc[df["F_DC_mae"].notna(), "suffix"]) if "F_DC_mae" in df.columns else set()
+    jobs = [sweep.make_job(numToCal, scene_name, setting[:8], cache_dir=cache_dir, in_process=in_process,
+                           with_distortion=True)
+            for setting, suffix in zip(settings, suffixes) if suffix not in done]
+    if jobs:
+        sweep.run_sweep(jobs, num_workers, store_path=store_path)
+        with results_store.ResultsStore(store_path) as store:
+            df = store.query("draco", [scene_name], suffixes, numToCal)
+    results = {}
+    for suffix, rows in df.groupby("suffix"):
+        row = rows.iloc[0].to_dict()
+        results[suffix] = (float(row["encode_size"]), distortion_of(row))
+    return {setting: results[suffix] for setting, suffix in zip(settings, suffixes) if suffix in results}, len(jobs)
+
+# Searches the settings of |scene_name| for the size/distortion Pareto front
+# with at most |budget| new encode/decode runs, |batch_size| per round.
+# Returns (front, evaluated): the front settings sorted by size as a
+# (n, 10) array like the random .npy files, and {setting: (encode_size,
+# distortion)} of every evaluated setting.
+def search(numToCal, scene_name, budget=40, batch_size=8, num_initial=None, space=SEARCH_SPACE, seed=0,
+           num_workers=None, cache_dir=None, in_process=False, store_path=results_store.DEFAULT_PATH):
+    rng = np.random.default_rng(seed)
+    if num_initial is None:
+        num_initial = max(batch_size, 2 * len(_free_columns(space)) + 1)
+    evaluated = {}
+    runs = 0
+    # corners of the space anchor both ends of the front
+    low = _make_setting({name: space[name][0] for name in _free_columns(space)}, space)
+    high = _make_setting({name: space[name][1] for name in _free_columns(space)}, space)
+    batch = list(dict.fromkeys([low, high] + _random_settings(rng, num_initial - 2, space)))
+    while batch and runs < budget:
+        batch = batch[:budget - runs]
+        results, new_runs = _evaluate(batch, numToCal, scene_name, num_workers, cache_dir, in_process, store_path)
+        runs += new_runs
+        for setting in batch:
+            # a failed setting is not retried
+            evaluated[setting] = results.get(setting, (math.inf, math.inf))
+        batch = _next_batch(evaluated, rng, batch_size, space)
+        front = [list(evaluated)[i] for i in pareto_front(list(evaluated.values()))]
+        print(f"{scene_name}: {runs} runs, {len(evaluated)} settings, {len(front)} on the front")
+
+    settings = [setting for setting, point in evaluated.items() if math.isfinite(point[0])]
+    points = [evaluated[setting] for setting in settings]
+    front = [settings[i] for i in pareto_front(points)]
+    return np.array(front, dtype=np.float64).reshape(-1, len(SETTING_NAMES)), evaluated
+
+def _next_batch(evaluated, rng, batch_size, space):
+    settings = [setting for setting, point in evaluated.items() if math.isfinite(point[0])]
+    if len(settings) < 2:
+        return []
+    points = [evaluated[setting] for setting in settings]
+    logs = np.log(np.maximum(np.asarray(points), 1e-12))
+    front = [tuple(logs[i]) for i in pareto_front(points)]
+    reference = logs.max(axis=0) + 0.1 * (logs.max(axis=0) - logs.min(axis=0) + 1e-9)
+
+    candidates = set()
+    for i in pareto_front(points):
+        candidates.update(_neighbours(settings[i], rng, space))
+    candidates.update(_random_settings(rng, batch_size, space))
+    candidates = [setting for setting in candidates if setting not in evaluated]
+    if not candidates:
+        return []
+    surrogate = _Surrogate(settings, points, space)
+    predicted = np.log(np.maximum(surrogate.predict(candidates), 1e-12))
+
+    # greedy batch: each pick is added to the front before scoring the next one,
+    # so a batch spreads along the front instead of piling up at one spot
+    batch = []
+    for _ in range(min(batch_size, len(candidates))):
+        base = _hypervolume(front, reference)
+        gains = np.array([_hypervolume(front + [tuple(p)], reference) - base for p in predicted])
+        if gains.max() <= 0:
+            # nothing is predicted to help, explore the closest candidates to the front
+            distances = np.array([min(np.hypot(*(p - np.asarray(f))) for f in front) for p in predicted])
+            gains = -distances
+        best = int(np.argmax(gains))
+        batch.append(candidates[best])
+        front.append(tuple(predicted[best]))
+        del candidates[best]
+        predicted = np.delete(predicted, best, axis=0)
+        if not candidates:
+            break
+    return batch
@@ -0,0 +1,75 @@
+import os
+import shutil
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Stages the gaussian-splatting output/{scene}_{suffix} directories the
+# renderer reads. Every file of a render dir is the same for all settings except
+# the decoded point cloud, so files are hardlinked (or reflinked) instead of
+# copied and a sweep takes almost no extra disk. Copies are only made when
+# neither works, e.g. across filesystems.
+
+FICLONE = 0x40049409  # linux/fs.h
+
+def _reflink(src, dst):
+    # copy-on-write clone on btrfs/xfs, raises OSError where unsupported
+    import fcntl
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            dst_file.close()
+            os.remove(dst)
+            raise
+
+def stage_file(src, dst):
+    # dst is unlinked first and never written through: it may be a hardlink of
+    # a file staged before, and the renderer only reads it
+    if os.path.lexists(dst):
+        if os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        _reflink(src, dst)
+        return
+    except (OSError, ImportError):
+        pass
+    shutil.copyfile(src, dst)
+
+def stage_render_dir(scene_name, suffix, decoded_ply_path, pretrain_model_dir, output_dir):
+    save_dir = Path(output_dir)/f"{scene_name}_{suffix}"
+    ply_save_dir = save_dir/"point_cloud"/"iteration_30000"
+    ply_save_dir.mkdir(parents=True, exist_ok=True)
+
+    # necessary files of the pretrained model, shared by every setting
+    stage_file(Path(pretrain_model_dir)/"input.ply", save_dir/"input.ply")
+    stage_file(Path(pretrain_model_dir)/"cameras.json", save_dir/"cameras.json")
+    # the decoded point cloud
+    stage_file(decoded_ply_path, ply_save_dir/"point_cloud.ply")
+
+    # create new cfg_args
+    with open(save_dir/"cfg_args", 'w') as f:
+        f.write(f"Namespace(data_device='cuda', eval=True, images='images', model_path='./output/{scene_name}_{suffix}', resolution=-1, sh_degree=3, source_path='./data/{scene_name}', white_background=False)")
+
+# Stages the render dirs of (scene_name, suffix) pairs whose decoded .ply and
+# pretrained model exist, on a thread pool since the work is only file system
+# calls. Returns the staged pairs.
+def stage_render_dirs(scene_suffixes, decoded_ply_root=Path("..")/"expData"/"draco_output_ply",
+                      output_dir=Path("..")/".."/"gaussian-splatting"/"output", num_workers=None):
+    tasks = []
+    for scene_name, suffix in scene_suffixes:
+        decoded_ply_path = Path(decoded_ply_root)/scene_name/f"{scene_name}_{suffix}.ply"
+        pretrain_model_dir = Path(output_dir)/f"{scene_name}"
+        if os.path.exists(decoded_ply_path) and os.path.exists(pretrain_model_dir):
+            tasks.append((scene_name, suffix, decoded_ply_path, pretrain_model_dir, output_dir))
+    if num_workers is None:
+        num_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        # list() re-raises the first failure
+        list(executor.map(lambda task: stage_render_dir(*task), tasks))
+    return [(task[0], task[1]) for task in tasks]
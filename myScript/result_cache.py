@@ -0,0 +1,130 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
+
+# Content-addressed cache of sweep results.
+# An entry is keyed by the hash of the input PLY, the hashes of the encoder and
+# decoder binaries and the quantization flags given to the encoder. It keeps the
+# encoded .drc, the decoded .ply and the parsed timings/sizes, so a hit skips
+# both runs. An entry is replaced by a later result with more runs.
+# Entries are evicted least-recently-used first once the cache exceeds max_bytes.
+
+# Bumped whenever the key inputs change, so older entries stop matching.
+KEY_VERSION = 2
+
+DRC_NAME = "out.drc"
+PLY_NAME = "out.ply"
+RESULT_NAME = "result.json"
+
+_file_hashes = {}
+
+def hash_file(file_path, chunk_size=1 << 24):
+    # Memoized on (path, size, mtime) so a scene is hashed once per process.
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    memo_key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_hashes:
+        h = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+        _file_hashes[memo_key] = h.hexdigest()
+    return _file_hashes[memo_key]
+
+def make_key(input_hash, encoder_hash, decoder_hash, encoder_flags):
+    h = hashlib.sha256()
+    h.update(f"v{KEY_VERSION}".encode())
+    h.update(input_hash.encode())
+    h.update(encoder_hash.encode())
+    h.update(decoder_hash.encode())
+    h.update(" ".join(str(flag) for flag in encoder_flags).encode())
+    return h.hexdigest()
+
+def _link_or_copy(src, dst):
+    # Hardlinks cost no space. Outputs are always unlinked before an encoder or
+    # decoder rewrites them, so a shared inode is never truncated in place.
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+class ResultCache:
+    def __init__(self, cache_dir, max_bytes=50 * (1 << 30)):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return self.cache_dir/key[:2]/key
+
+    def get(self, key, drc_path, ply_path):
+        # Returns the cached rows and restores drc/ply at the given paths, or None.
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(entry_dir/RESULT_NAME, 'r') as f:
+                result = json.load(f)
+            _link_or_copy(entry_dir/DRC_NAME, drc_path)
+            _link_or_copy(entry_dir/PLY_NAME, ply_path)
+            os.utime(entry_dir/RESULT_NAME)  # mark as recently used
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def _num_runs(self, entry_dir):
+        try:
+            with open(entry_dir/RESULT_NAME, 'r') as f:
+                return len(json.load(f).get("runs", []))
+        except (OSError, ValueError):
+            return -1
+
+    def put(self, key, drc_path, ply_path, result):
+        # Keeps the entry with the most runs, a sweep with a larger numToCal
+        # replaces the entry of a smaller one.
+        entry_dir = self._entry_dir(key)
+        if entry_dir.exists() and self._num_runs(entry_dir) >= len(result.get("runs", [])):
+            return
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        # Build the entry aside and swap it in, other workers may race on the same key.
+        tmp_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=".tmp_"))
+        try:
+            _link_or_copy(drc_path, tmp_dir/DRC_NAME)
+            _link_or_copy(ply_path, tmp_dir/PLY_NAME)
+            with open(tmp_dir/RESULT_NAME, 'w') as f:
+                json.dump(result, f)
+            if entry_dir.exists():
+                # os.replace() only swaps in a directory over an empty one, so
+                # the old entry is renamed away first and removed after.
+                old_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=".old_"))
+                os.replace(entry_dir, old_dir/"entry")
+                os.replace(tmp_dir, entry_dir)
+                shutil.rmtree(old_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total_bytes = 0
+        for result_path in self.cache_dir.glob(f"*/*/{RESULT_NAME}"):
+            entry_dir = result_path.parent
+            try:
+                size = sum(p.stat().st_size for p in entry_dir.iterdir())
+                last_used = result_path.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((last_used, size, entry_dir))
+            total_bytes += size
+        entries.sort()
+        for last_used, size, entry_dir in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
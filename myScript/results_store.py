@@ -0,0 +1,161 @@
+import sqlite3
+import numbers
+import pandas as pd
+from pathlib import Path
+import ply_header
+
+# All sweep results in one SQLite table instead of one log_{suffix}.csv per
+# setting. The drivers append the rows of a finished job in one transaction,
+# the merge scripts read them back with a single query on the
+# (alg, scene_name, suffix, i) index.
+
+DEFAULT_PATH = Path("..")/"expData"/"results"/"results.sqlite"
+
+# (column, SQLite type) of the fixed columns, in the order of the old CSV files
+# followed by the scene metadata the merge scripts used to add. Distortion
+# metrics are added as REAL columns the first time a row carries them.
+RUN_COLUMNS = [
+    ("i", "INTEGER NOT NULL"),
+    ("qp_value", "INTEGER"), ("qn_value", "INTEGER"),
+    ("qfd_value", "INTEGER"), ("qfr_value", "INTEGER"), ("qo_value", "INTEGER"),
+    ("qs_value", "INTEGER"), ("qr_value", "INTEGER"),
+    ("cl_value", "INTEGER"),
+    ("encode_time", "REAL"), ("encode_size", "INTEGER"), ("decode_time", "REAL"),
+    ("suffix", "TEXT NOT NULL"),
+    ("alg", "TEXT NOT NULL"),
+    ("scene_name", "TEXT NOT NULL"),
+    ("original_size", "INTEGER"),
+    ("numOf3DGS", "INTEGER"),
+]
+
+QUANTIZATION_COLUMNS = ["qp_value", "qn_value", "qfd_value", "qfr_value", "qo_value", "qs_value", "qr_value"]
+
+def _sql_value(value):
+    # numpy scalars are stored as plain numbers, NaN as NULL
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return None if value != value else float(value)
+    return value
+
+class ResultsStore:
+    def __init__(self, db_path=DEFAULT_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_path), timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS runs ("
+                             + ", ".join(f'"{name}" {sql_type}' for name, sql_type in RUN_COLUMNS) + ")")
+            # re-running a setting updates its rows, like rewriting its CSV did
+            self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS runs_key ON runs (alg, scene_name, suffix, i)")
+        self._columns = self._read_columns()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_columns(self):
+        return [row[1] for row in self._db.execute("PRAGMA table_info(runs)")]
+
+    # Appends the rows of one finished job. rows are dicts with the run columns
+    # (i, q*_value, cl_value, timings, encode_size, suffix) and optionally the
+    # distortion metrics. The quantization fields of gzip/bzip2 rows are not
+    # numbers and are stored as NULL, their level is in cl_value.
+    def append(self, alg, scene_name, rows, original_size=None, numOf3DGS=None):
+        if not rows:
+            return
+        records = []
+        for row in rows:
+            record = dict(row)
+            for name in QUANTIZATION_COLUMNS:
+                if name in record and not isinstance(record[name], numbers.Integral):
+                    record[name] = None
+            record.update({"alg": alg, "scene_name": scene_name,
+                           "original_size": original_size, "numOf3DGS": numOf3DGS})
+            records.append(record)
+        names = list(dict.fromkeys(name for record in records for name in record))
+        with self._db:
+            for name in names:
+                if name not in self._columns:
+                    self._db.execute(f'ALTER TABLE runs ADD COLUMN "{name}" REAL')
+                    self._columns.append(name)
+            columns_sql = ", ".join(f'"{name}"' for name in names)
+            # An upsert only touches the incoming columns, and a missing
+            # distortion metric keeps the stored one. A re-run without
+            # with_distortion would otherwise clear the metrics rd_search
+            # uses to tell finished settings apart.
+            fixed = {name for name, _ in RUN_COLUMNS}
+            key = ["alg", "scene_name", "suffix", "i"]
+            update_sql = ", ".join(
+                f'"{name}" = excluded."{name}"' if name in fixed
+                else f'"{name}" = COALESCE(excluded."{name}", runs."{name}")'
+                for name in names if name not in key)
+            self._db.executemany(
+                f"INSERT INTO runs ({columns_sql}) VALUES ({', '.join('?' * len(names))}) "
+                f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {update_sql}",
+                [[_sql_value(record.get(name)) for name in names] for record in records])
+
+    # Returns the rows of |alg| for |scene_names| as one DataFrame, in the
+    # column order of the old merged CSV files. With |suffixes| only those
+    # settings are returned, in the given order per scene; |numToCal| keeps the
+    # first numToCal repeats of every setting.
+    def query(self, alg, scene_names, suffixes=None, numToCal=None):
+        fixed = [name for name, _ in RUN_COLUMNS]
+        distortion_columns = [name for name in self._columns if name not in fixed]
+        # run columns, then distortion metrics, then scene metadata
+        select = fixed[:13] + distortion_columns + fixed[13:]
+        select_sql = ", ".join(f'runs."{name}"' for name in select)
+        limit_sql = "" if numToCal is None else " AND runs.i < ?"
+        limit_args = [] if numToCal is None else [int(numToCal)]
+        if suffixes is None:
+            placeholders = ", ".join("?" * len(scene_names))
+            cursor = self._db.execute(
+                f"SELECT {select_sql} FROM runs WHERE runs.alg = ? AND runs.scene_name IN ({placeholders})"
+                f"{limit_sql} ORDER BY runs.scene_name, runs.suffix, runs.i",
+                [alg, *scene_names, *limit_args])
+        else:
+            # the wanted keys go through a temporary table so the lookup is one
+            # indexed join however many settings there are
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS wanted "
+                             "(pos INTEGER PRIMARY KEY, scene_name TEXT, suffix TEXT)")
+            self._db.execute("DELETE FROM wanted")
+            self._db.executemany("INSERT INTO wanted (scene_name, suffix) VALUES (?, ?)",
+                                 [(scene_name, suffix) for scene_name in scene_names for suffix in suffixes])
+            cursor = self._db.execute(
+                f"SELECT {select_sql} FROM wanted JOIN runs ON runs.alg = ? "
+                f"AND runs.scene_name = wanted.scene_name AND runs.suffix = wanted.suffix"
+                f"{limit_sql} ORDER BY wanted.pos, runs.i",
+                [alg, *limit_args])
+            self._db.commit()
+        return pd.DataFrame(cursor.fetchall(), columns=select)
+
+# Imports the log_{suffix}.csv files written before the store existed, e.g.
+# import_csv_logs(store, "draco", ../expData/draco_csv). One scene per subdir.
+def import_csv_logs(store, alg, csv_root, raw_ply_root=Path("..")/"expData"/"raw_ply"):
+    for scene_dir in sorted(Path(csv_root).iterdir()):
+        if not scene_dir.is_dir():
+            continue
+        ply_path = Path(raw_ply_root)/scene_dir.name/"point_cloud.ply"
+        original_size = numOf3DGS = None
+        if ply_path.exists():
+            original_size = ply_path.stat().st_size
+            numOf3DGS = ply_header.vertex_count(ply_path)
+        for csv_file_path in sorted(scene_dir.glob("log_*.csv")):
+            rows = pd.read_csv(csv_file_path).to_dict("records")
+            store.append(alg, scene_dir.name, rows, original_size, numOf3DGS)
+
+if __name__ == "__main__":
+
+    exp_dir = Path("..")/"expData"
+    with ResultsStore() as store:
+        for alg in ["draco", "gzip", "bzip2"]:
+            csv_root = exp_dir/f"{alg}_csv"
+            if csv_root.is_dir():
+                import_csv_logs(store, alg, csv_root)
+                print(f"imported {csv_root}")
@@ -0,0 +1,304 @@
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import result_cache
+import distortion
+import ply_header
+import results_store
+
+CSV_COLUMNS = ["i", "qp_value", "qn_value", "qfd_value", "qfr_value", "qo_value", "qs_value", "qr_value", "cl_value", "encode_time", "encode_size", "decode_time", "suffix"]
+
+# Timings and sizes come from the --metrics-json record each tool writes,
+# the [YC] lines in the logs are kept for reading by hand only.
+def read_metrics(file_path):
+    with open(file_path, 'r') as file:
+        return json.load(file)
+
+def make_suffix(qp_value, qn_value, qfd_value, qfr_value, qo_value, qs_value, qr_value, cl_value):
+    return f"qp{qp_value}_qn{qn_value}_qfd{qfd_value}_qfr{qfr_value}_qo{qo_value}_qs{qs_value}_qr{qr_value}_cl{cl_value}"
+
+def make_scene_dirs(scene_name, exp_dir=Path("..")/"expData"):
+    # input, drc, ply, log
+    dirs = {
+        "input": exp_dir/"draco_input"/scene_name,
+        "drc": exp_dir/"draco_output_drc"/scene_name,
+        "ply": exp_dir/"draco_output_ply"/scene_name,
+        "log": exp_dir/"draco_log"/scene_name,
+    }
+    for key in ["drc", "ply", "log"]:
+        dirs[key].mkdir(parents=True, exist_ok=True)
+    return dirs
+
+def find_pydraco(build_dir):
+    # the pydraco module is built next to the tools with -DDRACO_PYTHON=ON
+    modules = sorted(Path(build_dir).glob("pydraco*.so")) + sorted(Path(build_dir).glob("pydraco*.pyd"))
+    if not modules:
+        raise FileNotFoundError(f"pydraco module not found in {build_dir}, configure with -DDRACO_PYTHON=ON")
+    return modules[0]
+
+# One job is every repeat of one (scene, setting): encode, then decode its own .drc.
+# Repeats stay inside the job because they all write the same output files.
+# With in_process=True the job runs through the pydraco module instead of the
+# draco_encoder/draco_decoder binaries, and a worker parses each scene only once.
+# With with_distortion=True the decoded .ply is compared to the input and the
+# distortion.compare_ply() metrics are added to the result rows.
+def make_job(numToCal, scene_name, setting, build_dir=Path("..")/"build_dir",
+             cache_dir=None, cache_max_bytes=50 * (1 << 30), in_process=False,
+             with_distortion=False):
+    suffix = make_suffix(*setting)
+    dirs = make_scene_dirs(scene_name)
+    job = {
+        "numToCal": numToCal,
+        "scene_name": scene_name,
+        "setting": tuple(setting),
+        "suffix": suffix,
+        "in_process": in_process,
+        "pydraco": str(find_pydraco(build_dir)) if in_process else None,
+        "encoder": str(build_dir/"draco_encoder"),
+        "decoder": str(build_dir/"draco_decoder"),
+        "input_ply": str(dirs["input"]/"point_cloud.ply"),
+        "drc": str(dirs["drc"]/f"{scene_name}_{suffix}.drc"),
+        "ply": str(dirs["ply"]/f"{scene_name}_{suffix}.ply"),
+        "log_dir": str(dirs["log"]),
+        "cache_dir": None,
+        "with_distortion": with_distortion,
+    }
+    if cache_dir is not None:
+        job["cache_dir"] = str(cache_dir)
+        job["cache_max_bytes"] = cache_max_bytes
+        # timings differ between the two paths, so they do not share entries
+        job["cache_key"] = result_cache.make_key(result_cache.hash_file(job["input_ply"]),
+                                                 result_cache.hash_file(job["pydraco"] if in_process else job["encoder"]),
+                                                 result_cache.hash_file(job["pydraco"] if in_process else job["decoder"]),
+                                                 encoder_flags(setting))
+    return job
+
+def encoder_flags(setting):
+    qp_value, qn_value, qfd_value, qfr_value, qo_value, qs_value, qr_value, cl_value = setting
+    return ["-qp", str(qp_value), "-qn", str(qn_value),
+            "-qfd", str(qfd_value), "-qfr", str(qfr_value), "-qo", str(qo_value),
+            "-qs", str(qs_value), "-qr", str(qr_value),
+            "-cl", str(cl_value)]
+
+def _remove_if_exists(file_path):
+    if os.path.lexists(file_path):
+        os.remove(file_path)
+
+def _run_logged(cmd, log_path):
+    with open(log_path, 'w') as log_file:
+        ret = subprocess.run(cmd, stdout=log_file, stderr=subprocess.STDOUT)
+    if ret.returncode != 0:
+        raise RuntimeError(f"{Path(cmd[0]).name} exited with {ret.returncode} (see {log_path})")
+
+def _make_row(i, setting, run, suffix, distortion_values):
+    row = dict(zip(CSV_COLUMNS, [i, *setting, *run, suffix]))
+    row.update(distortion_values)
+    return row
+
+# Distortion of the decoded .ply, the same for every repeat of a job. The
+# kd-tree encoding (cl > 0 with quantized positions) reorders the points, they
+# are then paired on the position quantization grid.
+def _distortion_values(job):
+    if not job["with_distortion"]:
+        return {}
+    qp_value, cl_value = job["setting"][0], job["setting"][7]
+    if cl_value > 0 and qp_value > 0:
+        result = distortion.compare_ply(job["input_ply"], job["ply"], align="position", position_bits=qp_value)
+    else:
+        result = distortion.compare_ply(job["input_ply"], job["ply"])
+    return distortion.flatten(result)
+
+_pydraco = None
+_scene = (None, None)
+
+def _load_scene(job):
+    global _pydraco, _scene
+    if _pydraco is None:
+        sys.path.insert(0, str(Path(job["pydraco"]).parent))
+        import pydraco
+        _pydraco = pydraco
+    # keep a single scene per worker, jobs are submitted scene by scene
+    if _scene[0] != job["input_ply"]:
+        _scene = (None, None)  # free the previous scene before parsing the next
+        _scene = (job["input_ply"], _pydraco.read_point_cloud(job["input_ply"]))
+    return _scene[1]
+
+def _run_in_process(job):
+    # same settings as the draco_encoder call, -qfr is ignored there so it is not passed
+    pc = _load_scene(job)
+    qp_value, qn_value, qfd_value, qfr_value, qo_value, qs_value, qr_value, cl_value = job["setting"]
+    start = time.perf_counter()
+    data = _pydraco.encode(pc, qp=qp_value, qn=qn_value, qfd=qfd_value,
+                           qo=qo_value, qs=qs_value, qr=qr_value, cl=cl_value)
+    encode_time = int((time.perf_counter() - start) * 1000)
+    with open(job["drc"], 'wb') as f:
+        f.write(data)
+    start = time.perf_counter()
+    decoded = _pydraco.decode(data)
+    decode_time = int((time.perf_counter() - start) * 1000)
+    _pydraco.write_ply(decoded, job["ply"])
+    return encode_time, len(data), decode_time
+
+def run_job(job):
+    suffix = job["suffix"]
+    log_dir = Path(job["log_dir"])
+
+    cache = None
+    if job["cache_dir"] is not None:
+        cache = result_cache.ResultCache(job["cache_dir"], job["cache_max_bytes"])
+        cached = cache.get(job["cache_key"], job["drc"], job["ply"])
+        if cached is not None and len(cached["runs"]) >= job["numToCal"]:
+            distortion_values = _distortion_values(job)
+            return [_make_row(i, job["setting"], cached["runs"][i], suffix, distortion_values)
+                    for i in range(job["numToCal"])]
+
+    runs = []
+    for i in range(job["numToCal"]):
+        encode_log = log_dir/f"encode_{suffix}_{i}.log"
+        decode_log = log_dir/f"decode_{suffix}_{i}.log"
+        encode_metrics = log_dir/f"encode_{suffix}_{i}.json"
+        decode_metrics = log_dir/f"decode_{suffix}_{i}.json"
+        # unlink first, the old outputs may be hardlinked into the cache
+        _remove_if_exists(job["drc"])
+        _remove_if_exists(job["ply"])
+        if job["in_process"]:
+            encode_time, encode_size, decode_time = _run_in_process(job)
+        else:
+            _run_logged([job["encoder"], "-point_cloud",
+                         "-i", job["input_ply"],
+                         "-o", job["drc"],
+                         "--metrics-json", str(encode_metrics)] + encoder_flags(job["setting"]), encode_log)
+            # the decode only depends on the .drc written just above
+            _run_logged([job["decoder"],
+                         "-i", job["drc"],
+                         "-o", job["ply"],
+                         "--metrics-json", str(decode_metrics)], decode_log)
+            encode_record = read_metrics(encode_metrics)
+            decode_record = read_metrics(decode_metrics)
+            # ms, as the [YC] time lines used to report
+            encode_time = encode_record["time_us"]["encode"] // 1000
+            encode_size = encode_record["encoded_size"]
+            decode_time = decode_record["time_us"]["decode"] // 1000
+        runs.append([encode_time, encode_size, decode_time])
+
+    distortion_values = _distortion_values(job)
+    datas = [_make_row(i, job["setting"], run, suffix, distortion_values) for i, run in enumerate(runs)]
+    if cache is not None:
+        cache.put(job["cache_key"], job["drc"], job["ply"], {"suffix": suffix, "runs": runs})
+    return datas
+
+# datas are the rows of run_job(), the CSV_COLUMNS followed by the distortion
+# metrics if any. The input size and splat count are stored with them.
+def store_job_rows(store, job, datas):
+    input_ply = Path(job["input_ply"])
+    store.append("draco", job["scene_name"], datas,
+                 original_size=input_ply.stat().st_size, numOf3DGS=ply_header.vertex_count(input_ply))
+
+# Runs the jobs on a process pool and appends the rows of every finished job to
+# the results store. A failing job is reported and skipped, it does not stop
+# the others.
+def run_sweep(jobs, num_workers=None, store_path=results_store.DEFAULT_PATH):
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    failed = []
+    with results_store.ResultsStore(store_path) as store, \
+            ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {executor.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                datas = future.result()
+            except Exception as e:
+                print(f"{job['scene_name']} {job['suffix']} failed: {e}")
+                failed.append(job)
+                continue
+            store_job_rows(store, job, datas)
+            print(f"{job['scene_name']} {job['suffix']} done")
+    return failed
+
+def _decode_sweep_job(job, i):
+    suffix = job["suffix"]
+    log_dir = Path(job["log_dir"])
+    encode_metrics = log_dir/f"encode_{suffix}_{i}.json"
+    decode_metrics = log_dir/f"decode_{suffix}_{i}.json"
+    # --sweep writes the record next to the .drc, keep it with the other logs
+    os.replace(Path(job["drc"]).with_suffix(".json"), encode_metrics)
+    _remove_if_exists(job["ply"])
+    _run_logged([job["decoder"],
+                 "-i", job["drc"],
+                 "-o", job["ply"],
+                 "--metrics-json", str(decode_metrics)], log_dir/f"decode_{suffix}_{i}.log")
+    encode_record = read_metrics(encode_metrics)
+    decode_record = read_metrics(decode_metrics)
+    run = [encode_record["time_us"]["encode"] // 1000, encode_record["encoded_size"],
+           decode_record["time_us"]["decode"] // 1000]
+    return _make_row(i, job["setting"], run, suffix, _distortion_values(job))
+
+# Suffixes of the rows that draco_encoder --sweep reports as failed in its log.
+def _failed_sweep_suffixes(log_path):
+    with open(log_path, errors='replace') as f:
+        for line in f:
+            if line.startswith("Failed sweep settings:"):
+                return line.split(":", 1)[1].split()
+    return []
+
+# Encodes all settings of one scene with a single draco_encoder --sweep run, so
+# point_cloud.ply is parsed once instead of once per setting, then decodes the
+# .drc files on a process pool. rows are the 10-column settings of main_random.py
+# (qp qn qfd qfr qo qs qr cl qt qg), draco_encoder ignores qt and qg like
+# encoder_flags() does. Stores the same rows as run_sweep(), the result cache is
+# not used.
+def run_encoder_sweep(numToCal, scene_name, rows, build_dir=Path("..")/"build_dir", num_workers=None,
+                      with_distortion=False, store_path=results_store.DEFAULT_PATH):
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    dirs = make_scene_dirs(scene_name)
+    rows = [tuple(int(v) for v in row) for row in rows]
+    settings_path = dirs["log"]/"sweep_settings.txt"
+    with open(settings_path, 'w') as f:
+        f.write("# qp qn qfd qfr qo qs qr cl qt qg\n")
+        for row in rows:
+            f.write(" ".join(str(v) for v in row) + "\n")
+    # one job per distinct setting, qt and qg are not part of the file names
+    jobs = {}
+    for row in rows:
+        job = make_job(numToCal, scene_name, row[:8], build_dir=build_dir, with_distortion=with_distortion)
+        jobs[job["suffix"]] = job
+    jobs = list(jobs.values())
+
+    datas = {job["suffix"]: [] for job in jobs}
+    failed = set()
+    for i in range(numToCal):
+        for job in jobs:
+            _remove_if_exists(job["drc"])
+        encode_log = dirs["log"]/f"encode_sweep_{i}.log"
+        with open(encode_log, 'w') as log_file:
+            # a failing row does not stop the others, its .drc is just missing
+            subprocess.run([jobs[0]["encoder"], "-point_cloud",
+                            "-i", jobs[0]["input_ply"],
+                            "-o", str(dirs["drc"]/scene_name),
+                            "--sweep", str(settings_path)], stdout=log_file, stderr=subprocess.STDOUT)
+        for suffix in _failed_sweep_suffixes(encode_log):
+            if suffix not in failed:
+                print(f"{scene_name} {suffix} failed to encode (see {encode_log})")
+                failed.add(suffix)
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {executor.submit(_decode_sweep_job, job, i): job for job in jobs if job["suffix"] not in failed}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    datas[job["suffix"]].append(future.result())
+                except Exception as e:
+                    print(f"{scene_name} {job['suffix']} failed: {e} (see {encode_log})")
+                    failed.add(job["suffix"])
+
+    with results_store.ResultsStore(store_path) as store:
+        for job in jobs:
+            if job["suffix"] not in failed:
+                store_job_rows(store, job, sorted(datas[job["suffix"]], key=lambda row: row["i"]))
+                print(f"{scene_name} {job['suffix']} done")
+    return [job for job in jobs if job["suffix"] in failed]
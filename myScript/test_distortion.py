@@ -0,0 +1,95 @@
+import math
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import distortion
+
+# python -m unittest test_distortion (from myScript)
+
+NAMES = ["x", "y", "z", "f_dc_0", "f_dc_1", "f_dc_2", "opacity", "rot_0", "rot_1", "rot_2", "rot_3"]
+
+def write_ply(file_path, values, ascii=False):
+    header = "ply\n"
+    header += "format ascii 1.0\n" if ascii else "format binary_little_endian 1.0\n"
+    header += f"element vertex {len(values)}\n"
+    header += "".join(f"property float {name}\n" for name in NAMES)
+    header += "end_header\n"
+    with open(file_path, 'wb') as f:
+        f.write(header.encode("ascii"))
+        if ascii:
+            # float32 values written exactly
+            np.savetxt(f, values.astype(np.float32), fmt="%.9g")
+        else:
+            f.write(values.astype("<f4").tobytes())
+
+class DistortionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self.tmp.name)
+        rng = np.random.default_rng(0)
+        self.original = rng.normal(size=(1000, len(NAMES))).astype(np.float32)
+        self.decoded = (self.original + rng.normal(scale=0.01, size=self.original.shape)).astype(np.float32)
+        self.original_path = self.tmp_dir/"original.ply"
+        write_ply(self.original_path, self.original)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertSameResult(self, result, expected):
+        self.assertEqual(result.keys(), expected.keys())
+        for group in expected:
+            for metric in distortion.METRICS:
+                self.assertTrue(math.isclose(result[group][metric], expected[group][metric], rel_tol=1e-9),
+                                f"{group} {metric}: {result[group][metric]} != {expected[group][metric]}")
+
+    def test_groups(self):
+        decoded_path = self.tmp_dir/"decoded.ply"
+        write_ply(decoded_path, self.decoded)
+        result = distortion.compare_ply(self.original_path, decoded_path)
+        self.assertEqual(list(result), ["POSITION", "F_DC", "OPACITY", "ROT"])
+        opacity = np.abs(self.original[:, 6].astype(np.float64) - self.decoded[:, 6])
+        self.assertAlmostEqual(result["OPACITY"]["mae"], opacity.mean())
+        self.assertAlmostEqual(result["OPACITY"]["max_error"], opacity.max())
+        self.assertEqual(result["OPACITY"]["mismatches"], np.count_nonzero(opacity))
+
+    def test_ascii_matches_binary(self):
+        binary_path = self.tmp_dir/"decoded.ply"
+        ascii_path = self.tmp_dir/"decoded_ascii.ply"
+        write_ply(binary_path, self.decoded)
+        write_ply(ascii_path, self.decoded, ascii=True)
+        self.assertSameResult(distortion.compare_ply(self.original_path, ascii_path),
+                              distortion.compare_ply(self.original_path, binary_path))
+
+    def test_block_size_independent(self):
+        decoded_path = self.tmp_dir/"decoded.ply"
+        write_ply(decoded_path, self.decoded)
+        expected = distortion.compare_ply(self.original_path, decoded_path)
+        for block_size in [1, 7, 999, 1000]:
+            self.assertSameResult(distortion.compare_ply(self.original_path, decoded_path, block_size=block_size),
+                                  expected)
+        ascii_path = self.tmp_dir/"decoded_ascii.ply"
+        write_ply(ascii_path, self.decoded, ascii=True)
+        self.assertSameResult(distortion.compare_ply(self.original_path, ascii_path, block_size=7), expected)
+
+    def test_rotations_compare_up_to_sign(self):
+        # the quaternion codec may return -q for q
+        flipped = self.decoded.copy()
+        flipped[::2, 7:11] *= -1
+        decoded_path = self.tmp_dir/"decoded.ply"
+        write_ply(decoded_path, self.decoded)
+        flipped_path = self.tmp_dir/"flipped.ply"
+        write_ply(flipped_path, flipped)
+        self.assertSameResult(distortion.compare_ply(self.original_path, flipped_path),
+                              distortion.compare_ply(self.original_path, decoded_path))
+        result = distortion.compare_ply(self.original_path, flipped_path)
+        self.assertLess(result["ROT"]["max_error"], 0.1)
+        # other groups keep their sign
+        flipped[::2, 3:6] *= -1
+        write_ply(flipped_path, flipped)
+        self.assertGreater(distortion.compare_ply(self.original_path, flipped_path)["F_DC"]["max_error"], 0.1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import sweep
+from test_sweep import BUILD_DIR, write_gaussian_ply
+
+# python -m unittest test_pydraco (from myScript)
+# Needs draco_encoder and the pydraco module in $DRACO_BUILD_DIR (configure
+# with -DDRACO_PYTHON=ON), the tests are skipped otherwise.
+
+try:
+    sys.path.insert(0, str(sweep.find_pydraco(BUILD_DIR).parent))
+    import pydraco
+except (FileNotFoundError, ImportError):
+    pydraco = None
+
+@unittest.skipUnless(pydraco is not None and (BUILD_DIR/"draco_encoder").exists(),
+                     "pydraco or draco_encoder is not built")
+class PydracoTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self.tmp.name)
+        self.input_ply = self.tmp_dir/"point_cloud.ply"
+        write_gaussian_ply(self.input_ply)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def encode_with_binary(self, flags):
+        drc = self.tmp_dir/"binary.drc"
+        subprocess.run([str(BUILD_DIR/"draco_encoder"), "-point_cloud", "-i", str(self.input_ply),
+                        "-o", str(drc)] + flags, check=True, stdout=subprocess.DEVNULL)
+        return drc.read_bytes()
+
+    def test_encode_matches_draco_encoder(self):
+        pc = pydraco.read_point_cloud(str(self.input_ply))
+        cases = [
+            ([], {}),
+            (["-qp", "14", "-qfd", "10", "-qfr1", "-1", "-qfr2", "-1", "-qfr3", "-1", "-cl", "10"],
+             dict(qp=14, qfd=10, qfr1=-1, qfr2=-1, qfr3=-1, cl=10)),
+            (["-cl", "0", "-qr_quaternion", "-delimit_streams", "-rans_streams", "4", "-point_order", "hilbert"],
+             dict(cl=0, qr_quaternion=True, delimit_streams=True, rans_streams=4, point_order="hilbert")),
+            (["-vq_frest", "16", "-vq_iterations", "3"], dict(vq_frest=16, vq_iterations=3)),
+        ]
+        for flags, kwargs in cases:
+            with self.subTest(flags=flags):
+                self.assertEqual(pydraco.encode(pc, **kwargs), self.encode_with_binary(flags))
+
+    def test_encode_matches_sweep_flags(self):
+        # the in-process sweep passes the same setting as keywords
+        pc = pydraco.read_point_cloud(str(self.input_ply))
+        setting = (16, -1, 12, 10, 10, 10, 10, 7)
+        qp, qn, qfd, _, qo, qs, qr, cl = setting
+        self.assertEqual(pydraco.encode(pc, qp=qp, qn=qn, qfd=qfd, qo=qo, qs=qs, qr=qr, cl=cl),
+                         self.encode_with_binary(sweep.encoder_flags(setting)))
+
+    def test_attribute_is_a_view(self):
+        pc = pydraco.read_point_cloud(str(self.input_ply))
+        position = pc.attribute(pydraco.POSITION)
+        self.assertEqual(position.shape, (pc.num_points, 3))
+        self.assertFalse(position.flags.owndata)
+        # two calls see the same memory, nothing was copied
+        self.assertTrue(np.shares_memory(position, pc.attribute(pydraco.POSITION)))
+        decoded = pydraco.decode(pydraco.encode(pc, cl=0))
+        rot = decoded.attribute(pydraco.ROT)
+        self.assertFalse(rot.flags.owndata)
+        self.assertTrue(np.shares_memory(rot, decoded.attribute(pydraco.ROT)))
+        # the view keeps the point cloud alive
+        del decoded
+        self.assertEqual(rot.shape[1], 4)
+        self.assertTrue(np.isfinite(rot).all())
+
+    def test_invalid_options(self):
+        pc = pydraco.read_point_cloud(str(self.input_ply))
+        with self.assertRaises(ValueError):
+            pydraco.encode(pc, rans_streams=3)
+        with self.assertRaises(ValueError):
+            pydraco.encode(pc, point_order="zorder")
+
+if __name__ == "__main__":
+    unittest.main()
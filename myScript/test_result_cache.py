@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import result_cache
+
+# python -m unittest test_result_cache (from myScript)
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self.tmp.name)
+        self.cache = result_cache.ResultCache(self.tmp_dir/"cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_outputs(self, tag):
+        drc = self.tmp_dir/"out.drc"
+        ply = self.tmp_dir/"out.ply"
+        for file_path in [drc, ply]:
+            if file_path.exists():
+                file_path.unlink()
+            file_path.write_text(tag)
+        return drc, ply
+
+    def test_more_runs_replace_the_entry(self):
+        key = result_cache.make_key("input", "encoder", "decoder", ["-qp", "16"])
+        # numToCal=1
+        drc, ply = self.write_outputs("one")
+        self.cache.put(key, drc, ply, {"suffix": "s", "runs": [[1, 10, 1]]})
+        # numToCal=3, the entry with one run is not enough and gets replaced
+        drc, ply = self.write_outputs("three")
+        self.cache.put(key, drc, ply, {"suffix": "s", "runs": [[1, 10, 1], [2, 10, 2], [3, 10, 3]]})
+        cached = self.cache.get(key, self.tmp_dir/"got.drc", self.tmp_dir/"got.ply")
+        self.assertEqual(len(cached["runs"]), 3)
+        self.assertEqual((self.tmp_dir/"got.ply").read_text(), "three")
+        # a later entry with fewer runs does not replace it
+        drc, ply = self.write_outputs("two")
+        self.cache.put(key, drc, ply, {"suffix": "s", "runs": [[1, 10, 1], [2, 10, 2]]})
+        cached = self.cache.get(key, self.tmp_dir/"got.drc", self.tmp_dir/"got.ply")
+        self.assertEqual(len(cached["runs"]), 3)
+        self.assertEqual((self.tmp_dir/"got.drc").read_text(), "three")
+        # no leftovers of the swap
+        leftovers = [p for p in (self.tmp_dir/"cache").glob("*/.*")]
+        self.assertEqual(leftovers, [])
+
+    def test_key_depends_on_decoder(self):
+        flags = ["-qp", "16"]
+        self.assertNotEqual(result_cache.make_key("input", "encoder", "decoder1", flags),
+                            result_cache.make_key("input", "encoder", "decoder2", flags))
+
+if __name__ == "__main__":
+    unittest.main()
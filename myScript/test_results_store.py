@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import results_store
+
+# python -m unittest test_results_store (from myScript)
+
+def make_row(i, encode_size, distortion=None):
+    row = {"i": i, "qp_value": 16, "qn_value": 16, "qfd_value": 16, "qfr_value": 16,
+           "qo_value": 16, "qs_value": 16, "qr_value": 16, "cl_value": 7,
+           "encode_time": 10, "encode_size": encode_size, "decode_time": 5, "suffix": "s"}
+    if distortion is not None:
+        row.update(distortion)
+    return row
+
+class ResultsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = results_store.ResultsStore(Path(self.tmp.name)/"results.sqlite")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_rerun_without_distortion_keeps_metrics(self):
+        self.store.append("draco", "truck", [make_row(0, 100, {"F_DC_mae": 0.5, "F_DC_psnr": 40.0})])
+        # the same setting again, without with_distortion
+        self.store.append("draco", "truck", [make_row(0, 120)])
+        df = self.store.query("draco", ["truck"])
+        self.assertEqual(len(df), 1)
+        self.assertEqual(df["encode_size"][0], 120)
+        self.assertEqual(df["F_DC_mae"][0], 0.5)
+        self.assertEqual(df["F_DC_psnr"][0], 40.0)
+        # new metrics still replace the stored ones
+        self.store.append("draco", "truck", [make_row(0, 120, {"F_DC_mae": 0.25})])
+        df = self.store.query("draco", ["truck"])
+        self.assertEqual(df["F_DC_mae"][0], 0.25)
+        self.assertEqual(df["F_DC_psnr"][0], 40.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import main_random
+import sweep
+
+# python -m unittest test_sweep (from myScript)
+# The draco_encoder tests use the build in $DRACO_BUILD_DIR (default ../build_dir)
+# and are skipped when it is missing.
+
+BUILD_DIR = Path(os.environ.get("DRACO_BUILD_DIR", Path(__file__).resolve().parent.parent/"build_dir"))
+
+GAUSSIAN_PROPERTIES = (["x", "y", "z", "nx", "ny", "nz", "f_dc_0", "f_dc_1", "f_dc_2"] +
+                       [f"f_rest_{i}" for i in range(45)] +
+                       ["opacity", "scale_0", "scale_1", "scale_2", "rot_0", "rot_1", "rot_2", "rot_3"])
+
+def write_gaussian_ply(file_path, num_points=500, seed=0):
+    values = np.random.default_rng(seed).normal(size=(num_points, len(GAUSSIAN_PROPERTIES))).astype("<f4")
+    values[:, 3:6] = 0  # normals are unused by 3DGS
+    header = "ply\nformat binary_little_endian 1.0\n"
+    header += f"element vertex {num_points}\n"
+    header += "".join(f"property float {name}\n" for name in GAUSSIAN_PROPERTIES)
+    header += "end_header\n"
+    with open(file_path, 'wb') as f:
+        f.write(header.encode("ascii"))
+        f.write(values.tobytes())
+
+class SweepTest(unittest.TestCase):
+    def setUp(self):
+        # make_scene_dirs() works relative to the current directory (../expData)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self.tmp.name)
+        (self.tmp_dir/"work").mkdir()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tmp_dir/"work")
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.tmp.cleanup()
+
+    def test_encoder_flags(self):
+        setting = (16, 1, 10, 9, 8, 7, 6, 0)
+        self.assertEqual(sweep.encoder_flags(setting),
+                         ["-qp", "16", "-qn", "1", "-qfd", "10", "-qfr", "9", "-qo", "8",
+                          "-qs", "7", "-qr", "6", "-cl", "0"])
+
+    def test_duplicate_settings_share_a_job(self):
+        # rows that differ only in qt/qg map to the same files and must run once
+        settings = np.array([[16, 1, 10, 10, 10, 10, 10, 7, 10, 8],
+                             [16, 1, 10, 10, 10, 10, 10, 7, 0, 0],
+                             [16, 1, 12, 10, 10, 10, 10, 7, 10, 8]], dtype=np.float64)
+        with mock.patch.object(sweep, "run_sweep", return_value=[]) as run_sweep:
+            main_random.main(1, ["lego"], settings, cache_dir=None)
+        jobs = run_sweep.call_args[0][0]
+        self.assertEqual(sorted(job["suffix"] for job in jobs),
+                         ["qp16_qn1_qfd10_qfr10_qo10_qs10_qr10_cl7",
+                          "qp16_qn1_qfd12_qfr10_qo10_qs10_qr10_cl7"])
+
+    def test_failed_sweep_suffixes(self):
+        log_path = self.tmp_dir/"encode_sweep_0.log"
+        log_path.write_text("Failed to encode point attributes.\n"
+                            "Encoded 1 of 3 sweep settings.\n"
+                            "Failed sweep settings: qp16_qn1_cl0 qp16_qn-1_cl0\n")
+        self.assertEqual(sweep._failed_sweep_suffixes(log_path), ["qp16_qn1_cl0", "qp16_qn-1_cl0"])
+        log_path.write_text("Encoded 3 of 3 sweep settings.\n")
+        self.assertEqual(sweep._failed_sweep_suffixes(log_path), [])
+
+    @unittest.skipUnless((BUILD_DIR/"draco_encoder").exists(), "draco_encoder is not built")
+    def test_encoder_flags_match_sweep_row(self):
+        # a row of draco_encoder --sweep encodes the same bytes as the per-job
+        # command line, whatever its qt/qg columns
+        input_ply = self.tmp_dir/"point_cloud.ply"
+        write_gaussian_ply(input_ply)
+        encoder = str(BUILD_DIR/"draco_encoder")
+        for setting in [(16, -1, 10, 10, 8, 9, 11, 0), (14, 8, 12, 10, 10, 10, 10, 7)]:
+            suffix = sweep.make_suffix(*setting)
+            settings_path = self.tmp_dir/"settings.txt"
+            settings_path.write_text(" ".join(str(v) for v in setting) + " 0 -1\n")
+            subprocess.run([encoder, "-point_cloud", "-i", str(input_ply), "-o", str(self.tmp_dir/"sweep"),
+                            "--sweep", str(settings_path)], check=True, stdout=subprocess.DEVNULL)
+            single_drc = self.tmp_dir/f"single_{suffix}.drc"
+            subprocess.run([encoder, "-point_cloud", "-i", str(input_ply), "-o", str(single_drc)] +
+                           sweep.encoder_flags(setting), check=True, stdout=subprocess.DEVNULL)
+            self.assertEqual((self.tmp_dir/f"sweep_{suffix}.drc").read_bytes(), single_drc.read_bytes())
+
+    @unittest.skipUnless((BUILD_DIR/"draco_encoder").exists(), "draco_encoder is not built")
+    def test_sweep_reports_failed_rows(self):
+        input_ply = self.tmp_dir/"point_cloud.ply"
+        write_gaussian_ply(input_ply)
+        settings_path = self.tmp_dir/"settings.txt"
+        settings_path.write_text("16 -1 10 10 10 10 10 0 10 8\n"
+                                 "16 -1 31 10 10 10 10 0 10 8\n")
+        ret = subprocess.run([str(BUILD_DIR/"draco_encoder"), "-point_cloud", "-i", str(input_ply),
+                              "-o", str(self.tmp_dir/"sweep"), "--sweep", str(settings_path)],
+                             stdout=subprocess.PIPE, text=True)
+        self.assertNotEqual(ret.returncode, 0)
+        self.assertIn("Encoded 1 of 2 sweep settings.", ret.stdout)
+        log_path = self.tmp_dir/"encode.log"
+        log_path.write_text(ret.stdout)
+        self.assertEqual(sweep._failed_sweep_suffixes(log_path), ["qp16_qn-1_qfd31_qfr10_qo10_qs10_qr10_cl0"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,8 @@ import time
 import shutil
 import pandas as pd
 from pathlib import Path
+import ply_header
+import results_store
 
 def compress_with_gzip(file_dir, save_dir, compressNum=6):
     file_path = file_dir/"point_cloud.ply"  
@@ -65,6 +67,8 @@ def decompress_with_bzip2(file_dir, save_dir):
 def main(numToCal, scene_name, gzip, bzip2, gzip_compression_levels, bzip2_compression_levels):
     
     input_dir = Path("..")/"expData"/"raw_ply"/scene_name
+    original_size = (input_dir/"point_cloud.ply").stat().st_size
+    numOf3DGS = ply_header.vertex_count(input_dir/"point_cloud.ply")
     
     
     
@@ -73,8 +77,6 @@ def main(numToCal, scene_name, gzip, bzip2, gzip_compression_levels, bzip2_compr
         save_gzip_dir.mkdir(parents=True, exist_ok=True)
         save_gzip_ply_dir = Path("..")/"expData"/"gzip_output_ply"/scene_name
         save_gzip_ply_dir.mkdir(parents=True, exist_ok=True)
-        save_gzip_csv_dir = Path("..")/"expData"/"gzip_csv"/scene_name
-        save_gzip_csv_dir.mkdir(parents=True, exist_ok=True)
         
         qp_value = qn_value = qfd_value = qfr_value = qo_value = qs_value = qr_value = "x" 
         for cl_value in gzip_compression_levels:
@@ -87,15 +89,14 @@ def main(numToCal, scene_name, gzip, bzip2, gzip_compression_levels, bzip2_compr
                 # print(compress_time, decompress_time)
                 datas.append([i, qp_value, qn_value, qfd_value, qfr_value, qo_value, qs_value, qr_value, cl_value, compress_time, encode_size, decompress_time, suffix])
             df = pd.DataFrame(datas, columns=["i", "qp_value", "qn_value", "qfd_value", "qfr_value", "qo_value", "qs_value", "qr_value", "cl_value", "encode_time", "encode_size", "decode_time", "suffix"])
-            df.to_csv(save_gzip_csv_dir/f"log_{suffix}.csv", index=False)
+            with results_store.ResultsStore() as store:
+                store.append("gzip", scene_name, df.to_dict("records"), original_size, numOf3DGS)
     
     if bzip2:
         save_bzip2_dir = Path("..")/"expData"/"bzip2_output_bzip2"/scene_name
         save_bzip2_dir.mkdir(parents=True, exist_ok=True)
         save_bzip2_ply_dir = Path("..")/"expData"/"bzip2_output_ply"/scene_name
         save_bzip2_ply_dir.mkdir(parents=True, exist_ok=True)
-        save_bzip2_csv_dir = Path("..")/"expData"/"bzip2_csv"/scene_name
-        save_bzip2_csv_dir.mkdir(parents=True, exist_ok=True)
         
         qp_value = qn_value = qfd_value = qfr_value = qo_value = qs_value = qr_value = "y" 
         for cl_value in bzip2_compression_levels:
@@ -108,7 +109,8 @@ def main(numToCal, scene_name, gzip, bzip2, gzip_compression_levels, bzip2_compr
                 # print(compress_time, decompress_time)
                 datas.append([i, qp_value, qn_value, qfd_value, qfr_value, qo_value, qs_value, qr_value, cl_value, compress_time, encode_size, decompress_time, suffix])
             df = pd.DataFrame(datas, columns=["i", "qp_value", "qn_value", "qfd_value", "qfr_value", "qo_value", "qs_value", "qr_value", "cl_value", "encode_time", "encode_size", "decode_time", "suffix"])
-            df.to_csv(save_bzip2_csv_dir/f"log_{suffix}.csv", index=False)
+            with results_store.ResultsStore() as store:
+                store.append("bzip2", scene_name, df.to_dict("records"), original_size, numOf3DGS)
     
             
 if __name__ == "__main__":
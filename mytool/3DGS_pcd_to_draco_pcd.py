@@ -1,12 +1,11 @@
-import torch
-from torch import nn
 import numpy as np
 from plyfile import PlyData, PlyElement
 from pathlib import Path
+import argparse
 # external lib
 # from scene.gaussian_model import GaussianModel
 
-def load_gaussian_ply(path: Path) -> list:
+def load_gaussian_ply(path: Path, sh_degree=3) -> list:
     plydata = PlyData.read(str(path))
 
     xyz = np.stack((np.asarray(plydata.elements[0]["x"]),
@@ -15,51 +14,53 @@ def load_gaussian_ply(path: Path) -> list:
     
     opacities = np.asarray(plydata.elements[0]["opacity"])[..., np.newaxis]
 
-    features_dc = np.zeros((xyz.shape[0], 3, 1))
+    features_dc = np.zeros((xyz.shape[0], 3, 1), dtype=np.float32)
     features_dc[:, 0, 0] = np.asarray(plydata.elements[0]["f_dc_0"])
     features_dc[:, 1, 0] = np.asarray(plydata.elements[0]["f_dc_1"])
     features_dc[:, 2, 0] = np.asarray(plydata.elements[0]["f_dc_2"])
 
     extra_f_names = [p.name for p in plydata.elements[0].properties if p.name.startswith("f_rest_")]
     extra_f_names = sorted(extra_f_names, key = lambda x: int(x.split('_')[-1]))
-    assert len(extra_f_names)==3*(3 + 1) ** 2 - 3
-    features_extra = np.zeros((xyz.shape[0], len(extra_f_names)))
+    assert len(extra_f_names)==3*(sh_degree + 1) ** 2 - 3
+    features_extra = np.zeros((xyz.shape[0], len(extra_f_names)), dtype=np.float32)
     for idx, attr_name in enumerate(extra_f_names):
         features_extra[:, idx] = np.asarray(plydata.elements[0][attr_name])
     # Reshape (P,F*SH_coeffs) to (P, F, SH_coeffs except DC)
-    features_extra = features_extra.reshape((features_extra.shape[0], 3, (3 + 1) ** 2 - 1))
+    features_extra = features_extra.reshape((features_extra.shape[0], 3, (sh_degree + 1) ** 2 - 1))
 
     scale_names = [p.name for p in plydata.elements[0].properties if p.name.startswith("scale_")]
     scale_names = sorted(scale_names, key = lambda x: int(x.split('_')[-1]))
-    scales = np.zeros((xyz.shape[0], len(scale_names)))
+    scales = np.zeros((xyz.shape[0], len(scale_names)), dtype=np.float32)
     for idx, attr_name in enumerate(scale_names):
         scales[:, idx] = np.asarray(plydata.elements[0][attr_name])
 
     rot_names = [p.name for p in plydata.elements[0].properties if p.name.startswith("rot")]
     rot_names = sorted(rot_names, key = lambda x: int(x.split('_')[-1]))
-    rots = np.zeros((xyz.shape[0], len(rot_names)))
+    rots = np.zeros((xyz.shape[0], len(rot_names)), dtype=np.float32)
     for idx, attr_name in enumerate(rot_names):
         rots[:, idx] = np.asarray(plydata.elements[0][attr_name])
 
-    results = [nn.Parameter(torch.tensor(xyz, dtype=torch.float, device="cuda").requires_grad_(True)), 
-               nn.Parameter(torch.tensor(features_dc, dtype=torch.float, device="cuda").transpose(1, 2).contiguous().requires_grad_(True)),
-               nn.Parameter(torch.tensor(features_extra, dtype=torch.float, device="cuda").transpose(1, 2).contiguous().requires_grad_(True)),
-               nn.Parameter(torch.tensor(opacities, dtype=torch.float, device="cuda").requires_grad_(True)),
-               nn.Parameter(torch.tensor(scales, dtype=torch.float, device="cuda").requires_grad_(True)),
-               nn.Parameter(torch.tensor(rots, dtype=torch.float, device="cuda").requires_grad_(True))
+    # float32 arrays laid out like the GaussianModel parameters,
+    # features are (P, SH_coeffs, F)
+    results = [xyz.astype(np.float32),
+               np.ascontiguousarray(features_dc.transpose(0, 2, 1)),
+               np.ascontiguousarray(features_extra.transpose(0, 2, 1)),
+               opacities.astype(np.float32),
+               scales,
+               rots
                ]
     return results
 
 
 def save_gaussian_ply_for_draco(_xyz, _features_dc, _features_rest, _opacity, _scaling, _rotation, path: Path, ascii=False):
         
-        xyz = _xyz.detach().cpu().numpy()
+        xyz = np.asarray(_xyz)
         normals = np.zeros_like(xyz)
-        f_dc = _features_dc.detach().transpose(1, 2).flatten(start_dim=1).contiguous().cpu().numpy()
-        f_rest = _features_rest.detach().transpose(1, 2).flatten(start_dim=1).contiguous().cpu().numpy()
-        opacities = _opacity.detach().cpu().numpy()
-        scale = _scaling.detach().cpu().numpy()
-        rotation = _rotation.detach().cpu().numpy()
+        f_dc = np.asarray(_features_dc).transpose(0, 2, 1).reshape(xyz.shape[0], -1)
+        f_rest = np.asarray(_features_rest).transpose(0, 2, 1).reshape(xyz.shape[0], -1)
+        opacities = np.asarray(_opacity)
+        scale = np.asarray(_scaling)
+        rotation = np.asarray(_rotation)
 
         l = ['x', 'y', 'z', 'nx', 'ny', 'nz']
         # All channels except the 3 DC
@@ -75,9 +76,8 @@ def save_gaussian_ply_for_draco(_xyz, _features_dc, _features_rest, _opacity, _s
 
         dtype_full = [(attribute, 'f4') for attribute in l]
 
-        elements = np.empty(xyz.shape[0], dtype=dtype_full)
         attributes = np.concatenate((xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1)
-        elements[:] = list(map(tuple, attributes))
+        elements = np.ascontiguousarray(attributes, dtype=np.float32).view(dtype_full).reshape(-1)
         el = PlyElement.describe(elements, 'vertex')
         
         if ascii:
@@ -85,10 +85,27 @@ def save_gaussian_ply_for_draco(_xyz, _features_dc, _features_rest, _opacity, _s
         else:
             PlyData([el]).write(str(path))
 
-if __name__ == "__main__":
-    load_ply_path = Path("..")/"mytest"/"gaussian_input"/"point_cloud.ply"
-    output_ply_path = Path("..")/"mytest"/"draco_input"/"point_cloud.ply"
-    
-    results = load_gaussian_ply(load_ply_path)
+def convert(load_ply_path: Path, output_ply_path: Path, sh_degree=3):
+    output_ply_path.parent.mkdir(parents=True, exist_ok=True)
+    results = load_gaussian_ply(load_ply_path, sh_degree)
     save_gaussian_ply_for_draco(results[0], results[1], results[2], results[3], results[4], results[5], output_ply_path)
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--load_ply_path", type=str, default=str(Path("..")/"mytest"/"gaussian_input"/"point_cloud.ply"),
+                        help="3DGS .ply, or a directory of scenes")
+    parser.add_argument("-o", "--save_ply_path", type=str, default=str(Path("..")/"mytest"/"draco_input"/"point_cloud.ply"),
+                        help="output .ply, or the output directory when -i is a directory")
+    parser.add_argument("-sh", "--sh_degree", type=int, default=3)
+    args = parser.parse_args()
+
+    load_ply_path = Path(args.load_ply_path)
+    output_ply_path = Path(args.save_ply_path)
+
+    if load_ply_path.is_dir():
+        # every .ply under -i is written to the same relative path under -o
+        for scene_ply_path in sorted(load_ply_path.rglob("*.ply")):
+            convert(scene_ply_path, output_ply_path/scene_ply_path.relative_to(load_ply_path), args.sh_degree)
+            print(f"{scene_ply_path} done")
+    else:
+        convert(load_ply_path, output_ply_path, args.sh_degree)
@@ -3,6 +3,9 @@ import numpy as np
 import os
 from pathlib import Path
 import pandas as pd
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent/"myScript"))
+import distortion
 
 def read_binary_ply(file_path):
     with open(file_path, 'rb') as f:
@@ -126,10 +129,11 @@ def test_diff():
     tmp = []
     results = []
     for idx, (in_item, out_item) in enumerate(zip(in_data, out_data)):
-        for x, y in zip(np.nditer(in_item), np.nditer(out_item)):
-            if x != y:
-                tmp.append(idx)
-                count = count + 1
+        # one vectorized comparison per property instead of a loop over values,
+        # NaNs count as mismatches as before
+        mismatches = int(np.count_nonzero(in_item != out_item))
+        tmp.extend([idx] * mismatches)
+        count = count + mismatches
         # if np.array_equal(in_item, out_item):
         #     pass
         # else:
@@ -141,6 +145,9 @@ def test_diff():
         results.append(np.absolute(in_item-out_item).mean())
     print(tmp)
     print(count)
+    # per attribute group MAE/RMSE/PSNR/max error, see myScript/distortion.py
+    print(distortion.compare_ply('../guassianData/penny/point_cloud/iteration_30000/point_cloud.ply',
+                                 '../guassianData/penny/draco/out.ply'))
     # print(in_attribute_name)
     # print(out_attribute_name)
     # print(f"qp: {qp_value}")
@@ -0,0 +1,163 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/attributes/attribute_codebook_transform.h"
+
+#include <cstring>
+
+#include "draco/attributes/attribute_transform_type.h"
+#include "draco/core/varint_decoding.h"
+#include "draco/core/varint_encoding.h"
+#include "draco/core/vector_quantization_utils.h"
+
+namespace draco {
+
+namespace {
+
+// The codebook is learned on a subset of at most this many attribute values
+// per codebook entry, which bounds the cost of an iteration.
+constexpr int kTrainingValuesPerEntry = 64;
+
+}  // namespace
+
+bool AttributeCodebookTransform::InitFromAttribute(
+    const PointAttribute &attribute) {
+  const AttributeTransformData *const transform_data =
+      attribute.GetAttributeTransformData();
+  if (!transform_data ||
+      transform_data->transform_type() != ATTRIBUTE_CODEBOOK_TRANSFORM) {
+    return false;  // Wrong transform type.
+  }
+  int32_t byte_offset = 0;
+  num_components_ = transform_data->GetParameterValue<int32_t>(byte_offset);
+  byte_offset += 4;
+  const int32_t num_entries =
+      transform_data->GetParameterValue<int32_t>(byte_offset);
+  byte_offset += 4;
+  codebook_.resize(static_cast<size_t>(num_entries) * num_components_);
+  for (float &value : codebook_) {
+    value = transform_data->GetParameterValue<float>(byte_offset);
+    byte_offset += 4;
+  }
+  return true;
+}
+
+void AttributeCodebookTransform::CopyToAttributeTransformData(
+    AttributeTransformData *out_data) const {
+  out_data->set_transform_type(ATTRIBUTE_CODEBOOK_TRANSFORM);
+  out_data->AppendParameterValue(static_cast<int32_t>(num_components_));
+  out_data->AppendParameterValue(static_cast<int32_t>(num_entries()));
+  for (const float value : codebook_) {
+    out_data->AppendParameterValue(value);
+  }
+}
+
+bool AttributeCodebookTransform::TransformAttribute(
+    const PointAttribute &attribute, const std::vector<PointIndex> &point_ids,
+    PointAttribute *target_attribute) {
+  if (value_indices_.size() != attribute.size()) {
+    return false;  // ComputeParameters() was not called for |attribute|.
+  }
+  uint32_t *portable_attribute_data = reinterpret_cast<uint32_t *>(
+      target_attribute->GetAddress(AttributeValueIndex(0)));
+  const int num_points = point_ids.empty()
+                             ? static_cast<int>(target_attribute->size())
+                             : static_cast<int>(point_ids.size());
+  for (int i = 0; i < num_points; ++i) {
+    const PointIndex point_id =
+        point_ids.empty() ? PointIndex(i) : point_ids[i];
+    *portable_attribute_data++ =
+        value_indices_[attribute.mapped_index(point_id).value()];
+  }
+  return true;
+}
+
+bool AttributeCodebookTransform::InverseTransformAttribute(
+    const PointAttribute &attribute, PointAttribute *target_attribute) {
+  if (target_attribute->data_type() != DT_FLOAT32 ||
+      target_attribute->num_components() != num_components_) {
+    return false;
+  }
+  const int num_points = target_attribute->size();
+  const uint32_t num_entries = this->num_entries();
+  const size_t entry_size = sizeof(float) * num_components_;
+  const uint32_t *source_attribute_data = reinterpret_cast<const uint32_t *>(
+      attribute.GetAddress(AttributeValueIndex(0)));
+  uint8_t *target_address =
+      target_attribute->GetAddress(AttributeValueIndex(0));
+  for (int i = 0; i < num_points; ++i) {
+    const uint32_t index = *source_attribute_data++;
+    if (index >= num_entries) {
+      return false;
+    }
+    std::memcpy(target_address, &codebook_[index * num_components_],
+                entry_size);
+    target_address += entry_size;
+  }
+  return true;
+}
+
+bool AttributeCodebookTransform::ComputeParameters(
+    const PointAttribute &attribute, int codebook_size, int max_iterations) {
+  num_components_ = attribute.num_components();
+  const int num_values = static_cast<int>(attribute.size());
+  if (num_values == 0 || codebook_size < 1) {
+    return false;
+  }
+  std::vector<float> values(static_cast<size_t>(num_values) * num_components_);
+  for (AttributeValueIndex i(0); i < num_values; ++i) {
+    if (!attribute.ConvertValue<float>(
+            i, num_components_, &values[i.value() * num_components_])) {
+      return false;
+    }
+  }
+  return ComputeKMeansCodebook(
+      values.data(), num_values, num_components_, codebook_size,
+      max_iterations, codebook_size * kTrainingValuesPerEntry, &codebook_,
+      &value_indices_);
+}
+
+bool AttributeCodebookTransform::EncodeParameters(
+    EncoderBuffer *encoder_buffer) const {
+  if (!is_initialized()) {
+    return false;
+  }
+  EncodeVarint(static_cast<uint32_t>(num_entries()), encoder_buffer);
+  encoder_buffer->Encode(static_cast<uint8_t>(num_components_));
+  return encoder_buffer->Encode(codebook_.data(),
+                                sizeof(float) * codebook_.size());
+}
+
+bool AttributeCodebookTransform::DecodeParameters(
+    const PointAttribute &attribute, DecoderBuffer *decoder_buffer) {
+  uint32_t num_entries;
+  uint8_t num_components;
+  if (!DecodeVarint(&num_entries, decoder_buffer) ||
+      !decoder_buffer->Decode(&num_components)) {
+    return false;
+  }
+  const int64_t num_values =
+      static_cast<int64_t>(num_entries) * num_components;
+  if (num_entries == 0 || num_components == 0 ||
+      num_values * static_cast<int64_t>(sizeof(float)) >
+          decoder_buffer->remaining_size()) {
+    return false;
+  }
+  num_components_ = num_components;
+  codebook_.resize(num_values);
+  return decoder_buffer->Decode(codebook_.data(),
+                                sizeof(float) * codebook_.size());
+}
+
+}  // namespace draco
@@ -0,0 +1,92 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_ATTRIBUTES_ATTRIBUTE_CODEBOOK_TRANSFORM_H_
+#define DRACO_ATTRIBUTES_ATTRIBUTE_CODEBOOK_TRANSFORM_H_
+
+#include <vector>
+
+#include "draco/attributes/attribute_transform.h"
+#include "draco/attributes/point_attribute.h"
+#include "draco/core/encoder_buffer.h"
+
+namespace draco {
+
+// Attribute transform for vector quantized attributes. Every attribute value
+// is replaced by the index of its nearest entry in a codebook learned with
+// the k-means algorithm (see vector_quantization_utils.h). The portable
+// attribute holds one index per point and the inverse transform is a table
+// lookup.
+class AttributeCodebookTransform : public AttributeTransform {
+ public:
+  AttributeCodebookTransform() : num_components_(0) {}
+
+  // Return attribute transform type.
+  AttributeTransformType Type() const override {
+    return ATTRIBUTE_CODEBOOK_TRANSFORM;
+  }
+  // Try to init transform from attribute.
+  bool InitFromAttribute(const PointAttribute &attribute) override;
+  // Copy parameter values into the provided AttributeTransformData instance.
+  void CopyToAttributeTransformData(
+      AttributeTransformData *out_data) const override;
+
+  bool TransformAttribute(const PointAttribute &attribute,
+                          const std::vector<PointIndex> &point_ids,
+                          PointAttribute *target_attribute) override;
+
+  bool InverseTransformAttribute(const PointAttribute &attribute,
+                                 PointAttribute *target_attribute) override;
+
+  // Learns a codebook of at most |codebook_size| entries for the values of
+  // |attribute| with at most |max_iterations| k-means iterations.
+  bool ComputeParameters(const PointAttribute &attribute, int codebook_size,
+                         int max_iterations);
+
+  // Encode relevant parameters into buffer.
+  bool EncodeParameters(EncoderBuffer *encoder_buffer) const override;
+
+  bool DecodeParameters(const PointAttribute &attribute,
+                        DecoderBuffer *decoder_buffer) override;
+
+  bool is_initialized() const { return !codebook_.empty(); }
+  int num_components() const { return num_components_; }
+  int num_entries() const {
+    return num_components_ > 0
+               ? static_cast<int>(codebook_.size()) / num_components_
+               : 0;
+  }
+  // Entries of the codebook, stored entry after entry.
+  const std::vector<float> &codebook() const { return codebook_; }
+
+ protected:
+  DataType GetTransformedDataType(
+      const PointAttribute &attribute) const override {
+    return DT_UINT32;
+  }
+  int GetTransformedNumComponents(
+      const PointAttribute &attribute) const override {
+    return 1;
+  }
+
+ private:
+  int num_components_;
+  std::vector<float> codebook_;
+  // Codebook index of every attribute value (only used by the encoder).
+  std::vector<uint32_t> value_indices_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_ATTRIBUTES_ATTRIBUTE_CODEBOOK_TRANSFORM_H_
@@ -23,6 +23,8 @@ enum AttributeTransformType {
   ATTRIBUTE_NO_TRANSFORM = 0,
   ATTRIBUTE_QUANTIZATION_TRANSFORM = 1,
   ATTRIBUTE_OCTAHEDRON_TRANSFORM = 2,
+  ATTRIBUTE_QUATERNION_TRANSFORM = 3,  // [YC] add: smallest three rotations
+  ATTRIBUTE_CODEBOOK_TRANSFORM = 4,  // [YC] add: vector quantization
 };
 
 }  // namespace draco
@@ -254,6 +254,22 @@ class GeometryAttribute {
         return "TEX_COORD";
       case GENERIC:
         return "GENERIC";
+      //! [YC] start: Names of the 3DGS attributes
+      case F_DC:
+        return "F_DC";
+      case F_REST_1:
+        return "F_REST_1";
+      case F_REST_2:
+        return "F_REST_2";
+      case F_REST_3:
+        return "F_REST_3";
+      case OPACITY:
+        return "OPACITY";
+      case SCALE:
+        return "SCALE";
+      case ROT:
+        return "ROT";
+      //! [YC] end
       default:
         return "UNKNOWN";
     }
@@ -19,7 +19,9 @@
 namespace draco {
 
 AttributesDecoder::AttributesDecoder()
-    : point_cloud_decoder_(nullptr), point_cloud_(nullptr) {}
+    : point_cloud_decoder_(nullptr),
+      point_cloud_(nullptr),
+      defer_transform_(false) {}
 
 bool AttributesDecoder::Init(PointCloudDecoder *decoder, PointCloud *pc) {
   point_cloud_decoder_ = decoder;
@@ -59,12 +59,24 @@ class AttributesDecoder : public AttributesDecoderInterface {
     if (!DecodeDataNeededByPortableTransforms(in_buffer)) {
       return false;
     }
+    //! [YC] start: Parallel attribute decoding
+    if (defer_transform_) {
+      return true;
+    }
+    //! [YC] end
     if (!TransformAttributesToOriginalFormat()) {
       return false;
     }
     return true;
   }
 
+  //! [YC] start: Parallel attribute decoding
+  void SetDeferTransform(bool defer) override { defer_transform_ = defer; }
+  bool TransformAttributes() override {
+    return TransformAttributesToOriginalFormat();
+  }
+  //! [YC] end
+
  protected:
   int32_t GetLocalIdForPointAttribute(int32_t point_attribute_id) const {
     const int id_map_size =
@@ -90,6 +102,9 @@ class AttributesDecoder : public AttributesDecoderInterface {
 
   PointCloudDecoder *point_cloud_decoder_;
   PointCloud *point_cloud_;
+  //! [YC] start: Parallel attribute decoding
+  bool defer_transform_;
+  //! [YC] end
 };
 
 }  // namespace draco
@@ -44,6 +44,16 @@ class AttributesDecoderInterface {
   // the derived classes.
   virtual bool DecodeAttributes(DecoderBuffer *in_buffer) = 0;
 
+  //! [YC] start: Parallel attribute decoding
+  // When |defer| is set, DecodeAttributes() stops before the decoded portable
+  // attributes are transformed to their original format, and the transform is
+  // done by a later TransformAttributes() call. TransformAttributes() does not
+  // read the input buffer, so it can run concurrently for all decoders.
+  // Decoders that cannot defer the transform ignore the flag.
+  virtual void SetDeferTransform(bool /* defer */) {}
+  virtual bool TransformAttributes() { return true; }
+  //! [YC] end
+
   virtual int32_t GetAttributeId(int i) const = 0;
   virtual int32_t GetNumAttributes() const = 0;
   virtual PointCloudDecoder *GetDecoder() const = 0;
@@ -19,6 +19,7 @@
 #include "draco/compression/point_cloud/algorithms/float_points_tree_decoder.h"
 #include "draco/compression/point_cloud/point_cloud_decoder.h"
 #include "draco/core/draco_types.h"
+#include "draco/core/parallel_for.h"
 #include "draco/core/varint_decoding.h"
 
 namespace draco {
@@ -494,47 +495,62 @@ bool KdTreeAttributesDecoder::TransformAttributesToOriginalFormat() {
   if (quantized_portable_attributes_.empty() && min_signed_values_.empty()) {
     return true;
   }
+  //! [YC] start: Parallel attribute decoding
+  // Find where the data of every attribute starts, then transform the
+  // attributes independently, concurrently with the "num_threads" option.
+  std::vector<int> quantized_attribute_ids(GetNumAttributes(), -1);
+  std::vector<int> signed_component_offsets(GetNumAttributes(), 0);
   int num_processed_quantized_attributes = 0;
   int num_processed_signed_components = 0;
-  // Dequantize attributes that needed it.
   for (int i = 0; i < GetNumAttributes(); ++i) {
+    const PointAttribute *const att =
+        GetDecoder()->point_cloud()->attribute(GetAttributeId(i));
+    if (att->data_type() == DT_INT32 || att->data_type() == DT_INT16 ||
+        att->data_type() == DT_INT8) {
+      signed_component_offsets[i] = num_processed_signed_components;
+      num_processed_signed_components += att->num_components();
+    } else if (att->data_type() == DT_FLOAT32) {
+      quantized_attribute_ids[i] = num_processed_quantized_attributes++;
+    }
+  }
+  const auto transform_attribute = [&](int i) {
     const int att_id = GetAttributeId(i);
     PointAttribute *const att = GetDecoder()->point_cloud()->attribute(att_id);
+    //! [YC] start: Selective attribute decoding
+    // The values are decoded together with the other attributes, only their
+    // transform can be skipped.
+    if (GetDecoder()->IsAttributeSkipped(*att)) {
+      return true;
+    }
+    //! [YC] end
     if (att->data_type() == DT_INT32 || att->data_type() == DT_INT16 ||
         att->data_type() == DT_INT8) {
-      std::vector<uint32_t> unsigned_val(att->num_components());
-      std::vector<int32_t> signed_val(att->num_components());
       // Values are stored as unsigned in the attribute, make them signed again.
       if (att->data_type() == DT_INT32) {
         if (!TransformAttributeBackToSignedType<int32_t>(
-                att, num_processed_signed_components)) {
+                att, signed_component_offsets[i])) {
           return false;
         }
       } else if (att->data_type() == DT_INT16) {
         if (!TransformAttributeBackToSignedType<int16_t>(
-                att, num_processed_signed_components)) {
+                att, signed_component_offsets[i])) {
           return false;
         }
       } else if (att->data_type() == DT_INT8) {
         if (!TransformAttributeBackToSignedType<int8_t>(
-                att, num_processed_signed_components)) {
+                att, signed_component_offsets[i])) {
           return false;
         }
       }
-      num_processed_signed_components += att->num_components();
     } else if (att->data_type() == DT_FLOAT32) {
       // TODO(ostava): This code should be probably moved out to attribute
       // transform and shared with the SequentialQuantizationAttributeDecoder.
 
       const PointAttribute *const src_att =
-          quantized_portable_attributes_[num_processed_quantized_attributes]
-              .get();
+          quantized_portable_attributes_[quantized_attribute_ids[i]].get();
 
       const AttributeQuantizationTransform &transform =
-          attribute_quantization_transforms_
-              [num_processed_quantized_attributes];
-
-      num_processed_quantized_attributes++;
+          attribute_quantization_transforms_[quantized_attribute_ids[i]];
 
       if (GetDecoder()->options()->GetAttributeBool(
               att->attribute_type(), "skip_attribute_transform", false)) {
@@ -544,7 +560,7 @@ bool KdTreeAttributesDecoder::TransformAttributesToOriginalFormat() {
         // mechanism that would allow to use the final attributes as portable
         // attributes for predictors that may need them.
         att->CopyFrom(*src_att);
-        continue;
+        return true;
       }
 
       // Convert all quantized values back to floats.
@@ -574,8 +590,11 @@ bool KdTreeAttributesDecoder::TransformAttributesToOriginalFormat() {
         out_byte_pos += entry_size;
       }
     }
-  }
-  return true;
+    return true;
+  };
+  return ParallelFor(GetNumAttributes(), GetDecoder()->num_decoding_threads(),
+                     transform_attribute);
+  //! [YC] end
 }
 
 }  // namespace draco
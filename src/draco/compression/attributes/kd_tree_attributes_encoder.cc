@@ -19,6 +19,8 @@
 #include "draco/compression/point_cloud/algorithms/dynamic_integer_points_kd_tree_encoder.h"
 #include "draco/compression/point_cloud/algorithms/float_points_tree_encoder.h"
 #include "draco/compression/point_cloud/point_cloud_encoder.h"
+#include "draco/core/cycle_timer.h"
+#include "draco/core/parallel_for.h"
 #include "draco/core/varint_encoding.h"
 
 namespace draco {
@@ -41,14 +43,25 @@ bool KdTreeAttributesEncoder::TransformAttributesToPortableFormat() {
   }
   num_components_ = num_components;
 
-  // Go over all attributes and quantize them if needed.
-  for (uint32_t i = 0; i < num_attributes(); ++i) {
+  //! [YC] start: Threaded attribute encoding
+  // Go over all attributes and quantize them if needed. Attributes are
+  // independent, so with the "num_threads" option they are processed
+  // concurrently and the results are gathered in the attribute order.
+  std::vector<AttributeQuantizationTransform> quantization_transforms(
+      num_attributes());
+  std::vector<std::unique_ptr<PointAttribute>> portable_attributes(
+      num_attributes());
+  std::vector<std::vector<int32_t>> min_signed_values(num_attributes());
+  const auto transform_attribute = [&](int i) {
     const int att_id = GetAttributeId(i);
     const PointAttribute *const att =
         encoder()->point_cloud()->attribute(att_id);
+    CycleTimer timer;
+    timer.Start();
     if (att->data_type() == DT_FLOAT32) {
       // Quantization path.
-      AttributeQuantizationTransform attribute_quantization_transform;
+      AttributeQuantizationTransform &attribute_quantization_transform =
+          quantization_transforms[i];
       const int quantization_bits = encoder()->options()->GetAttributeInt(
           att_id, "quantization_bits", -1);
       if (quantization_bits < 1) {
@@ -76,8 +89,6 @@ bool KdTreeAttributesEncoder::TransformAttributesToPortableFormat() {
           return false;
         }
       }
-      attribute_quantization_transforms_.push_back(
-          attribute_quantization_transform);
       // Store the quantized attribute in an array that will be used when we do
       // the actual encoding of the data.
       auto portable_att =
@@ -85,14 +96,15 @@ bool KdTreeAttributesEncoder::TransformAttributesToPortableFormat() {
                                                                     num_points);
       attribute_quantization_transform.TransformAttribute(*att, {},
                                                           portable_att.get());
-      quantized_portable_attributes_.push_back(std::move(portable_att));
+      portable_attributes[i] = std::move(portable_att);
     } else if (att->data_type() == DT_INT32 || att->data_type() == DT_INT16 ||
                att->data_type() == DT_INT8) {
       // For signed types, find the minimum value for each component. These
       // values are going to be used to transform the attribute values to
       // unsigned integers that can be processed by the core kd tree algorithm.
-      std::vector<int32_t> min_value(att->num_components(),
-                                     std::numeric_limits<int32_t>::max());
+      std::vector<int32_t> &min_value = min_signed_values[i];
+      min_value.assign(att->num_components(),
+                       std::numeric_limits<int32_t>::max());
       std::vector<int32_t> act_value(att->num_components());
       for (AttributeValueIndex avi(0); avi < static_cast<uint32_t>(att->size());
            ++avi) {
@@ -103,11 +115,30 @@ bool KdTreeAttributesEncoder::TransformAttributesToPortableFormat() {
           }
         }
       }
-      for (int c = 0; c < att->num_components(); ++c) {
-        min_signed_values_.push_back(min_value[c]);
-      }
     }
+    timer.Stop();
+    AttributeEncodingStats *const stats =
+        encoder()->mutable_stats()->attribute(att_id);
+    if (stats) {
+      stats->quantization_time_us += timer.GetInUs();
+    }
+    return true;
+  };
+  if (!ParallelFor(num_attributes(), encoder()->num_encoding_threads(),
+                   transform_attribute)) {
+    return false;
   }
+  for (uint32_t i = 0; i < num_attributes(); ++i) {
+    if (portable_attributes[i] != nullptr) {
+      attribute_quantization_transforms_.push_back(quantization_transforms[i]);
+      quantized_portable_attributes_.push_back(
+          std::move(portable_attributes[i]));
+    }
+    min_signed_values_.insert(min_signed_values_.end(),
+                              min_signed_values[i].begin(),
+                              min_signed_values[i].end());
+  }
+  //! [YC] end
   return true;
 }
 
@@ -154,10 +185,16 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
   const int num_points = encoder()->point_cloud()->num_points();
   PointDVector<uint32_t> point_vector(num_points, num_components_);
 
+  //! [YC] start: Threaded attribute encoding
+  // Find the source of every attribute and its first dimension in the point
+  // vector. The attributes are then copied to their own dimensions, which with
+  // the "num_threads" option happens concurrently.
+  std::vector<const PointAttribute *> source_atts(num_attributes());
+  std::vector<int> first_components(num_attributes());
+  std::vector<int> first_signed_components(num_attributes());
   int num_processed_components = 0;
   int num_processed_quantized_attributes = 0;
   int num_processed_signed_components = 0;
-  // Copy data to the point vector.
   for (uint32_t i = 0; i < num_attributes(); ++i) {
     const int att_id = GetAttributeId(i);
     const PointAttribute *const att =
@@ -182,7 +219,19 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     if (source_att == nullptr) {
       return false;
     }
+    source_atts[i] = source_att;
+    first_components[i] = num_processed_components;
+    first_signed_components[i] = num_processed_signed_components;
+    if (source_att->data_type() == DT_INT32 ||
+        source_att->data_type() == DT_INT16 ||
+        source_att->data_type() == DT_INT8) {
+      num_processed_signed_components += source_att->num_components();
+    }
+    num_processed_components += source_att->num_components();
+  }
 
+  const auto copy_attribute = [&](int i) {
+    const PointAttribute *const source_att = source_atts[i];
     // Copy source_att to the vector.
     if (source_att->data_type() == DT_UINT32) {
       // If the data type is the same as the one used by the point vector, we
@@ -191,7 +240,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
         const AttributeValueIndex avi = source_att->mapped_index(pi);
         const uint8_t *const att_value_address = source_att->GetAddress(avi);
         point_vector.CopyAttribute(source_att->num_components(),
-                                   num_processed_components, pi.value(),
+                                   first_components[i], pi.value(),
                                    att_value_address);
       }
     } else if (source_att->data_type() == DT_INT32 ||
@@ -207,14 +256,13 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
         for (int c = 0; c < source_att->num_components(); ++c) {
           unsigned_point[c] =
               signed_point[c] -
-              min_signed_values_[num_processed_signed_components + c];
+              min_signed_values_[first_signed_components[i] + c];
         }
 
         point_vector.CopyAttribute(source_att->num_components(),
-                                   num_processed_components, pi.value(),
+                                   first_components[i], pi.value(),
                                    &unsigned_point[0]);
       }
-      num_processed_signed_components += source_att->num_components();
     } else {
       // If the data type of the attribute is different, we have to convert the
       // value before we put it to the point vector.
@@ -223,12 +271,27 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
         const AttributeValueIndex avi = source_att->mapped_index(pi);
         source_att->ConvertValue<uint32_t>(avi, &point[0]);
         point_vector.CopyAttribute(source_att->num_components(),
-                                   num_processed_components, pi.value(),
+                                   first_components[i], pi.value(),
                                    point.data());
       }
     }
-    num_processed_components += source_att->num_components();
+    return true;
+  };
+  if (!ParallelFor(num_attributes(), encoder()->num_encoding_threads(),
+                   copy_attribute)) {
+    return false;
   }
+  //! [YC] end
+
+  //! [YC] start: Scalable kD-tree encoding
+  // The quantized values are no longer needed once they are in the point
+  // vector, release them before the tree is built.
+  quantized_portable_attributes_.clear();
+  quantized_portable_attributes_.shrink_to_fit();
+  // Independent subtrees are encoded on worker threads, the encoded data
+  // does not depend on the number of threads.
+  const int num_threads = encoder()->num_encoding_threads();
+  //! [YC] end
 
   // Compute the maximum bit length needed for the kd tree encoding.
   int num_bits = 0;
@@ -245,6 +308,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
   switch (compression_level) {
     case 6: {
       DynamicIntegerPointsKdTreeEncoder<6> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -253,6 +317,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     }
     case 5: {
       DynamicIntegerPointsKdTreeEncoder<5> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -261,6 +326,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     }
     case 4: {
       DynamicIntegerPointsKdTreeEncoder<4> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -269,6 +335,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     }
     case 3: {
       DynamicIntegerPointsKdTreeEncoder<3> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -277,6 +344,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     }
     case 2: {
       DynamicIntegerPointsKdTreeEncoder<2> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -285,6 +353,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     }
     case 1: {
       DynamicIntegerPointsKdTreeEncoder<1> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -293,6 +362,7 @@ bool KdTreeAttributesEncoder::EncodePortableAttributes(
     }
     case 0: {
       DynamicIntegerPointsKdTreeEncoder<0> points_encoder(num_components_);
+      points_encoder.SetNumThreads(num_threads);  // [YC] add: scalable kD-tree
       if (!points_encoder.EncodePoints(point_vector.begin(), point_vector.end(),
                                        num_bits, out_buffer)) {
         return false;
@@ -0,0 +1,172 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+// Utilities for converting rotation quaternions to the "smallest three"
+// representation and back.
+//
+// A rotation is represented by a unit quaternion q, and -q represents the same
+// rotation. After normalization, the component with the largest magnitude is
+// dropped and only its index (two bits) is stored. The sign of the quaternion
+// is chosen such that the dropped component is positive, so it can be
+// recovered from the unit length as sqrt(1 - a^2 - b^2 - c^2). The remaining
+// three components lie in [-1/sqrt(2), 1/sqrt(2)] and are quantized uniformly.
+//
+// Important values in this file:
+// * q: number of quantization bits of the three stored components
+// * max_quantized_value: the max value representable with q bits (odd)
+// * max_value: max value used by the quantization = max_quantized_value - 1
+//   (even, so that a zero component is represented exactly by center_value)
+// * center_value: the quantized value of zero
+
+#ifndef DRACO_COMPRESSION_ATTRIBUTES_QUATERNION_COMPRESSION_UTILS_H_
+#define DRACO_COMPRESSION_ATTRIBUTES_QUATERNION_COMPRESSION_UTILS_H_
+
+#include <inttypes.h>
+
+#include <algorithm>
+#include <cmath>
+
+#include "draco/core/macros.h"
+
+namespace draco {
+
+class QuaternionToolBox {
+ public:
+  // Number of values of one quaternion in the smallest three representation,
+  // the index of the dropped component followed by the three quantized
+  // components.
+  static constexpr int kNumComponents = 4;
+
+  QuaternionToolBox()
+      : quantization_bits_(-1),
+        max_quantized_value_(-1),
+        max_value_(-1),
+        center_value_(-1),
+        quantization_scale_(1.),
+        dequantization_scale_(1.f) {}
+
+  bool SetQuantizationBits(int32_t q) {
+    if (q < 2 || q > 30) {
+      return false;
+    }
+    quantization_bits_ = q;
+    max_quantized_value_ = (1u << quantization_bits_) - 1;
+    max_value_ = max_quantized_value_ - 1;
+    center_value_ = max_value_ / 2;
+    quantization_scale_ = center_value_ * std::sqrt(2.);
+    dequantization_scale_ = 1.f / quantization_scale_;
+    return true;
+  }
+  bool IsInitialized() const { return quantization_bits_ != -1; }
+
+  // Converts |quaternion| (in any length) to the smallest three
+  // representation: |out_values[0]| is the index of the dropped component and
+  // |out_values[1..3]| are the quantized values of the other components in
+  // their order. Quaternions of zero length (or with non-finite components)
+  // are encoded as (1, 0, 0, 0), the identity rotation in the (w, x, y, z)
+  // order of the 3DGS rot_0..3 properties.
+  inline void QuaternionToQuantizedSmallestThree(const float *quaternion,
+                                                 int32_t *out_values) const {
+    DRACO_DCHECK(IsInitialized());
+    double length_sq = 0;
+    for (int i = 0; i < 4; ++i) {
+      length_sq += static_cast<double>(quaternion[i]) * quaternion[i];
+    }
+    if (!(length_sq > 0) || !std::isfinite(length_sq)) {
+      out_values[0] = 0;
+      out_values[1] = out_values[2] = out_values[3] = center_value_;
+      return;
+    }
+    int largest = 0;
+    for (int i = 1; i < 4; ++i) {
+      if (std::abs(quaternion[i]) > std::abs(quaternion[largest])) {
+        largest = i;
+      }
+    }
+    // Canonicalize the sign so that the dropped component is positive.
+    const double scale =
+        (quaternion[largest] < 0 ? -1. : 1.) / std::sqrt(length_sq);
+    out_values[0] = largest;
+    int32_t *value = out_values + 1;
+    for (int i = 0; i < 4; ++i) {
+      if (i == largest) {
+        continue;
+      }
+      *value++ = QuantizeComponent(quaternion[i] * scale);
+    }
+  }
+
+  // Converts the smallest three representation |in_values| back to a unit
+  // quaternion.
+  inline void QuantizedSmallestThreeToQuaternion(const int32_t *in_values,
+                                                 float *out_quaternion) const {
+    DRACO_DCHECK(IsInitialized());
+    const int largest = in_values[0] & 3;
+    const int32_t *value = in_values + 1;
+    float sum_sq = 0.f;
+    for (int i = 0; i < 4; ++i) {
+      if (i == largest) {
+        continue;
+      }
+      out_quaternion[i] = DequantizeComponent(*value++);
+      sum_sq += out_quaternion[i] * out_quaternion[i];
+    }
+    if (sum_sq <= 1.f) {
+      out_quaternion[largest] = std::sqrt(1.f - sum_sq);
+      return;
+    }
+    // Only reachable with invalid input, the stored components of a valid
+    // quaternion are smaller than the dropped one.
+    out_quaternion[largest] = 0.f;
+    const float inv_length = 1.f / std::sqrt(sum_sq);
+    for (int i = 0; i < 4; ++i) {
+      out_quaternion[i] *= inv_length;
+    }
+  }
+
+  // Quantizes |value| from [-1/sqrt(2), 1/sqrt(2)] to [0, max_value].
+  // Computed in double and clamped in integer space: with 30 quantization
+  // bits the quantized values are not representable as floats.
+  inline int32_t QuantizeComponent(double value) const {
+    const double scaled = std::floor(value * quantization_scale_ + 0.5);
+    const int64_t quantized =
+        static_cast<int64_t>(std::min(std::max(scaled, -2. * center_value_),
+                                      2. * center_value_)) +
+        center_value_;
+    return static_cast<int32_t>(
+        std::min<int64_t>(std::max<int64_t>(quantized, 0), max_value_));
+  }
+
+  inline float DequantizeComponent(int32_t value) const {
+    value = std::min(std::max(value, 0), max_value_);
+    return static_cast<float>(value - center_value_) * dequantization_scale_;
+  }
+
+  int32_t quantization_bits() const { return quantization_bits_; }
+  int32_t max_quantized_value() const { return max_quantized_value_; }
+  int32_t max_value() const { return max_value_; }
+  int32_t center_value() const { return center_value_; }
+
+ private:
+  int32_t quantization_bits_;
+  int32_t max_quantized_value_;
+  int32_t max_value_;
+  int32_t center_value_;
+  double quantization_scale_;
+  float dequantization_scale_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_ATTRIBUTES_QUATERNION_COMPRESSION_UTILS_H_
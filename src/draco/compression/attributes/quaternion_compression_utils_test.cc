@@ -0,0 +1,144 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/attributes/quaternion_compression_utils.h"
+
+#include <algorithm>
+#include <cmath>
+
+#include "draco/core/draco_test_base.h"
+
+namespace draco {
+
+class QuaternionCompressionUtilsTest : public ::testing::Test {
+ protected:
+  // Returns the angle of the rotation between the unit quaternions |a| and |b|
+  // (computed from their distance, which is accurate for small angles).
+  static double RotationAngle(const float *a, const float *b) {
+    double dot = 0;
+    for (int i = 0; i < 4; ++i) {
+      dot += static_cast<double>(a[i]) * b[i];
+    }
+    const double sign = dot < 0 ? -1. : 1.;
+    double distance_sq = 0;
+    for (int i = 0; i < 4; ++i) {
+      const double d = a[i] - sign * b[i];
+      distance_sq += d * d;
+    }
+    return 4. * std::asin(std::min(std::sqrt(distance_sq) / 2., 1.));
+  }
+
+  static void Normalize(float *q) {
+    const float length =
+        std::sqrt(q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3]);
+    for (int i = 0; i < 4; ++i) {
+      q[i] /= length;
+    }
+  }
+};
+
+TEST_F(QuaternionCompressionUtilsTest, TestSmallestThree) {
+  QuaternionToolBox tool_box;
+  ASSERT_FALSE(tool_box.SetQuantizationBits(1));
+  ASSERT_TRUE(tool_box.SetQuantizationBits(8));
+  ASSERT_EQ(tool_box.max_value(), 254);
+  ASSERT_EQ(tool_box.center_value(), 127);
+
+  // The largest component is dropped and made positive by flipping the sign
+  // of the quaternion.
+  const float quaternion[4] = {0.f, -2.f, 0.f, 0.f};
+  int32_t values[4];
+  tool_box.QuaternionToQuantizedSmallestThree(quaternion, values);
+  ASSERT_EQ(values[0], 1);
+  for (int i = 1; i < 4; ++i) {
+    ASSERT_EQ(values[i], tool_box.center_value());
+  }
+  float decoded[4];
+  tool_box.QuantizedSmallestThreeToQuaternion(values, decoded);
+  ASSERT_EQ(decoded[0], 0.f);
+  ASSERT_EQ(decoded[1], 1.f);
+
+  // q and -q are the same rotation and encode to the same values.
+  const float q[4] = {0.3f, -0.5f, 0.1f, 0.8f};
+  const float minus_q[4] = {-0.3f, 0.5f, -0.1f, -0.8f};
+  int32_t q_values[4], minus_q_values[4];
+  tool_box.QuaternionToQuantizedSmallestThree(q, q_values);
+  tool_box.QuaternionToQuantizedSmallestThree(minus_q, minus_q_values);
+  for (int i = 0; i < 4; ++i) {
+    ASSERT_EQ(q_values[i], minus_q_values[i]);
+  }
+
+  // Zero quaternions become the identity rotation.
+  const float zero[4] = {0.f, 0.f, 0.f, 0.f};
+  tool_box.QuaternionToQuantizedSmallestThree(zero, values);
+  tool_box.QuantizedSmallestThreeToQuaternion(values, decoded);
+  ASSERT_EQ(decoded[0], 1.f);
+  ASSERT_EQ(decoded[1], 0.f);
+  ASSERT_EQ(decoded[2], 0.f);
+  ASSERT_EQ(decoded[3], 0.f);
+}
+
+TEST_F(QuaternionCompressionUtilsTest, TestRotationError) {
+  QuaternionToolBox tool_box;
+  for (const int bits : {6, 11, 16, 23, 30}) {
+    ASSERT_TRUE(tool_box.SetQuantizationBits(bits));
+    // Each stored component is within half a quantization step. The error of
+    // the restored component is at most sqrt(3) times larger (it is at least
+    // 1/2, the others are at most sqrt(3)/2 in total) and the angle is twice
+    // the distance of the quaternions.
+    const double step = std::sqrt(0.5) / tool_box.center_value();
+    // Beyond ~20 bits the float output limits the accuracy.
+    const double max_error = std::max(
+        2. * (1. + std::sqrt(3.)) * std::sqrt(3.) * 0.5 * step, 2e-6);
+    double max_angle = 0;
+    for (int i = 0; i < 1000; ++i) {
+      float q[4] = {std::sin(0.37f * i), std::cos(1.3f * i),
+                    std::sin(2.1f * i + 1.f), std::cos(0.7f * i + 2.f)};
+      Normalize(q);
+      int32_t values[4];
+      tool_box.QuaternionToQuantizedSmallestThree(q, values);
+      for (int c = 1; c < 4; ++c) {
+        ASSERT_GE(values[c], 0);
+        ASSERT_LE(values[c], tool_box.max_value());
+      }
+      float decoded[4];
+      tool_box.QuantizedSmallestThreeToQuaternion(values, decoded);
+      double length_sq = 0;
+      for (int c = 0; c < 4; ++c) {
+        length_sq += decoded[c] * decoded[c];
+      }
+      ASSERT_NEAR(length_sq, 1., 1e-5);
+      max_angle = std::max(max_angle, RotationAngle(q, decoded));
+    }
+    ASSERT_LT(max_angle, max_error);
+
+    // Components of +-1/sqrt(2) (two equally large components) map to the
+    // ends of the quantized range, also when rounding pushes them past it.
+    const float half = std::sqrt(0.5f);
+    for (const float edge : {half, -half, std::nextafter(half, 1.f)}) {
+      const float q[4] = {half, edge, 0.f, 0.f};
+      int32_t values[4];
+      tool_box.QuaternionToQuantizedSmallestThree(q, values);
+      for (int c = 1; c < 4; ++c) {
+        ASSERT_GE(values[c], 0) << bits;
+        ASSERT_LE(values[c], tool_box.max_value()) << bits;
+      }
+      float decoded[4];
+      tool_box.QuantizedSmallestThreeToQuaternion(values, decoded);
+      ASSERT_LT(RotationAngle(q, decoded), max_error) << bits;
+    }
+  }
+}
+
+}  // namespace draco
@@ -36,10 +36,14 @@ bool SequentialAttributeDecoder::InitializeStandalone(
 
 bool SequentialAttributeDecoder::DecodePortableAttribute(
     const std::vector<PointIndex> &point_ids, DecoderBuffer *in_buffer) {
+  //! [YC] start: Selective attribute decoding
+  // The values of a skipped attribute are never stored, so its buffer is not
+  // allocated.
   if (attribute_->num_components() <= 0 ||
-      !attribute_->Reset(point_ids.size())) {
+      (!IsSkipped() && !attribute_->Reset(point_ids.size()))) {
     return false;
   }
+  //! [YC] end
   if (!DecodeValues(point_ids, in_buffer)) {
     return false;
   }
@@ -58,6 +62,12 @@ bool SequentialAttributeDecoder::TransformAttributeToOriginalFormat(
   return true;
 }
 
+//! [YC] start: Selective attribute decoding
+bool SequentialAttributeDecoder::IsSkipped() const {
+  return decoder_ != nullptr && decoder_->IsAttributeSkipped(*attribute_);
+}
+//! [YC] end
+
 const PointAttribute *SequentialAttributeDecoder::GetPortableAttribute() {
   // If needed, copy point to attribute value index mapping from the final
   // attribute to the portable attribute.
@@ -101,6 +111,16 @@ bool SequentialAttributeDecoder::DecodeValues(
     const std::vector<PointIndex> &point_ids, DecoderBuffer *in_buffer) {
   const int32_t num_values = static_cast<uint32_t>(point_ids.size());
   const int entry_size = static_cast<int>(attribute_->byte_stride());
+  //! [YC] start: Selective attribute decoding
+  if (IsSkipped()) {
+    const int64_t num_bytes = static_cast<int64_t>(num_values) * entry_size;
+    if (in_buffer->remaining_size() < num_bytes) {
+      return false;
+    }
+    in_buffer->Advance(num_bytes);
+    return true;
+  }
+  //! [YC] end
   std::unique_ptr<uint8_t[]> value_data_ptr(new uint8_t[entry_size]);
   uint8_t *const value_data = value_data_ptr.get();
   int out_byte_pos = 0;
@@ -55,6 +55,13 @@ class SequentialAttributeDecoder {
   int attribute_id() const { return attribute_id_; }
   PointCloudDecoder *decoder() const { return decoder_; }
 
+  //! [YC] start: Selective attribute decoding
+  // Returns true if the attribute is left out of the decoded geometry (see
+  // PointCloudDecoder::IsAttributeSkipped()). Its values are then parsed past
+  // without being stored and the attribute is not transformed.
+  bool IsSkipped() const;
+  //! [YC] end
+
  protected:
   // Should be used to initialize newly created prediction scheme.
   // Returns false when the initialization failed (in which case the scheme
@@ -17,7 +17,11 @@
 #include "draco/compression/attributes/sequential_normal_attribute_decoder.h"
 #endif
 #include "draco/compression/attributes/sequential_quantization_attribute_decoder.h"
+#include "draco/compression/attributes/sequential_quaternion_attribute_decoder.h"  // [YC] add: quaternion codec
+#include "draco/compression/attributes/sequential_codebook_attribute_decoder.h"  // [YC] add: vector quantization
 #include "draco/compression/config/compression_shared.h"
+#include "draco/core/parallel_for.h"  // [YC] add: parallel attribute decoding
+#include "draco/core/varint_decoding.h"  // [YC] add: delimited attribute streams
 
 namespace draco {
 
@@ -69,6 +73,11 @@ bool SequentialAttributeDecodersController::DecodeAttributes(
 
 bool SequentialAttributeDecodersController::DecodePortableAttributes(
     DecoderBuffer *in_buffer) {
+  //! [YC] start: Delimited attribute streams
+  if (GetDecoder()->delimited_attribute_streams()) {
+    return DecodeDelimitedPortableAttributes(in_buffer);
+  }
+  //! [YC] end
   const int32_t num_attributes = GetNumAttributes();
   for (int i = 0; i < num_attributes; ++i) {
     if (!sequential_decoders_[i]->DecodePortableAttribute(point_ids_,
@@ -91,35 +100,83 @@ bool SequentialAttributeDecodersController::
   return true;
 }
 
-bool SequentialAttributeDecodersController::
-    TransformAttributesToOriginalFormat() {
+//! [YC] start: Delimited attribute streams
+bool SequentialAttributeDecodersController::DecodeDelimitedPortableAttributes(
+    DecoderBuffer *in_buffer) {
   const int32_t num_attributes = GetNumAttributes();
+  std::vector<uint64_t> value_sizes(num_attributes);
   for (int i = 0; i < num_attributes; ++i) {
-    // Check whether the attribute transform should be skipped.
-    if (GetDecoder()->options()) {
-      const PointAttribute *const attribute =
-          sequential_decoders_[i]->attribute();
-      const PointAttribute *const portable_attribute =
-          sequential_decoders_[i]->GetPortableAttribute();
-      if (portable_attribute &&
-          GetDecoder()->options()->GetAttributeBool(
-              attribute->attribute_type(), "skip_attribute_transform", false)) {
-        // Attribute transform should not be performed. In this case, we replace
-        // the output geometry attribute with the portable attribute.
-        // TODO(ostava): We can potentially avoid this copy by introducing a new
-        // mechanism that would allow to use the final attributes as portable
-        // attributes for predictors that may need them.
-        sequential_decoders_[i]->attribute()->CopyFrom(*portable_attribute);
-        continue;
-      }
+    if (!DecodeVarint(&value_sizes[i], in_buffer)) {
+      return false;
     }
-    if (!sequential_decoders_[i]->TransformAttributeToOriginalFormat(
-            point_ids_)) {
+  }
+  std::vector<DecoderBuffer> value_buffers(num_attributes);
+  const uint64_t remaining_size = in_buffer->remaining_size();
+  uint64_t offset = 0;
+  for (int i = 0; i < num_attributes; ++i) {
+    if (value_sizes[i] > remaining_size - offset) {
       return false;
     }
+    value_buffers[i].Init(in_buffer->data_head() + offset, value_sizes[i],
+                          in_buffer->bitstream_version());
+    offset += value_sizes[i];
   }
+  if (!ParallelFor(num_attributes, GetDecoder()->num_decoding_threads(),
+                   [&](int i) {
+                     return sequential_decoders_[i]->DecodePortableAttribute(
+                         point_ids_, &value_buffers[i]);
+                   })) {
+    return false;
+  }
+  in_buffer->Advance(offset);
   return true;
 }
+//! [YC] end
+
+bool SequentialAttributeDecodersController::
+    TransformAttributesToOriginalFormat() {
+  //! [YC] start: Parallel attribute decoding
+  // The attributes are transformed independently of each other. Before
+  // version 2.0 the transforms ran while decoding the values.
+  const int num_threads =
+      GetDecoder()->bitstream_version() >= DRACO_BITSTREAM_VERSION(2, 0)
+          ? GetDecoder()->num_decoding_threads()
+          : 1;
+  return ParallelFor(GetNumAttributes(), num_threads, [&](int i) {
+    return TransformAttributeToOriginalFormat(i);
+  });
+  //! [YC] end
+}
+
+//! [YC] start: Parallel attribute decoding
+bool SequentialAttributeDecodersController::TransformAttributeToOriginalFormat(
+    int i) {
+  // Skipped attributes are removed from the decoded point cloud.
+  if (sequential_decoders_[i]->IsSkipped()) {
+    return true;
+  }
+  // Check whether the attribute transform should be skipped.
+  if (GetDecoder()->options()) {
+    const PointAttribute *const attribute =
+        sequential_decoders_[i]->attribute();
+    const PointAttribute *const portable_attribute =
+        sequential_decoders_[i]->GetPortableAttribute();
+    if (portable_attribute &&
+        GetDecoder()->options()->GetAttributeBool(
+            attribute->attribute_type(), "skip_attribute_transform", false)) {
+      // Attribute transform should not be performed. In this case, we replace
+      // the output geometry attribute with the portable attribute.
+      // TODO(ostava): We can potentially avoid this copy by introducing a new
+      // mechanism that would allow to use the final attributes as portable
+      // attributes for predictors that may need them.
+      sequential_decoders_[i]->attribute()->CopyFrom(*portable_attribute);
+      return true;
+    }
+  }
+  return sequential_decoders_[i]->TransformAttributeToOriginalFormat(
+      point_ids_);
+}
+//! [YC] end
 
 std::unique_ptr<SequentialAttributeDecoder>
 SequentialAttributeDecodersController::CreateSequentialDecoder(
@@ -139,6 +196,16 @@ SequentialAttributeDecodersController::CreateSequentialDecoder(
       return std::unique_ptr<SequentialNormalAttributeDecoder>(
           new SequentialNormalAttributeDecoder());
 #endif
+    //! [YC] start: Quaternion codec
+    case SEQUENTIAL_ATTRIBUTE_ENCODER_QUATERNIONS:
+      return std::unique_ptr<SequentialAttributeDecoder>(
+          new SequentialQuaternionAttributeDecoder());
+    //! [YC] end
+    //! [YC] start: Vector quantization
+    case SEQUENTIAL_ATTRIBUTE_ENCODER_CODEBOOK:
+      return std::unique_ptr<SequentialAttributeDecoder>(
+          new SequentialCodebookAttributeDecoder());
+    //! [YC] end
     default:
       break;
   }
@@ -51,6 +51,17 @@ class SequentialAttributeDecodersController : public AttributesDecoder {
       uint8_t decoder_type);
 
  private:
+  //! [YC] start: Delimited attribute streams
+  // Decodes the values of all attributes, each from its own slice of
+  // |in_buffer| given by the stored sizes, concurrently.
+  bool DecodeDelimitedPortableAttributes(DecoderBuffer *in_buffer);
+  //! [YC] end
+
+  //! [YC] start: Parallel attribute decoding
+  // Transforms the i-th attribute to its original format.
+  bool TransformAttributeToOriginalFormat(int i);
+  //! [YC] end
+
   std::vector<std::unique_ptr<SequentialAttributeDecoder>> sequential_decoders_;
   std::vector<PointIndex> point_ids_;
   std::unique_ptr<PointsSequencer> sequencer_;
@@ -17,7 +17,12 @@
 #include "draco/compression/attributes/sequential_normal_attribute_encoder.h"
 #endif
 #include "draco/compression/attributes/sequential_quantization_attribute_encoder.h"
+#include "draco/compression/attributes/sequential_quaternion_attribute_encoder.h"  // [YC] add: quaternion codec
+#include "draco/compression/attributes/sequential_codebook_attribute_encoder.h"  // [YC] add: vector quantization
 #include "draco/compression/point_cloud/point_cloud_encoder.h"
+#include "draco/core/cycle_timer.h"
+#include "draco/core/parallel_for.h"  // [YC] add: threaded attribute encoding
+#include "draco/core/varint_encoding.h"  // [YC] add: delimited attribute streams
 
 namespace draco {
 
@@ -69,23 +74,70 @@ bool SequentialAttributeEncodersController::EncodeAttributes(
 
 bool SequentialAttributeEncodersController::
     TransformAttributesToPortableFormat() {
-  for (uint32_t i = 0; i < sequential_encoders_.size(); ++i) {
-    if (!sequential_encoders_[i]->TransformAttributeToPortableFormat(
-            point_ids_)) {
-      return false;
-    }
-  }
-  return true;
+  //! [YC] start: Threaded attribute encoding
+  return ParallelFor(
+      static_cast<int>(sequential_encoders_.size()), num_threads(),
+      [&](int i) {
+        //! [YC] start: Time the quantization of each attribute
+        CycleTimer timer;
+        timer.Start();
+        //! [YC] end
+        if (!sequential_encoders_[i]->TransformAttributeToPortableFormat(
+                point_ids_)) {
+          return false;
+        }
+        //! [YC] start: Time the quantization of each attribute
+        timer.Stop();
+        AttributeEncodingStats *const stats =
+            encoder()->mutable_stats()->attribute(GetAttributeId(i));
+        if (stats) {
+          stats->quantization_time_us += timer.GetInUs();
+        }
+        //! [YC] end
+        return true;
+      });
+  //! [YC] end
 }
 
 bool SequentialAttributeEncodersController::EncodePortableAttributes(
     EncoderBuffer *out_buffer) {
   printf("[YC] SequentialAttributeEncodersController::EncodePortableAttributes\n"); // [YC] add: print to check
+  //! [YC] start: Delimited attribute streams
+  if (encoder()->DelimitsAttributeStreams()) {
+    return EncodeDelimitedPortableAttributes(out_buffer);
+  }
+  //! [YC] end
+  //! [YC] start: Threaded attribute encoding
+  const int num_encoders = static_cast<int>(sequential_encoders_.size());
+  if (num_threads() > 1 && num_encoders > 1) {
+    // Every attribute is encoded into its own buffer on a worker thread. The
+    // buffers are appended in the attribute order, which gives the same
+    // bitstream as encoding them one after another.
+    std::vector<EncoderBuffer> value_buffers(num_encoders);
+    if (!ParallelFor(num_encoders, num_threads(), [&](int i) {
+          return sequential_encoders_[i]->EncodePortableAttribute(
+              point_ids_, &value_buffers[i]);
+        })) {
+      return false;
+    }
+    for (int i = 0; i < num_encoders; ++i) {
+      out_buffer->Encode(value_buffers[i].data(), value_buffers[i].size());
+      AddEncodedSize(i, value_buffers[i].size());
+    }
+    return true;
+  }
+  //! [YC] end
   for (uint32_t i = 0; i < sequential_encoders_.size(); ++i) {
+    //! [YC] start: Track the encoded size of each attribute
+    const size_t start_size = out_buffer->size();
+    //! [YC] end
     if (!sequential_encoders_[i]->EncodePortableAttribute(point_ids_,
                                                           out_buffer)) {
       return false;
     }
+    //! [YC] start: Track the encoded size of each attribute
+    AddEncodedSize(i, out_buffer->size() - start_size);
+    //! [YC] end
   }
   return true;
 }
@@ -93,13 +145,72 @@ bool SequentialAttributeEncodersController::EncodePortableAttributes(
 bool SequentialAttributeEncodersController::
     EncodeDataNeededByPortableTransforms(EncoderBuffer *out_buffer) {
   for (uint32_t i = 0; i < sequential_encoders_.size(); ++i) {
+    //! [YC] start: Track the encoded size of each attribute
+    const size_t start_size = out_buffer->size();
+    //! [YC] end
     if (!sequential_encoders_[i]->EncodeDataNeededByPortableTransform(
             out_buffer)) {
       return false;
     }
+    //! [YC] start: Track the encoded size of each attribute
+    AddEncodedSize(i, out_buffer->size() - start_size);
+    //! [YC] end
+  }
+  return true;
+}
+
+//! [YC] start: Delimited attribute streams
+bool SequentialAttributeEncodersController::EncodeDelimitedPortableAttributes(
+    EncoderBuffer *out_buffer) {
+  // The values of every attribute are encoded into their own buffer, possibly
+  // concurrently, and stored after the sizes of all buffers.
+  const int num_encoders = static_cast<int>(sequential_encoders_.size());
+  std::vector<EncoderBuffer> value_buffers(num_encoders);
+  if (!ParallelFor(num_encoders, encoder()->num_encoding_threads(),
+                   [&](int i) {
+                     return sequential_encoders_[i]->EncodePortableAttribute(
+                         point_ids_, &value_buffers[i]);
+                   })) {
+    return false;
+  }
+  const size_t start_size = out_buffer->size();
+  for (const EncoderBuffer &value_buffer : value_buffers) {
+    EncodeVarint(static_cast<uint64_t>(value_buffer.size()), out_buffer);
+  }
+  // The sizes are counted towards the first attribute.
+  AddEncodedSize(0, out_buffer->size() - start_size);
+  for (int i = 0; i < num_encoders; ++i) {
+    out_buffer->Encode(value_buffers[i].data(), value_buffers[i].size());
+    AddEncodedSize(i, value_buffers[i].size());
   }
   return true;
 }
+//! [YC] end
+
+//! [YC] start: Threaded attribute encoding
+int SequentialAttributeEncodersController::num_threads() const {
+  // Attributes of meshes may be predicted from each other and stay serial.
+  if (encoder()->GetGeometryType() != POINT_CLOUD) {
+    return 1;
+  }
+  return encoder()->num_encoding_threads();
+}
+//! [YC] end
+
+//! [YC] start: Track the encoded size of each attribute
+void SequentialAttributeEncodersController::AddEncodedSize(int i,
+                                                           int64_t size) {
+  AttributeEncodingStats *const stats =
+      encoder()->mutable_stats()->attribute(GetAttributeId(i));
+  if (stats == nullptr) {
+    return;
+  }
+  if (stats->encoded_size < 0) {
+    stats->encoded_size = 0;
+  }
+  stats->encoded_size += size;
+}
+//! [YC] end
 
 bool SequentialAttributeEncodersController::CreateSequentialEncoders() {
   sequential_encoders_.resize(num_attributes());
@@ -132,8 +243,27 @@ SequentialAttributeEncodersController::CreateSequentialEncoder(int i) {
       return std::unique_ptr<SequentialAttributeEncoder>(
           new SequentialIntegerAttributeEncoder());
     case DT_FLOAT32:
+      //! [YC] start: Vector quantization
+      if (encoder()->GetGeometryType() == POINT_CLOUD &&
+          encoder()->options()->GetAttributeInt(att_id, "codebook_size", -1) >
+              0) {
+        // Values replaced by the indices of a learned codebook.
+        return std::unique_ptr<SequentialAttributeEncoder>(
+            new SequentialCodebookAttributeEncoder());
+      }
+      //! [YC] end
       if (encoder()->options()->GetAttributeInt(att_id, "quantization_bits",
                                                 -1) > 0) {
+        //! [YC] start: Quaternion codec
+        if (encoder()->GetGeometryType() == POINT_CLOUD &&
+            att->num_components() == 4 &&
+            encoder()->options()->GetAttributeBool(
+                att_id, "quaternion_encoding", false)) {
+          // Rotations stored as the smallest three quaternion components.
+          return std::unique_ptr<SequentialAttributeEncoder>(
+              new SequentialQuaternionAttributeEncoder());
+        }
+        //! [YC] end
 #ifdef DRACO_NORMAL_ENCODING_SUPPORTED
         if (att->attribute_type() == GeometryAttribute::NORMAL) {
           // We currently only support normals with float coordinates
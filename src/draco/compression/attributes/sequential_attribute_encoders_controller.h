@@ -101,6 +101,21 @@ class SequentialAttributeEncodersController : public AttributesEncoder {
       int i);
 
  private:
+  //! [YC] start: Adds |size| bytes to the encoding stats of the i-th attribute.
+  void AddEncodedSize(int i, int64_t size);
+  //! [YC] end
+
+  //! [YC] start: Delimited attribute streams
+  // Encodes the sizes of the encoded values of all attributes followed by the
+  // values.
+  bool EncodeDelimitedPortableAttributes(EncoderBuffer *out_buffer);
+  //! [YC] end
+
+  //! [YC] start: Threaded attribute encoding
+  // Number of threads the attributes are encoded on, always 1 for meshes.
+  int num_threads() const;
+  //! [YC] end
+
   std::vector<std::unique_ptr<SequentialAttributeEncoder>> sequential_encoders_;
 
   // Flag for each sequential attribute encoder indicating whether it was marked
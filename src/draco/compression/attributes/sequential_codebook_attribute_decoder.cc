@@ -0,0 +1,46 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/attributes/sequential_codebook_attribute_decoder.h"
+
+namespace draco {
+
+SequentialCodebookAttributeDecoder::SequentialCodebookAttributeDecoder() {}
+
+bool SequentialCodebookAttributeDecoder::Init(PointCloudDecoder *decoder,
+                                              int attribute_id) {
+  if (!SequentialIntegerAttributeDecoder::Init(decoder, attribute_id)) {
+    return false;
+  }
+  // Codebooks are used only for floating point attributes.
+  return attribute()->data_type() == DT_FLOAT32;
+}
+
+bool SequentialCodebookAttributeDecoder::DecodeDataNeededByPortableTransform(
+    const std::vector<PointIndex> &point_ids, DecoderBuffer *in_buffer) {
+  if (!codebook_transform_.DecodeParameters(*GetPortableAttribute(),
+                                            in_buffer)) {
+    return false;
+  }
+  // Store the decoded transform data in portable attribute.
+  return codebook_transform_.TransferToAttribute(portable_attribute());
+}
+
+bool SequentialCodebookAttributeDecoder::StoreValues(uint32_t num_points) {
+  // Expand all codebook indices to the values of their entries.
+  return codebook_transform_.InverseTransformAttribute(*GetPortableAttribute(),
+                                                       attribute());
+}
+
+}  // namespace draco
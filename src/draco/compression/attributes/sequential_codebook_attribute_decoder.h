@@ -0,0 +1,46 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_ATTRIBUTES_SEQUENTIAL_CODEBOOK_ATTRIBUTE_DECODER_H_
+#define DRACO_COMPRESSION_ATTRIBUTES_SEQUENTIAL_CODEBOOK_ATTRIBUTE_DECODER_H_
+
+#include "draco/attributes/attribute_codebook_transform.h"
+#include "draco/compression/attributes/sequential_integer_attribute_decoder.h"
+
+namespace draco {
+
+// Decoder for attributes encoded with the SequentialCodebookAttributeEncoder.
+// The values are looked up in the decoded codebook.
+class SequentialCodebookAttributeDecoder
+    : public SequentialIntegerAttributeDecoder {
+ public:
+  SequentialCodebookAttributeDecoder();
+  bool Init(PointCloudDecoder *decoder, int attribute_id) override;
+
+ protected:
+  int32_t GetNumValueComponents() const override {
+    return 1;  // One codebook index per value.
+  }
+  bool DecodeDataNeededByPortableTransform(
+      const std::vector<PointIndex> &point_ids,
+      DecoderBuffer *in_buffer) override;
+  bool StoreValues(uint32_t num_points) override;
+
+ private:
+  AttributeCodebookTransform codebook_transform_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_ATTRIBUTES_SEQUENTIAL_CODEBOOK_ATTRIBUTE_DECODER_H_
@@ -0,0 +1,57 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/attributes/sequential_codebook_attribute_encoder.h"
+
+namespace draco {
+
+bool SequentialCodebookAttributeEncoder::Init(PointCloudEncoder *encoder,
+                                              int attribute_id) {
+  if (!SequentialIntegerAttributeEncoder::Init(encoder, attribute_id)) {
+    return false;
+  }
+  // This encoder currently works only for floating point attributes.
+  if (attribute()->data_type() != DT_FLOAT32) {
+    return false;
+  }
+  return encoder->options()->GetAttributeInt(attribute_id, "codebook_size",
+                                             -1) > 0;
+}
+
+bool SequentialCodebookAttributeEncoder::EncodeDataNeededByPortableTransform(
+    EncoderBuffer *out_buffer) {
+  return attribute_codebook_transform_.EncodeParameters(out_buffer);
+}
+
+bool SequentialCodebookAttributeEncoder::PrepareValues(
+    const std::vector<PointIndex> &point_ids, int num_points) {
+  const int codebook_size = encoder()->options()->GetAttributeInt(
+      attribute_id(), "codebook_size", -1);
+  const int max_iterations = encoder()->options()->GetAttributeInt(
+      attribute_id(), "codebook_iterations", 10);
+  if (!attribute_codebook_transform_.ComputeParameters(
+          *attribute(), codebook_size, max_iterations)) {
+    return false;
+  }
+  auto portable_att = attribute_codebook_transform_.InitTransformedAttribute(
+      *(attribute()), point_ids.size());
+  if (!attribute_codebook_transform_.TransformAttribute(
+          *(attribute()), point_ids, portable_att.get())) {
+    return false;
+  }
+  SetPortableAttribute(std::move(portable_att));
+  return true;
+}
+
+}  // namespace draco
@@ -106,6 +106,12 @@ bool SequentialIntegerAttributeDecoder::DecodeIntegerValues(
   }
   const size_t num_entries = point_ids.size();
   const size_t num_values = num_entries * num_components;
+  //! [YC] start: Selective attribute decoding
+  if (IsSkipped()) {
+    return SkipIntegerValues(static_cast<uint32_t>(num_values), num_components,
+                             in_buffer);
+  }
+  //! [YC] end
   PreparePortableAttribute(static_cast<int>(num_entries), num_components);
   int32_t *const portable_attribute_data = GetPortableAttributeData();
   if (portable_attribute_data == nullptr) {
@@ -180,6 +186,39 @@ bool SequentialIntegerAttributeDecoder::DecodeIntegerValues(
   return true;
 }
 
+//! [YC] start: Selective attribute decoding
+bool SequentialIntegerAttributeDecoder::SkipIntegerValues(
+    uint32_t num_values, int num_components, DecoderBuffer *in_buffer) {
+  // The portable attribute stays empty. It still receives the parameters of
+  // the portable transform that are decoded after the values.
+  PreparePortableAttribute(0, num_components);
+  uint8_t compressed;
+  if (!in_buffer->Decode(&compressed)) {
+    return false;
+  }
+  if (compressed > 0) {
+    if (!SkipSymbols(num_values, num_components, in_buffer)) {
+      return false;
+    }
+  } else {
+    uint8_t num_bytes;
+    if (!in_buffer->Decode(&num_bytes)) {
+      return false;
+    }
+    const int64_t data_size =
+        static_cast<int64_t>(num_bytes) * static_cast<int64_t>(num_values);
+    if (in_buffer->remaining_size() < data_size) {
+      return false;
+    }
+    in_buffer->Advance(data_size);
+  }
+  if (prediction_scheme_) {
+    return prediction_scheme_->DecodePredictionData(in_buffer);
+  }
+  return true;
+}
+//! [YC] end
+
 bool SequentialIntegerAttributeDecoder::StoreValues(uint32_t num_values) {
   switch (attribute()->data_type()) {
     case DT_UINT8:
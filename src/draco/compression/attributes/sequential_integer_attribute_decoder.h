@@ -54,6 +54,13 @@ class SequentialIntegerAttributeDecoder : public SequentialAttributeDecoder {
 
   void PreparePortableAttribute(int num_entries, int num_components);
 
+  //! [YC] start: Selective attribute decoding
+  // Parses past the |num_values| encoded integer values of a skipped
+  // attribute and its prediction data without decoding the values.
+  bool SkipIntegerValues(uint32_t num_values, int num_components,
+                         DecoderBuffer *in_buffer);
+  //! [YC] end
+
   int32_t *GetPortableAttributeData() {
     if (portable_attribute()->size() == 0) {
       return nullptr;
@@ -18,6 +18,7 @@
 #include "draco/compression/attributes/prediction_schemes/prediction_scheme_wrap_encoding_transform.h"
 #include "draco/compression/entropy/symbol_encoding.h"
 #include "draco/core/bit_utils.h"
+#include "draco/core/cycle_timer.h"
 
 namespace draco {
 
@@ -135,6 +136,14 @@ bool SequentialIntegerAttributeEncoder::EncodeValues(
   // process all encoded data in a separate array.
   std::vector<int32_t> encoded_data(num_values);
 
+  //! [YC] start: Time the prediction and the entropy coding separately
+  AttributeEncodingStats *const stats =
+      encoder() ? encoder()->mutable_stats()->attribute(attribute_id())
+                : nullptr;
+  CycleTimer timer;
+  timer.Start();
+  //! [YC] end
+
   // All integer values are initialized. Process them using the prediction
   // scheme if we have one.
   if (prediction_scheme_) {
@@ -153,6 +162,14 @@ bool SequentialIntegerAttributeEncoder::EncodeValues(
                                reinterpret_cast<uint32_t *>(&encoded_data[0]));
   }
 
+  //! [YC] start: Time the prediction and the entropy coding separately
+  timer.Stop();
+  if (stats) {
+    stats->prediction_time_us += timer.GetInUs();
+  }
+  timer.Start();
+  //! [YC] end
+
   if (encoder() == nullptr || encoder()->options()->GetGlobalBool(
                                   "use_built_in_attribute_compression", true)) {
     out_buffer->Encode(static_cast<uint8_t>(1));
@@ -160,6 +177,18 @@ bool SequentialIntegerAttributeEncoder::EncodeValues(
     if (encoder() != nullptr) {
       SetSymbolEncodingCompressionLevel(&symbol_encoding_options,
                                         10 - encoder()->options()->GetSpeed());
+      //! [YC] start: Interleaved rANS streams
+      // Point clouds only, the mesh bitstream version does not include them.
+      const int num_streams =
+          encoder()->GetGeometryType() == POINT_CLOUD
+              ? encoder()->options()->GetGlobalInt("rans_streams", 1)
+              : 1;
+      if (num_streams > 1 &&
+          !SetSymbolEncodingNumStreams(&symbol_encoding_options,
+                                       num_streams)) {
+        return false;
+      }
+      //! [YC] end
     }
     if (!EncodeSymbols(reinterpret_cast<uint32_t *>(encoded_data.data()),
                        static_cast<int>(point_ids.size()) * num_components,
@@ -196,6 +225,12 @@ bool SequentialIntegerAttributeEncoder::EncodeValues(
   if (prediction_scheme_) {
     prediction_scheme_->EncodePredictionData(out_buffer);
   }
+  //! [YC] start: Time the prediction and the entropy coding separately
+  timer.Stop();
+  if (stats) {
+    stats->entropy_coding_time_us += timer.GetInUs();
+  }
+  //! [YC] end
   return true;
 }
 
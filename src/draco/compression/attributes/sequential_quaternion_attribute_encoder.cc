@@ -0,0 +1,57 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/attributes/sequential_quaternion_attribute_encoder.h"
+
+namespace draco {
+
+bool SequentialQuaternionAttributeEncoder::Init(PointCloudEncoder *encoder,
+                                                int attribute_id) {
+  if (!SequentialIntegerAttributeEncoder::Init(encoder, attribute_id)) {
+    return false;
+  }
+  // This encoder works only for 4-component floating point quaternions.
+  if (attribute()->num_components() != 4 ||
+      attribute()->data_type() != DT_FLOAT32) {
+    return false;
+  }
+
+  // Initialize AttributeQuaternionTransform.
+  const int quantization_bits = encoder->options()->GetAttributeInt(
+      attribute_id, "quantization_bits", -1);
+  if (quantization_bits < 2) {
+    return false;
+  }
+  attribute_quaternion_transform_.SetParameters(quantization_bits);
+  return true;
+}
+
+bool SequentialQuaternionAttributeEncoder::EncodeDataNeededByPortableTransform(
+    EncoderBuffer *out_buffer) {
+  return attribute_quaternion_transform_.EncodeParameters(out_buffer);
+}
+
+bool SequentialQuaternionAttributeEncoder::PrepareValues(
+    const std::vector<PointIndex> &point_ids, int num_points) {
+  auto portable_att = attribute_quaternion_transform_.InitTransformedAttribute(
+      *(attribute()), point_ids.size());
+  if (!attribute_quaternion_transform_.TransformAttribute(
+          *(attribute()), point_ids, portable_att.get())) {
+    return false;
+  }
+  SetPortableAttribute(std::move(portable_att));
+  return true;
+}
+
+}  // namespace draco
@@ -0,0 +1,149 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/attributes/space_filling_curve_sequencer.h"
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <utility>
+
+namespace draco {
+
+namespace {
+
+// Bits per axis of the grid the positions are snapped to, 3 * 21 bits fit
+// into a 64 bit key.
+constexpr int kGridBits = 21;
+
+// Spreads the lower 21 bits of |value| to every third bit.
+uint64_t SpreadBits(uint64_t value) {
+  value &= 0x1fffff;
+  value = (value | value << 32) & 0x1f00000000ffffull;
+  value = (value | value << 16) & 0x1f0000ff0000ffull;
+  value = (value | value << 8) & 0x100f00f00f00f00full;
+  value = (value | value << 4) & 0x10c30c30c30c30c3ull;
+  value = (value | value << 2) & 0x1249249249249249ull;
+  return value;
+}
+
+uint64_t MortonKey(const uint32_t cell[3]) {
+  return SpreadBits(cell[0]) << 2 | SpreadBits(cell[1]) << 1 |
+         SpreadBits(cell[2]);
+}
+
+// Index of |cell| along the Hilbert curve, using the transpose algorithm of
+// J. Skilling, "Programming the Hilbert curve", AIP Conf. Proc. 707 (2004).
+uint64_t HilbertKey(const uint32_t cell[3]) {
+  uint32_t x[3] = {cell[0], cell[1], cell[2]};
+  const uint32_t m = 1u << (kGridBits - 1);
+  // Inverse undo of the excess work.
+  for (uint32_t q = m; q > 1; q >>= 1) {
+    const uint32_t p = q - 1;
+    for (int i = 0; i < 3; ++i) {
+      if (x[i] & q) {
+        x[0] ^= p;
+      } else {
+        const uint32_t t = (x[0] ^ x[i]) & p;
+        x[0] ^= t;
+        x[i] ^= t;
+      }
+    }
+  }
+  // Gray encode.
+  x[1] ^= x[0];
+  x[2] ^= x[1];
+  uint32_t t = 0;
+  for (uint32_t q = m; q > 1; q >>= 1) {
+    if (x[2] & q) {
+      t ^= q - 1;
+    }
+  }
+  for (int i = 0; i < 3; ++i) {
+    x[i] ^= t;
+  }
+  // The transposed index interleaves like a Morton key.
+  return MortonKey(x);
+}
+
+}  // namespace
+
+std::vector<PointIndex> ComputeSpaceFillingCurveOrder(
+    const PointAttribute &position, int32_t num_points, PointOrder order) {
+  std::vector<PointIndex> point_ids(num_points);
+  for (int32_t i = 0; i < num_points; ++i) {
+    point_ids[i] = PointIndex(i);
+  }
+  if (order == POINT_ORDER_INPUT || num_points == 0) {
+    return point_ids;
+  }
+
+  std::vector<float> values(3 * num_points);
+  float min_value[3], max_value[3];
+  for (int c = 0; c < 3; ++c) {
+    min_value[c] = std::numeric_limits<float>::max();
+    max_value[c] = std::numeric_limits<float>::lowest();
+  }
+  for (int32_t i = 0; i < num_points; ++i) {
+    float *const value = &values[3 * i];
+    position.ConvertValue<float>(position.mapped_index(PointIndex(i)), 3,
+                                 value);
+    for (int c = 0; c < 3; ++c) {
+      if (!std::isfinite(value[c])) {
+        // Non-finite coordinates go to the lowest cell.
+        value[c] = std::numeric_limits<float>::lowest();
+        continue;
+      }
+      min_value[c] = std::min(min_value[c], value[c]);
+      max_value[c] = std::max(max_value[c], value[c]);
+    }
+  }
+  // A cube keeps the cells of the curve cubic.
+  double extent = 0;
+  for (int c = 0; c < 3; ++c) {
+    if (min_value[c] <= max_value[c]) {
+      extent = std::max(extent, static_cast<double>(max_value[c]) -
+                                    static_cast<double>(min_value[c]));
+    }
+  }
+  // The scale is a power of two, so points on a regular grid (such as
+  // quantized positions) with a power of two spacing fall onto the cells of
+  // the same level of the curve.
+  const double max_cell = (1u << kGridBits) - 1;
+  const double scale =
+      extent > 0 ? std::exp2(std::floor(std::log2(max_cell / extent))) : 0;
+
+  std::vector<std::pair<uint64_t, int32_t>> keys(num_points);
+  for (int32_t i = 0; i < num_points; ++i) {
+    uint32_t cell[3];
+    for (int c = 0; c < 3; ++c) {
+      const double offset =
+          (static_cast<double>(values[3 * i + c]) - min_value[c]) * scale;
+      // Also catches the NaN of an axis without finite coordinates.
+      cell[c] = offset > 0
+                    ? static_cast<uint32_t>(std::min(offset + 0.5, max_cell))
+                    : 0;
+    }
+    keys[i].first =
+        order == POINT_ORDER_HILBERT ? HilbertKey(cell) : MortonKey(cell);
+    keys[i].second = i;
+  }
+  std::sort(keys.begin(), keys.end());
+  for (int32_t i = 0; i < num_points; ++i) {
+    point_ids[i] = PointIndex(keys[i].second);
+  }
+  return point_ids;
+}
+
+}  // namespace draco
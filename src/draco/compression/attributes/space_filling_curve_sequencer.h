@@ -0,0 +1,62 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_ATTRIBUTES_SPACE_FILLING_CURVE_SEQUENCER_H_
+#define DRACO_COMPRESSION_ATTRIBUTES_SPACE_FILLING_CURVE_SEQUENCER_H_
+
+#include <vector>
+
+#include "draco/compression/attributes/points_sequencer.h"
+#include "draco/compression/config/compression_shared.h"
+
+namespace draco {
+
+// Returns the points [0, num_points - 1] sorted along the space-filling curve
+// |order| over the values of |position| (a 3 component attribute). The
+// positions are snapped to a grid of up to 2^21 cells per axis covering their
+// bounding cube, points in the same cell keep their input order.
+// POINT_ORDER_INPUT returns the points in their input order.
+std::vector<PointIndex> ComputeSpaceFillingCurveOrder(
+    const PointAttribute &position, int32_t num_points, PointOrder order);
+
+// A sequencer that visits the points along a space-filling curve over their
+// positions. Only used for encoding, the decoder visits the points linearly,
+// so the order is implied by the encoded data and the decoded points come out
+// sorted.
+class SpaceFillingCurveSequencer : public PointsSequencer {
+ public:
+  SpaceFillingCurveSequencer(const PointAttribute *position, int32_t num_points,
+                             PointOrder order)
+      : position_(position), num_points_(num_points), order_(order) {}
+
+ protected:
+  bool GenerateSequenceInternal() override {
+    if (num_points_ < 0 || position_ == nullptr ||
+        position_->num_components() != 3) {
+      return false;
+    }
+    *out_point_ids() =
+        ComputeSpaceFillingCurveOrder(*position_, num_points_, order_);
+    return true;
+  }
+
+ private:
+  const PointAttribute *position_;
+  int32_t num_points_;
+  PointOrder order_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_ATTRIBUTES_SPACE_FILLING_CURVE_SEQUENCER_H_
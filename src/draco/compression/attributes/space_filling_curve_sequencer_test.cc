@@ -0,0 +1,124 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/attributes/space_filling_curve_sequencer.h"
+
+#include <array>
+#include <cmath>
+#include <cstdlib>
+#include <memory>
+
+#include "draco/core/draco_test_base.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+class SpaceFillingCurveSequencerTest : public ::testing::Test {
+ protected:
+  // Creates a point cloud with the points of a |size|^3 grid with unit
+  // spacing, in a scrambled order.
+  void CreateGrid(int size) {
+    const int num_points = size * size * size;
+    pc_.reset(new PointCloud());
+    pc_->set_num_points(num_points);
+    GeometryAttribute ga;
+    ga.Init(GeometryAttribute::POSITION, nullptr, 3, DT_FLOAT32, false,
+            sizeof(float) * 3, 0);
+    pos_att_ = pc_->attribute(pc_->AddAttribute(ga, true, num_points));
+    for (int i = 0; i < num_points; ++i) {
+      // 7919 is a prime that does not divide the number of points.
+      const int cell = (i * 7919) % num_points;
+      const std::array<float, 3> value = {
+          static_cast<float>(cell % size),
+          static_cast<float>(cell / size % size),
+          static_cast<float>(cell / (size * size))};
+      pos_att_->SetAttributeValue(AttributeValueIndex(i), value.data());
+    }
+  }
+
+  std::array<float, 3> Position(PointIndex pi) const {
+    std::array<float, 3> value;
+    pos_att_->GetValue(pos_att_->mapped_index(pi), &value);
+    return value;
+  }
+
+  // Sum of the Manhattan distances between consecutive points of |order|.
+  float PathLength(const std::vector<PointIndex> &order) const {
+    float length = 0;
+    for (size_t i = 1; i < order.size(); ++i) {
+      const std::array<float, 3> a = Position(order[i - 1]);
+      const std::array<float, 3> b = Position(order[i]);
+      for (int c = 0; c < 3; ++c) {
+        length += std::abs(a[c] - b[c]);
+      }
+    }
+    return length;
+  }
+
+  std::unique_ptr<PointCloud> pc_;
+  PointAttribute *pos_att_;
+};
+
+TEST_F(SpaceFillingCurveSequencerTest, TestInputOrder) {
+  CreateGrid(4);
+  const std::vector<PointIndex> order = ComputeSpaceFillingCurveOrder(
+      *pos_att_, pc_->num_points(), POINT_ORDER_INPUT);
+  ASSERT_EQ(order.size(), pc_->num_points());
+  for (int i = 0; i < static_cast<int>(order.size()); ++i) {
+    ASSERT_EQ(order[i], PointIndex(i));
+  }
+}
+
+TEST_F(SpaceFillingCurveSequencerTest, TestMortonOrder) {
+  CreateGrid(2);
+  const std::vector<PointIndex> order = ComputeSpaceFillingCurveOrder(
+      *pos_att_, pc_->num_points(), POINT_ORDER_MORTON);
+  ASSERT_EQ(order.size(), 8);
+  // The x coordinate is the most significant bit of the cube octants.
+  for (int i = 0; i < 8; ++i) {
+    const std::array<float, 3> expected = {static_cast<float>(i >> 2),
+                                           static_cast<float>((i >> 1) & 1),
+                                           static_cast<float>(i & 1)};
+    ASSERT_EQ(Position(order[i]), expected);
+  }
+}
+
+TEST_F(SpaceFillingCurveSequencerTest, TestCurvesAreLocal) {
+  CreateGrid(16);
+  std::vector<PointIndex> input_order(pc_->num_points());
+  for (PointIndex pi(0); pi < pc_->num_points(); ++pi) {
+    input_order[pi.value()] = pi;
+  }
+  const std::vector<PointIndex> morton_order = ComputeSpaceFillingCurveOrder(
+      *pos_att_, pc_->num_points(), POINT_ORDER_MORTON);
+  const std::vector<PointIndex> hilbert_order = ComputeSpaceFillingCurveOrder(
+      *pos_att_, pc_->num_points(), POINT_ORDER_HILBERT);
+  // The Hilbert curve only moves between neighbouring grid points, the Morton
+  // curve jumps between the octants.
+  ASSERT_EQ(PathLength(hilbert_order), pc_->num_points() - 1);
+  ASSERT_LT(PathLength(hilbert_order), PathLength(morton_order));
+  ASSERT_LT(PathLength(morton_order), PathLength(input_order) / 2);
+}
+
+TEST_F(SpaceFillingCurveSequencerTest, TestSequencer) {
+  CreateGrid(4);
+  SpaceFillingCurveSequencer sequencer(pos_att_, pc_->num_points(),
+                                       POINT_ORDER_HILBERT);
+  std::vector<PointIndex> point_ids;
+  ASSERT_TRUE(sequencer.GenerateSequence(&point_ids));
+  ASSERT_EQ(point_ids, ComputeSpaceFillingCurveOrder(
+                           *pos_att_, pc_->num_points(), POINT_ORDER_HILBERT));
+}
+
+}  // namespace draco
@@ -23,8 +23,12 @@
 namespace draco {
 
 // Latest Draco bit-stream version.
+// [YC] note: point cloud version 2.4 adds delimited attribute streams, the
+// quaternion and codebook attribute encoders and interleaved rANS streams, so
+// that older decoders reject such files with a version error. Meshes do not use
+// them and stay at 2.2.
 static constexpr uint8_t kDracoPointCloudBitstreamVersionMajor = 2;
-static constexpr uint8_t kDracoPointCloudBitstreamVersionMinor = 3;
+static constexpr uint8_t kDracoPointCloudBitstreamVersionMinor = 4;
 static constexpr uint8_t kDracoMeshBitstreamVersionMajor = 2;
 static constexpr uint8_t kDracoMeshBitstreamVersionMinor = 2;
 
@@ -74,6 +78,8 @@ enum SequentialAttributeEncoderType {
   SEQUENTIAL_ATTRIBUTE_ENCODER_INTEGER,
   SEQUENTIAL_ATTRIBUTE_ENCODER_QUANTIZATION,
   SEQUENTIAL_ATTRIBUTE_ENCODER_NORMALS,
+  SEQUENTIAL_ATTRIBUTE_ENCODER_QUATERNIONS,  // [YC] add: rotation quaternions
+  SEQUENTIAL_ATTRIBUTE_ENCODER_CODEBOOK,  // [YC] add: vector quantization
 };
 
 // List of all prediction methods currently supported by our framework.
@@ -144,11 +150,34 @@ enum NormalPredictionMode {
 enum SymbolCodingMethod {
   SYMBOL_CODING_TAGGED = 0,
   SYMBOL_CODING_RAW = 1,
+  //! [YC] start: Interleaved rANS streams
+  SYMBOL_CODING_RAW_INTERLEAVED = 2,
+  SYMBOL_CODING_TAGGED_INTERLEAVED = 3,
+  //! [YC] end
   NUM_SYMBOL_CODING_METHODS,
 };
 
+//! [YC] start: Space-filling curve point order
+// Order in which the sequential point cloud encoding visits the points, and
+// therefore the order of the decoded points. The order is not stored, the
+// decoder outputs the points in the order they were encoded.
+enum PointOrder {
+  POINT_ORDER_INPUT = 0,
+  // Points sorted along a Morton (Z-order) or Hilbert curve over their
+  // positions.
+  POINT_ORDER_MORTON = 1,
+  POINT_ORDER_HILBERT = 2,
+};
+//! [YC] end
+
 // Mask for setting and getting the bit for metadata in |flags| of header.
 #define METADATA_FLAG_MASK 0x8000
+//! [YC] start: Delimited attribute streams
+// Mask for the bit telling that the sequential encoding stores the size of the
+// encoded values of every attribute ahead of them, so that the attributes can
+// be decoded concurrently.
+#define ATTRIBUTE_STREAM_SIZES_FLAG_MASK 0x4000
+//! [YC] end
 
 }  // namespace draco
 
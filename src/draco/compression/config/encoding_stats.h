@@ -0,0 +1,83 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_CONFIG_ENCODING_STATS_H_
+#define DRACO_COMPRESSION_CONFIG_ENCODING_STATS_H_
+
+#include <cstdint>
+#include <vector>
+
+#include "draco/attributes/geometry_attribute.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+// Statistics gathered for a single point attribute during encoding.
+struct AttributeEncodingStats {
+  AttributeEncodingStats()
+      : attribute_type(GeometryAttribute::INVALID),
+        encoded_size(-1),
+        quantization_time_us(0),
+        prediction_time_us(0),
+        entropy_coding_time_us(0) {}
+
+  GeometryAttribute::Type attribute_type;
+  // Number of bytes written for the attribute (including the data needed to
+  // revert the portable transform), or -1 when the attribute was encoded
+  // together with other attributes and its size cannot be separated (e.g. by
+  // the kd-tree encoder).
+  int64_t encoded_size;
+  // Time spent converting the attribute into its portable format (usually
+  // quantization).
+  int64_t quantization_time_us;
+  // Time spent computing prediction corrections.
+  int64_t prediction_time_us;
+  // Time spent entropy coding the corrected values.
+  int64_t entropy_coding_time_us;
+};
+
+// Statistics gathered during the last encoding of a point cloud or mesh.
+// Entries of |attributes| are indexed by the point attribute id.
+struct EncodingStats {
+  EncodingStats() : attributes_size(0) {}
+
+  void Reset(const PointCloud &pc) {
+    attributes.assign(pc.num_attributes(), AttributeEncodingStats());
+    for (int i = 0; i < pc.num_attributes(); ++i) {
+      attributes[i].attribute_type = pc.attribute(i)->attribute_type();
+    }
+    attributes_size = 0;
+  }
+
+  AttributeEncodingStats *attribute(int att_id) {
+    if (att_id < 0 || att_id >= static_cast<int>(attributes.size())) {
+      return nullptr;
+    }
+    return &attributes[att_id];
+  }
+  const AttributeEncodingStats *attribute(int att_id) const {
+    if (att_id < 0 || att_id >= static_cast<int>(attributes.size())) {
+      return nullptr;
+    }
+    return &attributes[att_id];
+  }
+
+  std::vector<AttributeEncodingStats> attributes;
+  // Total number of bytes used by all attribute encoders.
+  int64_t attributes_size;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_CONFIG_ENCODING_STATS_H_
@@ -133,4 +133,16 @@ void Decoder::SetSkipAttributeTransform(GeometryAttribute::Type att_type) {
   options_.SetAttributeBool(att_type, "skip_attribute_transform", true);
 }
 
+//! [YC] start: Parallel attribute decoding
+void Decoder::SetNumThreads(int num_threads) {
+  options_.SetGlobalInt("num_threads", num_threads);
+}
+//! [YC] end
+
+//! [YC] start: Selective attribute decoding
+void Decoder::SetSkipAttribute(GeometryAttribute::Type att_type) {
+  options_.SetAttributeBool(att_type, "skip_attribute", true);
+}
+//! [YC] end
+
 }  // namespace draco
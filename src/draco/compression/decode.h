@@ -67,6 +67,25 @@ class Decoder {
   // transform manually.
   void SetSkipAttributeTransform(GeometryAttribute::Type att_type);
 
+  //! [YC] start: Parallel attribute decoding
+  // Sets the number of threads used to decode the attributes (default = 1, 0
+  // uses all cores). Point clouds encoded with
+  // EncoderBase::SetDelimitAttributeStreams() decode their attribute streams
+  // concurrently; otherwise the streams are read one after another and only
+  // their transforms to the original format (e.g. dequantization) run
+  // concurrently. The decoded geometry does not depend on it.
+  void SetNumThreads(int num_threads);
+  //! [YC] end
+
+  //! [YC] start: Selective attribute decoding
+  // Leaves all attributes of type |att_type| out of the decoded geometry.
+  // Their values are not entropy decoded nor dequantized when the encoding
+  // stores every attribute separately (sequential encoding); the kd-tree
+  // encoding codes all attributes together, so there only the dequantization
+  // is skipped. Positions cannot be skipped.
+  void SetSkipAttribute(GeometryAttribute::Type att_type);
+  //! [YC] end
+
   // Returns the options instance used by the decoder that can be used by users
   // to control the decoding process.
   DecoderOptions *options() { return &options_; }
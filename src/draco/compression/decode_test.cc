@@ -15,6 +15,7 @@
 #include "draco/compression/decode.h"
 
 #include <cinttypes>
+#include <cstring>
 #include <sstream>
 
 #include "draco/compression/encode.h"
@@ -242,4 +243,150 @@ TEST_F(DecodeTest, TestSkipAttributeTransformUniqueId) {
             << std::endl;
 }
 
+//! [YC] start: Parallel attribute decoding
+TEST_F(DecodeTest, TestParallelDecodingIsIdentical) {
+  // Decoding with several threads must give the same attribute values as the
+  // serial decoder, for current and legacy bitstreams, point clouds and meshes.
+  const std::vector<std::string> file_names = {
+      "pc_kd_color.drc", "pc_color.drc", "cube_att.obj.edgebreaker.cl10.2.2.drc",
+      "test_nm.obj.sequential.cl3.2.2.drc", "test_nm.obj.edgebreaker.0.9.1.drc"};
+  for (const std::string &file_name : file_names) {
+    std::vector<char> data;
+    ASSERT_TRUE(
+        draco::ReadFileToBuffer(draco::GetTestFileFullPath(file_name), &data));
+    std::unique_ptr<draco::PointCloud> pcs[2];
+    for (int i = 0; i < 2; ++i) {
+      draco::DecoderBuffer buffer;
+      buffer.Init(data.data(), data.size());
+      draco::Decoder decoder;
+      decoder.SetNumThreads(i == 0 ? 1 : 4);
+      pcs[i] = decoder.DecodePointCloudFromBuffer(&buffer).value();
+      ASSERT_NE(pcs[i], nullptr) << file_name;
+    }
+    ASSERT_EQ(pcs[0]->num_points(), pcs[1]->num_points()) << file_name;
+    ASSERT_EQ(pcs[0]->num_attributes(), pcs[1]->num_attributes()) << file_name;
+    for (int a = 0; a < pcs[0]->num_attributes(); ++a) {
+      const draco::PointAttribute *const att0 = pcs[0]->attribute(a);
+      const draco::PointAttribute *const att1 = pcs[1]->attribute(a);
+      ASSERT_EQ(att0->size(), att1->size()) << file_name;
+      ASSERT_EQ(att0->byte_stride(), att1->byte_stride()) << file_name;
+      for (draco::PointIndex p(0); p < pcs[0]->num_points(); ++p) {
+        ASSERT_EQ(memcmp(att0->GetAddress(att0->mapped_index(p)),
+                         att1->GetAddress(att1->mapped_index(p)),
+                         att0->byte_stride()),
+                  0)
+            << file_name;
+      }
+    }
+  }
+}
+//! [YC] end
+
+//! [YC] start: Delimited attribute streams
+TEST_F(DecodeTest, TestDelimitedAttributeStreams) {
+  // A sequentially encoded point cloud with stored stream sizes decodes to the
+  // same attribute values on one or several threads as without the sizes.
+  const std::unique_ptr<draco::PointCloud> pc =
+      draco::ReadPointCloudFromTestFile("test_nm.obj");
+  ASSERT_NE(pc, nullptr);
+  draco::EncoderBuffer buffers[2];
+  for (int i = 0; i < 2; ++i) {
+    draco::Encoder encoder;
+    encoder.SetAttributeQuantization(draco::GeometryAttribute::POSITION, 14);
+    encoder.SetAttributeQuantization(draco::GeometryAttribute::NORMAL, 10);
+    encoder.SetEncodingMethod(draco::POINT_CLOUD_SEQUENTIAL_ENCODING);
+    encoder.SetDelimitAttributeStreams(i == 1);
+    DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*pc, &buffers[i]));
+  }
+  ASSERT_GT(buffers[1].size(), buffers[0].size());
+
+  std::unique_ptr<draco::PointCloud> pcs[3];
+  for (int i = 0; i < 3; ++i) {
+    const draco::EncoderBuffer &encoded = buffers[i == 0 ? 0 : 1];
+    draco::DecoderBuffer buffer;
+    buffer.Init(encoded.data(), encoded.size());
+    draco::Decoder decoder;
+    decoder.SetNumThreads(i == 2 ? 4 : 1);
+    pcs[i] = decoder.DecodePointCloudFromBuffer(&buffer).value();
+    ASSERT_NE(pcs[i], nullptr);
+  }
+  for (int i = 1; i < 3; ++i) {
+    ASSERT_EQ(pcs[0]->num_points(), pcs[i]->num_points());
+    ASSERT_EQ(pcs[0]->num_attributes(), pcs[i]->num_attributes());
+    for (int a = 0; a < pcs[0]->num_attributes(); ++a) {
+      const draco::PointAttribute *const att0 = pcs[0]->attribute(a);
+      const draco::PointAttribute *const att1 = pcs[i]->attribute(a);
+      ASSERT_EQ(att0->byte_stride(), att1->byte_stride());
+      for (draco::PointIndex p(0); p < pcs[0]->num_points(); ++p) {
+        ASSERT_EQ(memcmp(att0->GetAddress(att0->mapped_index(p)),
+                         att1->GetAddress(att1->mapped_index(p)),
+                         att0->byte_stride()),
+                  0);
+      }
+    }
+  }
+
+  // A truncated input whose stored sizes point past its end is rejected.
+  draco::DecoderBuffer buffer;
+  buffer.Init(buffers[1].data(), buffers[1].size() - 1);
+  draco::Decoder decoder;
+  decoder.SetNumThreads(4);
+  ASSERT_FALSE(decoder.DecodePointCloudFromBuffer(&buffer).ok());
+}
+//! [YC] end
+
+//! [YC] start: Selective attribute decoding
+TEST_F(DecodeTest, TestSkipAttribute) {
+  // A skipped attribute is missing from the decoded geometry and the other
+  // attributes are decoded as without skipping, for kd-tree and sequential
+  // point clouds and for meshes.
+  const std::vector<std::pair<std::string, draco::GeometryAttribute::Type>>
+      cases = {
+          {"pc_kd_color.drc", draco::GeometryAttribute::COLOR},
+          {"pc_color.drc", draco::GeometryAttribute::COLOR},
+          {"test_nm.obj.sequential.cl3.2.2.drc",
+           draco::GeometryAttribute::NORMAL},
+          {"cube_att.obj.edgebreaker.cl10.2.2.drc",
+           draco::GeometryAttribute::TEX_COORD},
+          {"cube_att.obj.edgebreaker.cl10.2.2.drc",
+           draco::GeometryAttribute::NORMAL}};
+  for (const auto &c : cases) {
+    const std::string &file_name = c.first;
+    std::vector<char> data;
+    ASSERT_TRUE(
+        draco::ReadFileToBuffer(draco::GetTestFileFullPath(file_name), &data));
+    std::unique_ptr<draco::PointCloud> pcs[2];
+    for (int i = 0; i < 2; ++i) {
+      draco::DecoderBuffer buffer;
+      buffer.Init(data.data(), data.size());
+      draco::Decoder decoder;
+      if (i == 1) {
+        decoder.SetSkipAttribute(c.second);
+      }
+      pcs[i] = decoder.DecodePointCloudFromBuffer(&buffer).value();
+      ASSERT_NE(pcs[i], nullptr) << file_name;
+    }
+    ASSERT_NE(pcs[0]->GetNamedAttribute(c.second), nullptr) << file_name;
+    ASSERT_EQ(pcs[1]->GetNamedAttribute(c.second), nullptr) << file_name;
+    ASSERT_EQ(pcs[0]->num_points(), pcs[1]->num_points()) << file_name;
+    ASSERT_EQ(pcs[0]->num_attributes(), pcs[1]->num_attributes() + 1)
+        << file_name;
+    for (int a = 0; a < pcs[1]->num_attributes(); ++a) {
+      const draco::PointAttribute *const att1 = pcs[1]->attribute(a);
+      const draco::PointAttribute *const att0 =
+          pcs[0]->GetNamedAttribute(att1->attribute_type());
+      ASSERT_NE(att0, nullptr) << file_name;
+      ASSERT_EQ(att0->byte_stride(), att1->byte_stride()) << file_name;
+      for (draco::PointIndex p(0); p < pcs[0]->num_points(); ++p) {
+        ASSERT_EQ(memcmp(att0->GetAddress(att0->mapped_index(p)),
+                         att1->GetAddress(att1->mapped_index(p)),
+                         att0->byte_stride()),
+                  0)
+            << file_name;
+      }
+    }
+  }
+}
+//! [YC] end
+
 }  // namespace
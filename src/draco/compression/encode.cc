@@ -24,7 +24,11 @@ Status Encoder::EncodePointCloudToBuffer(const PointCloud &pc,
                                          EncoderBuffer *out_buffer) {
   ExpertEncoder encoder(pc);
   encoder.Reset(CreateExpertEncoderOptions(pc));
-  return encoder.EncodeToBuffer(out_buffer);
+  //! [YC] start: Keep the statistics of the expert encoder
+  DRACO_RETURN_IF_ERROR(encoder.EncodeToBuffer(out_buffer));
+  set_encoding_stats(encoder.encoding_stats());
+  return OkStatus();
+  //! [YC] end
 }
 
 Status Encoder::EncodeMeshToBuffer(const Mesh &m, EncoderBuffer *out_buffer) {
@@ -33,6 +37,9 @@ Status Encoder::EncodeMeshToBuffer(const Mesh &m, EncoderBuffer *out_buffer) {
   DRACO_RETURN_IF_ERROR(encoder.EncodeToBuffer(out_buffer));
   set_num_encoded_points(encoder.num_encoded_points());
   set_num_encoded_faces(encoder.num_encoded_faces());
+  //! [YC] start: Keep the statistics of the expert encoder
+  set_encoding_stats(encoder.encoding_stats());
+  //! [YC] end
   return OkStatus();
 }
 
@@ -78,6 +85,22 @@ void Encoder::SetAttributeExplicitQuantization(GeometryAttribute::Type type,
   options().SetAttributeFloat(type, "quantization_range", range);
 }
 
+//! [YC] start: Quaternion codec
+void Encoder::SetAttributeQuaternionQuantization(GeometryAttribute::Type type,
+                                                 int quantization_bits) {
+  options().SetAttributeInt(type, "quantization_bits", quantization_bits);
+  options().SetAttributeBool(type, "quaternion_encoding", true);
+}
+//! [YC] end
+
+//! [YC] start: Vector quantization
+void Encoder::SetAttributeCodebook(GeometryAttribute::Type type,
+                                   int codebook_size, int max_iterations) {
+  options().SetAttributeInt(type, "codebook_size", codebook_size);
+  options().SetAttributeInt(type, "codebook_iterations", max_iterations);
+}
+//! [YC] end
+
 void Encoder::SetEncodingMethod(int encoding_method) {
   Base::SetEncodingMethod(encoding_method);
 }
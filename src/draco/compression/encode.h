@@ -84,6 +84,30 @@ class Encoder
                                         int quantization_bits, int num_dims,
                                         const float *origin, float range);
 
+  //! [YC] start: Quaternion codec
+  // Sets a named attribute of rotation quaternions (4 float components, such
+  // as ROT) to be encoded with the smallest three representation: the
+  // quaternion is normalized, the largest component is dropped (its index
+  // takes two bits) and the other three components are quantized to
+  // |quantization_bits| each. Used by the sequential encoding only, point
+  // clouds with such an attribute are not encoded with the kD-tree encoding.
+  void SetAttributeQuaternionQuantization(GeometryAttribute::Type type,
+                                          int quantization_bits);
+  //! [YC] end
+
+  //! [YC] start: Vector quantization
+  // Sets a named floating point attribute to be encoded with a codebook of at
+  // most |codebook_size| entries learned with at most |max_iterations| k-means
+  // iterations. Every value is replaced by the index of its nearest entry and
+  // the codebook is stored with the attribute (as floats), so the codebook
+  // should be much smaller than the number of points. Overrides the
+  // quantization of the attribute. Used by the sequential encoding only,
+  // point clouds with such an attribute are not encoded with the kD-tree
+  // encoding.
+  void SetAttributeCodebook(GeometryAttribute::Type type, int codebook_size,
+                            int max_iterations);
+  //! [YC] end
+
   // Sets the desired prediction method for a given attribute. By default,
   // prediction scheme is selected automatically by the encoder using other
   // provided options (such as speed) and input geometry type (mesh, point
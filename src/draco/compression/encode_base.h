@@ -17,6 +17,7 @@
 
 #include "draco/attributes/geometry_attribute.h"
 #include "draco/compression/config/compression_shared.h"
+#include "draco/compression/config/encoding_stats.h"
 #include "draco/core/status.h"
 
 namespace draco {
@@ -43,11 +44,54 @@ class EncoderBase {
   // Note that this can slow down encoding for certain encoders.
   void SetTrackEncodedProperties(bool flag);
 
+  //! [YC] start: Threaded attribute encoding
+  // Sets the number of threads used to encode independent attributes (default
+  // = 1, 0 uses all cores). The encoded data does not depend on it.
+  void SetNumThreads(int num_threads) {
+    options_.SetGlobalInt("num_threads", num_threads);
+  }
+  //! [YC] end
+
+  //! [YC] start: Delimited attribute streams
+  // If enabled, the sequential encoding of point clouds stores the size of the
+  // encoded values of every attribute (default = false). It costs a few bytes
+  // and lets a decoder with more than one thread decode the attributes
+  // concurrently. Files encoded with it need a decoder of this version.
+  void SetDelimitAttributeStreams(bool flag) {
+    options_.SetGlobalBool("delimit_attribute_streams", flag);
+  }
+  //! [YC] end
+
+  //! [YC] start: Space-filling curve point order
+  // Sets the order of the points of point clouds encoded with the sequential
+  // encoding (default = POINT_ORDER_INPUT). Spatially sorted points make
+  // neighbouring attribute values more similar and compress better. The
+  // decoded points come out in this order.
+  void SetPointOrder(PointOrder order) {
+    options_.SetGlobalInt("point_order", order);
+  }
+  //! [YC] end
+
+  //! [YC] start: Interleaved rANS streams
+  // Sets the number of interleaved rANS streams (1, 2, 4 or 8) of the
+  // attribute values entropy coded by the sequential encoding (default = 1).
+  // More streams decode faster at the cost of a few bytes per attribute.
+  // Files encoded with more than one stream need a decoder of this version.
+  void SetInterleavedRAnsStreams(int num_streams) {
+    options_.SetGlobalInt("rans_streams", num_streams);
+  }
+  //! [YC] end
+
   // Returns the number of encoded points and faces during the last encoding
   // operation. Returns 0 if SetTrackEncodedProperties() was not set.
   size_t num_encoded_points() const { return num_encoded_points_; }
   size_t num_encoded_faces() const { return num_encoded_faces_; }
 
+  //! [YC] start: Per-attribute sizes and timings of the last encoding
+  // operation.
+  const EncodingStats &encoding_stats() const { return encoding_stats_; }
+  //! [YC] end
+
  protected:
   void Reset(const EncoderOptionsT &options) { options_ = options; }
 
@@ -112,12 +156,20 @@ class EncoderBase {
  protected:
   void set_num_encoded_points(size_t num) { num_encoded_points_ = num; }
   void set_num_encoded_faces(size_t num) { num_encoded_faces_ = num; }
+  //! [YC] start
+  void set_encoding_stats(const EncodingStats &stats) {
+    encoding_stats_ = stats;
+  }
+  //! [YC] end
 
  private:
   EncoderOptionsT options_;
 
   size_t num_encoded_points_;
   size_t num_encoded_faces_;
+  //! [YC] start
+  EncodingStats encoding_stats_;
+  //! [YC] end
 };
 
 template <class EncoderOptionsT>
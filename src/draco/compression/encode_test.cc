@@ -16,6 +16,8 @@
 #include "draco/compression/encode.h"
 
 #include <cinttypes>
+#include <cmath>
+#include <cstring>
 #include <fstream>
 #include <sstream>
 
@@ -350,6 +352,97 @@ TEST_F(EncodeTest, TestKdTreeEncoding) {
   DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*pc, &buffer));
 }
 
+//! [YC] start: Threaded attribute encoding
+TEST_F(EncodeTest, TestThreadedEncodingIsBitIdentical) {
+  // Encoding the attributes on several threads must not change the output of
+  // the kd-tree and sequential point cloud encoders, or of meshes whose
+  // attributes depend on each other.
+  const std::vector<std::pair<std::string, int>> inputs = {
+      {"cube_subd.obj", draco::POINT_CLOUD_KD_TREE_ENCODING},
+      {"cube_subd.obj", draco::POINT_CLOUD_SEQUENTIAL_ENCODING},
+      {"test_nm.obj", draco::MESH_EDGEBREAKER_ENCODING}};
+  for (const auto &input : inputs) {
+    const std::unique_ptr<draco::Mesh> mesh =
+        draco::ReadMeshFromTestFile(input.first);
+    ASSERT_NE(mesh, nullptr);
+    draco::EncoderBuffer buffers[2];
+    for (int i = 0; i < 2; ++i) {
+      draco::Encoder encoder;
+      encoder.SetAttributeQuantization(draco::GeometryAttribute::POSITION, 14);
+      encoder.SetAttributeQuantization(draco::GeometryAttribute::TEX_COORD, 12);
+      encoder.SetAttributeQuantization(draco::GeometryAttribute::NORMAL, 10);
+      encoder.SetEncodingMethod(input.second);
+      encoder.SetNumThreads(i == 0 ? 1 : 4);
+      if (input.second == draco::MESH_EDGEBREAKER_ENCODING) {
+        DRACO_ASSERT_OK(encoder.EncodeMeshToBuffer(*mesh, &buffers[i]));
+      } else {
+        DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*mesh, &buffers[i]));
+      }
+    }
+    ASSERT_EQ(buffers[0].size(), buffers[1].size()) << input.first;
+    ASSERT_EQ(memcmp(buffers[0].data(), buffers[1].data(), buffers[0].size()),
+              0)
+        << input.first;
+  }
+}
+
+TEST_F(EncodeTest, TestThreadedEncodingOfManyAttributes) {
+  // A point cloud with several float and integer attributes, which the point
+  // cloud encoders put into a single attributes encoder, encodes to the same
+  // bytes on any number of threads and decodes back.
+  constexpr int kNumPoints = 1000;
+  draco::PointCloudBuilder builder;
+  builder.Start(kNumPoints);
+  const int pos_att_id = builder.AddAttribute(
+      draco::GeometryAttribute::POSITION, 3, draco::DT_FLOAT32);
+  const int color_att_id = builder.AddAttribute(
+      draco::GeometryAttribute::COLOR, 3, draco::DT_UINT8);
+  const int rot_att_id = builder.AddAttribute(
+      draco::GeometryAttribute::GENERIC, 4, draco::DT_FLOAT32);
+  const int opacity_att_id = builder.AddAttribute(
+      draco::GeometryAttribute::GENERIC, 1, draco::DT_FLOAT32);
+  for (draco::PointIndex i(0); i < kNumPoints; ++i) {
+    const float v = static_cast<float>(i.value());
+    const float pos[3] = {v, 0.5f * v, v * v / kNumPoints};
+    const uint8_t color[3] = {static_cast<uint8_t>(i.value() % 256), 7,
+                              static_cast<uint8_t>(i.value() / 7)};
+    const float rot[4] = {std::sin(v), std::cos(v), 0.25f, -0.25f};
+    const float opacity = std::sin(0.1f * v);
+    builder.SetAttributeValueForPoint(pos_att_id, i, pos);
+    builder.SetAttributeValueForPoint(color_att_id, i, color);
+    builder.SetAttributeValueForPoint(rot_att_id, i, rot);
+    builder.SetAttributeValueForPoint(opacity_att_id, i, &opacity);
+  }
+  const std::unique_ptr<draco::PointCloud> pc = builder.Finalize(false);
+  ASSERT_NE(pc, nullptr);
+
+  for (const int method : {draco::POINT_CLOUD_SEQUENTIAL_ENCODING,
+                           draco::POINT_CLOUD_KD_TREE_ENCODING}) {
+    draco::EncoderBuffer buffers[2];
+    for (int i = 0; i < 2; ++i) {
+      draco::Encoder encoder;
+      encoder.SetAttributeQuantization(draco::GeometryAttribute::POSITION, 14);
+      encoder.SetAttributeQuantization(draco::GeometryAttribute::GENERIC, 10);
+      encoder.SetEncodingMethod(method);
+      encoder.SetNumThreads(i == 0 ? 1 : 4);
+      DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*pc, &buffers[i]));
+    }
+    ASSERT_EQ(buffers[0].size(), buffers[1].size()) << method;
+    ASSERT_EQ(memcmp(buffers[0].data(), buffers[1].data(), buffers[0].size()),
+              0)
+        << method;
+
+    draco::DecoderBuffer dec_buffer;
+    dec_buffer.Init(buffers[1].data(), buffers[1].size());
+    draco::Decoder decoder;
+    DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<draco::PointCloud> decoded_pc,
+                           decoder.DecodePointCloudFromBuffer(&dec_buffer));
+    ASSERT_EQ(decoded_pc->num_points(), kNumPoints);
+    ASSERT_EQ(decoded_pc->num_attributes(), pc->num_attributes());
+  }
+}
+//! [YC] end
+
 TEST_F(EncodeTest, TestTrackingOfNumberOfEncodedEntries) {
   TestNumberOfEncodedEntries("deg_faces.obj", draco::MESH_EDGEBREAKER_ENCODING);
   TestNumberOfEncodedEntries("deg_faces.obj", draco::MESH_SEQUENTIAL_ENCODING);
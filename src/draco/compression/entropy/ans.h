@@ -419,61 +419,78 @@ class RAnsDecoder {
   // number of bytes encoded by the encoder. A non zero return value is an
   // error.
   inline int read_init(const uint8_t *const buf, int offset) {
+    return read_init(&ans_, buf, offset);  // [YC] add: interleaved rANS
+  }
+
+  //! [YC] start: Interleaved rANS streams
+  // Same as read_init() and rans_read() for the state |ans| of one of several
+  // streams sharing the lookup table of this decoder. The states of
+  // independent streams have no dependency on each other, so their symbols
+  // can be decoded in an interleaved loop.
+  inline int read_init(AnsDecoder *ans, const uint8_t *const buf, int offset) {
     unsigned x;
     if (offset < 1) {
       return 1;
     }
-    ans_.buf = buf;
+    ans->buf = buf;
     x = buf[offset - 1] >> 6;
     if (x == 0) {
-      ans_.buf_offset = offset - 1;
-      ans_.state = buf[offset - 1] & 0x3F;
+      ans->buf_offset = offset - 1;
+      ans->state = buf[offset - 1] & 0x3F;
     } else if (x == 1) {
       if (offset < 2) {
         return 1;
       }
-      ans_.buf_offset = offset - 2;
-      ans_.state = mem_get_le16(buf + offset - 2) & 0x3FFF;
+      ans->buf_offset = offset - 2;
+      ans->state = mem_get_le16(buf + offset - 2) & 0x3FFF;
     } else if (x == 2) {
       if (offset < 3) {
         return 1;
       }
-      ans_.buf_offset = offset - 3;
-      ans_.state = mem_get_le24(buf + offset - 3) & 0x3FFFFF;
+      ans->buf_offset = offset - 3;
+      ans->state = mem_get_le24(buf + offset - 3) & 0x3FFFFF;
     } else if (x == 3) {
-      ans_.buf_offset = offset - 4;
-      ans_.state = mem_get_le32(buf + offset - 4) & 0x3FFFFFFF;
+      if (offset < 4) {
+        return 1;
+      }
+      ans->buf_offset = offset - 4;
+      ans->state = mem_get_le32(buf + offset - 4) & 0x3FFFFFFF;
     } else {
       return 1;
     }
-    ans_.state += l_rans_base;
-    if (ans_.state >= l_rans_base * DRACO_ANS_IO_BASE) {
+    ans->state += l_rans_base;
+    if (ans->state >= l_rans_base * DRACO_ANS_IO_BASE) {
       return 1;
     }
     return 0;
   }
 
-  inline int read_end() { return ans_.state == l_rans_base; }
-
-  inline int reader_has_error() {
-    return ans_.state < l_rans_base && ans_.buf_offset == 0;
-  }
-
-  inline int rans_read() {
+  inline int rans_read(AnsDecoder *ans) {
     unsigned rem;
     unsigned quo;
     struct rans_dec_sym sym;
-    while (ans_.state < l_rans_base && ans_.buf_offset > 0) {
-      ans_.state = ans_.state * DRACO_ANS_IO_BASE + ans_.buf[--ans_.buf_offset];
+    while (ans->state < l_rans_base && ans->buf_offset > 0) {
+      ans->state = ans->state * DRACO_ANS_IO_BASE + ans->buf[--ans->buf_offset];
     }
     // |rans_precision| is a power of two compile time constant, and the below
     // division and modulo are going to be optimized by the compiler.
-    quo = ans_.state / rans_precision;
-    rem = ans_.state % rans_precision;
+    quo = ans->state / rans_precision;
+    rem = ans->state % rans_precision;
     fetch_sym(&sym, rem);
-    ans_.state = quo * sym.prob + rem - sym.cum_prob;
+    ans->state = quo * sym.prob + rem - sym.cum_prob;
     return sym.val;
   }
+  //! [YC] end
+
+  inline int read_end() { return ans_.state == l_rans_base; }
+
+  inline int reader_has_error() {
+    return ans_.state < l_rans_base && ans_.buf_offset == 0;
+  }
+
+  inline int rans_read() {
+    return rans_read(&ans_);  // [YC] add: interleaved rANS
+  }
 
   // Construct a lookup table with |rans_precision| number of entries.
   // Returns false if the table couldn't be built (because of wrong input data).
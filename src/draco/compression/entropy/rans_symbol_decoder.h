@@ -43,7 +43,25 @@ class RAnsSymbolDecoder {
   uint32_t DecodeSymbol() { return ans_.rans_read(); }
   void EndDecoding();
 
+  //! [YC] start: Interleaved rANS streams
+  // Decodes |num_values| symbols encoded by
+  // RAnsSymbolEncoder::EncodeInterleavedSymbols() into |out_values|. The
+  // streams are decoded in one loop so that their independent state updates
+  // overlap. Supported values of |num_streams| are 2, 4 and 8. When
+  // |out_values| is null, the streams are skipped. Must be called after
+  // Create() instead of StartDecoding(), DecodeSymbol() and EndDecoding().
+  bool DecodeInterleavedSymbols(int num_streams, uint32_t num_values,
+                                DecoderBuffer *buffer, uint32_t *out_values);
+  //! [YC] end
+
  private:
+  //! [YC] start: Interleaved rANS streams
+  template <int num_streams_t>
+  bool DecodeInterleavedSymbolsInternal(uint32_t num_values,
+                                        DecoderBuffer *buffer,
+                                        uint32_t *out_values);
+  //! [YC] end
+
   static constexpr int rans_precision_bits_ =
       ComputeRAnsPrecisionFromUniqueSymbolsBitLength(
           unique_symbols_bit_length_t);
@@ -166,6 +184,66 @@ void RAnsSymbolDecoder<unique_symbols_bit_length_t>::EndDecoding() {
   ans_.read_end();
 }
 
+//! [YC] start: Interleaved rANS streams
+template <int unique_symbols_bit_length_t>
+bool RAnsSymbolDecoder<unique_symbols_bit_length_t>::DecodeInterleavedSymbols(
+    int num_streams, uint32_t num_values, DecoderBuffer *buffer,
+    uint32_t *out_values) {
+  switch (num_streams) {
+    case 2:
+      return DecodeInterleavedSymbolsInternal<2>(num_values, buffer,
+                                                 out_values);
+    case 4:
+      return DecodeInterleavedSymbolsInternal<4>(num_values, buffer,
+                                                 out_values);
+    case 8:
+      return DecodeInterleavedSymbolsInternal<8>(num_values, buffer,
+                                                 out_values);
+    default:
+      return false;
+  }
+}
+
+template <int unique_symbols_bit_length_t>
+template <int num_streams_t>
+bool RAnsSymbolDecoder<unique_symbols_bit_length_t>::
+    DecodeInterleavedSymbolsInternal(uint32_t num_values,
+                                     DecoderBuffer *buffer,
+                                     uint32_t *out_values) {
+  AnsDecoder streams[num_streams_t];
+  for (int s = 0; s < num_streams_t; ++s) {
+    uint64_t bytes_encoded;
+    if (!DecodeVarint<uint64_t>(&bytes_encoded, buffer)) {
+      return false;
+    }
+    if (bytes_encoded > static_cast<uint64_t>(buffer->remaining_size())) {
+      return false;
+    }
+    const uint8_t *const data_head =
+        reinterpret_cast<const uint8_t *>(buffer->data_head());
+    buffer->Advance(bytes_encoded);
+    if (out_values &&
+        ans_.read_init(&streams[s], data_head,
+                       static_cast<int>(bytes_encoded)) != 0) {
+      return false;
+    }
+  }
+  if (!out_values) {
+    return true;
+  }
+  uint32_t i = 0;
+  for (; i + num_streams_t <= num_values; i += num_streams_t) {
+    for (int s = 0; s < num_streams_t; ++s) {
+      out_values[i + s] = ans_.rans_read(&streams[s]);
+    }
+  }
+  for (int s = 0; i < num_values; ++i, ++s) {
+    out_values[i] = ans_.rans_read(&streams[s]);
+  }
+  return true;
+}
+//! [YC] end
+
 }  // namespace draco
 
 #endif  // DRACO_COMPRESSION_ENTROPY_RANS_SYMBOL_DECODER_H_
@@ -46,6 +46,16 @@ class RAnsSymbolEncoder {
   }
   void EndEncoding(EncoderBuffer *buffer);
 
+  //! [YC] start: Interleaved rANS streams
+  // Encodes |symbols| into |num_streams| independent rANS streams, where the
+  // stream s holds the symbols s, s + num_streams, s + 2 * num_streams, ...
+  // Each stream is stored as its size in bytes (varint) followed by its data.
+  // Must be called after Create() instead of StartEncoding(), EncodeSymbol()
+  // and EndEncoding().
+  void EncodeInterleavedSymbols(const uint32_t *symbols, int num_values,
+                                int num_streams, EncoderBuffer *buffer);
+  //! [YC] end
+
   // rANS requires to encode the input symbols in the reverse order.
   static constexpr bool needs_reverse_encoding() { return true; }
 
@@ -285,6 +295,29 @@ void RAnsSymbolEncoder<unique_symbols_bit_length_t>::EndEncoding(
   buffer->Resize(buffer_offset_ + bytes_written + size_len);
 }
 
+//! [YC] start: Interleaved rANS streams
+template <int unique_symbols_bit_length_t>
+void RAnsSymbolEncoder<unique_symbols_bit_length_t>::EncodeInterleavedSymbols(
+    const uint32_t *symbols, int num_values, int num_streams,
+    EncoderBuffer *buffer) {
+  // Every stream holds a subset of the symbols so the bound used by
+  // StartEncoding() for all of them is also valid for a single stream.
+  const uint64_t required_bits = 2 * num_expected_bits_ + 32;
+  std::vector<uint8_t> data((required_bits + 7) / 8 + 8);
+  for (int s = 0; s < num_streams; ++s) {
+    ans_.write_init(data.data());
+    // rANS encodes the symbols of every stream in the reverse order.
+    int i = s + ((num_values - 1 - s) / num_streams) * num_streams;
+    for (; i >= s && i < num_values; i -= num_streams) {
+      ans_.rans_write(&probability_table_[symbols[i]]);
+    }
+    const int bytes_written = ans_.write_end();
+    EncodeVarint(static_cast<uint64_t>(bytes_written), buffer);
+    buffer->Encode(data.data(), bytes_written);
+  }
+}
+//! [YC] end
+
 }  // namespace draco
 
 #endif  // DRACO_COMPRESSION_ENTROPY_RANS_SYMBOL_ENCODER_H_
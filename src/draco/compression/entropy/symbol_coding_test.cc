@@ -158,6 +158,108 @@ TEST_F(SymbolCodingTest, TestLargeNumberCondition) {
   }
 }
 
+TEST_F(SymbolCodingTest, TestSkipSymbols) {
+  // Skipping symbols must leave the buffer at the same position as decoding
+  // them, with every symbol coding method.
+  std::vector<uint32_t> in;
+  for (uint32_t i = 0; i < 3000; ++i) {
+    in.push_back((i * 7919) % (i % 3 == 0 ? 100000 : 50));
+  }
+  const uint32_t marker = 0xdeadbeef;
+  for (int method = 0; method < NUM_SYMBOL_CODING_METHODS; ++method) {
+    Options options;
+    SetSymbolEncodingMethod(&options, static_cast<SymbolCodingMethod>(method));
+    EncoderBuffer eb;
+    ASSERT_TRUE(EncodeSymbols(in.data(), in.size(), 3, &options, &eb));
+    eb.Encode(marker);
+
+    DecoderBuffer db;
+    db.Init(eb.data(), eb.size());
+    db.set_bitstream_version(bitstream_version_);
+    ASSERT_TRUE(SkipSymbols(in.size(), 3, &db));
+    uint32_t value;
+    ASSERT_TRUE(db.Decode(&value));
+    ASSERT_EQ(value, marker);
+  }
+}
+
+TEST_F(SymbolCodingTest, TestInterleavedStreams) {
+  // Symbols split into interleaved rANS streams decode to the same values for
+  // any number of values per stream, including empty streams.
+  for (const int num_values : {6, 999, 1002, 4098}) {
+    std::vector<uint32_t> in;
+    for (int i = 0; i < num_values; ++i) {
+      in.push_back((i * 7919) % (i % 5 == 0 ? 70000 : 17));
+    }
+    for (const SymbolCodingMethod method :
+         {SYMBOL_CODING_TAGGED_INTERLEAVED, SYMBOL_CODING_RAW_INTERLEAVED}) {
+      for (const int num_streams : {2, 4, 8}) {
+        Options options;
+        SetSymbolEncodingMethod(&options, method);
+        ASSERT_TRUE(SetSymbolEncodingNumStreams(&options, num_streams));
+        EncoderBuffer eb;
+        ASSERT_TRUE(EncodeSymbols(in.data(), num_values, 3, &options, &eb));
+        ASSERT_EQ(eb.data()[0], method);
+        ASSERT_EQ(eb.data()[1], num_streams);
+
+        std::vector<uint32_t> out(num_values);
+        DecoderBuffer db;
+        db.Init(eb.data(), eb.size());
+        db.set_bitstream_version(bitstream_version_);
+        ASSERT_TRUE(DecodeSymbols(num_values, 3, &db, out.data()));
+        ASSERT_EQ(in, out);
+        ASSERT_EQ(db.remaining_size(), 0);
+      }
+    }
+  }
+
+  // The automatically chosen scheme is interleaved only when there are enough
+  // symbols per stream.
+  Options options;
+  ASSERT_FALSE(SetSymbolEncodingNumStreams(&options, 3));
+  ASSERT_TRUE(SetSymbolEncodingNumStreams(&options, 8));
+  for (const int num_values : {20, 10000}) {
+    const std::vector<uint32_t> in(num_values, 3);
+    EncoderBuffer eb;
+    ASSERT_TRUE(EncodeSymbols(in.data(), in.size(), 1, &options, &eb));
+    if (num_values == 20) {
+      ASSERT_LT(eb.data()[0], SYMBOL_CODING_RAW_INTERLEAVED);
+    } else {
+      ASSERT_GE(eb.data()[0], SYMBOL_CODING_RAW_INTERLEAVED);
+    }
+  }
+}
+
+TEST_F(SymbolCodingTest, TestInvalidNumStreams) {
+  // A malformed stream count of an interleaved scheme is rejected instead of
+  // being decoded as a single stream.
+  std::vector<uint32_t> in;
+  for (int i = 0; i < 1000; ++i) {
+    in.push_back(i % 13);
+  }
+  for (const SymbolCodingMethod method :
+       {SYMBOL_CODING_TAGGED_INTERLEAVED, SYMBOL_CODING_RAW_INTERLEAVED}) {
+    Options options;
+    SetSymbolEncodingMethod(&options, method);
+    ASSERT_TRUE(SetSymbolEncodingNumStreams(&options, 4));
+    EncoderBuffer eb;
+    ASSERT_TRUE(EncodeSymbols(in.data(), in.size(), 1, &options, &eb));
+    ASSERT_EQ(eb.data()[1], 4);
+    std::vector<char> data(eb.data(), eb.data() + eb.size());
+    for (const int num_streams : {0, 1, 3, 16, 255}) {
+      data[1] = static_cast<char>(num_streams);
+      std::vector<uint32_t> out(in.size());
+      DecoderBuffer db;
+      db.Init(data.data(), data.size());
+      db.set_bitstream_version(bitstream_version_);
+      ASSERT_FALSE(DecodeSymbols(in.size(), 1, &db, out.data()));
+      db.Init(data.data(), data.size());
+      db.set_bitstream_version(bitstream_version_);
+      ASSERT_FALSE(SkipSymbols(in.size(), 1, &db));
+    }
+  }
+}
+
 TEST_F(SymbolCodingTest, TestConversionFullRange) {
   TestConvertToSymbolAndBack(static_cast<int8_t>(-128));
   TestConvertToSymbolAndBack(static_cast<int8_t>(-127));
@@ -16,6 +16,7 @@
 
 #include <algorithm>
 #include <cmath>
+#include <vector>
 
 #include "draco/compression/entropy/rans_symbol_decoder.h"
 
@@ -23,11 +24,30 @@ namespace draco {
 
 template <template <int> class SymbolDecoderT>
 bool DecodeTaggedSymbols(uint32_t num_values, int num_components,
-                         DecoderBuffer *src_buffer, uint32_t *out_values);
+                         int num_streams, DecoderBuffer *src_buffer,
+                         uint32_t *out_values);
 
 template <template <int> class SymbolDecoderT>
-bool DecodeRawSymbols(uint32_t num_values, DecoderBuffer *src_buffer,
-                      uint32_t *out_values);
+bool DecodeRawSymbols(uint32_t num_values, int num_streams,
+                      DecoderBuffer *src_buffer, uint32_t *out_values);
+
+//! [YC] start: Interleaved rANS streams
+// Decodes the number of rANS streams of |scheme|: 1 for the single stream
+// schemes, otherwise the stored count, which must be 2, 4 or 8.
+static bool DecodeNumStreams(uint8_t scheme, DecoderBuffer *src_buffer,
+                             uint8_t *out_num_streams) {
+  *out_num_streams = 1;
+  if (scheme != SYMBOL_CODING_TAGGED_INTERLEAVED &&
+      scheme != SYMBOL_CODING_RAW_INTERLEAVED) {
+    return true;
+  }
+  if (!src_buffer->Decode(out_num_streams)) {
+    return false;
+  }
+  return *out_num_streams == 2 || *out_num_streams == 4 ||
+         *out_num_streams == 8;
+}
+//! [YC] end
 
 bool DecodeSymbols(uint32_t num_values, int num_components,
                    DecoderBuffer *src_buffer, uint32_t *out_values) {
@@ -39,25 +59,140 @@ bool DecodeSymbols(uint32_t num_values, int num_components,
   if (!src_buffer->Decode(&scheme)) {
     return false;
   }
-  if (scheme == SYMBOL_CODING_TAGGED) {
-    return DecodeTaggedSymbols<RAnsSymbolDecoder>(num_values, num_components,
-                                                  src_buffer, out_values);
-  } else if (scheme == SYMBOL_CODING_RAW) {
-    return DecodeRawSymbols<RAnsSymbolDecoder>(num_values, src_buffer,
-                                               out_values);
+  //! [YC] start: Interleaved rANS streams
+  uint8_t num_streams;
+  if (!DecodeNumStreams(scheme, src_buffer, &num_streams)) {
+    return false;
+  }
+  if (scheme == SYMBOL_CODING_TAGGED ||
+      scheme == SYMBOL_CODING_TAGGED_INTERLEAVED) {
+    return DecodeTaggedSymbols<RAnsSymbolDecoder>(
+        num_values, num_components, num_streams, src_buffer, out_values);
+  } else if (scheme == SYMBOL_CODING_RAW ||
+             scheme == SYMBOL_CODING_RAW_INTERLEAVED) {
+    return DecodeRawSymbols<RAnsSymbolDecoder>(num_values, num_streams,
+                                               src_buffer, out_values);
   }
+  //! [YC] end
   return false;
 }
 
+//! [YC] start: Selective attribute decoding
+bool SkipSymbols(uint32_t num_values, int num_components,
+                 DecoderBuffer *src_buffer) {
+  if (num_values == 0) {
+    return true;
+  }
+  uint8_t scheme;
+  if (!src_buffer->Decode(&scheme)) {
+    return false;
+  }
+  uint8_t num_streams;
+  if (!DecodeNumStreams(scheme, src_buffer, &num_streams)) {
+    return false;
+  }
+  // The decoders below skip the values when |out_values| is null.
+  if (scheme == SYMBOL_CODING_TAGGED ||
+      scheme == SYMBOL_CODING_TAGGED_INTERLEAVED) {
+    return DecodeTaggedSymbols<RAnsSymbolDecoder>(
+        num_values, num_components, num_streams, src_buffer, nullptr);
+  } else if (scheme == SYMBOL_CODING_RAW ||
+             scheme == SYMBOL_CODING_RAW_INTERLEAVED) {
+    return DecodeRawSymbols<RAnsSymbolDecoder>(num_values, num_streams,
+                                               src_buffer, nullptr);
+  }
+  return false;
+}
+//! [YC] end
+
+//! [YC] start: Interleaved rANS streams
+// Loads 8 bytes as a little endian word (a single load on little endian
+// targets).
+static inline uint64_t LoadLittleEndian64(const uint8_t *data) {
+  uint64_t word = 0;
+  for (int b = 7; b >= 0; --b) {
+    word = (word << 8) | data[b];
+  }
+  return word;
+}
+
+// Decodes the values of the tagged scheme stored behind the tags as
+// |bit_lengths[i]| bits for each component of the entry i. Reads the bits
+// from 64-bit little endian words instead of one by one.
+static bool DecodeTaggedValues(const std::vector<uint32_t> &bit_lengths,
+                               uint32_t num_values, int num_components,
+                               DecoderBuffer *src_buffer,
+                               uint32_t *out_values) {
+  uint64_t num_bits = 0;
+  for (const uint32_t bit_length : bit_lengths) {
+    if (bit_length > 32) {
+      return false;
+    }
+    num_bits += static_cast<uint64_t>(bit_length) * num_components;
+  }
+  const uint64_t num_bytes = (num_bits + 7) / 8;
+  if (num_bytes > static_cast<uint64_t>(src_buffer->remaining_size())) {
+    return false;
+  }
+  const uint8_t *const data =
+      reinterpret_cast<const uint8_t *>(src_buffer->data_head());
+  src_buffer->Advance(num_bytes);
+  if (out_values == nullptr) {
+    return true;
+  }
+  uint64_t bit_offset = 0;
+  uint32_t value_id = 0;
+  for (uint32_t i = 0; i < num_values; i += num_components) {
+    const uint32_t bit_length = bit_lengths[i / num_components];
+    const uint64_t mask = (uint64_t(1) << bit_length) - 1;
+    for (int j = 0; j < num_components; ++j) {
+      const uint64_t byte_offset = bit_offset >> 3;
+      uint64_t word = 0;
+      // The bits are stored from the least significant bit of every byte.
+      if (byte_offset + 8 <= num_bytes) {
+        word = LoadLittleEndian64(data + byte_offset);
+      } else {
+        for (uint64_t b = byte_offset; b < num_bytes; ++b) {
+          word |= static_cast<uint64_t>(data[b]) << (8 * (b - byte_offset));
+        }
+      }
+      out_values[value_id++] =
+          static_cast<uint32_t>((word >> (bit_offset & 7)) & mask);
+      bit_offset += bit_length;
+    }
+  }
+  return true;
+}
+//! [YC] end
+
 template <template <int> class SymbolDecoderT>
 bool DecodeTaggedSymbols(uint32_t num_values, int num_components,
-                         DecoderBuffer *src_buffer, uint32_t *out_values) {
+                         int num_streams, DecoderBuffer *src_buffer,
+                         uint32_t *out_values) {
   // Decode the encoded data.
   SymbolDecoderT<5> tag_decoder;
   if (!tag_decoder.Create(src_buffer)) {
     return false;
   }
 
+  //! [YC] start: Interleaved rANS streams
+  if (num_streams > 1) {
+    if (num_values > 0 && tag_decoder.num_symbols() == 0) {
+      return false;  // Wrong number of symbols.
+    }
+    // All tags are stored before the values.
+    std::vector<uint32_t> bit_lengths((num_values + num_components - 1) /
+                                      num_components);
+    if (!tag_decoder.DecodeInterleavedSymbols(
+            num_streams, static_cast<uint32_t>(bit_lengths.size()),
+            src_buffer, bit_lengths.data())) {
+      return false;
+    }
+    return DecodeTaggedValues(bit_lengths, num_values, num_components,
+                              src_buffer, out_values);
+  }
+  //! [YC] end
+
   if (!tag_decoder.StartDecoding(src_buffer)) {
     return false;
   }
@@ -66,6 +201,25 @@ bool DecodeTaggedSymbols(uint32_t num_values, int num_components,
     return false;  // Wrong number of symbols.
   }
 
+  //! [YC] start: Selective attribute decoding
+  if (out_values == nullptr) {
+    // The values are stored as raw bits behind the tag data, the tags give
+    // their total length.
+    uint64_t num_bits = 0;
+    for (uint32_t i = 0; i < num_values; i += num_components) {
+      num_bits += static_cast<uint64_t>(tag_decoder.DecodeSymbol()) *
+                  num_components;
+    }
+    tag_decoder.EndDecoding();
+    const uint64_t num_bytes = (num_bits + 7) / 8;
+    if (num_bytes > static_cast<uint64_t>(src_buffer->remaining_size())) {
+      return false;
+    }
+    src_buffer->Advance(num_bytes);
+    return true;
+  }
+  //! [YC] end
+
   // src_buffer now points behind the encoded tag data (to the place where the
   // values are encoded).
   src_buffer->StartBitDecoding(false, nullptr);
@@ -88,8 +242,8 @@ bool DecodeTaggedSymbols(uint32_t num_values, int num_components,
 }
 
 template <class SymbolDecoderT>
-bool DecodeRawSymbolsInternal(uint32_t num_values, DecoderBuffer *src_buffer,
-                              uint32_t *out_values) {
+bool DecodeRawSymbolsInternal(uint32_t num_values, int num_streams,
+                              DecoderBuffer *src_buffer, uint32_t *out_values) {
   SymbolDecoderT decoder;
   if (!decoder.Create(src_buffer)) {
     return false;
@@ -99,9 +253,21 @@ bool DecodeRawSymbolsInternal(uint32_t num_values, DecoderBuffer *src_buffer,
     return false;  // Wrong number of symbols.
   }
 
+  //! [YC] start: Interleaved rANS streams
+  if (num_streams > 1) {
+    return decoder.DecodeInterleavedSymbols(num_streams, num_values, src_buffer,
+                                            out_values);
+  }
+  //! [YC] end
   if (!decoder.StartDecoding(src_buffer)) {
     return false;
   }
+  //! [YC] start: Selective attribute decoding
+  // StartDecoding() already moved |src_buffer| past the rANS data.
+  if (out_values == nullptr) {
+    return true;
+  }
+  //! [YC] end
   for (uint32_t i = 0; i < num_values; ++i) {
     // Decode a symbol into the value.
     const uint32_t value = decoder.DecodeSymbol();
@@ -112,67 +278,67 @@ bool DecodeRawSymbolsInternal(uint32_t num_values, DecoderBuffer *src_buffer,
 }
 
 template <template <int> class SymbolDecoderT>
-bool DecodeRawSymbols(uint32_t num_values, DecoderBuffer *src_buffer,
-                      uint32_t *out_values) {
+bool DecodeRawSymbols(uint32_t num_values, int num_streams,
+                      DecoderBuffer *src_buffer, uint32_t *out_values) {
   uint8_t max_bit_length;
   if (!src_buffer->Decode(&max_bit_length)) {
     return false;
   }
   switch (max_bit_length) {
     case 1:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<1>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<1>>(
+          num_values, num_streams, src_buffer, out_values);
     case 2:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<2>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<2>>(
+          num_values, num_streams, src_buffer, out_values);
     case 3:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<3>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<3>>(
+          num_values, num_streams, src_buffer, out_values);
     case 4:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<4>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<4>>(
+          num_values, num_streams, src_buffer, out_values);
     case 5:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<5>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<5>>(
+          num_values, num_streams, src_buffer, out_values);
     case 6:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<6>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<6>>(
+          num_values, num_streams, src_buffer, out_values);
     case 7:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<7>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<7>>(
+          num_values, num_streams, src_buffer, out_values);
     case 8:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<8>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<8>>(
+          num_values, num_streams, src_buffer, out_values);
     case 9:
-      return DecodeRawSymbolsInternal<SymbolDecoderT<9>>(num_values, src_buffer,
-                                                         out_values);
+      return DecodeRawSymbolsInternal<SymbolDecoderT<9>>(
+          num_values, num_streams, src_buffer, out_values);
     case 10:
       return DecodeRawSymbolsInternal<SymbolDecoderT<10>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 11:
       return DecodeRawSymbolsInternal<SymbolDecoderT<11>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 12:
       return DecodeRawSymbolsInternal<SymbolDecoderT<12>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 13:
       return DecodeRawSymbolsInternal<SymbolDecoderT<13>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 14:
       return DecodeRawSymbolsInternal<SymbolDecoderT<14>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 15:
       return DecodeRawSymbolsInternal<SymbolDecoderT<15>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 16:
       return DecodeRawSymbolsInternal<SymbolDecoderT<16>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 17:
       return DecodeRawSymbolsInternal<SymbolDecoderT<17>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     case 18:
       return DecodeRawSymbolsInternal<SymbolDecoderT<18>>(
-          num_values, src_buffer, out_values);
+          num_values, num_streams, src_buffer, out_values);
     default:
       return false;
   }
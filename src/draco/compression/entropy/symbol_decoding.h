@@ -24,6 +24,14 @@ namespace draco {
 bool DecodeSymbols(uint32_t num_values, int num_components,
                    DecoderBuffer *src_buffer, uint32_t *out_values);
 
+//! [YC] start: Selective attribute decoding
+// Advances |src_buffer| past symbols encoded by EncodeSymbols() without
+// decoding them. Only the tags of the tagged scheme are decoded, they give the
+// length of the values. Returns false on error.
+bool SkipSymbols(uint32_t num_values, int num_components,
+                 DecoderBuffer *src_buffer);
+//! [YC] end
+
 }  // namespace draco
 
 #endif  // DRACO_COMPRESSION_ENTROPY_SYMBOL_DECODING_H_
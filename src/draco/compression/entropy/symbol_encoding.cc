@@ -27,6 +27,14 @@ namespace draco {
 constexpr int32_t kMaxTagSymbolBitLength = 32;
 constexpr int kMaxRawEncodingBitLength = 18;
 constexpr int kDefaultSymbolCodingCompressionLevel = 7;
+//! [YC] start: Interleaved rANS streams
+// Number of streams used when an interleaved method is forced without setting
+// the number of streams.
+constexpr int kDefaultSymbolCodingNumStreams = 4;
+// Inputs with fewer values per stream are encoded into a single stream, where
+// the sizes and final states of the extra streams would not pay off.
+constexpr int kMinInterleavedValuesPerStream = 64;
+//! [YC] end
 
 typedef uint64_t TaggedBitLengthFrequencies[kMaxTagSymbolBitLength];
 
@@ -43,6 +51,17 @@ bool SetSymbolEncodingCompressionLevel(Options *options,
   return true;
 }
 
+//! [YC] start: Interleaved rANS streams
+bool SetSymbolEncodingNumStreams(Options *options, int num_streams) {
+  if (num_streams != 1 && num_streams != 2 && num_streams != 4 &&
+      num_streams != 8) {
+    return false;
+  }
+  options->SetInt("symbol_encoding_num_streams", num_streams);
+  return true;
+}
+//! [YC] end
+
 // Computes bit lengths of the input values. If num_components > 1, the values
 // are processed in "num_components" sized chunks and the bit length is always
 // computed for the largest value from the chunk.
@@ -106,12 +125,13 @@ template <template <int> class SymbolEncoderT>
 bool EncodeTaggedSymbols(const uint32_t *symbols, int num_values,
                          int num_components,
                          const std::vector<uint32_t> &bit_lengths,
-                         EncoderBuffer *target_buffer);
+                         int num_streams, EncoderBuffer *target_buffer);
 
 template <template <int> class SymbolEncoderT>
 bool EncodeRawSymbols(const uint32_t *symbols, int num_values,
                       uint32_t max_entry_value, int32_t num_unique_symbols,
-                      const Options *options, EncoderBuffer *target_buffer);
+                      const Options *options, int num_streams,
+                      EncoderBuffer *target_buffer);
 
 bool EncodeSymbols(const uint32_t *symbols, int num_values, int num_components,
                    const Options *options, EncoderBuffer *target_buffer) {
@@ -155,18 +175,48 @@ bool EncodeSymbols(const uint32_t *symbols, int num_values, int num_components,
     } else {
       method = SYMBOL_CODING_RAW;
     }
+    //! [YC] start: Interleaved rANS streams
+    // The tagged scheme codes one symbol per entry, the raw scheme one per
+    // value.
+    const int num_streams =
+        options != nullptr ? options->GetInt("symbol_encoding_num_streams", 1)
+                           : 1;
+    const int num_symbols = method == SYMBOL_CODING_TAGGED
+                                ? static_cast<int>(bit_lengths.size())
+                                : num_values;
+    if (num_streams > 1 &&
+        num_symbols >= kMinInterleavedValuesPerStream * num_streams) {
+      method = method == SYMBOL_CODING_TAGGED
+                   ? SYMBOL_CODING_TAGGED_INTERLEAVED
+                   : SYMBOL_CODING_RAW_INTERLEAVED;
+    }
+    //! [YC] end
   }
   // Use the tagged scheme.
   target_buffer->Encode(static_cast<uint8_t>(method));
-  if (method == SYMBOL_CODING_TAGGED) {
-    return EncodeTaggedSymbols<RAnsSymbolEncoder>(
-        symbols, num_values, num_components, bit_lengths, target_buffer);
+  //! [YC] start: Interleaved rANS streams
+  int num_streams = 1;
+  if (method == SYMBOL_CODING_TAGGED_INTERLEAVED ||
+      method == SYMBOL_CODING_RAW_INTERLEAVED) {
+    num_streams = kDefaultSymbolCodingNumStreams;
+    if (options != nullptr &&
+        options->GetInt("symbol_encoding_num_streams", 1) > 1) {
+      num_streams = options->GetInt("symbol_encoding_num_streams");
+    }
+    target_buffer->Encode(static_cast<uint8_t>(num_streams));
+  }
+  if (method == SYMBOL_CODING_TAGGED ||
+      method == SYMBOL_CODING_TAGGED_INTERLEAVED) {
+    return EncodeTaggedSymbols<RAnsSymbolEncoder>(symbols, num_values,
+                                                  num_components, bit_lengths,
+                                                  num_streams, target_buffer);
   }
-  if (method == SYMBOL_CODING_RAW) {
+  if (method == SYMBOL_CODING_RAW || method == SYMBOL_CODING_RAW_INTERLEAVED) {
     return EncodeRawSymbols<RAnsSymbolEncoder>(symbols, num_values, max_value,
                                                num_unique_symbols, options,
-                                               target_buffer);
+                                               num_streams, target_buffer);
   }
+  //! [YC] end
   // Unknown method selected.
   return false;
 }
@@ -175,7 +225,7 @@ template <template <int> class SymbolEncoderT>
 bool EncodeTaggedSymbols(const uint32_t *symbols, int num_values,
                          int num_components,
                          const std::vector<uint32_t> &bit_lengths,
-                         EncoderBuffer *target_buffer) {
+                         int num_streams, EncoderBuffer *target_buffer) {
   // Create entries for entropy coding. Each entry corresponds to a different
   // number of bits that are necessary to encode a given value. Every value
   // has at most 32 bits. Therefore, we need 32 different entries (for
@@ -203,6 +253,25 @@ bool EncodeTaggedSymbols(const uint32_t *symbols, int num_values,
   SymbolEncoderT<5> tag_encoder;
   tag_encoder.Create(frequencies, kMaxTagSymbolBitLength, target_buffer);
 
+  //! [YC] start: Interleaved rANS streams
+  if (num_streams > 1) {
+    // All tags go before the values, which keep their order.
+    tag_encoder.EncodeInterleavedSymbols(bit_lengths.data(),
+                                         static_cast<int>(bit_lengths.size()),
+                                         num_streams, target_buffer);
+    value_buffer.StartBitEncoding(value_bits, false);
+    for (int i = 0; i < num_values; i += num_components) {
+      const int bit_length = bit_lengths[i / num_components];
+      for (int j = 0; j < num_components; ++j) {
+        value_buffer.EncodeLeastSignificantBits32(bit_length, symbols[i + j]);
+      }
+    }
+    value_buffer.EndBitEncoding();
+    target_buffer->Encode(value_buffer.data(), value_buffer.size());
+    return true;
+  }
+  //! [YC] end
+
   // Start encoding bit tags.
   tag_encoder.StartEncoding(target_buffer);
 
@@ -244,7 +313,7 @@ bool EncodeTaggedSymbols(const uint32_t *symbols, int num_values,
 
 template <class SymbolEncoderT>
 bool EncodeRawSymbolsInternal(const uint32_t *symbols, int num_values,
-                              uint32_t max_entry_value,
+                              uint32_t max_entry_value, int num_streams,
                               EncoderBuffer *target_buffer) {
   // Count the frequency of each entry value.
   std::vector<uint64_t> frequencies(max_entry_value + 1, 0);
@@ -255,6 +324,13 @@ bool EncodeRawSymbolsInternal(const uint32_t *symbols, int num_values,
   SymbolEncoderT encoder;
   encoder.Create(frequencies.data(), static_cast<int>(frequencies.size()),
                  target_buffer);
+  //! [YC] start: Interleaved rANS streams
+  if (num_streams > 1) {
+    encoder.EncodeInterleavedSymbols(symbols, num_values, num_streams,
+                                     target_buffer);
+    return true;
+  }
+  //! [YC] end
   encoder.StartEncoding(target_buffer);
   // Encode all values.
   if (SymbolEncoderT::needs_reverse_encoding()) {
@@ -273,7 +349,8 @@ bool EncodeRawSymbolsInternal(const uint32_t *symbols, int num_values,
 template <template <int> class SymbolEncoderT>
 bool EncodeRawSymbols(const uint32_t *symbols, int num_values,
                       uint32_t max_entry_value, int32_t num_unique_symbols,
-                      const Options *options, EncoderBuffer *target_buffer) {
+                      const Options *options, int num_streams,
+                      EncoderBuffer *target_buffer) {
   int symbol_bits = 0;
   if (num_unique_symbols > 0) {
     symbol_bits = MostSignificantBit(num_unique_symbols);
@@ -316,58 +393,58 @@ bool EncodeRawSymbols(const uint32_t *symbols, int num_values,
       FALLTHROUGH_INTENDED;
     case 1:
       return EncodeRawSymbolsInternal<SymbolEncoderT<1>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 2:
       return EncodeRawSymbolsInternal<SymbolEncoderT<2>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 3:
       return EncodeRawSymbolsInternal<SymbolEncoderT<3>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 4:
       return EncodeRawSymbolsInternal<SymbolEncoderT<4>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 5:
       return EncodeRawSymbolsInternal<SymbolEncoderT<5>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 6:
       return EncodeRawSymbolsInternal<SymbolEncoderT<6>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 7:
       return EncodeRawSymbolsInternal<SymbolEncoderT<7>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 8:
       return EncodeRawSymbolsInternal<SymbolEncoderT<8>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 9:
       return EncodeRawSymbolsInternal<SymbolEncoderT<9>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 10:
       return EncodeRawSymbolsInternal<SymbolEncoderT<10>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 11:
       return EncodeRawSymbolsInternal<SymbolEncoderT<11>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 12:
       return EncodeRawSymbolsInternal<SymbolEncoderT<12>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 13:
       return EncodeRawSymbolsInternal<SymbolEncoderT<13>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 14:
       return EncodeRawSymbolsInternal<SymbolEncoderT<14>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 15:
       return EncodeRawSymbolsInternal<SymbolEncoderT<15>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 16:
       return EncodeRawSymbolsInternal<SymbolEncoderT<16>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 17:
       return EncodeRawSymbolsInternal<SymbolEncoderT<17>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     case 18:
       return EncodeRawSymbolsInternal<SymbolEncoderT<18>>(
-          symbols, num_values, max_entry_value, target_buffer);
+          symbols, num_values, max_entry_value, num_streams, target_buffer);
     default:
       return false;
   }
@@ -42,6 +42,16 @@ void SetSymbolEncodingMethod(Options *options, SymbolCodingMethod method);
 // Returns false if an invalid level has been set.
 bool SetSymbolEncodingCompressionLevel(Options *options, int compression_level);
 
+//! [YC] start: Interleaved rANS streams
+// Sets the number of interleaved rANS streams (1, 2, 4 or 8) used for the
+// symbols of the raw scheme or the bit length tags of the tagged scheme.
+// Multiple streams are stored as SYMBOL_CODING_RAW_INTERLEAVED or
+// SYMBOL_CODING_TAGGED_INTERLEAVED and decode faster. If the option is not
+// set, a single stream is used. Returns false for an unsupported number of
+// streams.
+bool SetSymbolEncodingNumStreams(Options *options, int num_streams);
+//! [YC] end
+
 }  // namespace draco
 
 #endif  // DRACO_COMPRESSION_ENTROPY_SYMBOL_ENCODING_H_
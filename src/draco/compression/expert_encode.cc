@@ -86,6 +86,18 @@ Status ExpertEncoder::EncodePointCloudToBuffer(const PointCloud &pc,
             // printf("[YC] DT_FLOAT32 i: %d\n", i);  // [YC] add: check print
             kd_tree_possible = false;              // Quantization not enabled.
         }
+        //! [YC] start: Quaternion codec
+        if (kd_tree_possible &&
+            options().GetAttributeBool(i, "quaternion_encoding", false)) {
+            kd_tree_possible = false;  // Only sequential quaternion encoder.
+        }
+        //! [YC] end
+        //! [YC] start: Vector quantization
+        if (kd_tree_possible &&
+            options().GetAttributeInt(i, "codebook_size", -1) > 0) {
+            kd_tree_possible = false;  // Only sequential codebook encoder.
+        }
+        //! [YC] end
         if (!kd_tree_possible) {
             // printf("[YC] !kd_tree_possible i: %d\n", i);  // [YC] add: check print
             break;
@@ -111,6 +123,9 @@ Status ExpertEncoder::EncodePointCloudToBuffer(const PointCloud &pc,
     // printf("[YC] encoder->num_encoded_points(): %zu\n", encoder->num_encoded_points()); // [YC] add: check print, weird
     set_num_encoded_points(encoder->num_encoded_points());
     set_num_encoded_faces(0);
+    //! [YC] start: Keep the statistics of the encoder
+    set_encoding_stats(encoder->stats());
+    //! [YC] end
     return OkStatus();
 #else
   return Status(Status::DRACO_ERROR, "Point cloud encoding is not enabled.");
@@ -146,6 +161,9 @@ Status ExpertEncoder::EncodeMeshToBuffer(const Mesh &m,
 
   set_num_encoded_points(encoder->num_encoded_points());
   set_num_encoded_faces(encoder->num_encoded_faces());
+  //! [YC] start: Keep the statistics of the encoder
+  set_encoding_stats(encoder->stats());
+  //! [YC] end
   return OkStatus();
 }
 
@@ -177,6 +195,25 @@ void ExpertEncoder::SetAttributeExplicitQuantization(int32_t attribute_id,
   options().SetAttributeFloat(attribute_id, "quantization_range", range);
 }
 
+//! [YC] start: Quaternion codec
+void ExpertEncoder::SetAttributeQuaternionQuantization(int32_t attribute_id,
+                                                       int quantization_bits) {
+  options().SetAttributeInt(attribute_id, "quantization_bits",
+                            quantization_bits);
+  options().SetAttributeBool(attribute_id, "quaternion_encoding", true);
+}
+//! [YC] end
+
+//! [YC] start: Vector quantization
+void ExpertEncoder::SetAttributeCodebook(int32_t attribute_id,
+                                         int codebook_size,
+                                         int max_iterations) {
+  options().SetAttributeInt(attribute_id, "codebook_size", codebook_size);
+  options().SetAttributeInt(attribute_id, "codebook_iterations",
+                            max_iterations);
+}
+//! [YC] end
+
 void ExpertEncoder::SetUseBuiltInAttributeCompression(bool enabled) {
   options().SetGlobalBool("use_built_in_attribute_compression", enabled);
 }
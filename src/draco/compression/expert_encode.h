@@ -75,6 +75,21 @@ class ExpertEncoder : public EncoderBase<EncoderOptions> {
                                         int quantization_bits, int num_dims,
                                         const float *origin, float range);
 
+  //! [YC] start: Quaternion codec
+  // Sets a specific attribute of rotation quaternions to be encoded with the
+  // smallest three representation. See
+  // Encoder::SetAttributeQuaternionQuantization() for more details.
+  void SetAttributeQuaternionQuantization(int32_t attribute_id,
+                                          int quantization_bits);
+  //! [YC] end
+
+  //! [YC] start: Vector quantization
+  // Sets a specific attribute to be encoded with a k-means codebook. See
+  // Encoder::SetAttributeCodebook() for more details.
+  void SetAttributeCodebook(int32_t attribute_id, int codebook_size,
+                            int max_iterations);
+  //! [YC] end
+
   // Enables/disables built in entropy coding of attribute values. Disabling
   // this option may be useful to improve the performance when third party
   // compression is used on top of the Draco compression. Default: [true].
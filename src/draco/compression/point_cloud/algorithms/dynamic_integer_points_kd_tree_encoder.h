@@ -17,6 +17,7 @@
 
 #include <algorithm>
 #include <array>
+#include <atomic>
 #include <memory>
 #include <stack>
 #include <vector>
@@ -29,6 +30,7 @@
 #include "draco/core/bit_utils.h"
 #include "draco/core/encoder_buffer.h"
 #include "draco/core/math_utils.h"
+#include "draco/core/parallel_for.h"  // [YC] add: scalable kD-tree encoding
 
 namespace draco {
 
@@ -99,14 +101,15 @@ class DynamicIntegerPointsKdTreeEncoder {
   typedef std::vector<uint32_t> VectorUint32;
 
  public:
+  //! [YC] start: Scalable kD-tree encoding
   explicit DynamicIntegerPointsKdTreeEncoder(uint32_t dimension)
       : bit_length_(0),
+        num_points_(0),
         dimension_(dimension),
-        deviations_(dimension, 0),
-        num_remaining_bits_(dimension, 0),
-        axes_(dimension, 0),
-        base_stack_(32 * dimension + 1, VectorUint32(dimension, 0)),
-        levels_stack_(32 * dimension + 1, VectorUint32(dimension, 0)) {}
+        num_threads_(1),
+        max_deferred_points_(0),
+        num_deferred_points_(0) {}
+  //! [YC] end
 
   // Encodes an integer point cloud given by [begin,end) into buffer.
   // |bit_length| gives the highest bit used for all coordinates.
@@ -123,62 +126,169 @@ class DynamicIntegerPointsKdTreeEncoder {
 
   const uint32_t dimension() const { return dimension_; }
 
+  //! [YC] start: Scalable kD-tree encoding
+  // Sets the number of threads encoding independent subtrees. The encoded
+  // data does not depend on it.
+  void SetNumThreads(int num_threads) { num_threads_ = num_threads; }
+  //! [YC] end
+
  private:
-  template <class RandomAccessIteratorT>
-  uint32_t GetAndEncodeAxis(RandomAccessIteratorT begin,
-                            RandomAccessIteratorT end,
-                            const VectorUint32 &old_base,
-                            const VectorUint32 &levels, uint32_t last_axis);
-  template <class RandomAccessIteratorT>
-  void EncodeInternal(RandomAccessIteratorT begin, RandomAccessIteratorT end);
+  //! [YC] start: Scalable kD-tree encoding
+  // The tree is built by partitioning an array of point indices in place, the
+  // points themselves are never moved. A node of the tree is a range of this
+  // array.
+  struct Node {
+    uint32_t begin;
+    uint32_t end;
+    uint32_t last_axis;
+    uint32_t stack_pos;  // used to get base and levels
+  };
 
-  class Splitter {
+  // Scratch memory of the traversal of a (sub)tree. The base and the levels
+  // of stack position |i| are stored at [i * dimension, (i + 1) * dimension)
+  // of |base_stack| and |levels_stack|.
+  struct Traversal {
+    explicit Traversal(uint32_t dimension)
+        : deviations(dimension, 0),
+          num_remaining_bits(dimension, 0),
+          axes(dimension, 0),
+          base_stack((32 * dimension + 1) * dimension, 0),
+          levels_stack((32 * dimension + 1) * dimension, 0) {}
+
+    VectorUint32 deviations;
+    VectorUint32 num_remaining_bits;
+    VectorUint32 axes;
+    VectorUint32 base_stack;
+    VectorUint32 levels_stack;
+    std::vector<Node> node_stack;
+  };
+
+  // Writes the symbols of a traversal directly to the bit encoders.
+  class DirectSink {
    public:
-    Splitter(uint32_t axis, uint32_t value) : axis_(axis), value_(value) {}
-    template <class PointT>
-    bool operator()(const PointT &a) const {
-      return a[axis_] < value_;
+    explicit DirectSink(DynamicIntegerPointsKdTreeEncoder *encoder)
+        : encoder_(encoder) {}
+    void EncodeNumber(int nbits, uint32_t value) {
+      encoder_->numbers_encoder_.EncodeLeastSignificantBits32(nbits, value);
+    }
+    void EncodeRemainingBits(int nbits, uint32_t value) {
+      encoder_->remaining_bits_encoder_.EncodeLeastSignificantBits32(nbits,
+                                                                     value);
+    }
+    void EncodeAxis(uint32_t axis) {
+      encoder_->axis_encoder_.EncodeLeastSignificantBits32(4, axis);
     }
+    void EncodeHalf(bool left) { encoder_->half_encoder_.EncodeBit(left); }
 
    private:
-    const uint32_t axis_;
-    const uint32_t value_;
+    DynamicIntegerPointsKdTreeEncoder *const encoder_;
   };
 
-  void EncodeNumber(int nbits, uint32_t value) {
-    numbers_encoder_.EncodeLeastSignificantBits32(nbits, value);
-  }
+  // Records the symbols of a traversal of a subtree, so that subtrees can be
+  // traversed concurrently and their symbols written in the tree order.
+  // Every symbol is packed as the value (bits 0-31), the number of bits (bits
+  // 32-37) and the bit encoder (bits 38-39).
+  class RecordingSink {
+   public:
+    enum BitEncoder { NUMBERS, REMAINING_BITS, AXIS, HALF };
+
+    explicit RecordingSink(std::vector<uint64_t> *symbols)
+        : symbols_(symbols) {}
+    void EncodeNumber(int nbits, uint32_t value) {
+      Record(NUMBERS, nbits, value);
+    }
+    void EncodeRemainingBits(int nbits, uint32_t value) {
+      Record(REMAINING_BITS, nbits, value);
+    }
+    void EncodeAxis(uint32_t axis) { Record(AXIS, 4, axis); }
+    void EncodeHalf(bool left) { Record(HALF, 1, left); }
+
+    // Writes the recorded |symbol| to |sink|.
+    static void Replay(uint64_t symbol, DirectSink *sink) {
+      const uint32_t value = static_cast<uint32_t>(symbol);
+      const int nbits = static_cast<int>(symbol >> 32) & 63;
+      switch (symbol >> 38) {
+        case NUMBERS:
+          sink->EncodeNumber(nbits, value);
+          break;
+        case REMAINING_BITS:
+          sink->EncodeRemainingBits(nbits, value);
+          break;
+        case AXIS:
+          sink->EncodeAxis(value);
+          break;
+        default:
+          sink->EncodeHalf(value != 0);
+          break;
+      }
+    }
+
+   private:
+    void Record(BitEncoder bit_encoder, int nbits, uint32_t value) {
+      symbols_->push_back(static_cast<uint64_t>(bit_encoder) << 38 |
+                          static_cast<uint64_t>(nbits) << 32 | value);
+    }
+
+    std::vector<uint64_t> *const symbols_;
+  };
+
+  template <class RandomAccessIteratorT, class SinkT>
+  uint32_t GetAndEncodeAxis(RandomAccessIteratorT points, const Node &node,
+                            const uint32_t *old_base, const uint32_t *levels,
+                            Traversal *traversal, SinkT *sink);
+  template <class RandomAccessIteratorT>
+  void EncodeInternal(RandomAccessIteratorT begin, RandomAccessIteratorT end);
+
+  // Encodes the subtree of the node on top of the node stack of |traversal|
+  // into |sink|. When |defer_small_nodes| is set, nodes of at most
+  // |max_deferred_points_| points are collected in |deferred_nodes_| and
+  // encoded concurrently later.
+  template <class RandomAccessIteratorT, class SinkT>
+  void EncodeNodes(RandomAccessIteratorT points, Traversal *traversal,
+                   SinkT *sink, bool defer_small_nodes);
 
+  // Encodes the subtrees of |deferred_nodes_| on |num_threads_| threads and
+  // writes their symbols in the order of the nodes.
   template <class RandomAccessIteratorT>
-  struct EncodingStatus {
-    EncodingStatus(RandomAccessIteratorT begin_, RandomAccessIteratorT end_,
-                   uint32_t last_axis_, uint32_t stack_pos_)
-        : begin(begin_),
-          end(end_),
-          last_axis(last_axis_),
-          stack_pos(stack_pos_) {
-      num_remaining_points = static_cast<uint32_t>(end - begin);
+  void EncodeDeferredNodes(RandomAccessIteratorT points);
+
+  template <class RandomAccessIteratorT>
+  class Splitter {
+   public:
+    Splitter(RandomAccessIteratorT points, uint32_t axis, uint32_t value)
+        : points_(points), axis_(axis), value_(value) {}
+    bool operator()(uint32_t index) const {
+      return points_[index][axis_] < value_;
     }
 
-    RandomAccessIteratorT begin;
-    RandomAccessIteratorT end;
-    uint32_t last_axis;
-    uint32_t num_remaining_points;
-    uint32_t stack_pos;  // used to get base and levels
+   private:
+    const RandomAccessIteratorT points_;
+    const uint32_t axis_;
+    const uint32_t value_;
   };
 
+  // Subtrees of at most this many points are encoded concurrently.
+  static constexpr uint32_t kMaxDeferredPoints = 8192;
+  // Number of subtrees per thread whose symbols are kept in memory at once.
+  static constexpr uint32_t kDeferredNodesPerThread = 4;
+
   uint32_t bit_length_;
   uint32_t num_points_;
   uint32_t dimension_;
+  int num_threads_;
   NumbersEncoder numbers_encoder_;
   RemainingBitsEncoder remaining_bits_encoder_;
   AxisEncoder axis_encoder_;
   HalfEncoder half_encoder_;
-  VectorUint32 deviations_;
-  VectorUint32 num_remaining_bits_;
-  VectorUint32 axes_;
-  std::vector<VectorUint32> base_stack_;
-  std::vector<VectorUint32> levels_stack_;
+  // Indices of the points partitioned by the tree.
+  VectorUint32 indices_;
+  uint32_t max_deferred_points_;
+  uint32_t num_deferred_points_;
+  // Roots of the deferred subtrees with their base and levels.
+  std::vector<Node> deferred_nodes_;
+  VectorUint32 deferred_bases_;
+  VectorUint32 deferred_levels_;
+  //! [YC] end
 };
 
 template <int compression_level_t>
@@ -211,15 +321,16 @@ bool DynamicIntegerPointsKdTreeEncoder<compression_level_t>::EncodePoints(
 
   return true;
 }
+
+//! [YC] start: Scalable kD-tree encoding
 template <int compression_level_t>
-template <class RandomAccessIteratorT>
+template <class RandomAccessIteratorT, class SinkT>
 uint32_t
 DynamicIntegerPointsKdTreeEncoder<compression_level_t>::GetAndEncodeAxis(
-    RandomAccessIteratorT begin, RandomAccessIteratorT end,
-    const VectorUint32 &old_base, const VectorUint32 &levels,
-    uint32_t last_axis) {
+    RandomAccessIteratorT points, const Node &node, const uint32_t *old_base,
+    const uint32_t *levels, Traversal *traversal, SinkT *sink) {
   if (!Policy::select_axis) {
-    return DRACO_INCREMENT_MOD(last_axis, dimension_);
+    return DRACO_INCREMENT_MOD(node.last_axis, dimension_);
   }
 
   // For many points this function selects the axis that should be used
@@ -228,27 +339,29 @@ DynamicIntegerPointsKdTreeEncoder<compression_level_t>::GetAndEncodeAxis(
   // For lower number of points, we simply choose the axis that is refined the
   // least so far.
 
-  DRACO_DCHECK_EQ(true, end - begin != 0);
+  DRACO_DCHECK_EQ(true, node.end - node.begin != 0);
 
   uint32_t best_axis = 0;
-  if (end - begin < 64) {
+  if (node.end - node.begin < 64) {
     for (uint32_t axis = 1; axis < dimension_; ++axis) {
       if (levels[best_axis] > levels[axis]) {
         best_axis = axis;
       }
     }
   } else {
-    const uint32_t size = static_cast<uint32_t>(end - begin);
+    VectorUint32 &deviations = traversal->deviations;
+    VectorUint32 &num_remaining_bits = traversal->num_remaining_bits;
+    const uint32_t size = node.end - node.begin;
     for (uint32_t i = 0; i < dimension_; i++) {
-      deviations_[i] = 0;
-      num_remaining_bits_[i] = bit_length_ - levels[i];
-      if (num_remaining_bits_[i] > 0) {
+      deviations[i] = 0;
+      num_remaining_bits[i] = bit_length_ - levels[i];
+      if (num_remaining_bits[i] > 0) {
         const uint32_t split =
-            old_base[i] + (1 << (num_remaining_bits_[i] - 1));
-        for (auto it = begin; it != end; ++it) {
-          deviations_[i] += ((*it)[i] < split);
+            old_base[i] + (1 << (num_remaining_bits[i] - 1));
+        for (uint32_t j = node.begin; j < node.end; ++j) {
+          deviations[i] += (points[indices_[j]][i] < split);
         }
-        deviations_[i] = std::max(size - deviations_[i], deviations_[i]);
+        deviations[i] = std::max(size - deviations[i], deviations[i]);
       }
     }
 
@@ -256,15 +369,15 @@ DynamicIntegerPointsKdTreeEncoder<compression_level_t>::GetAndEncodeAxis(
     best_axis = 0;
     for (uint32_t i = 0; i < dimension_; i++) {
       // If axis can be subdivided.
-      if (num_remaining_bits_[i]) {
+      if (num_remaining_bits[i]) {
         // Check if this is the better axis.
-        if (max_value < deviations_[i]) {
-          max_value = deviations_[i];
+        if (max_value < deviations[i]) {
+          max_value = deviations[i];
           best_axis = i;
         }
       }
     }
-    axis_encoder_.EncodeLeastSignificantBits32(4, best_axis);
+    sink->EncodeAxis(best_axis);
   }
 
   return best_axis;
@@ -274,30 +387,61 @@ template <int compression_level_t>
 template <class RandomAccessIteratorT>
 void DynamicIntegerPointsKdTreeEncoder<compression_level_t>::EncodeInternal(
     RandomAccessIteratorT begin, RandomAccessIteratorT end) {
-  typedef EncodingStatus<RandomAccessIteratorT> Status;
-
-  base_stack_[0] = VectorUint32(dimension_, 0);
-  levels_stack_[0] = VectorUint32(dimension_, 0);
-  Status init_status(begin, end, 0, 0);
-  std::stack<Status> status_stack;
-  status_stack.push(init_status);
-
-  // TODO(b/199760123): Use preallocated vector instead of stack.
-  while (!status_stack.empty()) {
-    Status status = status_stack.top();
-    status_stack.pop();
-
-    begin = status.begin;
-    end = status.end;
-    const uint32_t last_axis = status.last_axis;
-    const uint32_t stack_pos = status.stack_pos;
-    const VectorUint32 &old_base = base_stack_[stack_pos];
-    const VectorUint32 &levels = levels_stack_[stack_pos];
+  indices_.resize(num_points_);
+  for (uint32_t i = 0; i < num_points_; ++i) {
+    indices_[i] = i;
+  }
+  if (num_threads_ > 1) {
+    max_deferred_points_ = kMaxDeferredPoints;
+  }
+  Traversal traversal(dimension_);
+  traversal.node_stack.push_back({0, num_points_, 0, 0});
+  DirectSink sink(this);
+  EncodeNodes(begin, &traversal, &sink, num_threads_ > 1);
+  EncodeDeferredNodes(begin);
+  indices_.clear();
+  indices_.shrink_to_fit();
+}
+
+template <int compression_level_t>
+template <class RandomAccessIteratorT, class SinkT>
+void DynamicIntegerPointsKdTreeEncoder<compression_level_t>::EncodeNodes(
+    RandomAccessIteratorT points, Traversal *traversal, SinkT *sink,
+    bool defer_small_nodes) {
+  std::vector<Node> &node_stack = traversal->node_stack;
+  while (!node_stack.empty()) {
+    const Node node = node_stack.back();
+    node_stack.pop_back();
+
+    const uint32_t stack_pos = node.stack_pos;
+    const uint32_t *const old_base =
+        &traversal->base_stack[stack_pos * dimension_];
+    uint32_t *const levels = &traversal->levels_stack[stack_pos * dimension_];
+    const uint32_t num_remaining_points = node.end - node.begin;
+
+    if (defer_small_nodes) {
+      if (num_remaining_points <= max_deferred_points_) {
+        // The symbols of all nodes on the stack come after the symbols of
+        // this subtree, so it can be encoded independently.
+        deferred_nodes_.push_back(node);
+        deferred_bases_.insert(deferred_bases_.end(), old_base,
+                               old_base + dimension_);
+        deferred_levels_.insert(deferred_levels_.end(), levels,
+                                levels + dimension_);
+        num_deferred_points_ += num_remaining_points;
+        if (num_deferred_points_ >=
+            max_deferred_points_ * kDeferredNodesPerThread * num_threads_) {
+          EncodeDeferredNodes(points);
+        }
+        continue;
+      }
+      // Symbols of the deferred subtrees come before the ones of this node.
+      EncodeDeferredNodes(points);
+    }
 
     const uint32_t axis =
-        GetAndEncodeAxis(begin, end, old_base, levels, last_axis);
+        GetAndEncodeAxis(points, node, old_base, levels, traversal, sink);
     const uint32_t level = levels[axis];
-    const uint32_t num_remaining_points = static_cast<uint32_t>(end - begin);
 
     // If this happens all axis are subdivided to the end.
     if ((bit_length_ - level) == 0) {
@@ -309,17 +453,17 @@ void DynamicIntegerPointsKdTreeEncoder<compression_level_t>::EncodeInternal(
     if (num_remaining_points <= 2) {
       // TODO(b/199760123): |axes_| not necessary, remove would change
       // bitstream!
-      axes_[0] = axis;
+      VectorUint32 &axes = traversal->axes;
+      axes[0] = axis;
       for (uint32_t i = 1; i < dimension_; i++) {
-        axes_[i] = DRACO_INCREMENT_MOD(axes_[i - 1], dimension_);
+        axes[i] = DRACO_INCREMENT_MOD(axes[i - 1], dimension_);
       }
-      for (uint32_t i = 0; i < num_remaining_points; ++i) {
-        const auto &p = *(begin + i);
+      for (uint32_t i = node.begin; i < node.end; ++i) {
+        const auto &p = points[indices_[i]];
         for (uint32_t j = 0; j < dimension_; j++) {
-          const uint32_t num_remaining_bits = bit_length_ - levels[axes_[j]];
+          const uint32_t num_remaining_bits = bit_length_ - levels[axes[j]];
           if (num_remaining_bits) {
-            remaining_bits_encoder_.EncodeLeastSignificantBits32(
-                num_remaining_bits, p[axes_[j]]);
+            sink->EncodeRemainingBits(num_remaining_bits, p[axes[j]]);
           }
         }
       }
@@ -328,42 +472,90 @@ void DynamicIntegerPointsKdTreeEncoder<compression_level_t>::EncodeInternal(
 
     const uint32_t num_remaining_bits = bit_length_ - level;
     const uint32_t modifier = 1 << (num_remaining_bits - 1);
-    base_stack_[stack_pos + 1] = old_base;  // copy
-    base_stack_[stack_pos + 1][axis] += modifier;
-    const VectorUint32 &new_base = base_stack_[stack_pos + 1];
+    uint32_t *const new_base =
+        &traversal->base_stack[(stack_pos + 1) * dimension_];
+    std::copy(old_base, old_base + dimension_, new_base);  // copy
+    new_base[axis] += modifier;
 
-    const RandomAccessIteratorT split =
-        std::partition(begin, end, Splitter(axis, new_base[axis]));
+    const uint32_t *const split = std::partition(
+        &indices_[0] + node.begin, &indices_[0] + node.end,
+        Splitter<RandomAccessIteratorT>(points, axis, new_base[axis]));
 
-    DRACO_DCHECK_EQ(true, (end - begin) > 0);
+    DRACO_DCHECK_EQ(true, num_remaining_points > 0);
 
     // Encode number of points in first and second half.
     const int required_bits = MostSignificantBit(num_remaining_points);
 
-    const uint32_t first_half = static_cast<uint32_t>(split - begin);
-    const uint32_t second_half = static_cast<uint32_t>(end - split);
+    const uint32_t first_half =
+        static_cast<uint32_t>(split - (&indices_[0] + node.begin));
+    const uint32_t second_half = num_remaining_points - first_half;
     const bool left = first_half < second_half;
 
     if (first_half != second_half) {
-      half_encoder_.EncodeBit(left);
+      sink->EncodeHalf(left);
     }
 
     if (left) {
-      EncodeNumber(required_bits, num_remaining_points / 2 - first_half);
+      sink->EncodeNumber(required_bits,
+                         num_remaining_points / 2 - first_half);
     } else {
-      EncodeNumber(required_bits, num_remaining_points / 2 - second_half);
+      sink->EncodeNumber(required_bits,
+                         num_remaining_points / 2 - second_half);
     }
 
-    levels_stack_[stack_pos][axis] += 1;
-    levels_stack_[stack_pos + 1] = levels_stack_[stack_pos];  // copy
-    if (split != begin) {
-      status_stack.push(Status(begin, split, axis, stack_pos));
+    levels[axis] += 1;
+    std::copy(levels, levels + dimension_,
+              &traversal->levels_stack[(stack_pos + 1) * dimension_]);
+    const uint32_t split_index = node.begin + first_half;
+    if (split_index != node.begin) {
+      node_stack.push_back({node.begin, split_index, axis, stack_pos});
     }
-    if (split != end) {
-      status_stack.push(Status(split, end, axis, stack_pos + 1));
+    if (split_index != node.end) {
+      node_stack.push_back({split_index, node.end, axis, stack_pos + 1});
+    }
+  }
+}
+
+template <int compression_level_t>
+template <class RandomAccessIteratorT>
+void DynamicIntegerPointsKdTreeEncoder<
+    compression_level_t>::EncodeDeferredNodes(RandomAccessIteratorT points) {
+  const int num_nodes = static_cast<int>(deferred_nodes_.size());
+  if (num_nodes == 0) {
+    return;
+  }
+  std::vector<std::vector<uint64_t>> symbols(num_nodes);
+  std::atomic<int> next_node(0);
+  const int num_threads = std::min(num_threads_, num_nodes);
+  ParallelFor(num_threads, num_threads, [&](int) {
+    Traversal traversal(dimension_);
+    for (int i = next_node++; i < num_nodes; i = next_node++) {
+      std::copy(&deferred_bases_[i * dimension_],
+                &deferred_bases_[i * dimension_] + dimension_,
+                traversal.base_stack.begin());
+      std::copy(&deferred_levels_[i * dimension_],
+                &deferred_levels_[i * dimension_] + dimension_,
+                traversal.levels_stack.begin());
+      Node root = deferred_nodes_[i];
+      root.stack_pos = 0;
+      traversal.node_stack.push_back(root);
+      RecordingSink sink(&symbols[i]);
+      EncodeNodes(points, &traversal, &sink, false);
+    }
+    return true;
+  });
+  DirectSink sink(this);
+  for (const std::vector<uint64_t> &node_symbols : symbols) {
+    for (const uint64_t symbol : node_symbols) {
+      RecordingSink::Replay(symbol, &sink);
     }
   }
+  deferred_nodes_.clear();
+  deferred_bases_.clear();
+  deferred_levels_.clear();
+  num_deferred_points_ = 0;
 }
+//! [YC] end
 extern template class DynamicIntegerPointsKdTreeEncoder<0>;
 extern template class DynamicIntegerPointsKdTreeEncoder<2>;
 extern template class DynamicIntegerPointsKdTreeEncoder<4>;
@@ -0,0 +1,183 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/point_cloud/layered_point_cloud_decoder.h"
+
+#include <algorithm>
+#include <cstring>
+#include <limits>
+
+#include "draco/compression/decode.h"
+
+namespace draco {
+
+LayeredPointCloudDecoder::LayeredPointCloudDecoder()
+    : num_points_(0), index_size_(0), num_threads_(1) {}
+
+bool LayeredPointCloudDecoder::IsLayeredPointCloud(
+    const DecoderBuffer &buffer) {
+  return buffer.remaining_size() >= kLayeredPointCloudMagicSize &&
+         memcmp(buffer.data_head(), kLayeredPointCloudMagic,
+                kLayeredPointCloudMagicSize) == 0;
+}
+
+Status LayeredPointCloudDecoder::DecodeIndex(DecoderBuffer *buffer) {
+  layers_.clear();
+  const int64_t start_size = buffer->remaining_size();
+  if (!IsLayeredPointCloud(*buffer)) {
+    return Status(Status::DRACO_ERROR, "Not a layered point cloud.");
+  }
+  buffer->Advance(kLayeredPointCloudMagicSize);
+  uint8_t major_version, minor_version, num_layers;
+  if (!buffer->Decode(&major_version) || !buffer->Decode(&minor_version) ||
+      !buffer->Decode(&num_points_) || !buffer->Decode(&num_layers)) {
+    return Status(Status::IO_ERROR, "Failed to parse the layer index.");
+  }
+  if (major_version != kLayeredPointCloudMajorVersion) {
+    return Status(Status::UNKNOWN_VERSION, "Unknown layer index version.");
+  }
+  if (num_layers == 0) {
+    return Status(Status::DRACO_ERROR, "Missing base layer.");
+  }
+  layers_.resize(num_layers);
+  uint64_t offset = 0;
+  for (int i = 0; i < num_layers; ++i) {
+    PointCloudLayer &layer = layers_[i];
+    uint8_t attribute_type;
+    if (!buffer->Decode(&attribute_type) || !buffer->Decode(&layer.size)) {
+      return Status(Status::IO_ERROR, "Failed to parse the layer index.");
+    }
+    layer.attribute_type = static_cast<GeometryAttribute::Type>(
+        static_cast<int8_t>(attribute_type));
+    const bool is_band = layer.attribute_type == GeometryAttribute::F_REST_1 ||
+                         layer.attribute_type == GeometryAttribute::F_REST_2 ||
+                         layer.attribute_type == GeometryAttribute::F_REST_3;
+    if (i == 0 ? layer.attribute_type != GeometryAttribute::INVALID
+               : !is_band) {
+      return Status(Status::DRACO_ERROR, "Invalid layer attribute type.");
+    }
+    if (layer.size > std::numeric_limits<uint64_t>::max() - offset) {
+      return Status(Status::IO_ERROR, "Failed to parse the layer index.");
+    }
+    layer.offset = offset;
+    offset += layer.size;
+  }
+  index_size_ = start_size - buffer->remaining_size();
+  return OkStatus();
+}
+
+int LayeredPointCloudDecoder::NumAvailableLayers(int64_t num_bytes) const {
+  int num_available = 0;
+  for (const PointCloudLayer &layer : layers_) {
+    if (layer.offset + layer.size >
+        static_cast<uint64_t>(std::max<int64_t>(num_bytes - index_size_, 0))) {
+      break;
+    }
+    ++num_available;
+  }
+  return num_available;
+}
+
+StatusOr<std::unique_ptr<PointCloud>> LayeredPointCloudDecoder::DecodeBase(
+    DecoderBuffer *layer_buffer) {
+  if (layers_.empty()) {
+    return Status(Status::DRACO_ERROR, "The layer index was not decoded.");
+  }
+  Decoder decoder;
+  decoder.SetNumThreads(num_threads_);
+  for (const GeometryAttribute::Type att_type : skipped_attributes_) {
+    decoder.SetSkipAttribute(att_type);
+  }
+  DRACO_ASSIGN_OR_RETURN(std::unique_ptr<PointCloud> pc,
+                         decoder.DecodePointCloudFromBuffer(layer_buffer));
+  if (pc->num_points() != num_points_) {
+    return Status(Status::DRACO_ERROR, "Unexpected number of layer points.");
+  }
+  return std::move(pc);
+}
+
+Status LayeredPointCloudDecoder::DecodeLayer(int layer_id,
+                                             DecoderBuffer *layer_buffer,
+                                             PointCloud *pc) {
+  if (layer_id < 1 || layer_id >= num_layers()) {
+    return Status(Status::DRACO_ERROR, "Invalid layer id.");
+  }
+  if (pc->num_points() != num_points_) {
+    return Status(Status::DRACO_ERROR, "Unexpected number of points.");
+  }
+  const GeometryAttribute::Type band = layers_[layer_id].attribute_type;
+  if (pc->GetNamedAttribute(band) != nullptr) {
+    return Status(Status::DRACO_ERROR, "The layer was already decoded.");
+  }
+  Decoder decoder;
+  decoder.SetNumThreads(num_threads_);
+  for (const GeometryAttribute::Type att_type : skipped_attributes_) {
+    decoder.SetSkipAttribute(att_type);
+  }
+  DRACO_ASSIGN_OR_RETURN(std::unique_ptr<PointCloud> layer_pc,
+                         decoder.DecodePointCloudFromBuffer(layer_buffer));
+  if (layer_pc->num_points() != num_points_) {
+    return Status(Status::DRACO_ERROR, "Unexpected number of layer points.");
+  }
+  // Points are stored in the same order in all layers, so the band is copied
+  // point by point.
+  for (int att_id = 0; att_id < layer_pc->num_attributes(); ++att_id) {
+    const PointAttribute *const layer_att = layer_pc->attribute(att_id);
+    if (layer_att->attribute_type() != band) {
+      return Status(Status::DRACO_ERROR, "Unexpected layer attribute.");
+    }
+    GeometryAttribute ga;
+    ga.Init(layer_att->attribute_type(), nullptr, layer_att->num_components(),
+            layer_att->data_type(), layer_att->normalized(),
+            layer_att->byte_stride(), 0);
+    PointAttribute *const att =
+        pc->attribute(pc->AddAttribute(ga, true, num_points_));
+    for (PointIndex pi(0); pi < num_points_; ++pi) {
+      memcpy(att->GetAddress(AttributeValueIndex(pi.value())),
+             layer_att->GetAddress(layer_att->mapped_index(pi)),
+             att->byte_stride());
+    }
+  }
+  return OkStatus();
+}
+
+StatusOr<std::unique_ptr<PointCloud>> LayeredPointCloudDecoder::Decode(
+    DecoderBuffer *buffer, int max_layers) {
+  const char *const data = buffer->data_head();
+  const int64_t data_size = buffer->remaining_size();
+  DRACO_RETURN_IF_ERROR(DecodeIndex(buffer));
+  int num_decoded = NumAvailableLayers(data_size);
+  if (max_layers >= 0 && max_layers < num_decoded) {
+    num_decoded = max_layers;
+  }
+  if (num_decoded == 0) {
+    return Status(Status::IO_ERROR, "The base layer is incomplete.");
+  }
+  DecoderBuffer layer_buffer;
+  layer_buffer.Init(data + index_size_, layers_[0].size);
+  DRACO_ASSIGN_OR_RETURN(std::unique_ptr<PointCloud> pc,
+                         DecodeBase(&layer_buffer));
+  for (int i = 1; i < num_decoded; ++i) {
+    // Skipped bands are not decoded at all.
+    if (std::find(skipped_attributes_.begin(), skipped_attributes_.end(),
+                  layers_[i].attribute_type) != skipped_attributes_.end()) {
+      continue;
+    }
+    layer_buffer.Init(data + index_size_ + layers_[i].offset, layers_[i].size);
+    DRACO_RETURN_IF_ERROR(DecodeLayer(i, &layer_buffer, pc.get()));
+  }
+  return std::move(pc);
+}
+
+}  // namespace draco
@@ -0,0 +1,95 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_DECODER_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_DECODER_H_
+
+#include <memory>
+#include <vector>
+
+#include "draco/compression/point_cloud/layered_point_cloud_shared.h"
+#include "draco/core/decoder_buffer.h"
+#include "draco/core/status.h"
+#include "draco/core/status_or.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+// Decodes point clouds encoded by LayeredPointCloudEncoder. The index is small
+// and stored first. A client streaming the data can decode the base layer
+// with DecodeBase() as soon as NumAvailableLayers() reports it complete, render
+// it at SH degree 0, and add the SH bands with DecodeLayer() as their bytes
+// arrive.
+class LayeredPointCloudDecoder {
+ public:
+  LayeredPointCloudDecoder();
+
+  // Returns true if |buffer| holds a layered point cloud. The buffer is not
+  // advanced.
+  static bool IsLayeredPointCloud(const DecoderBuffer &buffer);
+
+  // Reads the index from |buffer|, which is left at the start of the layer
+  // data.
+  Status DecodeIndex(DecoderBuffer *buffer);
+
+  uint32_t num_points() const { return num_points_; }
+  // Layer 0 is the base layer, the following ones are SH bands.
+  int num_layers() const { return static_cast<int>(layers_.size()); }
+  const PointCloudLayer &layer(int i) const { return layers_[i]; }
+
+  // Size of the index in bytes. Layer |i| is stored at byte
+  // index_size() + layer(i).offset of the encoded data.
+  int64_t index_size() const { return index_size_; }
+
+  // Returns the number of leading layers that are complete in the first
+  // |num_bytes| bytes of the encoded data (including the index).
+  int NumAvailableLayers(int64_t num_bytes) const;
+
+  // Decodes the base layer from |layer_buffer| that holds its layer(0).size
+  // bytes.
+  StatusOr<std::unique_ptr<PointCloud>> DecodeBase(DecoderBuffer *layer_buffer);
+
+  // Decodes the SH band of layer |layer_id| from |layer_buffer| that holds its
+  // layer(layer_id).size bytes and adds it to |pc| decoded by DecodeBase().
+  Status DecodeLayer(int layer_id, DecoderBuffer *layer_buffer, PointCloud *pc);
+
+  // Decodes the index, the base layer and at most |max_layers| - 1 SH bands
+  // from |buffer|, which may hold only a prefix of the encoded data: bands
+  // that are not complete are left out. A negative |max_layers| decodes all
+  // available layers.
+  StatusOr<std::unique_ptr<PointCloud>> Decode(DecoderBuffer *buffer,
+                                               int max_layers);
+
+  // Number of threads used by the attribute decoders (default = 1, 0 uses
+  // all cores).
+  void SetNumThreads(int num_threads) { num_threads_ = num_threads; }
+
+  // Leaves all attributes of type |att_type| out of the decoded point cloud
+  // (see Decoder::SetSkipAttribute()). The layer of a skipped SH band is not
+  // decoded at all.
+  void SetSkipAttribute(GeometryAttribute::Type att_type) {
+    skipped_attributes_.push_back(att_type);
+  }
+
+ private:
+  std::vector<PointCloudLayer> layers_;
+  uint32_t num_points_;
+  int64_t index_size_;
+  int num_threads_;
+  std::vector<GeometryAttribute::Type> skipped_attributes_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_DECODER_H_
@@ -0,0 +1,187 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/point_cloud/layered_point_cloud_encoder.h"
+
+#include <cstring>
+
+#include "draco/compression/attributes/space_filling_curve_sequencer.h"
+#include "draco/compression/config/compression_shared.h"
+#include "draco/compression/expert_encode.h"
+#include "draco/core/parallel_for.h"
+
+namespace draco {
+
+namespace {
+
+// SH bands in the order of their enhancement layers.
+constexpr GeometryAttribute::Type kShBands[] = {
+    GeometryAttribute::F_REST_1, GeometryAttribute::F_REST_2,
+    GeometryAttribute::F_REST_3};
+
+bool IsShBand(GeometryAttribute::Type type) {
+  for (const GeometryAttribute::Type band : kShBands) {
+    if (type == band) {
+      return true;
+    }
+  }
+  return false;
+}
+
+}  // namespace
+
+LayeredPointCloudEncoder::LayeredPointCloudEncoder() {}
+
+Status LayeredPointCloudEncoder::EncodeToBuffer(const PointCloud &pc,
+                                                const EncoderOptions &options,
+                                                EncoderBuffer *out_buffer) {
+  layers_.clear();
+  encoding_stats_.Reset(pc);
+
+  // Attribute ids of every layer, the base layer first.
+  std::vector<std::vector<int>> layer_att_ids(1);
+  for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+    if (!IsShBand(pc.attribute(att_id)->attribute_type())) {
+      layer_att_ids[0].push_back(att_id);
+    }
+  }
+  if (layer_att_ids[0].empty()) {
+    return Status(Status::DRACO_ERROR, "The base layer has no attributes.");
+  }
+  layers_.resize(1);
+  for (const GeometryAttribute::Type band : kShBands) {
+    std::vector<int> att_ids;
+    for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+      if (pc.attribute(att_id)->attribute_type() == band) {
+        att_ids.push_back(att_id);
+      }
+    }
+    if (!att_ids.empty()) {
+      layer_att_ids.push_back(att_ids);
+      layers_.emplace_back();
+      layers_.back().attribute_type = band;
+    }
+  }
+  const int num_layers = static_cast<int>(layers_.size());
+
+  // The band layers have no positions to sort their points by, so the point
+  // order is applied to all layers here instead of by the layer encoders.
+  const PointOrder order = static_cast<PointOrder>(
+      options.GetGlobalInt("point_order", POINT_ORDER_INPUT));
+  const PointAttribute *const position =
+      pc.GetNamedAttribute(GeometryAttribute::POSITION);
+  std::vector<PointIndex> point_ids(pc.num_points());
+  if (order != POINT_ORDER_INPUT && position != nullptr &&
+      position->num_components() == 3) {
+    point_ids = ComputeSpaceFillingCurveOrder(*position, pc.num_points(), order);
+  } else {
+    for (PointIndex pi(0); pi < pc.num_points(); ++pi) {
+      point_ids[pi.value()] = pi;
+    }
+  }
+
+  // Layers are independent. When they are encoded concurrently, each layer is
+  // encoded on a single thread.
+  int num_threads = options.GetGlobalInt("num_threads", 1);
+  if (num_threads == 0) {
+    num_threads = GetDefaultNumThreads();
+  }
+  std::vector<EncoderBuffer> layer_buffers(num_layers);
+  std::vector<EncodingStats> layer_stats(num_layers);
+  std::vector<Status> layer_status(num_layers);
+  ParallelFor(num_layers, num_threads, [&](int i) {
+    const std::vector<int> &att_ids = layer_att_ids[i];
+    const std::unique_ptr<PointCloud> layer_pc =
+        ExtractLayer(pc, att_ids, point_ids);
+    // The options of every attribute move to its id in the layer.
+    EncoderOptions layer_options = EncoderOptions::CreateEmptyOptions();
+    layer_options.SetGlobalOptions(options.GetGlobalOptions());
+    layer_options.SetFeatureOptions(options.GetFeaturelOptions());
+    for (int j = 0; j < static_cast<int>(att_ids.size()); ++j) {
+      const Options *const att_options =
+          options.FindAttributeOptions(att_ids[j]);
+      if (att_options != nullptr) {
+        layer_options.SetAttributeOptions(j, *att_options);
+      }
+    }
+    layer_options.SetGlobalInt("encoding_method",
+                               POINT_CLOUD_SEQUENTIAL_ENCODING);
+    layer_options.SetGlobalInt("point_order", POINT_ORDER_INPUT);
+    if (num_threads > 1 && num_layers > 1) {
+      layer_options.SetGlobalInt("num_threads", 1);
+    }
+    ExpertEncoder encoder(*layer_pc);
+    encoder.Reset(layer_options);
+    layer_status[i] = encoder.EncodeToBuffer(&layer_buffers[i]);
+    layer_stats[i] = encoder.encoding_stats();
+    return layer_status[i].ok();
+  });
+  for (const Status &status : layer_status) {
+    DRACO_RETURN_IF_ERROR(status);
+  }
+
+  // Write the index followed by the encoded layers.
+  out_buffer->Encode(kLayeredPointCloudMagic, kLayeredPointCloudMagicSize);
+  out_buffer->Encode(kLayeredPointCloudMajorVersion);
+  out_buffer->Encode(kLayeredPointCloudMinorVersion);
+  out_buffer->Encode(static_cast<uint32_t>(pc.num_points()));
+  out_buffer->Encode(static_cast<uint8_t>(num_layers));
+  uint64_t offset = 0;
+  for (int i = 0; i < num_layers; ++i) {
+    PointCloudLayer &layer = layers_[i];
+    layer.offset = offset;
+    layer.size = layer_buffers[i].size();
+    offset += layer.size;
+    out_buffer->Encode(static_cast<uint8_t>(layer.attribute_type));
+    out_buffer->Encode(layer.size);
+  }
+  for (int i = 0; i < num_layers; ++i) {
+    out_buffer->Encode(layer_buffers[i].data(), layer_buffers[i].size());
+
+    const std::vector<int> &att_ids = layer_att_ids[i];
+    for (int j = 0; j < static_cast<int>(att_ids.size()); ++j) {
+      const AttributeEncodingStats *const layer_att_stats =
+          layer_stats[i].attribute(j);
+      if (layer_att_stats != nullptr) {
+        *encoding_stats_.attribute(att_ids[j]) = *layer_att_stats;
+      }
+    }
+    encoding_stats_.attributes_size += layer_stats[i].attributes_size;
+  }
+  return OkStatus();
+}
+
+std::unique_ptr<PointCloud> LayeredPointCloudEncoder::ExtractLayer(
+    const PointCloud &pc, const std::vector<int> &att_ids,
+    const std::vector<PointIndex> &point_ids) {
+  std::unique_ptr<PointCloud> layer(new PointCloud());
+  const uint32_t num_points = pc.num_points();
+  layer->set_num_points(num_points);
+  for (const int att_id : att_ids) {
+    const PointAttribute *const att = pc.attribute(att_id);
+    GeometryAttribute ga;
+    ga.Init(att->attribute_type(), nullptr, att->num_components(),
+            att->data_type(), att->normalized(), att->byte_stride(), 0);
+    const int layer_att_id = layer->AddAttribute(ga, true, num_points);
+    PointAttribute *const layer_att = layer->attribute(layer_att_id);
+    for (uint32_t i = 0; i < num_points; ++i) {
+      memcpy(layer_att->GetAddress(AttributeValueIndex(i)),
+             att->GetAddress(att->mapped_index(point_ids[i])),
+             att->byte_stride());
+    }
+  }
+  return layer;
+}
+
+}  // namespace draco
@@ -0,0 +1,67 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_ENCODER_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_ENCODER_H_
+
+#include <memory>
+#include <vector>
+
+#include "draco/compression/config/encoder_options.h"
+#include "draco/compression/config/encoding_stats.h"
+#include "draco/compression/point_cloud/layered_point_cloud_shared.h"
+#include "draco/core/encoder_buffer.h"
+#include "draco/core/status.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+// Encodes a 3DGS point cloud as a base layer followed by one enhancement layer
+// per SH band (see layered_point_cloud_shared.h). Bands missing from the point
+// cloud (e.g. dropped with negative quantization bits) have no layer.
+//
+// The layers are decoded independently and joined by point index, so all of
+// them are encoded with the sequential encoding that keeps the order of the
+// points. The kd-tree encoding would reorder every layer differently.
+class LayeredPointCloudEncoder {
+ public:
+  LayeredPointCloudEncoder();
+
+  // Encodes |pc| into |out_buffer|. |options| are the per-attribute-id options
+  // of an ExpertEncoder for |pc| (e.g. from Encoder::CreateExpertEncoderOptions)
+  // and are applied to the attributes of every layer. With the "num_threads"
+  // global option the layers are encoded concurrently.
+  Status EncodeToBuffer(const PointCloud &pc, const EncoderOptions &options,
+                        EncoderBuffer *out_buffer);
+
+  // Index of the last encoded point cloud.
+  const std::vector<PointCloudLayer> &layers() const { return layers_; }
+
+  // Statistics of the last encoding, indexed by the attribute ids of |pc|.
+  const EncodingStats &encoding_stats() const { return encoding_stats_; }
+
+ private:
+  // Creates a point cloud with the attributes |att_ids| of the points
+  // |point_ids| of |pc|, in that order.
+  static std::unique_ptr<PointCloud> ExtractLayer(
+      const PointCloud &pc, const std::vector<int> &att_ids,
+      const std::vector<PointIndex> &point_ids);
+
+  std::vector<PointCloudLayer> layers_;
+  EncodingStats encoding_stats_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_ENCODER_H_
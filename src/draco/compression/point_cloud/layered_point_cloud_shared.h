@@ -0,0 +1,64 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_SHARED_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_SHARED_H_
+
+#include <cstdint>
+
+#include "draco/attributes/geometry_attribute.h"
+
+namespace draco {
+
+// A layered point cloud stores the spherical harmonics bands of a 3D Gaussian
+// splatting point cloud as enhancement layers after a base layer with all the
+// other attributes (positions, F_DC, opacity, scale, rotation). The base layer
+// alone renders the splats at SH degree 0 and every following layer adds one
+// band, so a prefix of the encoded data is a lower quality point cloud. The
+// layout is:
+//
+//   char[8]   kLayeredPointCloudMagic
+//   uint8     major version
+//   uint8     minor version
+//   uint32    number of points
+//   uint8     number of layers
+//   per layer:
+//     uint8     attribute type of the SH band (F_REST_1, F_REST_2 or
+//               F_REST_3), GeometryAttribute::INVALID for the base layer
+//     uint64    size of the encoded layer in bytes
+//   the encoded layers in the order of the index, each one a regular .drc
+//   bitstream with the points in the same order
+//
+// Values are stored in the byte order of the encoder like the rest of Draco.
+constexpr char kLayeredPointCloudMagic[] = "DRACOLAY";
+constexpr int kLayeredPointCloudMagicSize = 8;
+constexpr uint8_t kLayeredPointCloudMajorVersion = 1;
+constexpr uint8_t kLayeredPointCloudMinorVersion = 0;
+
+// Index entry of one layer.
+struct PointCloudLayer {
+  PointCloudLayer()
+      : attribute_type(GeometryAttribute::INVALID), offset(0), size(0) {}
+
+  // SH band stored in the layer, or INVALID for the base layer.
+  GeometryAttribute::Type attribute_type;
+  // Location of the encoded layer, relative to the end of the index. Layers
+  // are stored back to back, so the offset is not part of the index.
+  uint64_t offset;
+  uint64_t size;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_LAYERED_POINT_CLOUD_SHARED_H_
@@ -0,0 +1,206 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include <cmath>
+
+#include "draco/compression/encode.h"
+#include "draco/compression/point_cloud/layered_point_cloud_decoder.h"
+#include "draco/compression/point_cloud/layered_point_cloud_encoder.h"
+#include "draco/core/draco_test_base.h"
+#include "draco/core/draco_test_utils.h"
+
+namespace draco {
+
+class LayeredPointCloudTest : public ::testing::Test {
+ protected:
+  // Adds 3DGS attributes with values depending on the point index to the
+  // points of the bunny.
+  static std::unique_ptr<PointCloud> CreateSplats(bool with_bands) {
+    std::unique_ptr<PointCloud> pc =
+        ReadPointCloudFromTestFile("bun_zipper.ply");
+    if (pc == nullptr) {
+      return nullptr;
+    }
+    AddAttribute(GeometryAttribute::F_DC, 3, pc.get());
+    if (with_bands) {
+      AddAttribute(GeometryAttribute::F_REST_1, 9, pc.get());
+      AddAttribute(GeometryAttribute::F_REST_2, 15, pc.get());
+      AddAttribute(GeometryAttribute::F_REST_3, 21, pc.get());
+    }
+    AddAttribute(GeometryAttribute::OPACITY, 1, pc.get());
+    return pc;
+  }
+
+  static void AddAttribute(GeometryAttribute::Type type, int num_components,
+                           PointCloud *pc) {
+    GeometryAttribute ga;
+    ga.Init(type, nullptr, num_components, DT_FLOAT32, false,
+            sizeof(float) * num_components, 0);
+    PointAttribute *const att =
+        pc->attribute(pc->AddAttribute(ga, true, pc->num_points()));
+    std::vector<float> value(num_components);
+    for (PointIndex pi(0); pi < pc->num_points(); ++pi) {
+      for (int c = 0; c < num_components; ++c) {
+        value[c] = std::sin(0.01f * pi.value() * (c + 1) + type);
+      }
+      att->SetAttributeValue(AttributeValueIndex(pi.value()), value.data());
+    }
+  }
+
+  void Encode(const PointCloud &pc, EncoderBuffer *buffer) {
+    Encoder encoder;
+    encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 14);
+    encoder.SetAttributeQuantization(GeometryAttribute::F_DC, 12);
+    encoder.SetAttributeQuantization(GeometryAttribute::F_REST_1, 10);
+    encoder.SetAttributeQuantization(GeometryAttribute::F_REST_2, 10);
+    encoder.SetAttributeQuantization(GeometryAttribute::F_REST_3, 10);
+    encoder.SetAttributeQuantization(GeometryAttribute::OPACITY, 12);
+    LayeredPointCloudEncoder layered_encoder;
+    DRACO_ASSERT_OK(layered_encoder.EncodeToBuffer(
+        pc, encoder.CreateExpertEncoderOptions(pc), buffer));
+  }
+
+  // Checks that every point of |decoded| still has the values of the same
+  // point of |pc| within |tolerance|.
+  static void ExpectSameValues(const PointCloud &pc, const PointCloud &decoded,
+                               GeometryAttribute::Type type, float tolerance) {
+    const PointAttribute *const att = pc.GetNamedAttribute(type);
+    const PointAttribute *const decoded_att = decoded.GetNamedAttribute(type);
+    ASSERT_NE(decoded_att, nullptr);
+    ASSERT_EQ(decoded_att->num_components(), att->num_components());
+    std::vector<float> value(att->num_components());
+    std::vector<float> decoded_value(att->num_components());
+    for (PointIndex pi(0); pi < pc.num_points(); ++pi) {
+      att->GetValue(att->mapped_index(pi), value.data());
+      decoded_att->GetValue(decoded_att->mapped_index(pi),
+                            decoded_value.data());
+      for (int c = 0; c < att->num_components(); ++c) {
+        ASSERT_NEAR(value[c], decoded_value[c], tolerance);
+      }
+    }
+  }
+};
+
+TEST_F(LayeredPointCloudTest, TestIndex) {
+  const std::unique_ptr<PointCloud> pc = CreateSplats(true);
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  Encode(*pc, &buffer);
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  ASSERT_TRUE(LayeredPointCloudDecoder::IsLayeredPointCloud(dec_buffer));
+  LayeredPointCloudDecoder decoder;
+  DRACO_ASSERT_OK(decoder.DecodeIndex(&dec_buffer));
+  ASSERT_EQ(decoder.num_points(), pc->num_points());
+  ASSERT_EQ(decoder.num_layers(), 4);
+  ASSERT_EQ(decoder.layer(0).attribute_type, GeometryAttribute::INVALID);
+  ASSERT_EQ(decoder.layer(1).attribute_type, GeometryAttribute::F_REST_1);
+  ASSERT_EQ(decoder.layer(2).attribute_type, GeometryAttribute::F_REST_2);
+  ASSERT_EQ(decoder.layer(3).attribute_type, GeometryAttribute::F_REST_3);
+  ASSERT_EQ(decoder.index_size() + decoder.layer(3).offset +
+                decoder.layer(3).size,
+            buffer.size());
+}
+
+TEST_F(LayeredPointCloudTest, TestDecodeAllLayers) {
+  const std::unique_ptr<PointCloud> pc = CreateSplats(true);
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  Encode(*pc, &buffer);
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  LayeredPointCloudDecoder decoder;
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> decoded,
+                         decoder.Decode(&dec_buffer, -1));
+  ASSERT_EQ(decoded->num_points(), pc->num_points());
+  ASSERT_EQ(decoded->num_attributes(), pc->num_attributes());
+  // The layers keep the order of the points, so the bands line up with the
+  // base layer.
+  ExpectSameValues(*pc, *decoded, GeometryAttribute::F_DC, 1e-3f);
+  ExpectSameValues(*pc, *decoded, GeometryAttribute::F_REST_1, 1e-2f);
+  ExpectSameValues(*pc, *decoded, GeometryAttribute::F_REST_2, 1e-2f);
+  ExpectSameValues(*pc, *decoded, GeometryAttribute::F_REST_3, 1e-2f);
+  ExpectSameValues(*pc, *decoded, GeometryAttribute::OPACITY, 1e-3f);
+}
+
+TEST_F(LayeredPointCloudTest, TestProgressiveDecode) {
+  const std::unique_ptr<PointCloud> pc = CreateSplats(true);
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  Encode(*pc, &buffer);
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  LayeredPointCloudDecoder decoder;
+  DRACO_ASSERT_OK(decoder.DecodeIndex(&dec_buffer));
+  ASSERT_EQ(decoder.NumAvailableLayers(decoder.index_size()), 0);
+
+  // Only the bytes of the base layer have arrived.
+  const int64_t base_end = decoder.index_size() + decoder.layer(0).size;
+  ASSERT_EQ(decoder.NumAvailableLayers(base_end), 1);
+  DecoderBuffer layer_buffer;
+  layer_buffer.Init(buffer.data() + decoder.index_size(),
+                    decoder.layer(0).size);
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> decoded,
+                         decoder.DecodeBase(&layer_buffer));
+  ASSERT_NE(decoded->GetNamedAttribute(GeometryAttribute::POSITION), nullptr);
+  ASSERT_NE(decoded->GetNamedAttribute(GeometryAttribute::F_DC), nullptr);
+  ASSERT_NE(decoded->GetNamedAttribute(GeometryAttribute::OPACITY), nullptr);
+  ASSERT_EQ(decoded->GetNamedAttribute(GeometryAttribute::F_REST_1), nullptr);
+
+  // Add the bands one at a time.
+  for (int i = 1; i < decoder.num_layers(); ++i) {
+    const PointCloudLayer &layer = decoder.layer(i);
+    ASSERT_EQ(decoder.NumAvailableLayers(decoder.index_size() + layer.offset +
+                                         layer.size),
+              i + 1);
+    layer_buffer.Init(buffer.data() + decoder.index_size() + layer.offset,
+                      layer.size);
+    DRACO_ASSERT_OK(decoder.DecodeLayer(i, &layer_buffer, decoded.get()));
+    ExpectSameValues(*pc, *decoded, layer.attribute_type, 1e-2f);
+  }
+
+  // A prefix of the data decodes to the complete layers it holds.
+  dec_buffer.Init(buffer.data(), base_end + decoder.layer(1).size + 1);
+  DRACO_ASSIGN_OR_ASSERT(decoded, decoder.Decode(&dec_buffer, -1));
+  ASSERT_NE(decoded->GetNamedAttribute(GeometryAttribute::F_REST_1), nullptr);
+  ASSERT_EQ(decoded->GetNamedAttribute(GeometryAttribute::F_REST_2), nullptr);
+
+  // So does a limit on the number of layers.
+  dec_buffer.Init(buffer.data(), buffer.size());
+  DRACO_ASSIGN_OR_ASSERT(decoded, decoder.Decode(&dec_buffer, 1));
+  ASSERT_EQ(decoded->GetNamedAttribute(GeometryAttribute::F_REST_1), nullptr);
+
+  dec_buffer.Init(buffer.data(), base_end - 1);
+  ASSERT_FALSE(decoder.Decode(&dec_buffer, -1).ok());
+}
+
+TEST_F(LayeredPointCloudTest, TestWithoutBands) {
+  const std::unique_ptr<PointCloud> pc = CreateSplats(false);
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  Encode(*pc, &buffer);
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  LayeredPointCloudDecoder decoder;
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> decoded,
+                         decoder.Decode(&dec_buffer, -1));
+  ASSERT_EQ(decoder.num_layers(), 1);
+  ASSERT_EQ(decoded->num_attributes(), pc->num_attributes());
+}
+
+}  // namespace draco
@@ -14,6 +14,7 @@
 //
 #include "draco/compression/point_cloud/point_cloud_decoder.h"
 
+#include "draco/core/parallel_for.h"
 #include "draco/metadata/metadata_decoder.h"
 
 namespace draco {
@@ -23,7 +24,8 @@ PointCloudDecoder::PointCloudDecoder()
       buffer_(nullptr),
       version_major_(0),
       version_minor_(0),
-      options_(nullptr) {}
+      options_(nullptr),
+      delimited_attribute_streams_(false) {}
 
 Status PointCloudDecoder::DecodeHeader(DecoderBuffer *buffer,
                                        DracoHeader *out_header) {
@@ -113,6 +115,10 @@ Status PointCloudDecoder::Decode(const DecoderOptions &options,
       (header.flags & METADATA_FLAG_MASK)) {
     DRACO_RETURN_IF_ERROR(DecodeMetadata())
   }
+  //! [YC] start: Delimited attribute streams
+  delimited_attribute_streams_ =
+      (header.flags & ATTRIBUTE_STREAM_SIZES_FLAG_MASK) != 0;
+  //! [YC] end
   if (!InitializeDecoder()) {
     return Status(Status::DRACO_ERROR, "Failed to initialize the decoder.");
   }
@@ -122,6 +128,14 @@ Status PointCloudDecoder::Decode(const DecoderOptions &options,
   if (!DecodePointAttributes()) {
     return Status(Status::DRACO_ERROR, "Failed to decode point attributes.");
   }
+  //! [YC] start: Selective attribute decoding
+  for (int att_id = point_cloud_->num_attributes() - 1; att_id >= 0;
+       --att_id) {
+    if (IsAttributeSkipped(*point_cloud_->attribute(att_id))) {
+      point_cloud_->DeleteAttribute(att_id);
+    }
+  }
+  //! [YC] end
   return OkStatus();
 }
 
@@ -176,7 +190,53 @@ bool PointCloudDecoder::DecodePointAttributes() {
   return true;
 }
 
+//! [YC] start: Parallel attribute decoding
+int PointCloudDecoder::num_decoding_threads() const {
+  if (options_ == nullptr) {
+    return 1;
+  }
+  const int num_threads = options_->GetGlobalInt("num_threads", 1);
+  return num_threads == 0 ? GetDefaultNumThreads() : num_threads;
+}
+//! [YC] end
+
+//! [YC] start: Selective attribute decoding
+bool PointCloudDecoder::IsAttributeSkipped(const PointAttribute &att) const {
+  // Older bitstreams transform the attributes while decoding them.
+  if (options_ == nullptr ||
+      bitstream_version() < DRACO_BITSTREAM_VERSION(2, 0) ||
+      att.attribute_type() == GeometryAttribute::POSITION) {
+    return false;
+  }
+  return options_->GetAttributeBool(att.attribute_type(), "skip_attribute",
+                                    false);
+}
+//! [YC] end
+
 bool PointCloudDecoder::DecodeAllAttributes() {
+  //! [YC] start: Parallel attribute decoding
+  // The streams of the attribute decoders are not delimited, so they are
+  // decoded one after another (the sequential decoder delimits the values of
+  // its attributes on request and decodes them concurrently). Their
+  // transforms to the original format (dequantization, octahedral normals,
+  // ...) only use the already decoded portable attributes and run
+  // concurrently once all streams are read. Before version 2.0 the predictors
+  // used the transformed parent attributes, so those bitstreams keep the
+  // serial order.
+  const int num_threads = num_decoding_threads();
+  if (num_threads > 1 && bitstream_version() >= DRACO_BITSTREAM_VERSION(2, 0)) {
+    for (auto &att_dec : attributes_decoders_) {
+      att_dec->SetDeferTransform(true);
+      if (!att_dec->DecodeAttributes(buffer_)) {
+        return false;
+      }
+    }
+    return ParallelFor(static_cast<int>(attributes_decoders_.size()),
+                       num_threads, [&](int i) {
+                         return attributes_decoders_[i]->TransformAttributes();
+                       });
+  }
+  //! [YC] end
   for (auto &att_dec : attributes_decoders_) {
     if (!att_dec->DecodeAttributes(buffer_)) {
       return false;
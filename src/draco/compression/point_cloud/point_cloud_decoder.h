@@ -79,6 +79,27 @@ class PointCloudDecoder {
   DecoderBuffer *buffer() { return buffer_; }
   const DecoderOptions *options() const { return options_; }
 
+  //! [YC] start: Parallel attribute decoding
+  // Number of threads requested with the "num_threads" global option.
+  int num_decoding_threads() const;
+  //! [YC] end
+
+  //! [YC] start: Delimited attribute streams
+  // Returns true when the header tells that the sequential encoding stored the
+  // size of the encoded values of every attribute ahead of them.
+  bool delimited_attribute_streams() const {
+    return delimited_attribute_streams_;
+  }
+  //! [YC] end
+
+  //! [YC] start: Selective attribute decoding
+  // Returns true if |att| is skipped with the "skip_attribute" option. Its
+  // encoded data is only parsed past where possible and the attribute is
+  // removed from the decoded point cloud. Positions are always decoded, they
+  // are the parents of other attributes' predictions.
+  bool IsAttributeSkipped(const PointAttribute &att) const;
+  //! [YC] end
+
  protected:
   // Can be implemented by derived classes to perform any custom initialization
   // of the decoder. Called in the Decode() method.
@@ -111,6 +132,9 @@ class PointCloudDecoder {
   uint8_t version_minor_;
 
   const DecoderOptions *options_;
+
+  // [YC] add: the header stores the size of every attribute stream
+  bool delimited_attribute_streams_;
 };
 
 }  // namespace draco
@@ -14,6 +14,7 @@
 //
 #include "draco/compression/point_cloud/point_cloud_encoder.h"
 
+#include "draco/core/parallel_for.h"
 #include "draco/metadata/metadata_encoder.h"
 
 namespace draco {
@@ -38,6 +39,9 @@ Status PointCloudEncoder::Encode(const EncoderOptions &options,
   if (!point_cloud_) {
     return Status(Status::DRACO_ERROR, "Invalid input geometry.");
   }
+  //! [YC] start: Reset the statistics for this run
+  stats_.Reset(*point_cloud_);
+  //! [YC] end
   DRACO_RETURN_IF_ERROR(EncodeHeader())
   DRACO_RETURN_IF_ERROR(EncodeMetadata())
   // printf("[YC] InitializeEncoder\n"); // [YC] add: print to check
@@ -89,6 +93,11 @@ Status PointCloudEncoder::EncodeHeader() {
   if (point_cloud_->GetMetadata()) {
     flags |= METADATA_FLAG_MASK;
   }
+  //! [YC] start: Delimited attribute streams
+  if (DelimitsAttributeStreams()) {
+    flags |= ATTRIBUTE_STREAM_SIZES_FLAG_MASK;
+  }
+  //! [YC] end
   // printf("[YC] Encode flags\n"); // [YC] add: print to check
   buffer_->Encode(flags);
   return OkStatus();
@@ -167,13 +176,68 @@ bool PointCloudEncoder::GenerateAttributesEncoders() {
   return true;
 }
 
+//! [YC] start: Threaded attribute encoding
+int PointCloudEncoder::num_encoding_threads() const {
+  const int num_threads = options_->GetGlobalInt("num_threads", 1);
+  return num_threads == 0 ? GetDefaultNumThreads() : num_threads;
+}
+
+bool PointCloudEncoder::CanEncodeAttributesInParallel() const {
+  // Attributes predicted from another attribute (e.g. mesh normals from
+  // positions) need the portable version of their parent, which is created
+  // while the parent's encoder runs.
+  for (const auto &att_enc : attributes_encoders_) {
+    for (uint32_t i = 0; i < att_enc->num_attributes(); ++i) {
+      if (att_enc->NumParentAttributes(att_enc->GetAttributeId(i)) > 0) {
+        return false;
+      }
+    }
+  }
+  return true;
+}
+//! [YC] end
+
+//! [YC] start: Delimited attribute streams
+bool PointCloudEncoder::DelimitsAttributeStreams() const {
+  return GetGeometryType() == POINT_CLOUD &&
+         GetEncodingMethod() == POINT_CLOUD_SEQUENTIAL_ENCODING &&
+         options_->GetGlobalBool("delimit_attribute_streams", false);
+}
+//! [YC] end
+
 bool PointCloudEncoder::EncodeAllAttributes() {
+  //! [YC] start: Track the size of the encoded attributes
+  const size_t start_size = buffer_->size();
+  //! [YC] end
+  //! [YC] start: Threaded attribute encoding
+  if (num_encoding_threads() > 1 && CanEncodeAttributesInParallel()) {
+    // Every attribute encoder writes into its own buffer and the buffers are
+    // appended in the encoding order, which keeps the output bit-identical.
+    const int num_encoders =
+        static_cast<int>(attributes_encoder_ids_order_.size());
+    std::vector<EncoderBuffer> encoder_buffers(num_encoders);
+    if (!ParallelFor(num_encoders, num_encoding_threads(), [&](int i) {
+          return attributes_encoders_[attributes_encoder_ids_order_[i]]
+              ->EncodeAttributes(&encoder_buffers[i]);
+        })) {
+      return false;
+    }
+    for (const EncoderBuffer &encoder_buffer : encoder_buffers) {
+      buffer_->Encode(encoder_buffer.data(), encoder_buffer.size());
+    }
+    stats_.attributes_size = buffer_->size() - start_size;
+    return true;
+  }
+  //! [YC] end
   for (int att_encoder_id : attributes_encoder_ids_order_) {
     // printf("[YC] EncodeAllAttributes() att_encoder_id: %d\n", att_encoder_id); // [YC] add: print to check
     if (!attributes_encoders_[att_encoder_id]->EncodeAttributes(buffer_)) {
       return false;
     }
   }
+  //! [YC] start: Track the size of the encoded attributes
+  stats_.attributes_size = buffer_->size() - start_size;
+  //! [YC] end
   return true;
 }
 
@@ -18,6 +18,7 @@
 #include "draco/compression/attributes/attributes_encoder.h"
 #include "draco/compression/config/compression_shared.h"
 #include "draco/compression/config/encoder_options.h"
+#include "draco/compression/config/encoding_stats.h"
 #include "draco/core/encoder_buffer.h"
 #include "draco/core/status.h"
 #include "draco/point_cloud/point_cloud.h"
@@ -76,6 +77,24 @@ class PointCloudEncoder {
   const EncoderOptions *options() const { return options_; }
   const PointCloud *point_cloud() const { return point_cloud_; }
 
+  //! [YC] start: Statistics of the last Encode() call (sizes and timings).
+  const EncodingStats &stats() const { return stats_; }
+  EncodingStats *mutable_stats() { return &stats_; }
+  //! [YC] end
+
+  //! [YC] start: Threaded attribute encoding
+  // Number of threads requested with the "num_threads" global option.
+  int num_encoding_threads() const;
+  //! [YC] end
+
+  //! [YC] start: Delimited attribute streams
+  // Returns true when the sequential encoding stores the size of the encoded
+  // values of every attribute ahead of them ("delimit_attribute_streams"
+  // global option), so that they can be decoded concurrently. Only used for
+  // point clouds, whose attributes never depend on each other.
+  bool DelimitsAttributeStreams() const;
+  //! [YC] end
+
  protected:
   // Can be implemented by derived classes to perform any custom initialization
   // of the encoder. Called in the Encode() method.
@@ -134,6 +153,12 @@ class PointCloudEncoder {
   // encoded in the correct order (parent attributes before their children).
   bool RearrangeAttributesEncoders();
 
+  //! [YC] start: Threaded attribute encoding
+  // Returns true when no attribute depends on the output of another attribute
+  // encoder, so that all encoders can run concurrently.
+  bool CanEncodeAttributesInParallel() const;
+  //! [YC] end
+
   const PointCloud *point_cloud_;
   std::vector<std::unique_ptr<AttributesEncoder>> attributes_encoders_;
 
@@ -151,6 +176,10 @@ class PointCloudEncoder {
   const EncoderOptions *options_;
 
   size_t num_encoded_points_;
+
+  //! [YC] start: Statistics of the last Encode() call.
+  EncodingStats stats_;
+  //! [YC] end
 };
 
 }  // namespace draco
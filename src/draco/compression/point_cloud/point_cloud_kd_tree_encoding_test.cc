@@ -455,4 +455,47 @@ TEST_F(PointCloudKdTreeEncodingTest, TestIntKdTreeEncodingHighDimensional) {
   TestKdTreeEncoding(*pc);
 }
 
+// Test that subtrees encoded on several threads give the same data.
+TEST_F(PointCloudKdTreeEncodingTest, TestIntKdTreeEncodingThreads) {
+  constexpr int num_points = 40000;
+  constexpr int num_dims = 20;
+  PointCloudBuilder builder;
+  builder.Start(num_points);
+  const int att_id =
+      builder.AddAttribute(GeometryAttribute::GENERIC, num_dims, DT_UINT32);
+  std::array<uint32_t, num_dims> value;
+  for (PointIndex i(0); i < num_points; ++i) {
+    // Generate some pseudo-random points.
+    for (int d = 0; d < num_dims; ++d) {
+      value[d] = (i.value() * (7 + d) + d * d * 131) % (1000 + 17 * d);
+    }
+    builder.SetAttributeValueForPoint(att_id, i, value.data());
+  }
+  std::unique_ptr<PointCloud> pc = builder.Finalize(false);
+  ASSERT_NE(pc, nullptr);
+
+  EncoderOptions options = EncoderOptions::CreateDefaultOptions();
+  EncoderBuffer buffer;
+  PointCloudKdTreeEncoder encoder;
+  encoder.SetPointCloud(*pc);
+  DRACO_ASSERT_OK(encoder.Encode(options, &buffer));
+  for (const int num_threads : {2, 5}) {
+    options.SetGlobalInt("num_threads", num_threads);
+    EncoderBuffer threaded_buffer;
+    PointCloudKdTreeEncoder threaded_encoder;
+    threaded_encoder.SetPointCloud(*pc);
+    DRACO_ASSERT_OK(threaded_encoder.Encode(options, &threaded_buffer));
+    ASSERT_EQ(threaded_buffer.size(), buffer.size());
+    ASSERT_EQ(memcmp(threaded_buffer.data(), buffer.data(), buffer.size()), 0);
+  }
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  PointCloudKdTreeDecoder decoder;
+  std::unique_ptr<PointCloud> out_pc(new PointCloud());
+  DecoderOptions dec_options;
+  DRACO_ASSERT_OK(decoder.Decode(dec_options, &dec_buffer, out_pc.get()));
+  ComparePointClouds(*pc, *out_pc);
+}
+
 }  // namespace draco
@@ -0,0 +1,371 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/point_cloud/point_cloud_rate_control.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <limits>
+
+#include "draco/compression/config/compression_shared.h"
+#include "draco/compression/expert_encode.h"
+
+namespace draco {
+
+namespace {
+
+// An allocation within this fraction below the target is not refined further.
+constexpr double kTargetTolerance = 0.02;
+
+}  // namespace
+
+PointCloudRateControl::PointCloudRateControl()
+    : target_size_(0),
+      min_bits_(4),
+      max_bits_(20),
+      max_sample_points_(1 << 15),
+      max_trial_encodes_(6),
+      sample_scale_(1.0),
+      joint_savings_(0.0),
+      sample_options_(EncoderOptions::CreateDefaultOptions()),
+      estimated_size_(0),
+      encoded_size_(0),
+      num_trial_encodes_(0) {}
+
+Status PointCloudRateControl::Allocate(const PointCloud &pc,
+                                       const EncoderOptions &options,
+                                       EncoderOptions *out_options) {
+  if (target_size_ <= 0) {
+    return Status(Status::DRACO_ERROR, "Invalid target size.");
+  }
+  if (min_bits_ < 1 || max_bits_ > 30 || min_bits_ > max_bits_) {
+    return Status(Status::DRACO_ERROR, "Invalid quantization bit range.");
+  }
+  if (pc.num_points() == 0) {
+    return Status(Status::DRACO_ERROR, "Empty point cloud.");
+  }
+  att_ids_.clear();
+  samples_.clear();
+  sample_sizes_.clear();
+  chosen_bits_.assign(pc.num_attributes(), -1);
+  num_trial_encodes_ = 0;
+
+  // Only attributes that are quantized anyway are allocated, lossless ones
+  // stay lossless.
+  for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+    if (pc.attribute(att_id)->data_type() == DT_FLOAT32 &&
+        options.GetAttributeInt(att_id, "quantization_bits", -1) > 0 &&
+        options.GetAttributeInt(att_id, "codebook_size", -1) <= 0) {
+      att_ids_.push_back(att_id);
+    }
+  }
+  if (att_ids_.empty()) {
+    return Status(Status::DRACO_ERROR, "No quantized attributes to allocate.");
+  }
+
+  const int stride =
+      (pc.num_points() + max_sample_points_ - 1) / max_sample_points_;
+  const int num_sample_points = (pc.num_points() + stride - 1) / stride;
+  sample_scale_ = static_cast<double>(pc.num_points()) / num_sample_points;
+  weights_.clear();
+  for (const int att_id : att_ids_) {
+    samples_.push_back(ExtractSample(pc, {att_id}, stride));
+    const PointAttribute &att = *pc.attribute(att_id);
+    double weight = 1.0;
+    const auto it = type_weights_.find(att.attribute_type());
+    if (it != type_weights_.end()) {
+      weight = it->second;
+    }
+    weights_.push_back(IsConstant(att) ? 0.0 : weight);
+  }
+  // The samples are always encoded sequentially, which keeps the attribute
+  // sizes separate. The kd-tree encoding of the full point cloud is
+  // calibrated for below and corrected for by the trial encodes.
+  sample_options_ = EncoderOptions::CreateDefaultOptions();
+  sample_options_.SetSpeed(options.GetEncodingSpeed(),
+                           options.GetDecodingSpeed());
+  sample_options_.SetGlobalInt("encoding_method",
+                               POINT_CLOUD_SEQUENTIAL_ENCODING);
+  size_scales_.assign(att_ids_.size(), 1.0);
+  joint_savings_ = 0;
+  DRACO_RETURN_IF_ERROR(CalibrateJointEncoding(pc, options, stride));
+
+  const int num_atts = static_cast<int>(att_ids_.size());
+  double budget = static_cast<double>(target_size_) + joint_savings_;
+  // Budgets known to fit and to overshoot, bisected when the estimates cannot
+  // be corrected per attribute.
+  double budget_fits = 0;
+  double budget_overshoots = 0;
+  std::vector<int> best_bits, smallest_bits, last_bits;
+  int64_t best_size = -1;
+  int64_t smallest_size = std::numeric_limits<int64_t>::max();
+  int64_t best_estimate = 0, smallest_estimate = 0;
+  for (int trial = 0; trial < max_trial_encodes_; ++trial) {
+    const std::vector<int> bits = AllocateBits(budget);
+    if (bits == last_bits) {
+      break;
+    }
+    last_bits = bits;
+    double estimate = -joint_savings_;
+    std::vector<double> att_estimates(num_atts);
+    for (int i = 0; i < num_atts; ++i) {
+      att_estimates[i] = EstimateSize(i, bits[i]);
+      estimate += att_estimates[i];
+    }
+
+    EncoderOptions trial_options = options;
+    for (int i = 0; i < num_atts; ++i) {
+      trial_options.SetAttributeInt(att_ids_[i], "quantization_bits", bits[i]);
+    }
+    ExpertEncoder encoder(pc);
+    encoder.Reset(trial_options);
+    EncoderBuffer buffer;
+    DRACO_RETURN_IF_ERROR(encoder.EncodeToBuffer(&buffer));
+    ++num_trial_encodes_;
+    const int64_t size = buffer.size();
+    if (size <= target_size_ && size > best_size) {
+      best_size = size;
+      best_bits = bits;
+      best_estimate = static_cast<int64_t>(estimate);
+    }
+    if (size < smallest_size) {
+      smallest_size = size;
+      smallest_bits = bits;
+      smallest_estimate = static_cast<int64_t>(estimate);
+    }
+    if (size <= target_size_ &&
+        size >= target_size_ * (1.0 - kTargetTolerance)) {
+      break;
+    }
+    if (size <= target_size_) {
+      budget_fits = std::max(budget_fits, budget);
+    } else if (budget_overshoots == 0 || budget < budget_overshoots) {
+      budget_overshoots = budget;
+    }
+
+    // Correct the estimates by the measured sizes. Sequential encodes report
+    // the size of every attribute, the kd-tree encoding only the total.
+    const EncodingStats &stats = encoder.encoding_stats();
+    bool have_att_sizes = true;
+    int64_t att_sizes = 0;
+    for (int i = 0; i < num_atts; ++i) {
+      const AttributeEncodingStats *const att_stats =
+          stats.attribute(att_ids_[i]);
+      if (att_stats == nullptr || att_stats->encoded_size < 0) {
+        have_att_sizes = false;
+        break;
+      }
+      att_sizes += att_stats->encoded_size;
+    }
+    if (have_att_sizes) {
+      for (int i = 0; i < num_atts; ++i) {
+        if (att_estimates[i] > 0) {
+          size_scales_[i] *=
+              stats.attribute(att_ids_[i])->encoded_size / att_estimates[i];
+        }
+      }
+      // Everything else (header, lossless attributes) is a fixed cost.
+      budget = static_cast<double>(target_size_ - (size - att_sizes));
+    } else {
+      // Move the fitted kd-tree model through the measured size. Bisect when
+      // it points outside the budgets known to fit and to overshoot.
+      joint_savings_ += estimate - size;
+      budget = static_cast<double>(target_size_) + joint_savings_;
+      if (budget_fits > 0 && budget_overshoots > 0 &&
+          (budget <= budget_fits || budget >= budget_overshoots)) {
+        budget = (budget_fits + budget_overshoots) / 2;
+      }
+    }
+  }
+
+  const bool fits = best_size >= 0;
+  const std::vector<int> &bits = fits ? best_bits : smallest_bits;
+  encoded_size_ = fits ? best_size : smallest_size;
+  estimated_size_ = fits ? best_estimate : smallest_estimate;
+  *out_options = options;
+  for (int i = 0; i < num_atts; ++i) {
+    chosen_bits_[att_ids_[i]] = bits[i];
+    out_options->SetAttributeInt(att_ids_[i], "quantization_bits", bits[i]);
+  }
+  return OkStatus();
+}
+
+int PointCloudRateControl::quantization_bits(int att_id) const {
+  if (att_id < 0 || att_id >= static_cast<int>(chosen_bits_.size())) {
+    return -1;
+  }
+  return chosen_bits_[att_id];
+}
+
+bool PointCloudRateControl::IsConstant(const PointAttribute &att) {
+  for (AttributeValueIndex i(1); i < att.size(); ++i) {
+    if (memcmp(att.GetAddress(i), att.GetAddress(AttributeValueIndex(0)),
+               att.byte_stride()) != 0) {
+      return false;
+    }
+  }
+  return true;
+}
+
+std::unique_ptr<PointCloud> PointCloudRateControl::ExtractSample(
+    const PointCloud &pc, const std::vector<int> &att_ids, int stride) {
+  const int num_points = (pc.num_points() + stride - 1) / stride;
+  std::unique_ptr<PointCloud> sample(new PointCloud());
+  sample->set_num_points(num_points);
+  for (const int att_id : att_ids) {
+    const PointAttribute *const src_att = pc.attribute(att_id);
+    GeometryAttribute ga;
+    ga.Init(src_att->attribute_type(), nullptr, src_att->num_components(),
+            src_att->data_type(), src_att->normalized(),
+            src_att->byte_stride(), 0);
+    PointAttribute *const att =
+        sample->attribute(sample->AddAttribute(ga, true, num_points));
+    for (int i = 0; i < num_points; ++i) {
+      const PointIndex pi(i * stride);
+      memcpy(att->GetAddress(AttributeValueIndex(i)),
+             src_att->GetAddress(src_att->mapped_index(pi)),
+             att->byte_stride());
+    }
+  }
+  return sample;
+}
+
+Status PointCloudRateControl::CalibrateJointEncoding(
+    const PointCloud &pc, const EncoderOptions &options, int stride) {
+  // Encode all attributes of the sample together with |options|, which
+  // selects the same encoding as for the full point cloud.
+  std::vector<int> all_att_ids(pc.num_attributes());
+  for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+    all_att_ids[att_id] = att_id;
+  }
+  const std::unique_ptr<PointCloud> sample =
+      ExtractSample(pc, all_att_ids, stride);
+  const int num_atts = static_cast<int>(att_ids_.size());
+  bool joint = true;
+  // Encodes the sample with the bits of |options|, or with the bits halfway
+  // down to |min_bits_| when |low| is set. Returns the sum of the estimates in
+  // |estimate| and the measured size scaled to all points in |size|.
+  const auto measure = [&](bool low, double *estimate, double *size) {
+    EncoderOptions sample_options = options;
+    *estimate = 0;
+    for (int i = 0; i < num_atts; ++i) {
+      int bits = std::min(
+          std::max(options.GetAttributeInt(att_ids_[i], "quantization_bits",
+                                           -1),
+                   min_bits_),
+          max_bits_);
+      if (low) {
+        bits = (bits + min_bits_) / 2;
+      }
+      sample_options.SetAttributeInt(att_ids_[i], "quantization_bits", bits);
+      *estimate += EstimateSize(i, bits);
+    }
+    ExpertEncoder encoder(*sample);
+    encoder.Reset(sample_options);
+    EncoderBuffer buffer;
+    DRACO_RETURN_IF_ERROR(encoder.EncodeToBuffer(&buffer));
+    *size = buffer.size() * sample_scale_;
+    for (const int att_id : att_ids_) {
+      const AttributeEncodingStats *const att_stats =
+          encoder.encoding_stats().attribute(att_id);
+      if (att_stats != nullptr && att_stats->encoded_size >= 0) {
+        joint = false;
+      }
+    }
+    return OkStatus();
+  };
+  double estimate_high, size_high;
+  DRACO_RETURN_IF_ERROR(measure(false, &estimate_high, &size_high));
+  if (!joint) {
+    // A sequential encoding, the trial encodes correct every attribute.
+    return OkStatus();
+  }
+  // The kd-tree encoding only reports the total. Its size is modelled as a
+  // linear function of the sum of the sequential estimates, fitted at two
+  // numbers of bits.
+  double estimate_low, size_low;
+  DRACO_RETURN_IF_ERROR(measure(true, &estimate_low, &size_low));
+  double slope = estimate_high > 0 ? size_high / estimate_high : 1.0;
+  if (estimate_high > estimate_low && size_high > size_low) {
+    slope = (size_high - size_low) / (estimate_high - estimate_low);
+  }
+  for (double &scale : size_scales_) {
+    scale = slope;
+  }
+  // The kd-tree does not code the order of the points, which takes log2(n!)
+  // bits for n points, so the full point cloud saves log2(|sample_scale_|)
+  // more bits per point than the sample.
+  joint_savings_ = slope * estimate_high - size_high +
+                   pc.num_points() * std::log2(sample_scale_) / 8;
+  return OkStatus();
+}
+
+double PointCloudRateControl::EstimateSize(int i, int bits) {
+  const std::pair<int, int> key(i, bits);
+  auto it = sample_sizes_.find(key);
+  if (it == sample_sizes_.end()) {
+    EncoderOptions sample_options = sample_options_;
+    sample_options.SetAttributeInt(0, "quantization_bits", bits);
+    ExpertEncoder encoder(*samples_[i]);
+    encoder.Reset(sample_options);
+    EncoderBuffer buffer;
+    // A failed estimate is never chosen.
+    const int64_t size = encoder.EncodeToBuffer(&buffer).ok()
+                             ? static_cast<int64_t>(buffer.size())
+                             : std::numeric_limits<int32_t>::max();
+    it = sample_sizes_.insert(std::make_pair(key, size)).first;
+  }
+  return it->second * sample_scale_ * size_scales_[i];
+}
+
+std::vector<int> PointCloudRateControl::AllocateBits(double budget) {
+  const int num_atts = static_cast<int>(att_ids_.size());
+  std::vector<int> bits(num_atts, min_bits_);
+  double total = 0;
+  for (int i = 0; i < num_atts; ++i) {
+    total += EstimateSize(i, min_bits_);
+  }
+  while (true) {
+    int best = -1;
+    double best_gain = 0;
+    double best_cost = 0;
+    for (int i = 0; i < num_atts; ++i) {
+      if (bits[i] >= max_bits_ || weights_[i] <= 0) {
+        continue;
+      }
+      const double cost =
+          EstimateSize(i, bits[i] + 1) - EstimateSize(i, bits[i]);
+      if (total + std::max(cost, 0.0) > budget) {
+        continue;
+      }
+      // One more bit halves the relative error of the attribute.
+      const double gain = weights_[i] * std::ldexp(1.0, -(bits[i] + 1)) /
+                          std::max(cost, 1.0);
+      if (gain > best_gain) {
+        best = i;
+        best_gain = gain;
+        best_cost = cost;
+      }
+    }
+    if (best < 0) {
+      break;
+    }
+    total += best_cost;
+    ++bits[best];
+  }
+  return bits;
+}
+
+}  // namespace draco
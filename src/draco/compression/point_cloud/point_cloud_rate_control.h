@@ -0,0 +1,141 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_POINT_CLOUD_RATE_CONTROL_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_POINT_CLOUD_RATE_CONTROL_H_
+
+#include <map>
+#include <memory>
+#include <vector>
+
+#include "draco/compression/config/encoder_options.h"
+#include "draco/core/status.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+// Chooses the quantization bits of the attributes of a point cloud so that the
+// encoded point cloud fits into a byte budget.
+//
+// The encoded size of every attribute is estimated per number of bits by
+// encoding the attribute alone on a subsample of the points. Starting from the
+// minimum number of bits, bits are then handed out greedily to the attribute
+// that removes the most quantization error per estimated byte. The error of an
+// attribute quantized to b bits is taken relative to its value range, as 2^-b
+// times the weight of its type (1 by default), so that attributes of different
+// units compare by their relative precision. Constant attributes have no error
+// to remove and stay at the minimum number of bits. The allocation is checked
+// with a full encode and, for a few rounds, the estimates are corrected by the
+// measured attribute sizes. The kd-tree encoding codes all attributes together
+// and does not report them. Its size is instead fitted as a linear function of
+// the sum of the estimates by two kd-tree encodes of the subsample with all
+// attributes, and moved through the size of every full encode. The best
+// allocation that fits is kept. Every round is a full encode of the point
+// cloud, so Allocate() takes up to max_trial_encodes (6 by default) times as
+// long as a single encode, plus the sample encodes.
+class PointCloudRateControl {
+ public:
+  PointCloudRateControl();
+
+  void SetTargetSize(int64_t target_size) { target_size_ = target_size; }
+
+  // Range of quantization bits the attributes are allocated within.
+  void SetBitRange(int min_bits, int max_bits) {
+    min_bits_ = min_bits;
+    max_bits_ = max_bits;
+  }
+
+  // Maximum number of points used for the size estimation.
+  void SetMaxSamplePoints(int max_sample_points) {
+    max_sample_points_ = max_sample_points;
+  }
+
+  // Weight of the quantization error of attributes of |type| (default 1). A
+  // weight of 0 keeps them at the minimum number of bits.
+  void SetAttributeWeight(GeometryAttribute::Type type, double weight) {
+    type_weights_[type] = weight;
+  }
+
+  // Maximum number of full encodes used to check the allocation.
+  void SetMaxTrialEncodes(int max_trial_encodes) {
+    max_trial_encodes_ = max_trial_encodes;
+  }
+
+  // Allocates the bits of the attributes of |pc| that are quantized in
+  // |options| (the per-attribute-id options of an ExpertEncoder for |pc|) and
+  // stores |options| with the chosen "quantization_bits" in |out_options|.
+  // When even the minimum number of bits does not fit, the smallest
+  // allocation is returned and encoded_size() is above the target.
+  Status Allocate(const PointCloud &pc, const EncoderOptions &options,
+                  EncoderOptions *out_options);
+
+  // Chosen bits of the attribute |att_id|, or -1 if it was not allocated.
+  int quantization_bits(int att_id) const;
+
+  // Estimated and measured encoded size of the chosen allocation.
+  int64_t estimated_size() const { return estimated_size_; }
+  int64_t encoded_size() const { return encoded_size_; }
+  int num_trial_encodes() const { return num_trial_encodes_; }
+
+ private:
+  // Returns true if all values of |att| are the same.
+  static bool IsConstant(const PointAttribute &att);
+
+  // Creates a point cloud with the attributes |att_ids| of every |stride|-th
+  // point of |pc|.
+  static std::unique_ptr<PointCloud> ExtractSample(
+      const PointCloud &pc, const std::vector<int> &att_ids, int stride);
+
+  // Sets |size_scales_| and |joint_savings_| when |options| select the kd-tree
+  // encoding for the subsample of |pc| with all attributes.
+  Status CalibrateJointEncoding(const PointCloud &pc,
+                                const EncoderOptions &options, int stride);
+
+  // Estimated size of the attribute with index |i| in |att_ids_| at |bits|,
+  // scaled to all points and corrected by |size_scales_|.
+  double EstimateSize(int i, int bits);
+
+  // Greedy allocation within |budget| bytes of estimated size.
+  std::vector<int> AllocateBits(double budget);
+
+  int64_t target_size_;
+  int min_bits_;
+  int max_bits_;
+  int max_sample_points_;
+  int max_trial_encodes_;
+  std::map<GeometryAttribute::Type, double> type_weights_;
+
+  // Attributes being allocated and their subsamples.
+  std::vector<int> att_ids_;
+  std::vector<std::unique_ptr<PointCloud>> samples_;
+  double sample_scale_;
+  EncoderOptions sample_options_;
+  // Encoded sizes of the subsamples, memoized per (attribute, bits).
+  std::map<std::pair<int, int>, int64_t> sample_sizes_;
+  std::vector<double> size_scales_;
+  // Bytes the kd-tree encoding saves over the sum of the estimates (scaled by
+  // |size_scales_|), 0 for the sequential encoding.
+  double joint_savings_;
+  // Error weights of the attributes, 0 for the ones that are not refined.
+  std::vector<double> weights_;
+
+  std::vector<int> chosen_bits_;
+  int64_t estimated_size_;
+  int64_t encoded_size_;
+  int num_trial_encodes_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_POINT_CLOUD_RATE_CONTROL_H_
@@ -0,0 +1,152 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/point_cloud/point_cloud_rate_control.h"
+
+#include "draco/compression/config/compression_shared.h"
+#include "draco/compression/encode.h"
+#include "draco/compression/expert_encode.h"
+#include "draco/core/draco_test_base.h"
+#include "draco/core/draco_test_utils.h"
+
+namespace draco {
+
+class PointCloudRateControlTest : public ::testing::Test {
+ protected:
+  void SetUp() override {
+    pc_ = ReadPointCloudFromTestFile("bun_zipper.ply");
+    ASSERT_NE(pc_, nullptr);
+  }
+
+  EncoderOptions CreateOptions(int encoding_method) {
+    Encoder encoder;
+    encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 16);
+    encoder.SetEncodingMethod(encoding_method);
+    return encoder.CreateExpertEncoderOptions(*pc_);
+  }
+
+  int64_t EncodedSize(const EncoderOptions &options) {
+    ExpertEncoder encoder(*pc_);
+    encoder.Reset(options);
+    EncoderBuffer buffer;
+    EXPECT_TRUE(encoder.EncodeToBuffer(&buffer).ok());
+    return buffer.size();
+  }
+
+  std::unique_ptr<PointCloud> pc_;
+};
+
+TEST_F(PointCloudRateControlTest, TestSequentialFitsTarget) {
+  const EncoderOptions options =
+      CreateOptions(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  const int64_t full_size = EncodedSize(options);
+  PointCloudRateControl rate_control;
+  rate_control.SetTargetSize(full_size / 2);
+  EncoderOptions allocated_options = EncoderOptions::CreateDefaultOptions();
+  DRACO_ASSERT_OK(rate_control.Allocate(*pc_, options, &allocated_options));
+
+  const int bits = rate_control.quantization_bits(0);
+  ASSERT_GE(bits, 4);
+  ASSERT_LT(bits, 16);
+  ASSERT_EQ(allocated_options.GetAttributeInt(0, "quantization_bits", -1),
+            bits);
+  const int64_t size = EncodedSize(allocated_options);
+  ASSERT_EQ(size, rate_control.encoded_size());
+  ASSERT_LE(size, full_size / 2);
+  ASSERT_GE(rate_control.num_trial_encodes(), 1);
+}
+
+TEST_F(PointCloudRateControlTest, TestKdTreeFitsTarget) {
+  const EncoderOptions options = CreateOptions(POINT_CLOUD_KD_TREE_ENCODING);
+  const int64_t full_size = EncodedSize(options);
+  PointCloudRateControl rate_control;
+  rate_control.SetTargetSize(full_size * 3 / 4);
+  EncoderOptions allocated_options = EncoderOptions::CreateDefaultOptions();
+  DRACO_ASSERT_OK(rate_control.Allocate(*pc_, options, &allocated_options));
+  ASSERT_LE(EncodedSize(allocated_options), full_size * 3 / 4);
+}
+
+TEST_F(PointCloudRateControlTest, TestKdTreeEstimateMatchesEncodedSize) {
+  // The sequential sample estimates are rescaled to the kd-tree encoding, so
+  // the estimate of the chosen allocation is close to its size.
+  const EncoderOptions options = CreateOptions(POINT_CLOUD_KD_TREE_ENCODING);
+  PointCloudRateControl rate_control;
+  rate_control.SetTargetSize(EncodedSize(options) / 2);
+  EncoderOptions allocated_options = EncoderOptions::CreateDefaultOptions();
+  DRACO_ASSERT_OK(rate_control.Allocate(*pc_, options, &allocated_options));
+  ASSERT_LE(rate_control.encoded_size(), EncodedSize(options) / 2);
+  ASSERT_NEAR(rate_control.estimated_size(), rate_control.encoded_size(),
+              0.1 * rate_control.encoded_size());
+}
+
+TEST_F(PointCloudRateControlTest, TestTargetBelowMinimumBits) {
+  const EncoderOptions options =
+      CreateOptions(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  PointCloudRateControl rate_control;
+  rate_control.SetTargetSize(1);
+  rate_control.SetBitRange(6, 12);
+  EncoderOptions allocated_options = EncoderOptions::CreateDefaultOptions();
+  DRACO_ASSERT_OK(rate_control.Allocate(*pc_, options, &allocated_options));
+  // The smallest allocation is returned and reported above the target.
+  ASSERT_EQ(rate_control.quantization_bits(0), 6);
+  ASSERT_GT(rate_control.encoded_size(), 1);
+}
+
+TEST_F(PointCloudRateControlTest, TestConstantAttributeDoesNotStarvePosition) {
+  // An all-zero attribute encodes to almost nothing at any number of bits. It
+  // has no error to remove and must not take the bits of the positions.
+  EncoderOptions options = CreateOptions(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  const int64_t target_size = EncodedSize(options) / 2;
+  PointCloudRateControl position_only;
+  position_only.SetTargetSize(target_size);
+  EncoderOptions allocated_options = EncoderOptions::CreateDefaultOptions();
+  DRACO_ASSERT_OK(position_only.Allocate(*pc_, options, &allocated_options));
+
+  GeometryAttribute ga;
+  ga.Init(GeometryAttribute::NORMAL, nullptr, 3, DT_FLOAT32, false,
+          sizeof(float) * 3, 0);
+  const int normal_id = pc_->AddAttribute(ga, true, pc_->num_points());
+  const float zero[3] = {0.f, 0.f, 0.f};
+  for (AttributeValueIndex i(0); i < pc_->num_points(); ++i) {
+    pc_->attribute(normal_id)->SetAttributeValue(i, zero);
+  }
+  Encoder encoder;
+  encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 16);
+  encoder.SetAttributeQuantization(GeometryAttribute::NORMAL, 16);
+  encoder.SetEncodingMethod(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  options = encoder.CreateExpertEncoderOptions(*pc_);
+  PointCloudRateControl rate_control;
+  rate_control.SetTargetSize(target_size);
+  DRACO_ASSERT_OK(rate_control.Allocate(*pc_, options, &allocated_options));
+  ASSERT_EQ(rate_control.quantization_bits(normal_id), 4);
+  ASSERT_GE(rate_control.quantization_bits(0),
+            position_only.quantization_bits(0) - 1);
+  ASSERT_LE(rate_control.encoded_size(), target_size);
+
+  // A zero weight keeps the positions at the minimum number of bits.
+  rate_control.SetAttributeWeight(GeometryAttribute::POSITION, 0.0);
+  DRACO_ASSERT_OK(rate_control.Allocate(*pc_, options, &allocated_options));
+  ASSERT_EQ(rate_control.quantization_bits(0), 4);
+}
+
+TEST_F(PointCloudRateControlTest, TestRequiresQuantizedAttributes) {
+  Encoder encoder;
+  const EncoderOptions options = encoder.CreateExpertEncoderOptions(*pc_);
+  PointCloudRateControl rate_control;
+  rate_control.SetTargetSize(1000);
+  EncoderOptions allocated_options = EncoderOptions::CreateDefaultOptions();
+  ASSERT_FALSE(rate_control.Allocate(*pc_, options, &allocated_options).ok());
+}
+
+}  // namespace draco
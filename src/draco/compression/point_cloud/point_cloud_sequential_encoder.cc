@@ -16,6 +16,7 @@
 
 #include "draco/compression/attributes/linear_sequencer.h"
 #include "draco/compression/attributes/sequential_attribute_encoders_controller.h"
+#include "draco/compression/attributes/space_filling_curve_sequencer.h"  // [YC] add: point order
 
 namespace draco {
 
@@ -30,11 +31,24 @@ bool PointCloudSequentialEncoder::GenerateAttributesEncoder(int32_t att_id) {
   // linear sequence.
   if (att_id == 0) {
     // Create a new attribute encoder only for the first attribute.
+    //! [YC] start: Space-filling curve point order
+    // The points are visited along a space-filling curve over the positions
+    // when requested, the decoder always visits them linearly.
+    std::unique_ptr<PointsSequencer> sequencer(
+        new LinearSequencer(point_cloud()->num_points()));
+    const PointOrder order = static_cast<PointOrder>(
+        options()->GetGlobalInt("point_order", POINT_ORDER_INPUT));
+    const PointAttribute *const position =
+        point_cloud()->GetNamedAttribute(GeometryAttribute::POSITION);
+    if (order != POINT_ORDER_INPUT && position != nullptr &&
+        position->num_components() == 3) {
+      sequencer.reset(new SpaceFillingCurveSequencer(
+          position, point_cloud()->num_points(), order));
+    }
     AddAttributesEncoder(std::unique_ptr<AttributesEncoder>(
-        new SequentialAttributeEncodersController(
-            std::unique_ptr<PointsSequencer>(
-                new LinearSequencer(point_cloud()->num_points())),
-            att_id)));
+        new SequentialAttributeEncodersController(std::move(sequencer),
+                                                  att_id)));
+    //! [YC] end
   } else {
     // Reuse the existing attribute encoder for other attributes.
     attributes_encoder(0)->AddAttributeId(att_id);
@@ -26,6 +26,8 @@ namespace draco {
 // This encoder preserves the order and the number of input points, but the
 // mapping between point ids and attribute values may be different for the
 // decoded point cloud.
+// [YC] add: The points are reordered along a space-filling curve when the
+// "point_order" option is set (see PointOrder).
 class PointCloudSequentialEncoder : public PointCloudEncoder {
  public:
   uint8_t GetEncodingMethod() const override {
@@ -12,6 +12,10 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 //
+#include <array>
+#include <cmath>
+
+#include "draco/compression/attributes/space_filling_curve_sequencer.h"
 #include "draco/compression/point_cloud/point_cloud_sequential_decoder.h"
 #include "draco/compression/point_cloud/point_cloud_sequential_encoder.h"
 #include "draco/core/draco_test_base.h"
@@ -22,10 +26,17 @@ namespace draco {
 
 class PointCloudSequentialEncodingTest : public ::testing::Test {
  protected:
-  std::unique_ptr<PointCloud> EncodeAndDecodePointCloud(const PointCloud *pc) {
+  std::unique_ptr<PointCloud> EncodeAndDecodePointCloud(
+      const PointCloud *pc, PointOrder order = POINT_ORDER_INPUT) {
+    EncoderOptions options = EncoderOptions::CreateDefaultOptions();
+    options.SetGlobalInt("point_order", order);
+    return EncodeAndDecodePointCloud(pc, options);
+  }
+
+  std::unique_ptr<PointCloud> EncodeAndDecodePointCloud(
+      const PointCloud *pc, const EncoderOptions &options) {
     EncoderBuffer buffer;
     PointCloudSequentialEncoder encoder;
-    EncoderOptions options = EncoderOptions::CreateDefaultOptions();
     encoder.SetPointCloud(*pc);
     if (!encoder.Encode(options, &buffer).ok()) {
       return nullptr;
@@ -86,6 +97,114 @@ TEST_F(PointCloudSequentialEncodingTest, EncodingPointCloudWithMetadata) {
             pc->attribute(pos_att_id)->unique_id());
 }
 
+TEST_F(PointCloudSequentialEncodingTest, EncodingSortedPoints) {
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  const PointAttribute *const pos_att =
+      pc->GetNamedAttribute(GeometryAttribute::POSITION);
+  const std::vector<PointIndex> order = ComputeSpaceFillingCurveOrder(
+      *pos_att, pc->num_points(), POINT_ORDER_HILBERT);
+
+  // The positions are not quantized, so the decoded points are exactly the
+  // input points in the order of the curve.
+  std::unique_ptr<PointCloud> decoded_pc =
+      EncodeAndDecodePointCloud(pc.get(), POINT_ORDER_HILBERT);
+  ASSERT_NE(decoded_pc.get(), nullptr);
+  ASSERT_EQ(decoded_pc->num_points(), pc->num_points());
+  const PointAttribute *const decoded_pos_att =
+      decoded_pc->GetNamedAttribute(GeometryAttribute::POSITION);
+  for (PointIndex pi(0); pi < decoded_pc->num_points(); ++pi) {
+    std::array<float, 3> value, decoded_value;
+    pos_att->GetValue(pos_att->mapped_index(order[pi.value()]), &value);
+    decoded_pos_att->GetValue(decoded_pos_att->mapped_index(pi),
+                              &decoded_value);
+    ASSERT_EQ(value, decoded_value);
+  }
+}
+
+TEST_F(PointCloudSequentialEncodingTest, EncodingQuaternions) {
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  GeometryAttribute ga;
+  ga.Init(GeometryAttribute::ROT, nullptr, 4, DT_FLOAT32, false,
+          sizeof(float) * 4, 0);
+  const int rot_att_id = pc->AddAttribute(ga, true, pc->num_points());
+  PointAttribute *const rot_att = pc->attribute(rot_att_id);
+  for (PointIndex pi(0); pi < pc->num_points(); ++pi) {
+    // Quaternions of any length and sign.
+    const float t = 0.01f * pi.value();
+    const std::array<float, 4> value = {std::sin(t), 2.f * std::cos(3.f * t),
+                                        -0.5f, std::sin(7.f * t)};
+    rot_att->SetAttributeValue(AttributeValueIndex(pi.value()), value.data());
+  }
+
+  EncoderOptions options = EncoderOptions::CreateDefaultOptions();
+  options.SetAttributeInt(rot_att_id, "quantization_bits", 12);
+  options.SetAttributeBool(rot_att_id, "quaternion_encoding", true);
+  std::unique_ptr<PointCloud> decoded_pc =
+      EncodeAndDecodePointCloud(pc.get(), options);
+  ASSERT_NE(decoded_pc.get(), nullptr);
+  ASSERT_EQ(decoded_pc->num_points(), pc->num_points());
+  const PointAttribute *const decoded_rot_att =
+      decoded_pc->attribute(rot_att_id);
+  for (PointIndex pi(0); pi < decoded_pc->num_points(); ++pi) {
+    std::array<float, 4> value, decoded_value;
+    rot_att->GetValue(rot_att->mapped_index(pi), &value);
+    decoded_rot_att->GetValue(decoded_rot_att->mapped_index(pi),
+                              &decoded_value);
+    // The decoded quaternions are unit length and represent the same
+    // rotations, possibly with the opposite sign.
+    float length_sq = 0.f, dot = 0.f, input_length_sq = 0.f;
+    for (int c = 0; c < 4; ++c) {
+      length_sq += decoded_value[c] * decoded_value[c];
+      dot += value[c] * decoded_value[c];
+      input_length_sq += value[c] * value[c];
+    }
+    ASSERT_NEAR(length_sq, 1.f, 1e-5f);
+    ASSERT_NEAR(std::abs(dot) / std::sqrt(input_length_sq), 1.f, 1e-5f);
+  }
+}
+
+TEST_F(PointCloudSequentialEncodingTest, EncodingCodebook) {
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  constexpr int kNumComponents = 9;
+  GeometryAttribute ga;
+  ga.Init(GeometryAttribute::F_REST_1, nullptr, kNumComponents, DT_FLOAT32,
+          false, sizeof(float) * kNumComponents, 0);
+  const int sh_att_id = pc->AddAttribute(ga, true, pc->num_points());
+  PointAttribute *const sh_att = pc->attribute(sh_att_id);
+  for (PointIndex pi(0); pi < pc->num_points(); ++pi) {
+    // Values scattered around eight distinct vectors.
+    std::array<float, kNumComponents> value;
+    for (int c = 0; c < kNumComponents; ++c) {
+      value[c] = static_cast<float>((pi.value() % 8) * (c + 1) % 5) +
+                 0.01f * std::sin(0.37f * pi.value() + c);
+    }
+    sh_att->SetAttributeValue(AttributeValueIndex(pi.value()), value.data());
+  }
+
+  EncoderOptions options = EncoderOptions::CreateDefaultOptions();
+  options.SetAttributeInt(sh_att_id, "codebook_size", 8);
+  std::unique_ptr<PointCloud> decoded_pc =
+      EncodeAndDecodePointCloud(pc.get(), options);
+  ASSERT_NE(decoded_pc.get(), nullptr);
+  ASSERT_EQ(decoded_pc->num_points(), pc->num_points());
+  const PointAttribute *const decoded_sh_att =
+      decoded_pc->attribute(sh_att_id);
+  ASSERT_EQ(decoded_sh_att->data_type(), DT_FLOAT32);
+  ASSERT_EQ(decoded_sh_att->num_components(), kNumComponents);
+  for (PointIndex pi(0); pi < decoded_pc->num_points(); ++pi) {
+    std::array<float, kNumComponents> value, decoded_value;
+    sh_att->GetValue(sh_att->mapped_index(pi), &value);
+    decoded_sh_att->GetValue(decoded_sh_att->mapped_index(pi),
+                             &decoded_value);
+    for (int c = 0; c < kNumComponents; ++c) {
+      ASSERT_NEAR(decoded_value[c], value[c], 0.02f);
+    }
+  }
+}
+
 // TODO(ostava): Test the reusability of a single instance of the encoder and
 // decoder class.
 
@@ -0,0 +1,181 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/point_cloud/tiled_point_cloud_decoder.h"
+
+#include <cstring>
+
+#include "draco/compression/decode.h"
+#include "draco/core/parallel_for.h"
+
+namespace draco {
+
+TiledPointCloudDecoder::TiledPointCloudDecoder()
+    : index_size_(0), num_threads_(1) {}
+
+bool TiledPointCloudDecoder::IsTiledPointCloud(const DecoderBuffer &buffer) {
+  return buffer.remaining_size() >= kTiledPointCloudMagicSize &&
+         memcmp(buffer.data_head(), kTiledPointCloudMagic,
+                kTiledPointCloudMagicSize) == 0;
+}
+
+Status TiledPointCloudDecoder::DecodeIndex(DecoderBuffer *buffer) {
+  tiles_.clear();
+  const int64_t start_size = buffer->remaining_size();
+  if (!IsTiledPointCloud(*buffer)) {
+    return Status(Status::DRACO_ERROR, "Not a tiled point cloud.");
+  }
+  buffer->Advance(kTiledPointCloudMagicSize);
+  uint8_t major_version, minor_version;
+  uint32_t num_tiles;
+  if (!buffer->Decode(&major_version) || !buffer->Decode(&minor_version) ||
+      !buffer->Decode(&num_tiles)) {
+    return Status(Status::IO_ERROR, "Failed to parse the tile index.");
+  }
+  if (major_version != kTiledPointCloudMajorVersion) {
+    return Status(Status::UNKNOWN_VERSION, "Unknown tile index version.");
+  }
+  // Every tile takes 44 bytes of index.
+  if (num_tiles > buffer->remaining_size() / 44) {
+    return Status(Status::IO_ERROR, "Failed to parse the tile index.");
+  }
+  tiles_.resize(num_tiles);
+  for (PointCloudTile &tile : tiles_) {
+    Vector3f min_point, max_point;
+    if (!buffer->Decode(min_point.data(), 3 * sizeof(float)) ||
+        !buffer->Decode(max_point.data(), 3 * sizeof(float)) ||
+        !buffer->Decode(&tile.num_points) || !buffer->Decode(&tile.offset) ||
+        !buffer->Decode(&tile.size)) {
+      return Status(Status::IO_ERROR, "Failed to parse the tile index.");
+    }
+    tile.bounds = BoundingBox(min_point, max_point);
+  }
+  index_size_ = start_size - buffer->remaining_size();
+  return OkStatus();
+}
+
+std::vector<int> TiledPointCloudDecoder::FindTiles(
+    const BoundingBox &box) const {
+  std::vector<int> tile_ids;
+  for (int i = 0; i < num_tiles(); ++i) {
+    const BoundingBox &bounds = tiles_[i].bounds;
+    bool intersects = true;
+    for (int c = 0; c < 3; ++c) {
+      if (bounds.GetMinPoint()[c] > box.GetMaxPoint()[c] ||
+          bounds.GetMaxPoint()[c] < box.GetMinPoint()[c]) {
+        intersects = false;
+      }
+    }
+    if (intersects) {
+      tile_ids.push_back(i);
+    }
+  }
+  return tile_ids;
+}
+
+StatusOr<std::unique_ptr<PointCloud>> TiledPointCloudDecoder::DecodeTile(
+    int tile_id, DecoderBuffer *tile_buffer) {
+  if (tile_id < 0 || tile_id >= num_tiles()) {
+    return Status(Status::DRACO_ERROR, "Invalid tile id.");
+  }
+  Decoder decoder;
+  for (const GeometryAttribute::Type att_type : skipped_attributes_) {
+    decoder.SetSkipAttribute(att_type);
+  }
+  DRACO_ASSIGN_OR_RETURN(std::unique_ptr<PointCloud> pc,
+                         decoder.DecodePointCloudFromBuffer(tile_buffer));
+  if (pc->num_points() != tiles_[tile_id].num_points) {
+    return Status(Status::DRACO_ERROR, "Unexpected number of tile points.");
+  }
+  return std::move(pc);
+}
+
+StatusOr<std::unique_ptr<PointCloud>> TiledPointCloudDecoder::DecodeBox(
+    DecoderBuffer *buffer, const BoundingBox &box) {
+  const char *const data = buffer->data_head();
+  const int64_t data_size = buffer->remaining_size();
+  DRACO_RETURN_IF_ERROR(DecodeIndex(buffer));
+  const std::vector<int> tile_ids = FindTiles(box);
+  for (const int tile_id : tile_ids) {
+    const PointCloudTile &tile = tiles_[tile_id];
+    if (tile.offset > static_cast<uint64_t>(data_size - index_size_) ||
+        tile.size > static_cast<uint64_t>(data_size - index_size_) -
+                        tile.offset) {
+      return Status(Status::IO_ERROR, "Tile data out of bounds.");
+    }
+  }
+  const int num_threads =
+      num_threads_ == 0 ? GetDefaultNumThreads() : num_threads_;
+  std::vector<std::unique_ptr<PointCloud>> tile_pcs(tile_ids.size());
+  std::vector<Status> tile_status(tile_ids.size());
+  ParallelFor(static_cast<int>(tile_ids.size()), num_threads, [&](int i) {
+    const PointCloudTile &tile = tiles_[tile_ids[i]];
+    DecoderBuffer tile_buffer;
+    tile_buffer.Init(data + index_size_ + tile.offset, tile.size);
+    StatusOr<std::unique_ptr<PointCloud>> maybe_pc =
+        DecodeTile(tile_ids[i], &tile_buffer);
+    if (!maybe_pc.ok()) {
+      tile_status[i] = maybe_pc.status();
+      return false;
+    }
+    tile_pcs[i] = std::move(maybe_pc).value();
+    return true;
+  });
+  for (const Status &status : tile_status) {
+    DRACO_RETURN_IF_ERROR(status);
+  }
+  return MergeTiles(tile_pcs);
+}
+
+StatusOr<std::unique_ptr<PointCloud>> TiledPointCloudDecoder::MergeTiles(
+    const std::vector<std::unique_ptr<PointCloud>> &tiles) {
+  std::unique_ptr<PointCloud> pc(new PointCloud());
+  if (tiles.empty()) {
+    return std::move(pc);
+  }
+  uint32_t num_points = 0;
+  for (const auto &tile : tiles) {
+    if (tile->num_attributes() != tiles[0]->num_attributes()) {
+      return Status(Status::DRACO_ERROR, "Tiles have different attributes.");
+    }
+    num_points += tile->num_points();
+  }
+  pc->set_num_points(num_points);
+  for (int att_id = 0; att_id < tiles[0]->num_attributes(); ++att_id) {
+    const PointAttribute *const first_att = tiles[0]->attribute(att_id);
+    GeometryAttribute ga;
+    ga.Init(first_att->attribute_type(), nullptr, first_att->num_components(),
+            first_att->data_type(), first_att->normalized(),
+            first_att->byte_stride(), 0);
+    PointAttribute *const att =
+        pc->attribute(pc->AddAttribute(ga, true, num_points));
+    AttributeValueIndex avi(0);
+    for (const auto &tile : tiles) {
+      const PointAttribute *const tile_att = tile->attribute(att_id);
+      if (tile_att->attribute_type() != first_att->attribute_type() ||
+          tile_att->data_type() != first_att->data_type() ||
+          tile_att->num_components() != first_att->num_components()) {
+        return Status(Status::DRACO_ERROR, "Tiles have different attributes.");
+      }
+      for (PointIndex pi(0); pi < tile->num_points(); ++pi) {
+        memcpy(att->GetAddress(avi++),
+               tile_att->GetAddress(tile_att->mapped_index(pi)),
+               att->byte_stride());
+      }
+    }
+  }
+  return std::move(pc);
+}
+
+}  // namespace draco
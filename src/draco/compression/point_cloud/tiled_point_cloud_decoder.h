@@ -0,0 +1,89 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_DECODER_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_DECODER_H_
+
+#include <memory>
+#include <vector>
+
+#include "draco/compression/point_cloud/tiled_point_cloud_shared.h"
+#include "draco/core/decoder_buffer.h"
+#include "draco/core/status.h"
+#include "draco/core/status_or.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+// Decodes point clouds encoded by TiledPointCloudEncoder. The index is small
+// and stored first, so a client can read it, pick the tiles it needs with
+// FindTiles() and fetch only their bytes (e.g. with ranged reads) before
+// decoding them with DecodeTile().
+class TiledPointCloudDecoder {
+ public:
+  TiledPointCloudDecoder();
+
+  // Returns true if |buffer| holds a tiled point cloud. The buffer is not
+  // advanced.
+  static bool IsTiledPointCloud(const DecoderBuffer &buffer);
+
+  // Reads the index from |buffer|, which is left at the start of the tile
+  // data.
+  Status DecodeIndex(DecoderBuffer *buffer);
+
+  int num_tiles() const { return static_cast<int>(tiles_.size()); }
+  const PointCloudTile &tile(int i) const { return tiles_[i]; }
+
+  // Size of the index in bytes. Tile |i| is stored at byte
+  // index_size() + tile(i).offset of the encoded data.
+  int64_t index_size() const { return index_size_; }
+
+  // Returns the ids of the tiles whose bounds intersect |box|.
+  std::vector<int> FindTiles(const BoundingBox &box) const;
+
+  // Decodes tile |tile_id| from |tile_buffer| that holds its tile(i).size
+  // bytes.
+  StatusOr<std::unique_ptr<PointCloud>> DecodeTile(int tile_id,
+                                                   DecoderBuffer *tile_buffer);
+
+  // Decodes the tiles intersecting |box| from |buffer| holding the whole
+  // encoded data and merges them into one point cloud. Tiles are decoded as a
+  // whole, so the result also contains points of those tiles outside |box|.
+  StatusOr<std::unique_ptr<PointCloud>> DecodeBox(DecoderBuffer *buffer,
+                                                  const BoundingBox &box);
+
+  // Number of threads decoding tiles concurrently (default = 1, 0 uses all
+  // cores).
+  void SetNumThreads(int num_threads) { num_threads_ = num_threads; }
+
+  // Leaves all attributes of type |att_type| out of the decoded point cloud
+  // (see Decoder::SetSkipAttribute()).
+  void SetSkipAttribute(GeometryAttribute::Type att_type) {
+    skipped_attributes_.push_back(att_type);
+  }
+
+ private:
+  // Concatenates the points of |tiles|, which must have the same attributes.
+  static StatusOr<std::unique_ptr<PointCloud>> MergeTiles(
+      const std::vector<std::unique_ptr<PointCloud>> &tiles);
+
+  std::vector<PointCloudTile> tiles_;
+  int64_t index_size_;
+  int num_threads_;
+  std::vector<GeometryAttribute::Type> skipped_attributes_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_DECODER_H_
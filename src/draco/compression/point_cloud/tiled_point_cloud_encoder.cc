@@ -0,0 +1,265 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/compression/point_cloud/tiled_point_cloud_encoder.h"
+
+#include <array>
+#include <cstring>
+
+#include "draco/attributes/attribute_quantization_transform.h"
+#include "draco/compression/expert_encode.h"
+#include "draco/core/parallel_for.h"
+
+namespace draco {
+
+namespace {
+
+// Cells are not split further past this depth, so that many points at the
+// same position still end up in a finite number of tiles.
+constexpr int kMaxTileDepth = 16;
+
+}  // namespace
+
+TiledPointCloudEncoder::TiledPointCloudEncoder()
+    : max_points_per_tile_(1 << 16) {}
+
+Status TiledPointCloudEncoder::EncodeToBuffer(const PointCloud &pc,
+                                              const EncoderOptions &options,
+                                              EncoderBuffer *out_buffer) {
+  tiles_.clear();
+  encoding_stats_.Reset(pc);
+  if (pc.GetNamedAttribute(GeometryAttribute::POSITION) == nullptr) {
+    return Status(Status::DRACO_ERROR, "Tiling requires positions.");
+  }
+  if (max_points_per_tile_ < 1) {
+    return Status(Status::DRACO_ERROR, "Invalid number of points per tile.");
+  }
+  const std::vector<std::vector<PointIndex>> tile_point_ids =
+      SplitIntoTiles(pc);
+  const int num_tiles = static_cast<int>(tile_point_ids.size());
+
+  // Tiles are independent. When they are encoded concurrently, each tile is
+  // encoded on a single thread.
+  int num_threads = options.GetGlobalInt("num_threads", 1);
+  if (num_threads == 0) {
+    num_threads = GetDefaultNumThreads();
+  }
+  EncoderOptions tile_options = options;
+  DRACO_RETURN_IF_ERROR(SetGlobalQuantization(pc, &tile_options));
+  if (num_threads > 1 && num_tiles > 1) {
+    tile_options.SetGlobalInt("num_threads", 1);
+  }
+  tiles_.resize(num_tiles);
+  std::vector<EncoderBuffer> tile_buffers(num_tiles);
+  std::vector<EncodingStats> tile_stats(num_tiles);
+  std::vector<Status> tile_status(num_tiles);
+  ParallelFor(num_tiles, num_threads, [&](int i) {
+    const std::unique_ptr<PointCloud> tile_pc =
+        ExtractTile(pc, tile_point_ids[i]);
+    const PointAttribute *const pos_att =
+        tile_pc->GetNamedAttribute(GeometryAttribute::POSITION);
+    for (AttributeValueIndex avi(0); avi < pos_att->size(); ++avi) {
+      Vector3f pos;
+      pos_att->ConvertValue<float, 3>(avi, &pos[0]);
+      tiles_[i].bounds.Update(pos);
+    }
+    tiles_[i].num_points = tile_pc->num_points();
+    ExpertEncoder encoder(*tile_pc);
+    encoder.Reset(tile_options);
+    tile_status[i] = encoder.EncodeToBuffer(&tile_buffers[i]);
+    tile_stats[i] = encoder.encoding_stats();
+    return tile_status[i].ok();
+  });
+  for (const Status &status : tile_status) {
+    DRACO_RETURN_IF_ERROR(status);
+  }
+
+  // Write the index followed by the encoded tiles.
+  out_buffer->Encode(kTiledPointCloudMagic, kTiledPointCloudMagicSize);
+  out_buffer->Encode(kTiledPointCloudMajorVersion);
+  out_buffer->Encode(kTiledPointCloudMinorVersion);
+  out_buffer->Encode(static_cast<uint32_t>(num_tiles));
+  uint64_t offset = 0;
+  for (int i = 0; i < num_tiles; ++i) {
+    PointCloudTile &tile = tiles_[i];
+    tile.offset = offset;
+    tile.size = tile_buffers[i].size();
+    offset += tile.size;
+    out_buffer->Encode(tile.bounds.GetMinPoint().data(), 3 * sizeof(float));
+    out_buffer->Encode(tile.bounds.GetMaxPoint().data(), 3 * sizeof(float));
+    out_buffer->Encode(tile.num_points);
+    out_buffer->Encode(tile.offset);
+    out_buffer->Encode(tile.size);
+  }
+  for (int i = 0; i < num_tiles; ++i) {
+    out_buffer->Encode(tile_buffers[i].data(), tile_buffers[i].size());
+
+    // Sizes are summed, or stay unknown (-1) if unknown for any tile.
+    for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+      AttributeEncodingStats *const stats = encoding_stats_.attribute(att_id);
+      const AttributeEncodingStats *const tile_att_stats =
+          tile_stats[i].attribute(att_id);
+      if (tile_att_stats == nullptr) {
+        continue;
+      }
+      if (i == 0 || tile_att_stats->encoded_size < 0) {
+        stats->encoded_size = tile_att_stats->encoded_size;
+      } else if (stats->encoded_size >= 0) {
+        stats->encoded_size += tile_att_stats->encoded_size;
+      }
+      stats->quantization_time_us += tile_att_stats->quantization_time_us;
+      stats->prediction_time_us += tile_att_stats->prediction_time_us;
+      stats->entropy_coding_time_us += tile_att_stats->entropy_coding_time_us;
+    }
+    encoding_stats_.attributes_size += tile_stats[i].attributes_size;
+  }
+  return OkStatus();
+}
+
+Status TiledPointCloudEncoder::SetGlobalQuantization(const PointCloud &pc,
+                                                     EncoderOptions *options) {
+  for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+    const PointAttribute *const att = pc.attribute(att_id);
+    const int quantization_bits =
+        options->GetAttributeInt(att_id, "quantization_bits", -1);
+    if (att->data_type() != DT_FLOAT32 || quantization_bits < 1) {
+      continue;  // Not quantized.
+    }
+    if (options->GetAttributeBool(att_id, "quaternion_encoding", false) ||
+        options->GetAttributeInt(att_id, "codebook_size", -1) > 0) {
+      continue;  // These encoders do not use the quantization range.
+    }
+    if (options->IsAttributeOptionSet(att_id, "quantization_origin") &&
+        options->IsAttributeOptionSet(att_id, "quantization_range")) {
+      continue;  // Already on an explicit grid.
+    }
+    AttributeQuantizationTransform transform;
+    if (!transform.ComputeParameters(*att, quantization_bits)) {
+      return Status(Status::DRACO_ERROR,
+                    "Failed to compute the quantization of an attribute.");
+    }
+    options->SetAttributeVector(att_id, "quantization_origin",
+                                att->num_components(),
+                                transform.min_values().data());
+    options->SetAttributeFloat(att_id, "quantization_range", transform.range());
+  }
+  return OkStatus();
+}
+
+std::vector<std::vector<PointIndex>> TiledPointCloudEncoder::SplitIntoTiles(
+    const PointCloud &pc) const {
+  const PointAttribute *const pos_att =
+      pc.GetNamedAttribute(GeometryAttribute::POSITION);
+  std::vector<Vector3f> positions(pc.num_points());
+  BoundingBox bounds;
+  for (PointIndex pi(0); pi < pc.num_points(); ++pi) {
+    pos_att->ConvertValue<float, 3>(pos_att->mapped_index(pi),
+                                    &positions[pi.value()][0]);
+    bounds.Update(positions[pi.value()]);
+  }
+
+  // Octree cells still to be processed: a range of |point_ids|, the cell
+  // bounds and the depth.
+  struct Cell {
+    int begin;
+    int end;
+    Vector3f min_point;
+    Vector3f max_point;
+    int depth;
+  };
+  std::vector<PointIndex> point_ids(pc.num_points());
+  for (PointIndex pi(0); pi < pc.num_points(); ++pi) {
+    point_ids[pi.value()] = pi;
+  }
+  std::vector<std::vector<PointIndex>> tiles;
+  std::vector<Cell> cells = {{0, static_cast<int>(pc.num_points()),
+                              bounds.GetMinPoint(), bounds.GetMaxPoint(), 0}};
+  std::vector<PointIndex> sorted_ids;
+  while (!cells.empty()) {
+    const Cell cell = cells.back();
+    cells.pop_back();
+    const int num_points = cell.end - cell.begin;
+    if (num_points == 0) {
+      continue;
+    }
+    if (num_points <= max_points_per_tile_ || cell.depth >= kMaxTileDepth) {
+      tiles.emplace_back(point_ids.begin() + cell.begin,
+                         point_ids.begin() + cell.end);
+      continue;
+    }
+    // Sort the points of the cell by octant, keeping their order within each
+    // octant.
+    const Vector3f center = (cell.min_point + cell.max_point) / 2;
+    const auto octant = [&](PointIndex pi) {
+      const Vector3f &pos = positions[pi.value()];
+      return (pos[0] > center[0] ? 1 : 0) | (pos[1] > center[1] ? 2 : 0) |
+             (pos[2] > center[2] ? 4 : 0);
+    };
+    std::array<int, 9> octant_begin = {};
+    for (int i = cell.begin; i < cell.end; ++i) {
+      ++octant_begin[octant(point_ids[i]) + 1];
+    }
+    for (int o = 0; o < 8; ++o) {
+      octant_begin[o + 1] += octant_begin[o];
+    }
+    sorted_ids.resize(num_points);
+    std::array<int, 8> octant_pos;
+    std::copy(octant_begin.begin(), octant_begin.begin() + 8,
+              octant_pos.begin());
+    for (int i = cell.begin; i < cell.end; ++i) {
+      sorted_ids[octant_pos[octant(point_ids[i])]++] = point_ids[i];
+    }
+    std::copy(sorted_ids.begin(), sorted_ids.end(),
+              point_ids.begin() + cell.begin);
+    // Push the octants in reverse so that they are emitted in octant order.
+    for (int o = 7; o >= 0; --o) {
+      Cell child;
+      child.begin = cell.begin + octant_begin[o];
+      child.end = cell.begin + octant_begin[o + 1];
+      child.depth = cell.depth + 1;
+      for (int c = 0; c < 3; ++c) {
+        const bool upper = (o >> c) & 1;
+        child.min_point[c] = upper ? center[c] : cell.min_point[c];
+        child.max_point[c] = upper ? cell.max_point[c] : center[c];
+      }
+      cells.push_back(child);
+    }
+  }
+  return tiles;
+}
+
+std::unique_ptr<PointCloud> TiledPointCloudEncoder::ExtractTile(
+    const PointCloud &pc, const std::vector<PointIndex> &point_ids) {
+  std::unique_ptr<PointCloud> tile(new PointCloud());
+  const uint32_t num_points = static_cast<uint32_t>(point_ids.size());
+  tile->set_num_points(num_points);
+  // Attributes keep their ids, so the per-attribute encoder options apply to
+  // the tile as well.
+  for (int att_id = 0; att_id < pc.num_attributes(); ++att_id) {
+    const PointAttribute *const att = pc.attribute(att_id);
+    GeometryAttribute ga;
+    ga.Init(att->attribute_type(), nullptr, att->num_components(),
+            att->data_type(), att->normalized(), att->byte_stride(), 0);
+    const int tile_att_id = tile->AddAttribute(ga, true, num_points);
+    PointAttribute *const tile_att = tile->attribute(tile_att_id);
+    for (uint32_t i = 0; i < num_points; ++i) {
+      memcpy(tile_att->GetAddress(AttributeValueIndex(i)),
+             att->GetAddress(att->mapped_index(point_ids[i])),
+             att->byte_stride());
+    }
+  }
+  return tile;
+}
+
+}  // namespace draco
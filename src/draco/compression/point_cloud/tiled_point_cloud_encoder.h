@@ -0,0 +1,79 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_ENCODER_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_ENCODER_H_
+
+#include <memory>
+#include <vector>
+
+#include "draco/compression/config/encoder_options.h"
+#include "draco/compression/config/encoding_stats.h"
+#include "draco/compression/point_cloud/tiled_point_cloud_shared.h"
+#include "draco/core/encoder_buffer.h"
+#include "draco/core/status.h"
+#include "draco/point_cloud/point_cloud.h"
+
+namespace draco {
+
+// Encodes a point cloud as a set of spatial tiles (see
+// tiled_point_cloud_shared.h). The bounding box of the positions is split as an
+// octree until every cell holds at most |max_points_per_tile| points, and the
+// points of every non-empty cell are encoded as an independent point cloud with
+// the same options as ExpertEncoder would use for the whole point cloud.
+// Quantized attributes of all tiles share the quantization grid of the whole
+// point cloud.
+class TiledPointCloudEncoder {
+ public:
+  TiledPointCloudEncoder();
+
+  void SetMaxPointsPerTile(int max_points_per_tile) {
+    max_points_per_tile_ = max_points_per_tile;
+  }
+
+  // Encodes |pc| into |out_buffer|. |options| are the per-attribute-id options
+  // of an ExpertEncoder for |pc| (e.g. from Encoder::CreateExpertEncoderOptions).
+  // With the "num_threads" global option the tiles are encoded concurrently.
+  Status EncodeToBuffer(const PointCloud &pc, const EncoderOptions &options,
+                        EncoderBuffer *out_buffer);
+
+  // Index of the last encoded point cloud.
+  const std::vector<PointCloudTile> &tiles() const { return tiles_; }
+
+  // Statistics of the last encoding, summed over all tiles.
+  const EncodingStats &encoding_stats() const { return encoding_stats_; }
+
+ private:
+  // Sets the explicit quantization origin and range of every quantized
+  // attribute of |pc| in |options|, unless they are already set.
+  static Status SetGlobalQuantization(const PointCloud &pc,
+                                      EncoderOptions *options);
+
+  // Splits the points of |pc| into the tiles, returning the point ids of every
+  // tile.
+  std::vector<std::vector<PointIndex>> SplitIntoTiles(
+      const PointCloud &pc) const;
+
+  // Creates a point cloud with the points |point_ids| of |pc|.
+  static std::unique_ptr<PointCloud> ExtractTile(
+      const PointCloud &pc, const std::vector<PointIndex> &point_ids);
+
+  int max_points_per_tile_;
+  std::vector<PointCloudTile> tiles_;
+  EncodingStats encoding_stats_;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_ENCODER_H_
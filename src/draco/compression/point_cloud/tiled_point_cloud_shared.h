@@ -0,0 +1,60 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_SHARED_H_
+#define DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_SHARED_H_
+
+#include <cstdint>
+
+#include "draco/core/bounding_box.h"
+
+namespace draco {
+
+// A tiled point cloud splits the points into spatial tiles that are encoded as
+// independent Draco point clouds, so that a region can be decoded without the
+// rest of the scene. The layout is:
+//
+//   char[8]   kTiledPointCloudMagic
+//   uint8     major version
+//   uint8     minor version
+//   uint32    number of tiles
+//   per tile:
+//     float[3]  minimum of the tile positions
+//     float[3]  maximum of the tile positions
+//     uint32    number of points
+//     uint64    offset of the encoded tile from the end of the index
+//     uint64    size of the encoded tile in bytes
+//   the encoded tiles, each one a regular .drc bitstream
+//
+// Values are stored in the byte order of the encoder like the rest of Draco.
+constexpr char kTiledPointCloudMagic[] = "DRACOTIL";
+constexpr int kTiledPointCloudMagicSize = 8;
+constexpr uint8_t kTiledPointCloudMajorVersion = 1;
+constexpr uint8_t kTiledPointCloudMinorVersion = 0;
+
+// Index entry of one tile.
+struct PointCloudTile {
+  PointCloudTile() : num_points(0), offset(0), size(0) {}
+
+  // Bounds of the positions of the points in the tile.
+  BoundingBox bounds;
+  uint32_t num_points;
+  // Location of the encoded tile, relative to the end of the index.
+  uint64_t offset;
+  uint64_t size;
+};
+
+}  // namespace draco
+
+#endif  // DRACO_COMPRESSION_POINT_CLOUD_TILED_POINT_CLOUD_SHARED_H_
@@ -0,0 +1,174 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include <algorithm>
+#include <array>
+#include <cfloat>
+
+#include "draco/compression/decode.h"
+#include "draco/compression/encode.h"
+#include "draco/compression/point_cloud/tiled_point_cloud_decoder.h"
+#include "draco/compression/point_cloud/tiled_point_cloud_encoder.h"
+#include "draco/core/draco_test_base.h"
+#include "draco/core/draco_test_utils.h"
+
+namespace draco {
+
+class TiledPointCloudTest : public ::testing::Test {
+ protected:
+  void EncodeTiles(const PointCloud &pc, int max_points_per_tile,
+                   EncoderBuffer *buffer) {
+    Encoder encoder;
+    encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 14);
+    TiledPointCloudEncoder tiled_encoder;
+    tiled_encoder.SetMaxPointsPerTile(max_points_per_tile);
+    DRACO_ASSERT_OK(tiled_encoder.EncodeToBuffer(
+        pc, encoder.CreateExpertEncoderOptions(pc), buffer));
+  }
+
+  static BoundingBox Everything() {
+    return BoundingBox(Vector3f(-FLT_MAX, -FLT_MAX, -FLT_MAX),
+                       Vector3f(FLT_MAX, FLT_MAX, FLT_MAX));
+  }
+};
+
+TEST_F(TiledPointCloudTest, TestIndex) {
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  EncodeTiles(*pc, 1000, &buffer);
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  ASSERT_TRUE(TiledPointCloudDecoder::IsTiledPointCloud(dec_buffer));
+  TiledPointCloudDecoder decoder;
+  DRACO_ASSERT_OK(decoder.DecodeIndex(&dec_buffer));
+  ASSERT_GT(decoder.num_tiles(), 1);
+
+  uint32_t num_points = 0;
+  uint64_t offset = 0;
+  for (int i = 0; i < decoder.num_tiles(); ++i) {
+    const PointCloudTile &tile = decoder.tile(i);
+    ASSERT_GT(tile.num_points, 0);
+    ASSERT_LE(tile.num_points, 1000);
+    ASSERT_EQ(tile.offset, offset);
+    num_points += tile.num_points;
+    offset += tile.size;
+
+    // Every tile can be decoded on its own.
+    DecoderBuffer tile_buffer;
+    tile_buffer.Init(buffer.data() + decoder.index_size() + tile.offset,
+                     tile.size);
+    DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> tile_pc,
+                           decoder.DecodeTile(i, &tile_buffer));
+    ASSERT_EQ(tile_pc->num_points(), tile.num_points);
+  }
+  ASSERT_EQ(num_points, pc->num_points());
+  ASSERT_EQ(decoder.index_size() + offset, buffer.size());
+}
+
+TEST_F(TiledPointCloudTest, TestDecodeBox) {
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  EncodeTiles(*pc, 1000, &buffer);
+
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  TiledPointCloudDecoder decoder;
+  decoder.SetNumThreads(2);
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> all_pc,
+                         decoder.DecodeBox(&dec_buffer, Everything()));
+  ASSERT_EQ(all_pc->num_points(), pc->num_points());
+  ASSERT_EQ(all_pc->num_attributes(), pc->num_attributes());
+
+  // A box around the first tile decodes only some of the tiles.
+  const BoundingBox box = decoder.tile(0).bounds;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> box_pc,
+                         decoder.DecodeBox(&dec_buffer, box));
+  ASSERT_GE(box_pc->num_points(), decoder.tile(0).num_points);
+  ASSERT_LT(box_pc->num_points(), pc->num_points());
+
+  // The decoded points cover the box.
+  const PointAttribute *const pos_att =
+      box_pc->GetNamedAttribute(GeometryAttribute::POSITION);
+  ASSERT_NE(pos_att, nullptr);
+  int num_inside = 0;
+  for (PointIndex pi(0); pi < box_pc->num_points(); ++pi) {
+    Vector3f pos;
+    pos_att->GetMappedValue(pi, &pos[0]);
+    bool inside = true;
+    for (int c = 0; c < 3; ++c) {
+      inside &= pos[c] >= box.GetMinPoint()[c] - 1e-3f &&
+                pos[c] <= box.GetMaxPoint()[c] + 1e-3f;
+    }
+    num_inside += inside;
+  }
+  ASSERT_GE(num_inside, decoder.tile(0).num_points);
+}
+
+TEST_F(TiledPointCloudTest, TestTilesShareQuantizationGrid) {
+  // Positions decoded from the tiles are the same as when the point cloud is
+  // encoded as a whole.
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  EncoderBuffer buffer;
+  EncodeTiles(*pc, 1000, &buffer);
+  DecoderBuffer dec_buffer;
+  dec_buffer.Init(buffer.data(), buffer.size());
+  TiledPointCloudDecoder tiled_decoder;
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> tiled_pc,
+                         tiled_decoder.DecodeBox(&dec_buffer, Everything()));
+
+  Encoder encoder;
+  encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 14);
+  EncoderBuffer whole_buffer;
+  DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*pc, &whole_buffer));
+  dec_buffer.Init(whole_buffer.data(), whole_buffer.size());
+  Decoder decoder;
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> whole_pc,
+                         decoder.DecodePointCloudFromBuffer(&dec_buffer));
+
+  const auto sorted_positions = [](const PointCloud &pc) {
+    const PointAttribute *const pos_att =
+        pc.GetNamedAttribute(GeometryAttribute::POSITION);
+    std::vector<std::array<float, 3>> positions(pc.num_points());
+    for (PointIndex pi(0); pi < pc.num_points(); ++pi) {
+      pos_att->GetMappedValue(pi, positions[pi.value()].data());
+    }
+    std::sort(positions.begin(), positions.end());
+    return positions;
+  };
+  ASSERT_EQ(sorted_positions(*tiled_pc), sorted_positions(*whole_pc));
+}
+
+TEST_F(TiledPointCloudTest, TestThreadedEncodingIsBitIdentical) {
+  std::unique_ptr<PointCloud> pc = ReadPointCloudFromTestFile("bun_zipper.ply");
+  ASSERT_NE(pc, nullptr);
+  Encoder encoder;
+  EncoderOptions options = encoder.CreateExpertEncoderOptions(*pc);
+  TiledPointCloudEncoder tiled_encoder;
+  tiled_encoder.SetMaxPointsPerTile(1000);
+  EncoderBuffer buffer;
+  DRACO_ASSERT_OK(tiled_encoder.EncodeToBuffer(*pc, options, &buffer));
+  options.SetGlobalInt("num_threads", 4);
+  EncoderBuffer threaded_buffer;
+  DRACO_ASSERT_OK(
+      tiled_encoder.EncodeToBuffer(*pc, options, &threaded_buffer));
+  ASSERT_EQ(buffer.size(), threaded_buffer.size());
+  ASSERT_EQ(memcmp(buffer.data(), threaded_buffer.data(), buffer.size()), 0);
+}
+
+}  // namespace draco
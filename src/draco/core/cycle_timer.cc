@@ -46,4 +46,21 @@ int64_t DracoTimer::GetInMs() {
 #endif
 }
 
+//! [YC] start: Finer resolution for timing individual encoding stages
+int64_t DracoTimer::GetInUs() {
+#ifdef _WIN32
+  LARGE_INTEGER elapsed = {0};
+  elapsed.QuadPart = tv_end_.QuadPart - tv_start_.QuadPart;
+
+  LARGE_INTEGER frequency = {0};
+  QueryPerformanceFrequency(&frequency);
+  return elapsed.QuadPart * 1000000 / frequency.QuadPart;
+#else
+  const int64_t seconds = (tv_end_.tv_sec - tv_start_.tv_sec) * 1000000;
+  const int64_t microseconds = tv_end_.tv_usec - tv_start_.tv_usec;
+  return seconds + microseconds;
+#endif
+}
+//! [YC] end
+
 }  // namespace draco
@@ -38,6 +38,9 @@ class DracoTimer {
   void Start();
   void Stop();
   int64_t GetInMs();
+  //! [YC] start: Finer resolution for timing individual encoding stages
+  int64_t GetInUs();
+  //! [YC] end
 
  private:
   DracoTimeVal tv_start_;
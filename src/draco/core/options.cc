@@ -14,6 +14,7 @@
 //
 #include "draco/core/options.h"
 
+#include <cstdio>
 #include <cstdlib>
 #include <set>
 #include <string>
@@ -32,8 +33,18 @@ void Options::SetInt(const std::string &name, int val) {
 }
 
 void Options::SetFloat(const std::string &name, float val) {
-  options_[name] = std::to_string(val);
+  options_[name] = ValueToString(val);
+}
+
+//! [YC] start: Exact float options
+std::string Options::ValueToString(float val) {
+  // std::to_string() keeps only 6 decimals, which moves explicit quantization
+  // origins and ranges. 9 significant digits parse back to the same float.
+  char str[32];
+  snprintf(str, sizeof(str), "%.9g", val);
+  return str;
 }
+//! [YC] end
 
 void Options::SetBool(const std::string &name, bool val) {
   options_[name] = std::to_string(val ? 1 : 0);
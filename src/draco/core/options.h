@@ -72,6 +72,21 @@ class Options {
   }
 
  private:
+  //! [YC] start: Exact float options
+  // Converts |val| to a string that parses back to the same value.
+  static std::string ValueToString(float val);
+  template <typename DataTypeT>
+  static std::string ValueToString(DataTypeT val) {
+// GNU STL on android doesn't include a proper std::to_string, but the libc++
+// version does
+#if defined(ANDROID) && !defined(_LIBCPP_VERSION)
+    return to_string(val);
+#else
+    return std::to_string(val);
+#endif
+  }
+  //! [YC] end
+
   // All entries are internally stored as strings and converted to the desired
   // return type based on the used Get* method.
   std::map<std::string, std::string> options_;
@@ -86,13 +101,7 @@ void Options::SetVector(const std::string &name, const DataTypeT *vec,
       out += " ";
     }
 
-// GNU STL on android doesn't include a proper std::to_string, but the libc++
-// version does
-#if defined(ANDROID) && !defined(_LIBCPP_VERSION)
-    out += to_string(vec[i]);
-#else
-    out += std::to_string(vec[i]);
-#endif
+    out += ValueToString(vec[i]);
   }
   options_[name] = out;
 }
@@ -0,0 +1,70 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#ifndef DRACO_CORE_PARALLEL_FOR_H_
+#define DRACO_CORE_PARALLEL_FOR_H_
+
+#include <algorithm>
+#include <atomic>
+#include <thread>
+#include <vector>
+
+namespace draco {
+
+// Runs |task(i)| for every i in [0, num_tasks) on up to |num_threads| threads,
+// the calling thread included. Tasks are picked in increasing order but may
+// finish in any order, so they must not depend on each other. Returns false if
+// any task returned false. With |num_threads| <= 1 the tasks run serially and
+// the first failure stops the loop.
+template <typename TaskT>
+bool ParallelFor(int num_tasks, int num_threads, const TaskT &task) {
+  num_threads = std::min(num_threads, num_tasks);
+  if (num_threads <= 1) {
+    for (int i = 0; i < num_tasks; ++i) {
+      if (!task(i)) {
+        return false;
+      }
+    }
+    return true;
+  }
+  std::atomic<int> next_task(0);
+  std::atomic<bool> ok(true);
+  const auto run_tasks = [&]() {
+    for (int i = next_task++; i < num_tasks && ok; i = next_task++) {
+      if (!task(i)) {
+        ok = false;
+      }
+    }
+  };
+  std::vector<std::thread> workers;
+  workers.reserve(num_threads - 1);
+  for (int t = 1; t < num_threads; ++t) {
+    workers.emplace_back(run_tasks);
+  }
+  run_tasks();
+  for (std::thread &worker : workers) {
+    worker.join();
+  }
+  return ok;
+}
+
+// Returns the number of threads used when an option asks for 0 ("all cores").
+inline int GetDefaultNumThreads() {
+  const unsigned int num_cores = std::thread::hardware_concurrency();
+  return num_cores == 0 ? 1 : static_cast<int>(num_cores);
+}
+
+}  // namespace draco
+
+#endif  // DRACO_CORE_PARALLEL_FOR_H_
@@ -0,0 +1,199 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/core/vector_quantization_utils.h"
+
+#include <algorithm>
+#include <cmath>
+#include <random>
+#include <utility>
+
+namespace draco {
+
+void CodebookSearch::Init(const std::vector<float> &codebook,
+                          int num_components) {
+  num_components_ = num_components;
+  num_entries_ = static_cast<int>(codebook.size()) / num_components;
+  transposed_codebook_.resize(codebook.size());
+  for (int e = 0; e < num_entries_; ++e) {
+    for (int c = 0; c < num_components_; ++c) {
+      transposed_codebook_[c * num_entries_ + e] =
+          codebook[e * num_components_ + c];
+    }
+  }
+  distances_.resize(num_entries_);
+}
+
+uint32_t CodebookSearch::FindNearestEntry(const float *vector,
+                                          float *out_distance) {
+  std::fill(distances_.begin(), distances_.end(), 0.f);
+  float *const distances = distances_.data();
+  for (int c = 0; c < num_components_; ++c) {
+    const float value = vector[c];
+    const float *const column = &transposed_codebook_[c * num_entries_];
+    for (int e = 0; e < num_entries_; ++e) {
+      const float d = value - column[e];
+      distances[e] += d * d;
+    }
+  }
+  const uint32_t nearest = static_cast<uint32_t>(
+      std::min_element(distances_.begin(), distances_.end()) -
+      distances_.begin());
+  if (out_distance) {
+    *out_distance = distances_[nearest];
+  }
+  return nearest;
+}
+
+namespace {
+
+float SquaredDistance(const float *a, const float *b, int num_components) {
+  float distance = 0.f;
+  for (int c = 0; c < num_components; ++c) {
+    const float d = a[c] - b[c];
+    distance += d * d;
+  }
+  return distance;
+}
+
+// Picks the initial entries among |vectors| with the k-means++ seeding: every
+// next entry is a vector chosen with the probability proportional to its
+// squared distance to the nearest entry picked so far.
+std::vector<float> SeedCodebook(const std::vector<float> &vectors,
+                                int num_components, int codebook_size,
+                                std::mt19937 *rng) {
+  const int num_vectors = static_cast<int>(vectors.size()) / num_components;
+  std::vector<float> codebook(vectors.begin(),
+                              vectors.begin() + num_components);
+  std::vector<float> distances(num_vectors);
+  double total_distance = 0;
+  for (int i = 0; i < num_vectors; ++i) {
+    distances[i] =
+        SquaredDistance(&vectors[i * num_components], codebook.data(),
+                        num_components);
+    total_distance += distances[i];
+  }
+  while (static_cast<int>(codebook.size()) < codebook_size * num_components &&
+         total_distance > 0) {
+    // std::uniform_real_distribution is implementation defined, the raw
+    // output of std::mt19937 is not.
+    double target = (*rng)() / 4294967296.0 * total_distance;
+    int picked = num_vectors - 1;
+    for (int i = 0; i < num_vectors; ++i) {
+      target -= distances[i];
+      if (target < 0) {
+        picked = i;
+        break;
+      }
+    }
+    while (distances[picked] == 0.f) {
+      --picked;  // Only reachable through rounding at the end.
+    }
+    const float *const entry = &vectors[picked * num_components];
+    codebook.insert(codebook.end(), entry, entry + num_components);
+    total_distance = 0;
+    for (int i = 0; i < num_vectors; ++i) {
+      distances[i] =
+          std::min(distances[i], SquaredDistance(&vectors[i * num_components],
+                                                 entry, num_components));
+      total_distance += distances[i];
+    }
+  }
+  return codebook;
+}
+
+}  // namespace
+
+bool ComputeKMeansCodebook(const float *vectors, int num_vectors,
+                           int num_components, int codebook_size,
+                           int max_iterations, int max_training_vectors,
+                           std::vector<float> *out_codebook,
+                           std::vector<uint32_t> *out_indices) {
+  if (num_vectors <= 0 || num_components <= 0 || codebook_size <= 0 ||
+      max_iterations < 0 || max_training_vectors <= 0) {
+    return false;
+  }
+  const int stride =
+      (num_vectors + max_training_vectors - 1) / max_training_vectors;
+  std::vector<float> training_vectors;
+  training_vectors.reserve(
+      static_cast<size_t>((num_vectors + stride - 1) / stride) *
+      num_components);
+  for (int i = 0; i < num_vectors; i += stride) {
+    const float *const vector =
+        vectors + static_cast<size_t>(i) * num_components;
+    for (int c = 0; c < num_components; ++c) {
+      // Non-finite values would poison the means.
+      training_vectors.push_back(std::isfinite(vector[c]) ? vector[c] : 0.f);
+    }
+  }
+  const int num_training_vectors =
+      static_cast<int>(training_vectors.size()) / num_components;
+
+  std::mt19937 rng(0);
+  std::vector<float> codebook = SeedCodebook(training_vectors, num_components,
+                                             codebook_size, &rng);
+  const int num_entries = static_cast<int>(codebook.size()) / num_components;
+
+  // Lloyd iterations on the training vectors.
+  CodebookSearch search;
+  std::vector<uint32_t> assignment(num_training_vectors, 0);
+  std::vector<double> sums(codebook.size());
+  std::vector<int> counts(num_entries);
+  for (int iteration = 0; iteration < max_iterations; ++iteration) {
+    search.Init(codebook, num_components);
+    bool changed = iteration == 0;
+    std::fill(sums.begin(), sums.end(), 0.);
+    std::fill(counts.begin(), counts.end(), 0);
+    for (int i = 0; i < num_training_vectors; ++i) {
+      const float *const vector = &training_vectors[i * num_components];
+      const uint32_t entry = search.FindNearestEntry(vector, nullptr);
+      changed |= entry != assignment[i];
+      assignment[i] = entry;
+      ++counts[entry];
+      for (int c = 0; c < num_components; ++c) {
+        sums[entry * num_components + c] += vector[c];
+      }
+    }
+    if (!changed) {
+      break;
+    }
+    for (int e = 0; e < num_entries; ++e) {
+      if (counts[e] == 0) {
+        continue;  // Empty entries keep their value.
+      }
+      for (int c = 0; c < num_components; ++c) {
+        codebook[e * num_components + c] =
+            static_cast<float>(sums[e * num_components + c] / counts[e]);
+      }
+    }
+  }
+
+  // Assign all vectors to the final codebook.
+  search.Init(codebook, num_components);
+  out_indices->resize(num_vectors);
+  std::vector<float> vector(num_components);
+  for (int i = 0; i < num_vectors; ++i) {
+    const float *const source =
+        vectors + static_cast<size_t>(i) * num_components;
+    for (int c = 0; c < num_components; ++c) {
+      vector[c] = std::isfinite(source[c]) ? source[c] : 0.f;
+    }
+    (*out_indices)[i] = search.FindNearestEntry(vector.data(), nullptr);
+  }
+  *out_codebook = std::move(codebook);
+  return true;
+}
+
+}  // namespace draco
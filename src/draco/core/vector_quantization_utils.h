@@ -0,0 +1,68 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+// Vector quantization of floating point vectors: a codebook of entries is
+// learned with the k-means algorithm and every vector is replaced by the index
+// of its nearest entry.
+
+#ifndef DRACO_CORE_VECTOR_QUANTIZATION_UTILS_H_
+#define DRACO_CORE_VECTOR_QUANTIZATION_UTILS_H_
+
+#include <stdint.h>
+
+#include <vector>
+
+namespace draco {
+
+// Finds the nearest entries of a codebook. The entries are stored component
+// major, so the distances to all entries are computed in loops over
+// contiguous memory that the compiler can vectorize.
+class CodebookSearch {
+ public:
+  CodebookSearch() : num_components_(0), num_entries_(0) {}
+
+  // Initializes the search for |codebook| with entries of |num_components|
+  // values each (stored entry after entry).
+  void Init(const std::vector<float> &codebook, int num_components);
+
+  // Returns the index of the entry nearest to |vector| and stores its squared
+  // distance in |out_distance| (if not null).
+  uint32_t FindNearestEntry(const float *vector, float *out_distance);
+
+  int num_entries() const { return num_entries_; }
+
+ private:
+  int num_components_;
+  int num_entries_;
+  // Component |c| of entry |e| is stored at [c * num_entries_ + e].
+  std::vector<float> transposed_codebook_;
+  std::vector<float> distances_;
+};
+
+// Learns a codebook of at most |codebook_size| entries for the |num_vectors|
+// vectors of |num_components| values in |vectors| with the k-means algorithm
+// (k-means++ seeding followed by at most |max_iterations| Lloyd iterations)
+// and assigns every vector to its nearest entry. The codebook is learned on
+// an evenly strided subset of at most |max_training_vectors| vectors. The
+// codebook has fewer entries when the vectors have fewer distinct values. The
+// result is deterministic. Returns false for invalid arguments.
+bool ComputeKMeansCodebook(const float *vectors, int num_vectors,
+                           int num_components, int codebook_size,
+                           int max_iterations, int max_training_vectors,
+                           std::vector<float> *out_codebook,
+                           std::vector<uint32_t> *out_indices);
+
+}  // namespace draco
+
+#endif  // DRACO_CORE_VECTOR_QUANTIZATION_UTILS_H_
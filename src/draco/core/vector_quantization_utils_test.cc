@@ -0,0 +1,99 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/core/vector_quantization_utils.h"
+
+#include <cmath>
+#include <vector>
+
+#include "draco/core/draco_test_base.h"
+
+namespace draco {
+
+class VectorQuantizationUtilsTest : public ::testing::Test {};
+
+TEST_F(VectorQuantizationUtilsTest, TestCodebookSearch) {
+  // Three entries of two components.
+  const std::vector<float> codebook = {0.f, 0.f, 10.f, 0.f, 0.f, 10.f};
+  CodebookSearch search;
+  search.Init(codebook, 2);
+  ASSERT_EQ(search.num_entries(), 3);
+  const float a[2] = {1.f, 2.f};
+  const float b[2] = {9.f, -1.f};
+  const float c[2] = {4.f, 7.f};
+  float distance;
+  EXPECT_EQ(search.FindNearestEntry(a, &distance), 0);
+  EXPECT_EQ(distance, 5.f);
+  EXPECT_EQ(search.FindNearestEntry(b, &distance), 1);
+  EXPECT_EQ(distance, 2.f);
+  EXPECT_EQ(search.FindNearestEntry(c, nullptr), 2);
+}
+
+TEST_F(VectorQuantizationUtilsTest, TestKMeansFindsClusters) {
+  // Vectors spread around four well separated centers.
+  const float centers[4][3] = {
+      {0.f, 0.f, 0.f}, {5.f, 0.f, 0.f}, {0.f, 5.f, 0.f}, {0.f, 0.f, 5.f}};
+  const int num_vectors = 1000;
+  std::vector<float> vectors;
+  for (int i = 0; i < num_vectors; ++i) {
+    for (int c = 0; c < 3; ++c) {
+      vectors.push_back(centers[i % 4][c] + 0.1f * std::sin(1.7f * i + c));
+    }
+  }
+  std::vector<float> codebook;
+  std::vector<uint32_t> indices;
+  ASSERT_TRUE(ComputeKMeansCodebook(vectors.data(), num_vectors, 3, 4, 20,
+                                    num_vectors, &codebook, &indices));
+  ASSERT_EQ(codebook.size(), 12);
+  ASSERT_EQ(indices.size(), num_vectors);
+  for (int i = 0; i < num_vectors; ++i) {
+    // Vectors of the same center share an entry close to the center.
+    ASSERT_EQ(indices[i], indices[i % 4]);
+    for (int c = 0; c < 3; ++c) {
+      ASSERT_NEAR(codebook[indices[i] * 3 + c], centers[i % 4][c], 0.1f);
+    }
+  }
+
+  // The result does not depend on the run and training on a subset of the
+  // vectors finds the same clusters.
+  std::vector<float> codebook2;
+  std::vector<uint32_t> indices2;
+  ASSERT_TRUE(ComputeKMeansCodebook(vectors.data(), num_vectors, 3, 4, 20,
+                                    num_vectors, &codebook2, &indices2));
+  ASSERT_EQ(codebook, codebook2);
+  ASSERT_EQ(indices, indices2);
+  ASSERT_TRUE(ComputeKMeansCodebook(vectors.data(), num_vectors, 3, 4, 20,
+                                    400, &codebook2, &indices2));
+  for (int i = 0; i < num_vectors; ++i) {
+    ASSERT_EQ(indices2[i], indices2[i % 4]);
+  }
+}
+
+TEST_F(VectorQuantizationUtilsTest, TestKMeansFewDistinctValues) {
+  // The codebook is limited to the number of distinct vectors.
+  const std::vector<float> vectors = {1.f, 2.f, 1.f, 2.f, 3.f, 4.f, 1.f, 2.f};
+  std::vector<float> codebook;
+  std::vector<uint32_t> indices;
+  ASSERT_TRUE(ComputeKMeansCodebook(vectors.data(), 4, 2, 16, 10, 100,
+                                    &codebook, &indices));
+  ASSERT_EQ(codebook.size(), 4);
+  for (int i = 0; i < 4; ++i) {
+    ASSERT_EQ(codebook[indices[i] * 2], vectors[i * 2]);
+    ASSERT_EQ(codebook[indices[i] * 2 + 1], vectors[i * 2 + 1]);
+  }
+  ASSERT_FALSE(ComputeKMeansCodebook(vectors.data(), 4, 2, 0, 10, 100,
+                                     &codebook, &indices));
+}
+
+}  // namespace draco
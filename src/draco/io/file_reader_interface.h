@@ -25,6 +25,13 @@ class FileReaderInterface {
 
   // Returns the size of the file.
   virtual size_t GetFileSize() = 0;
+
+  //! [YC] start: Chunked reading
+  // Reads the next |size| bytes of the file into |data| and returns true.
+  // Returns false when fewer bytes are left or when the reader does not
+  // support reading in chunks.
+  virtual bool ReadChunk(void *data, size_t size) { return false; }
+  //! [YC] end
 };
 
 }  // namespace draco
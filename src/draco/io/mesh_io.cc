@@ -76,6 +76,9 @@ StatusOr<std::unique_ptr<Mesh>> ReadMeshFromFile(
   if (extension == "ply") {
     // Stanford PLY file format.
     PlyDecoder ply_decoder;
+    //! [YC] start: Single pass vertex decoding
+    ply_decoder.set_use_memory_mapping(options.GetBool("use_memory_mapping"));
+    //! [YC] end
     DRACO_RETURN_IF_ERROR(ply_decoder.DecodeFromFile(file_name, mesh.get()));
     return std::move(mesh);
   }
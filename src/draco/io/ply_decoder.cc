@@ -14,11 +14,25 @@
 //
 #include "draco/io/ply_decoder.h"
 
+#include <algorithm>
+#include <cstring>
+
 #include "draco/core/macros.h"
 #include "draco/core/status.h"
+#include "draco/io/file_reader_factory.h"
 #include "draco/io/file_utils.h"
 #include "draco/io/ply_property_reader.h"
 
+//! [YC] start: Memory-mapped input
+#if defined(__unix__) || defined(__APPLE__)
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#define DRACO_PLY_MEMORY_MAPPING_SUPPORTED
+#endif
+//! [YC] end
+
 namespace draco {
 namespace {
 int64_t CountNumTriangles(const PlyElement &face_element,
@@ -34,9 +48,284 @@ int64_t CountNumTriangles(const PlyElement &face_element,
   }
   return num_triangles;
 }
+
+//! [YC] start: Single pass vertex decoding
+// Number of bytes of vertex rows read from the file at a time.
+constexpr int64_t kVertexChunkSize = 1 << 20;
+
+// An attribute decoded from the vertex element and the offsets of its
+// components within a vertex row.
+struct VertexRowAttribute {
+  GeometryAttribute::Type type;
+  DataType data_type;
+  bool normalized;
+  std::vector<int64_t> row_offsets;
+};
+
+// A run of bytes copied from every vertex row into an attribute value.
+struct VertexRowCopy {
+  int att_id;
+  int64_t row_offset;
+  int64_t value_offset;
+  int64_t num_bytes;
+};
+
+struct VertexRowsPlan {
+  int64_t num_rows = 0;
+  int64_t row_size = 0;
+  std::vector<VertexRowAttribute> attributes;
+  std::vector<VertexRowCopy> copies;
+};
+
+// Plans the decoding of the vertex element as fixed-size rows. The attributes
+// and their order are the same as in PlyDecoder::DecodeVertexData(). Returns
+// false for inputs that need the general decoder: ascii files, a vertex element
+// that is not the first one or that has list properties, and property types
+// that need a conversion (including half floats and quantized integers).
+bool PlanVertexRows(const PlyReader &ply_reader, VertexRowsPlan *plan) {
+  if (ply_reader.is_ascii() || ply_reader.num_elements() == 0) {
+    return false;
+  }
+  const PlyElement *const vertex_element = ply_reader.GetElementByName("vertex");
+  if (vertex_element != &ply_reader.element(0)) {
+    return false;
+  }
+  std::map<const PlyProperty *, int64_t> row_offsets;
+  int64_t row_size = 0;
+  for (int i = 0; i < vertex_element->num_properties(); ++i) {
+    const PlyProperty &prop = vertex_element->property(i);
+    if (prop.is_list() || prop.is_half() || prop.is_quantized()) {
+      return false;
+    }
+    row_offsets[&prop] = row_size;
+    row_size += prop.data_type_num_bytes();
+  }
+  plan->num_rows = vertex_element->num_entries();
+  plan->row_size = row_size;
+  plan->attributes.clear();
+
+  // Returns the properties of |names|, or an empty vector if one is missing.
+  const auto get_properties = [&](const std::vector<std::string> &names) {
+    std::vector<const PlyProperty *> properties;
+    for (const std::string &name : names) {
+      const PlyProperty *const prop = vertex_element->GetPropertyByName(name);
+      if (prop == nullptr) {
+        return std::vector<const PlyProperty *>();
+      }
+      properties.push_back(prop);
+    }
+    return properties;
+  };
+  const auto all_of_type = [](const std::vector<const PlyProperty *> &props,
+                              DataType data_type) {
+    for (const PlyProperty *const prop : props) {
+      if (prop->data_type() != data_type) {
+        return false;
+      }
+    }
+    return true;
+  };
+  const auto add_attribute = [&](GeometryAttribute::Type type,
+                                 DataType data_type, bool normalized,
+                                 const std::vector<const PlyProperty *> &props) {
+    VertexRowAttribute att;
+    att.type = type;
+    att.data_type = data_type;
+    att.normalized = normalized;
+    for (const PlyProperty *const prop : props) {
+      att.row_offsets.push_back(row_offsets[prop]);
+    }
+    plan->attributes.push_back(att);
+  };
+  const auto range_names = [](const std::string &prefix, int begin, int end) {
+    std::vector<std::string> names;
+    for (int i = begin; i < end; ++i) {
+      names.push_back(prefix + std::to_string(i));
+    }
+    return names;
+  };
+
+  // Positions are required and must be float32 or int32.
+  const std::vector<const PlyProperty *> position =
+      get_properties({"x", "y", "z"});
+  if (position.empty()) {
+    return false;
+  }
+  const DataType position_type = position[0]->data_type();
+  if ((position_type != DT_FLOAT32 && position_type != DT_INT32) ||
+      !all_of_type(position, position_type)) {
+    return false;
+  }
+  add_attribute(GeometryAttribute::POSITION, position_type, false, position);
+
+  // Attributes of float32 properties that are skipped when a property is
+  // missing or has another type.
+  const std::vector<std::pair<GeometryAttribute::Type,
+                              std::vector<std::string>>>
+      optional_attributes = {
+          {GeometryAttribute::NORMAL, {"nx", "ny", "nz"}},
+          {GeometryAttribute::F_DC, {"f_dc_0", "f_dc_1", "f_dc_2"}}};
+  for (const auto &att : optional_attributes) {
+    const std::vector<const PlyProperty *> props = get_properties(att.second);
+    if (!props.empty() && all_of_type(props, DT_FLOAT32)) {
+      add_attribute(att.first, DT_FLOAT32, false, props);
+    }
+  }
+
+  // SH bands, present when their marker property is. All of their properties
+  // must then exist.
+  const std::vector<std::tuple<GeometryAttribute::Type, std::string, int, int>>
+      sh_bands = {std::make_tuple(GeometryAttribute::F_REST_1, "f_rest_0", 0, 9),
+                  std::make_tuple(GeometryAttribute::F_REST_2, "f_rest_15", 9,
+                                  24),
+                  std::make_tuple(GeometryAttribute::F_REST_3, "f_rest_24", 24,
+                                  45)};
+  for (const auto &band : sh_bands) {
+    if (vertex_element->GetPropertyByName(std::get<1>(band)) == nullptr) {
+      continue;
+    }
+    const std::vector<const PlyProperty *> props = get_properties(
+        range_names("f_rest_", std::get<2>(band), std::get<3>(band)));
+    if (props.empty() || !all_of_type(props, DT_FLOAT32)) {
+      return false;
+    }
+    add_attribute(std::get<0>(band), DT_FLOAT32, false, props);
+  }
+
+  const std::vector<std::pair<GeometryAttribute::Type,
+                              std::vector<std::string>>>
+      gaussian_attributes = {
+          {GeometryAttribute::OPACITY, {"opacity"}},
+          {GeometryAttribute::SCALE, {"scale_0", "scale_1", "scale_2"}},
+          {GeometryAttribute::ROT, {"rot_0", "rot_1", "rot_2", "rot_3"}}};
+  for (const auto &att : gaussian_attributes) {
+    const std::vector<const PlyProperty *> props = get_properties(att.second);
+    if (props.empty()) {
+      continue;
+    }
+    // Other types are rejected by the general decoder.
+    if (!all_of_type(props, DT_FLOAT32)) {
+      return false;
+    }
+    add_attribute(att.first, DT_FLOAT32, false, props);
+  }
+
+  // Colors use every present channel, which must be uint8.
+  std::vector<const PlyProperty *> colors;
+  for (const std::string name : {"red", "green", "blue", "alpha"}) {
+    const PlyProperty *const prop = vertex_element->GetPropertyByName(name);
+    if (prop != nullptr) {
+      colors.push_back(prop);
+    }
+  }
+  if (!colors.empty()) {
+    if (!all_of_type(colors, DT_UINT8)) {
+      return false;
+    }
+    add_attribute(GeometryAttribute::COLOR, DT_UINT8, true, colors);
+  }
+  return true;
+}
+
+// Adds the planned attributes to |pc| and computes the copies from a vertex
+// row into them. Components that are consecutive both in the row and in the
+// attribute value are copied together.
+void AddVertexRowAttributes(PointCloud *pc, VertexRowsPlan *plan) {
+  pc->set_num_points(static_cast<PointIndex::ValueType>(plan->num_rows));
+  plan->copies.clear();
+  for (const VertexRowAttribute &att : plan->attributes) {
+    const int64_t component_size = DataTypeLength(att.data_type);
+    const int num_components = static_cast<int>(att.row_offsets.size());
+    GeometryAttribute va;
+    va.Init(att.type, nullptr, num_components, att.data_type, att.normalized,
+            component_size * num_components, 0);
+    const int att_id = pc->AddAttribute(
+        va, true, static_cast<PointIndex::ValueType>(plan->num_rows));
+    for (int c = 0; c < num_components; ++c) {
+      VertexRowCopy copy;
+      copy.att_id = att_id;
+      copy.row_offset = att.row_offsets[c];
+      copy.value_offset = component_size * c;
+      copy.num_bytes = component_size;
+      if (!plan->copies.empty()) {
+        VertexRowCopy &last = plan->copies.back();
+        if (last.att_id == att_id &&
+            last.row_offset + last.num_bytes == copy.row_offset &&
+            last.value_offset + last.num_bytes == copy.value_offset) {
+          last.num_bytes += copy.num_bytes;
+          continue;
+        }
+      }
+      plan->copies.push_back(copy);
+    }
+  }
+}
+
+// Scatters |num_rows| vertex rows starting at |rows| into the attributes of
+// |pc|, beginning with the value of vertex |first_row|.
+void CopyVertexRows(const VertexRowsPlan &plan, const uint8_t *rows,
+                    int64_t first_row, int64_t num_rows, PointCloud *pc) {
+  for (const VertexRowCopy &copy : plan.copies) {
+    PointAttribute *const att = pc->attribute(copy.att_id);
+    const int64_t value_stride = att->byte_stride();
+    uint8_t *dst = att->GetAddress(AttributeValueIndex(
+                       static_cast<uint32_t>(first_row))) +
+                   copy.value_offset;
+    const uint8_t *src = rows + copy.row_offset;
+    for (int64_t i = 0; i < num_rows; ++i) {
+      memcpy(dst, src, copy.num_bytes);
+      dst += value_stride;
+      src += plan.row_size;
+    }
+  }
+}
+
+#ifdef DRACO_PLY_MEMORY_MAPPING_SUPPORTED
+// Read-only mapping of a whole file, unmapped on destruction.
+class MappedFile {
+ public:
+  MappedFile() : data_(nullptr), size_(0) {}
+  ~MappedFile() {
+    if (data_ != nullptr) {
+      munmap(data_, size_);
+    }
+  }
+  bool Map(const std::string &file_name) {
+    const int fd = open(file_name.c_str(), O_RDONLY);
+    if (fd < 0) {
+      return false;
+    }
+    struct stat file_stat;
+    if (fstat(fd, &file_stat) != 0 || file_stat.st_size <= 0) {
+      close(fd);
+      return false;
+    }
+    void *const data = mmap(nullptr, file_stat.st_size, PROT_READ,
+                            MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (data == MAP_FAILED) {
+      return false;
+    }
+    madvise(data, file_stat.st_size, MADV_SEQUENTIAL);
+    data_ = data;
+    size_ = file_stat.st_size;
+    return true;
+  }
+  const char *data() const { return static_cast<const char *>(data_); }
+  size_t size() const { return size_; }
+
+ private:
+  void *data_;
+  size_t size_;
+};
+#endif
+//! [YC] end
 }  // namespace
 
-PlyDecoder::PlyDecoder() : out_mesh_(nullptr), out_point_cloud_(nullptr) {}
+PlyDecoder::PlyDecoder()
+    : out_mesh_(nullptr),
+      out_point_cloud_(nullptr),
+      use_memory_mapping_(false) {}
 
 Status PlyDecoder::DecodeFromFile(const std::string &file_name,
                                   Mesh *out_mesh) {
@@ -46,6 +335,25 @@ Status PlyDecoder::DecodeFromFile(const std::string &file_name,
 
 Status PlyDecoder::DecodeFromFile(const std::string &file_name,
                                   PointCloud *out_point_cloud) {
+  //! [YC] start: Single pass vertex decoding
+#ifdef DRACO_PLY_MEMORY_MAPPING_SUPPORTED
+  if (use_memory_mapping_) {
+    MappedFile mapped_file;
+    if (mapped_file.Map(file_name)) {
+      buffer_.Init(mapped_file.data(), mapped_file.size());
+      return DecodeFromBuffer(&buffer_, out_point_cloud);
+    }
+  }
+#endif
+  if (out_mesh_ == nullptr) {
+    out_point_cloud_ = out_point_cloud;
+    DRACO_ASSIGN_OR_RETURN(const bool decoded,
+                           DecodeVertexRowsFromFile(file_name));
+    if (decoded) {
+      return OkStatus();
+    }
+  }
+  //! [YC] end
   std::vector<char> data;
   if (!ReadFileToBuffer(file_name, &data)) {
     return Status(Status::DRACO_ERROR, "Unable to read input file.");
@@ -67,6 +375,14 @@ Status PlyDecoder::DecodeFromBuffer(DecoderBuffer *buffer,
 }
 
 Status PlyDecoder::DecodeInternal() {
+  //! [YC] start: Single pass vertex decoding
+  if (out_mesh_ == nullptr) {
+    DRACO_ASSIGN_OR_RETURN(const bool decoded, DecodeVertexRowsFromBuffer());
+    if (decoded) {
+      return OkStatus();
+    }
+  }
+  //! [YC] end
   PlyReader ply_reader;
   DRACO_RETURN_IF_ERROR(ply_reader.Read(buffer()));
   // First, decode the connectivity data.
@@ -91,6 +407,96 @@ Status PlyDecoder::DecodeInternal() {
   return OkStatus();
 }
 
+//! [YC] start: Single pass vertex decoding
+StatusOr<bool> PlyDecoder::DecodeVertexRowsFromBuffer() {
+  DecoderBuffer data_buffer;
+  data_buffer.Init(buffer()->data_head(), buffer()->remaining_size());
+  PlyReader header_reader;
+  VertexRowsPlan plan;
+  if (!header_reader.ReadHeader(&data_buffer).ok() ||
+      !PlanVertexRows(header_reader, &plan) ||
+      data_buffer.remaining_size() < plan.num_rows * plan.row_size) {
+    return false;
+  }
+  AddVertexRowAttributes(out_point_cloud_, &plan);
+  CopyVertexRows(plan, reinterpret_cast<const uint8_t *>(data_buffer.data_head()),
+                 0, plan.num_rows, out_point_cloud_);
+  return true;
+}
+
+StatusOr<bool> PlyDecoder::DecodeVertexRowsFromFile(
+    const std::string &file_name) {
+  std::unique_ptr<FileReaderInterface> file_reader =
+      FileReaderFactory::OpenReader(file_name);
+  if (file_reader == nullptr) {
+    return Status(Status::DRACO_ERROR, "Unable to read input file.");
+  }
+  const size_t file_size = file_reader->GetFileSize();
+
+  // Read blocks until the whole header is in |chunk|.
+  constexpr size_t kHeaderBlockSize = 4096;
+  const char kEndHeader[] = "end_header";
+  std::vector<uint8_t> chunk;
+  while (true) {
+    const size_t block_size =
+        std::min(kHeaderBlockSize, file_size - chunk.size());
+    if (block_size == 0) {
+      return false;
+    }
+    chunk.resize(chunk.size() + block_size);
+    if (!file_reader->ReadChunk(chunk.data() + chunk.size() - block_size,
+                                block_size)) {
+      return false;
+    }
+    const auto end_header =
+        std::search(chunk.begin(), chunk.end(), kEndHeader,
+                    kEndHeader + sizeof(kEndHeader) - 1);
+    if (end_header != chunk.end() &&
+        std::find(end_header, chunk.end(), '\n') != chunk.end()) {
+      break;
+    }
+  }
+  DecoderBuffer header_buffer;
+  header_buffer.Init(reinterpret_cast<const char *>(chunk.data()),
+                     chunk.size());
+  PlyReader header_reader;
+  VertexRowsPlan plan;
+  if (!header_reader.ReadHeader(&header_buffer).ok() ||
+      !PlanVertexRows(header_reader, &plan)) {
+    return false;
+  }
+  const size_t header_size = chunk.size() - header_buffer.remaining_size();
+  if (file_size - header_size < plan.num_rows * plan.row_size) {
+    return false;
+  }
+  AddVertexRowAttributes(out_point_cloud_, &plan);
+
+  // The rows read together with the header come first.
+  const int64_t rows_per_chunk =
+      std::max<int64_t>(1, kVertexChunkSize / std::max<int64_t>(1, plan.row_size));
+  chunk.erase(chunk.begin(), chunk.begin() + header_size);
+  int64_t num_bytes = chunk.size();
+  chunk.resize(std::max<int64_t>(num_bytes, rows_per_chunk * plan.row_size));
+  for (int64_t first_row = 0; first_row < plan.num_rows;) {
+    const int64_t num_rows =
+        std::min(rows_per_chunk, plan.num_rows - first_row);
+    const int64_t chunk_bytes = num_rows * plan.row_size;
+    if (num_bytes < chunk_bytes) {
+      if (!file_reader->ReadChunk(chunk.data() + num_bytes,
+                                  chunk_bytes - num_bytes)) {
+        return Status(Status::IO_ERROR, "Failed reading the vertex data.");
+      }
+      num_bytes = chunk_bytes;
+    }
+    CopyVertexRows(plan, chunk.data(), first_row, num_rows, out_point_cloud_);
+    memmove(chunk.data(), chunk.data() + chunk_bytes, num_bytes - chunk_bytes);
+    num_bytes -= chunk_bytes;
+    first_row += num_rows;
+  }
+  return true;
+}
+//! [YC] end
+
 Status PlyDecoder::DecodeFaceData(const PlyElement *face_element) {
   // We accept point clouds now.
   if (face_element == nullptr) {
@@ -350,6 +756,9 @@ Status PlyDecoder::DecodeVertexData(const PlyElement *vertex_element) {
         out_point_cloud_->attribute(att_id)->SetAttributeValue(
             AttributeValueIndex(i), &val[0]);
       }
+    } else {
+      return Status(Status::INVALID_PARAMETER,
+                    "opacity property must be float32 or quantized");
     }
   }
   
@@ -377,6 +786,9 @@ Status PlyDecoder::DecodeVertexData(const PlyElement *vertex_element) {
         out_point_cloud_->attribute(att_id)->SetAttributeValue(
             AttributeValueIndex(i), &val[0]);
       }
+    } else {
+      return Status(Status::INVALID_PARAMETER,
+                    "scale properties must be float32 or quantized");
     }
   }
 
@@ -408,6 +820,9 @@ Status PlyDecoder::DecodeVertexData(const PlyElement *vertex_element) {
         out_point_cloud_->attribute(att_id)->SetAttributeValue(
             AttributeValueIndex(i), &val[0]);
       }
+    } else {
+      return Status(Status::INVALID_PARAMETER,
+                    "rot properties must be float32 or quantized");
     }
   }
 
@@ -19,6 +19,7 @@
 
 #include "draco/core/decoder_buffer.h"
 #include "draco/core/status.h"
+#include "draco/core/status_or.h"
 #include "draco/draco_features.h"
 #include "draco/io/ply_reader.h"
 #include "draco/mesh/mesh.h"
@@ -43,6 +44,15 @@ class PlyDecoder {
   Status DecodeFromBuffer(DecoderBuffer *buffer, Mesh *out_mesh);
   Status DecodeFromBuffer(DecoderBuffer *buffer, PointCloud *out_point_cloud);
 
+  //! [YC] start: Single pass vertex decoding
+  // Point clouds stored as binary little-endian PLY files are decoded in a
+  // single pass that copies each vertex row straight into the attributes. By
+  // default DecodeFromFile() reads the vertex rows in fixed-size chunks. When
+  // |flag| is set the input file is memory-mapped instead (on platforms that
+  // support it).
+  void set_use_memory_mapping(bool flag) { use_memory_mapping_ = flag; }
+  //! [YC] end
+
  protected:
   Status DecodeInternal();
   DecoderBuffer *buffer() { return &buffer_; }
@@ -50,6 +60,13 @@ class PlyDecoder {
  private:
   Status DecodeFaceData(const PlyElement *face_element);
   Status DecodeVertexData(const PlyElement *vertex_element);
+  //! [YC] start: Single pass vertex decoding
+  // Both return false (and leave the point cloud untouched) when the input
+  // cannot be decoded in a single pass, in which case the caller falls back to
+  // the PlyReader based decoding.
+  StatusOr<bool> DecodeVertexRowsFromBuffer();
+  StatusOr<bool> DecodeVertexRowsFromFile(const std::string &file_name);
+  //! [YC] end
 
   template <typename DataTypeT>
   bool ReadPropertiesToAttribute(
@@ -62,6 +79,9 @@ class PlyDecoder {
   // always set but |out_mesh_| is optional.
   Mesh *out_mesh_;
   PointCloud *out_point_cloud_;
+  //! [YC] start: Single pass vertex decoding
+  bool use_memory_mapping_;
+  //! [YC] end
 };
 
 }  // namespace draco
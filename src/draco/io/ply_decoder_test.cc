@@ -91,4 +91,35 @@ TEST_F(PlyDecoderTest, TestPlyDecodingAll) {
   test_decoding("delim_test.ply");
 }
 
+//! [YC] start: Single pass vertex decoding
+TEST_F(PlyDecoderTest, TestSinglePassMatchesPlyReader) {
+  // Point clouds are decoded in a single pass, both when read in chunks and
+  // when memory-mapped. Meshes still go through the PlyReader, and the file has
+  // no faces so nothing gets deduplicated.
+  const std::string file_name = "point_cloud_test_pos_norm.ply";
+  const std::unique_ptr<Mesh> mesh(DecodePly<Mesh>(file_name));
+  ASSERT_NE(mesh, nullptr);
+  for (const bool use_memory_mapping : {false, true}) {
+    PlyDecoder decoder;
+    decoder.set_use_memory_mapping(use_memory_mapping);
+    PointCloud pc;
+    DRACO_ASSERT_OK(
+        decoder.DecodeFromFile(GetTestFileFullPath(file_name), &pc));
+    ASSERT_EQ(pc.num_points(), mesh->num_points());
+    ASSERT_EQ(pc.num_attributes(), mesh->num_attributes());
+    for (int i = 0; i < pc.num_attributes(); ++i) {
+      const PointAttribute *const att = pc.attribute(i);
+      const PointAttribute *const mesh_att = mesh->attribute(i);
+      ASSERT_EQ(att->attribute_type(), mesh_att->attribute_type());
+      ASSERT_EQ(att->data_type(), mesh_att->data_type());
+      ASSERT_EQ(att->num_components(), mesh_att->num_components());
+      ASSERT_EQ(att->buffer()->data_size(), mesh_att->buffer()->data_size());
+      ASSERT_EQ(memcmp(att->buffer()->data(), mesh_att->buffer()->data(),
+                       att->buffer()->data_size()),
+                0);
+    }
+  }
+}
+//! [YC] end
+
 }  // namespace draco
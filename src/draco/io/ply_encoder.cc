@@ -14,16 +14,62 @@
 //
 #include "draco/io/ply_encoder.h"
 
+#include <cstring>
+#include <iomanip>
+#include <limits>
 #include <memory>
 #include <sstream>
 
+#include "draco/attributes/attribute_quantization_transform.h"
+#include "draco/attributes/attribute_codebook_transform.h"  // [YC] add: vector quantization
+#include "draco/attributes/attribute_quaternion_transform.h"  // [YC] add: quaternion codec
+#include "draco/compression/attributes/quaternion_compression_utils.h"  // [YC] add: quaternion codec
 #include "draco/io/file_writer_factory.h"
 #include "draco/io/file_writer_interface.h"
 
 namespace draco {
 
+//! [YC] start: Compact 3DGS output
+namespace {
+
+// Converts |value| to the bits of an IEEE half float, rounding to nearest even.
+// Values above the half range become infinity and NaNs stay NaNs.
+uint16_t FloatToHalf(float value) {
+  uint32_t bits;
+  memcpy(&bits, &value, sizeof(bits));
+  const uint32_t sign = bits & 0x80000000u;
+  bits ^= sign;
+  uint16_t half;
+  if (bits >= (127u + 16u) << 23) {
+    // Infinity or NaN, 65536 and above.
+    half = bits > 0x7f800000u ? 0x7e00 : 0x7c00;
+  } else if (bits < 113u << 23) {
+    // Subnormal half or zero. Adding the magic value aligns the 10 mantissa
+    // bits at the bottom of the float, the float addition does the rounding.
+    const uint32_t magic_bits = ((127u - 15u) + (23u - 10u) + 1u) << 23;
+    float magic, abs_value;
+    memcpy(&magic, &magic_bits, sizeof(magic));
+    memcpy(&abs_value, &bits, sizeof(abs_value));
+    abs_value += magic;
+    memcpy(&bits, &abs_value, sizeof(bits));
+    half = static_cast<uint16_t>(bits - magic_bits);
+  } else {
+    // Rebias the exponent and round the 13 dropped mantissa bits.
+    const uint32_t mantissa_odd = (bits >> 13) & 1;
+    bits += (static_cast<uint32_t>(15 - 127) << 23) + 0xfff + mantissa_odd;
+    half = static_cast<uint16_t>(bits >> 13);
+  }
+  return half | static_cast<uint16_t>(sign >> 16);
+}
+
+}  // namespace
+//! [YC] end
+
 PlyEncoder::PlyEncoder()
-    : out_buffer_(nullptr), in_point_cloud_(nullptr), in_mesh_(nullptr) {}
+    : out_buffer_(nullptr),
+      in_point_cloud_(nullptr),
+      in_mesh_(nullptr),
+      gaussian_precision_(GAUSSIAN_PRECISION_FLOAT32) {}
 
 bool PlyEncoder::EncodeToFile(const PointCloud &pc,
                               const std::string &file_name) {
@@ -152,44 +198,89 @@ bool PlyEncoder::EncodeInternal() {
   //         << std::endl;
   //   }
   // }
+  // Attributes decoded without their quantization transform are written as
+  // the quantized values (int32 from the sequential decoders, uint32 from the
+  // kd-tree decoder).
+  quantization_bits_.assign(in_point_cloud_->num_attributes(), -1);
+  if (gaussian_precision_ == GAUSSIAN_PRECISION_QUANTIZED) {
+    for (int att_id = 0; att_id < in_point_cloud_->num_attributes();
+         ++att_id) {
+      const PointAttribute *const att = in_point_cloud_->attribute(att_id);
+      AttributeQuantizationTransform transform;
+      if ((att->data_type() == DT_INT32 || att->data_type() == DT_UINT32) &&
+          transform.InitFromAttribute(*att)) {
+        quantization_bits_[att_id] = transform.quantization_bits();
+      }
+    }
+  }
+  // Smallest three quaternions have no per-component dequantization, they
+  // are written as floats.
+  quaternion_bits_.assign(in_point_cloud_->num_attributes(), -1);
+  for (int att_id = 0; att_id < in_point_cloud_->num_attributes(); ++att_id) {
+    const PointAttribute *const att = in_point_cloud_->attribute(att_id);
+    AttributeQuaternionTransform transform;
+    if ((att->data_type() == DT_INT32 || att->data_type() == DT_UINT32) &&
+        att->num_components() == QuaternionToolBox::kNumComponents &&
+        transform.InitFromAttribute(*att)) {
+      quaternion_bits_[att_id] = transform.quantization_bits();
+    }
+  }
+  // Codebook indices are written as the float values of their entries.
+  codebooks_.assign(in_point_cloud_->num_attributes(), std::vector<float>());
+  codebook_num_components_.assign(in_point_cloud_->num_attributes(), 0);
+  for (int att_id = 0; att_id < in_point_cloud_->num_attributes(); ++att_id) {
+    const PointAttribute *const att = in_point_cloud_->attribute(att_id);
+    AttributeCodebookTransform transform;
+    if ((att->data_type() == DT_INT32 || att->data_type() == DT_UINT32) &&
+        att->num_components() == 1 && transform.InitFromAttribute(*att)) {
+      codebooks_[att_id] = transform.codebook();
+      codebook_num_components_[att_id] = transform.num_components();
+    }
+  }
   if (f_rest_1_att_id >= 0) {
+    out << GetGaussianComment(f_rest_1_att_id, "f_rest_0");
     for(int i = 0; i < 9; i++){
-      out << "property " << GetAttributeDataType(f_rest_1_att_id) << " f_rest_" << i
+      out << "property " << GetGaussianDataType(f_rest_1_att_id) << " f_rest_" << i
           << std::endl;
     }
   }
   if (f_rest_2_att_id >= 0) {
+    out << GetGaussianComment(f_rest_2_att_id, "f_rest_9");
     for(int i = 9; i < 24; i++){ // 24 = 9 + 15
-      out << "property " << GetAttributeDataType(f_rest_2_att_id) << " f_rest_" << i
+      out << "property " << GetGaussianDataType(f_rest_2_att_id) << " f_rest_" << i
           << std::endl;
     }
   }
   if (f_rest_3_att_id >= 0) {
+    out << GetGaussianComment(f_rest_3_att_id, "f_rest_24");
     for(int i = 24; i < 45; i++){ // 45 = 9 + 15 + 21
-      out << "property " << GetAttributeDataType(f_rest_3_att_id) << " f_rest_" << i
+      out << "property " << GetGaussianDataType(f_rest_3_att_id) << " f_rest_" << i
           << std::endl;
     }
   }
   if (opacity_att_id >= 0) {
-    out << "property " << GetAttributeDataType(opacity_att_id) << " opacity"
+    out << GetGaussianComment(opacity_att_id, "opacity");
+    out << "property " << GetGaussianDataType(opacity_att_id) << " opacity"
         << std::endl;
   }
   if (scale_att_id >= 0) {
-    out << "property " << GetAttributeDataType(scale_att_id) << " scale_0"
+    out << GetGaussianComment(scale_att_id, "scale_0");
+    out << "property " << GetGaussianDataType(scale_att_id) << " scale_0"
         << std::endl;
-    out << "property " << GetAttributeDataType(scale_att_id) << " scale_1"
+    out << "property " << GetGaussianDataType(scale_att_id) << " scale_1"
         << std::endl;
-    out << "property " << GetAttributeDataType(scale_att_id) << " scale_2"
+    out << "property " << GetGaussianDataType(scale_att_id) << " scale_2"
         << std::endl;
   }
   if (rot_att_id >= 0) {
-    out << "property " << GetAttributeDataType(rot_att_id) << " rot_0"
+    out << GetGaussianComment(rot_att_id, "rot_0");
+    out << "property " << GetGaussianDataType(rot_att_id) << " rot_0"
         << std::endl;
-    out << "property " << GetAttributeDataType(rot_att_id) << " rot_1"
+    out << "property " << GetGaussianDataType(rot_att_id) << " rot_1"
         << std::endl;
-    out << "property " << GetAttributeDataType(rot_att_id) << " rot_2"
+    out << "property " << GetGaussianDataType(rot_att_id) << " rot_2"
         << std::endl;
-    out << "property " << GetAttributeDataType(rot_att_id) << " rot_3"
+    out << "property " << GetGaussianDataType(rot_att_id) << " rot_3"
         << std::endl;
   }
   //! [YC] end
@@ -250,39 +341,27 @@ bool PlyEncoder::EncodeInternal() {
     // }
     if (f_rest_1_att_id >= 0) {
       // printf("[YC] f_rest_att_id\n"); // [YC] add: check print
-      const auto *const f_rest_1_att = in_point_cloud_->attribute(f_rest_1_att_id);
-      buffer()->Encode(f_rest_1_att->GetAddress(f_rest_1_att->mapped_index(v)),
-                       f_rest_1_att->byte_stride());
+      EncodeGaussianValue(f_rest_1_att_id, v);
     }
     if (f_rest_2_att_id >= 0) {
       // printf("[YC] f_rest_att_id\n"); // [YC] add: check print
-      const auto *const f_rest_2_att = in_point_cloud_->attribute(f_rest_2_att_id);
-      buffer()->Encode(f_rest_2_att->GetAddress(f_rest_2_att->mapped_index(v)),
-                       f_rest_2_att->byte_stride());
+      EncodeGaussianValue(f_rest_2_att_id, v);
     }
     if (f_rest_3_att_id >= 0) {
       // printf("[YC] f_rest_att_id\n"); // [YC] add: check print
-      const auto *const f_rest_3_att = in_point_cloud_->attribute(f_rest_3_att_id);
-      buffer()->Encode(f_rest_3_att->GetAddress(f_rest_3_att->mapped_index(v)),
-                       f_rest_3_att->byte_stride());
+      EncodeGaussianValue(f_rest_3_att_id, v);
     }
     if (opacity_att_id >= 0) {
       // printf("[YC] opacity_att_id\n"); // [YC] add: check print
-      const auto *const opacity_att = in_point_cloud_->attribute(opacity_att_id);
-      buffer()->Encode(opacity_att->GetAddress(opacity_att->mapped_index(v)),
-                       opacity_att->byte_stride());
+      EncodeGaussianValue(opacity_att_id, v);
     }
     if (scale_att_id >= 0) {
       // printf("[YC] scale_att_id\n"); // [YC] add: check print
-      const auto *const scale_att = in_point_cloud_->attribute(scale_att_id);
-      buffer()->Encode(scale_att->GetAddress(scale_att->mapped_index(v)),
-                       scale_att->byte_stride());
+      EncodeGaussianValue(scale_att_id, v);
     }
     if (rot_att_id >= 0) {
       // printf("[YC] rot_att_id\n"); // [YC] add: check print
-      const auto *const rot_att = in_point_cloud_->attribute(rot_att_id);
-      buffer()->Encode(rot_att->GetAddress(rot_att->mapped_index(v)),
-                       rot_att->byte_stride());
+      EncodeGaussianValue(rot_att_id, v);
     }
     //! [YC] end
   }
@@ -340,4 +419,83 @@ const char *PlyEncoder::GetAttributeDataType(int attribute) {
   return nullptr;
 }
 
+//! [YC] start: Compact 3DGS output
+const char *PlyEncoder::GetGaussianDataType(int attribute) {
+  if (quantization_bits_[attribute] > 0) {
+    return quantization_bits_[attribute] <= 16 ? "ushort" : "uint";
+  }
+  if (quaternion_bits_[attribute] > 0 || !codebooks_[attribute].empty()) {
+    return "float";
+  }
+  if (gaussian_precision_ == GAUSSIAN_PRECISION_HALF &&
+      in_point_cloud_->attribute(attribute)->data_type() == DT_FLOAT32) {
+    return "half";
+  }
+  return GetAttributeDataType(attribute);
+}
+
+std::string PlyEncoder::GetGaussianComment(int attribute,
+                                           const std::string &name) {
+  if (quantization_bits_[attribute] <= 0) {
+    return std::string();
+  }
+  AttributeQuantizationTransform transform;
+  transform.InitFromAttribute(*in_point_cloud_->attribute(attribute));
+  std::stringstream comment;
+  comment << std::setprecision(std::numeric_limits<float>::max_digits10);
+  comment << "comment quantized " << name << " "
+          << transform.min_values().size() << " "
+          << transform.quantization_bits() << " " << transform.range();
+  for (const float min_value : transform.min_values()) {
+    comment << " " << min_value;
+  }
+  comment << std::endl;
+  return comment.str();
+}
+
+void PlyEncoder::EncodeGaussianValue(int attribute, PointIndex v) {
+  const PointAttribute *const att = in_point_cloud_->attribute(attribute);
+  const uint8_t *const address = att->GetAddress(att->mapped_index(v));
+  const int num_components = att->num_components();
+  if (quaternion_bits_[attribute] > 0) {
+    QuaternionToolBox tool_box;
+    tool_box.SetQuantizationBits(quaternion_bits_[attribute]);
+    int32_t values[QuaternionToolBox::kNumComponents];
+    memcpy(values, address, sizeof(values));
+    float quaternion[4];
+    tool_box.QuantizedSmallestThreeToQuaternion(values, quaternion);
+    buffer()->Encode(quaternion, sizeof(quaternion));
+    return;
+  }
+  if (!codebooks_[attribute].empty()) {
+    const int entry_size = codebook_num_components_[attribute];
+    uint32_t index;
+    memcpy(&index, address, sizeof(index));
+    if (index * entry_size >= codebooks_[attribute].size()) {
+      index = 0;  // Invalid indices are rejected by the decoder.
+    }
+    buffer()->Encode(&codebooks_[attribute][index * entry_size],
+                     sizeof(float) * entry_size);
+    return;
+  }
+  if (quantization_bits_[attribute] > 0 && quantization_bits_[attribute] <= 16) {
+    for (int c = 0; c < num_components; ++c) {
+      uint32_t value;
+      memcpy(&value, address + c * sizeof(value), sizeof(value));
+      buffer()->Encode(static_cast<uint16_t>(value));
+    }
+  } else if (quantization_bits_[attribute] <= 0 &&
+             gaussian_precision_ == GAUSSIAN_PRECISION_HALF &&
+             att->data_type() == DT_FLOAT32) {
+    for (int c = 0; c < num_components; ++c) {
+      float value;
+      memcpy(&value, address + c * sizeof(value), sizeof(value));
+      buffer()->Encode(FloatToHalf(value));
+    }
+  } else {
+    buffer()->Encode(address, att->byte_stride());
+  }
+}
+//! [YC] end
+
 }  // namespace draco
@@ -15,6 +15,9 @@
 #ifndef DRACO_IO_PLY_ENCODER_H_
 #define DRACO_IO_PLY_ENCODER_H_
 
+#include <string>
+#include <vector>
+
 #include "draco/core/encoder_buffer.h"
 #include "draco/mesh/mesh.h"
 
@@ -35,6 +38,29 @@ class PlyEncoder {
   bool EncodeToBuffer(const PointCloud &pc, EncoderBuffer *out_buffer);
   bool EncodeToBuffer(const Mesh &mesh, EncoderBuffer *out_buffer);
 
+  //! [YC] start: Compact 3DGS output
+  // Precision of the F_REST_1..3, OPACITY, SCALE and ROT properties. Positions
+  // and the other attributes are always written as they were decoded.
+  enum GaussianPrecision {
+    // 32-bit floats (default).
+    GAUSSIAN_PRECISION_FLOAT32,
+    // 16-bit IEEE floats, written as "half" properties.
+    GAUSSIAN_PRECISION_HALF,
+    // The quantized values of attributes decoded without their attribute
+    // transform (Decoder::SetSkipAttributeTransform()), written as "ushort"
+    // (up to 16 bits) or "uint" properties. Every quantized attribute is
+    // preceded by a header line
+    //   comment quantized <first property> <num components> <bits> <range>
+    //       <min_0> ... <min_n-1>
+    // and a value is dequantized as min_c + q * range / (2^bits - 1).
+    // Attributes that are not quantized are written as 32-bit floats.
+    GAUSSIAN_PRECISION_QUANTIZED,
+  };
+  void SetGaussianPrecision(GaussianPrecision precision) {
+    gaussian_precision_ = precision;
+  }
+  //! [YC] end
+
  protected:
   bool EncodeInternal();
   EncoderBuffer *buffer() const { return out_buffer_; }
@@ -42,11 +68,38 @@ class PlyEncoder {
 
  private:
   const char *GetAttributeDataType(int attribute);
+  //! [YC] start: Compact 3DGS output
+  // Data type of the properties of the 3DGS attribute |attribute| and the
+  // comment line describing its quantization (if any) for the header.
+  const char *GetGaussianDataType(int attribute);
+  std::string GetGaussianComment(int attribute, const std::string &name);
+  // Writes the value of the 3DGS attribute |attribute| at point |v|.
+  void EncodeGaussianValue(int attribute, PointIndex v);
+  //! [YC] end
 
   EncoderBuffer *out_buffer_;
 
   const PointCloud *in_point_cloud_;
   const Mesh *in_mesh_;
+  //! [YC] start: Compact 3DGS output
+  GaussianPrecision gaussian_precision_;
+  // Quantization bits of the attributes written as quantized values, -1 for
+  // the other attributes.
+  std::vector<int> quantization_bits_;
+  //! [YC] end
+  //! [YC] start: Quaternion codec
+  // Quantization bits of the attributes decoded as smallest three
+  // quaternions, which are converted back to float quaternions, -1 for the
+  // other attributes.
+  std::vector<int> quaternion_bits_;
+  //! [YC] end
+  //! [YC] start: Vector quantization
+  // Codebooks of the attributes decoded as codebook indices, which are
+  // converted back to the float values of their entries, empty for the other
+  // attributes.
+  std::vector<std::vector<float>> codebooks_;
+  std::vector<int> codebook_num_components_;
+  //! [YC] end
 };
 
 }  // namespace draco
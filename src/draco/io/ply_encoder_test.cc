@@ -0,0 +1,221 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+#include "draco/io/ply_encoder.h"
+
+#include <cstring>
+#include <string>
+
+#include "draco/compression/decode.h"
+#include "draco/compression/encode.h"
+#include "draco/core/draco_test_base.h"
+#include "draco/core/draco_test_utils.h"
+#include "draco/io/ply_decoder.h"
+
+namespace draco {
+
+class PlyEncoderTest : public ::testing::Test {
+ protected:
+  void SetUp() override {
+    pc_ = ReadPointCloudFromTestFile("bun_zipper.ply");
+    ASSERT_NE(pc_, nullptr);
+    // Opacities of multiples of 1/8 are exact in half precision, the rotations
+    // are left unquantized by the Draco encoding.
+    AddAttribute(GeometryAttribute::OPACITY, 1, 0.125f);
+    AddAttribute(GeometryAttribute::ROT, 4, 0.1f);
+  }
+
+  void AddAttribute(GeometryAttribute::Type type, int num_components,
+                    float step) {
+    GeometryAttribute ga;
+    ga.Init(type, nullptr, num_components, DT_FLOAT32, false,
+            sizeof(float) * num_components, 0);
+    PointAttribute *const att =
+        pc_->attribute(pc_->AddAttribute(ga, true, pc_->num_points()));
+    std::vector<float> value(num_components);
+    for (PointIndex pi(0); pi < pc_->num_points(); ++pi) {
+      for (int c = 0; c < num_components; ++c) {
+        value[c] = step * ((pi.value() + c) % 16);
+      }
+      att->SetAttributeValue(AttributeValueIndex(pi.value()), value.data());
+    }
+  }
+
+  static std::string Encode(const PointCloud &pc,
+                            PlyEncoder::GaussianPrecision precision) {
+    PlyEncoder encoder;
+    encoder.SetGaussianPrecision(precision);
+    EncoderBuffer buffer;
+    EXPECT_TRUE(encoder.EncodeToBuffer(pc, &buffer));
+    return std::string(buffer.data(), buffer.size());
+  }
+
+  std::unique_ptr<PointCloud> pc_;
+};
+
+TEST_F(PlyEncoderTest, TestHalfPrecision) {
+  const std::string ply_float =
+      Encode(*pc_, PlyEncoder::GAUSSIAN_PRECISION_FLOAT32);
+  const std::string ply_half = Encode(*pc_, PlyEncoder::GAUSSIAN_PRECISION_HALF);
+  ASSERT_NE(ply_half.find("property float x\n"), std::string::npos);
+  ASSERT_NE(ply_half.find("property half opacity\n"), std::string::npos);
+  ASSERT_NE(ply_half.find("property half rot_3\n"), std::string::npos);
+  // Five properties per point are two bytes shorter (the header is one byte
+  // shorter per property too).
+  ASSERT_EQ(ply_float.size() - ply_half.size(), pc_->num_points() * 5 * 2 + 5);
+
+  // The opacity of the fourth point is 0.375 (0x3600 in half precision).
+  const size_t data_offset = ply_half.find("end_header\n") + 11;
+  const size_t point_size = 3 * sizeof(float) + 5 * sizeof(uint16_t);
+  uint16_t opacity;
+  memcpy(&opacity, &ply_half[data_offset + 3 * point_size + 3 * sizeof(float)],
+         sizeof(opacity));
+  ASSERT_EQ(opacity, 0x3600);
+}
+
+TEST_F(PlyEncoderTest, TestHalfPrecisionRoundTrip) {
+  // A half precision PLY decodes to the half values as floats and can be
+  // encoded again.
+  const std::string ply_half = Encode(*pc_, PlyEncoder::GAUSSIAN_PRECISION_HALF);
+  DecoderBuffer in_buffer;
+  in_buffer.Init(ply_half.data(), ply_half.size());
+  PointCloud decoded;
+  PlyDecoder decoder;
+  DRACO_ASSERT_OK(decoder.DecodeFromBuffer(&in_buffer, &decoded));
+  ASSERT_EQ(decoded.num_points(), pc_->num_points());
+  for (const GeometryAttribute::Type type :
+       {GeometryAttribute::OPACITY, GeometryAttribute::ROT}) {
+    const PointAttribute *const att = pc_->GetNamedAttribute(type);
+    const PointAttribute *const decoded_att = decoded.GetNamedAttribute(type);
+    ASSERT_NE(decoded_att, nullptr);
+    ASSERT_EQ(decoded_att->data_type(), DT_FLOAT32);
+    ASSERT_EQ(decoded_att->num_components(), att->num_components());
+    float value[4], decoded_value[4];
+    for (PointIndex pi(0); pi < pc_->num_points(); ++pi) {
+      att->GetMappedValue(pi, value);
+      decoded_att->GetMappedValue(pi, decoded_value);
+      for (int c = 0; c < att->num_components(); ++c) {
+        // Half floats keep 11 significant bits.
+        ASSERT_NEAR(decoded_value[c], value[c], value[c] / 1024.f);
+      }
+    }
+  }
+  // 0.375 is exact in half precision.
+  float opacity;
+  decoded.GetNamedAttribute(GeometryAttribute::OPACITY)
+      ->GetMappedValue(PointIndex(3), &opacity);
+  ASSERT_EQ(opacity, 0.375f);
+
+  Encoder encoder;
+  encoder.SetEncodingMethod(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  EncoderBuffer buffer;
+  DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(decoded, &buffer));
+  const std::string ply_again =
+      Encode(decoded, PlyEncoder::GAUSSIAN_PRECISION_HALF);
+  ASSERT_EQ(ply_again, ply_half);
+}
+
+TEST_F(PlyEncoderTest, TestQuantizedPrecision) {
+  Encoder encoder;
+  encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 14);
+  encoder.SetAttributeQuantization(GeometryAttribute::OPACITY, 10);
+  encoder.SetEncodingMethod(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  EncoderBuffer buffer;
+  DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*pc_, &buffer));
+
+  Decoder decoder;
+  decoder.SetSkipAttributeTransform(GeometryAttribute::OPACITY);
+  DecoderBuffer in_buffer;
+  in_buffer.Init(buffer.data(), buffer.size());
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> decoded,
+                         decoder.DecodePointCloudFromBuffer(&in_buffer));
+
+  const std::string ply =
+      Encode(*decoded, PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED);
+  // The opacities go from 0 to 1.875 in 10 bits.
+  ASSERT_NE(ply.find("comment quantized opacity 1 10 1.875 0\n"),
+            std::string::npos);
+  ASSERT_NE(ply.find("property ushort opacity\n"), std::string::npos);
+  ASSERT_NE(ply.find("property float rot_0\n"), std::string::npos);
+  ASSERT_EQ(ply.find("comment quantized rot_0"), std::string::npos);
+}
+
+TEST_F(PlyEncoderTest, TestQuantizedPrecisionRoundTrip) {
+  // A quantized PLY decodes to the same values as a float decode of the Draco
+  // bitstream.
+  Encoder encoder;
+  encoder.SetAttributeQuantization(GeometryAttribute::POSITION, 14);
+  encoder.SetAttributeQuantization(GeometryAttribute::OPACITY, 10);
+  encoder.SetEncodingMethod(POINT_CLOUD_SEQUENTIAL_ENCODING);
+  EncoderBuffer buffer;
+  DRACO_ASSERT_OK(encoder.EncodePointCloudToBuffer(*pc_, &buffer));
+
+  DecoderBuffer in_buffer;
+  in_buffer.Init(buffer.data(), buffer.size());
+  Decoder float_decoder;
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> expected,
+                         float_decoder.DecodePointCloudFromBuffer(&in_buffer));
+  in_buffer.Init(buffer.data(), buffer.size());
+  Decoder decoder;
+  decoder.SetSkipAttributeTransform(GeometryAttribute::OPACITY);
+  DRACO_ASSIGN_OR_ASSERT(std::unique_ptr<PointCloud> quantized,
+                         decoder.DecodePointCloudFromBuffer(&in_buffer));
+  const std::string ply =
+      Encode(*quantized, PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED);
+
+  DecoderBuffer ply_buffer;
+  ply_buffer.Init(ply.data(), ply.size());
+  PointCloud decoded;
+  PlyDecoder ply_decoder;
+  DRACO_ASSERT_OK(ply_decoder.DecodeFromBuffer(&ply_buffer, &decoded));
+  ASSERT_EQ(decoded.num_points(), expected->num_points());
+  for (const GeometryAttribute::Type type :
+       {GeometryAttribute::OPACITY, GeometryAttribute::ROT}) {
+    const PointAttribute *const att = expected->GetNamedAttribute(type);
+    const PointAttribute *const decoded_att = decoded.GetNamedAttribute(type);
+    ASSERT_NE(decoded_att, nullptr);
+    ASSERT_EQ(decoded_att->data_type(), DT_FLOAT32);
+    ASSERT_EQ(decoded_att->num_components(), att->num_components());
+    float value[4], decoded_value[4];
+    for (PointIndex pi(0); pi < expected->num_points(); ++pi) {
+      att->GetMappedValue(pi, value);
+      decoded_att->GetMappedValue(pi, decoded_value);
+      for (int c = 0; c < att->num_components(); ++c) {
+        ASSERT_EQ(decoded_value[c], value[c]);
+      }
+    }
+  }
+}
+
+TEST_F(PlyEncoderTest, TestQuantizedPropertyWithoutComment) {
+  // Integer opacities without their quantization comment are rejected rather
+  // than dropped.
+  const std::string ply =
+      "ply\n"
+      "format ascii 1.0\n"
+      "element vertex 1\n"
+      "property float x\n"
+      "property float y\n"
+      "property float z\n"
+      "property ushort opacity\n"
+      "end_header\n"
+      "0 0 0 128\n";
+  DecoderBuffer ply_buffer;
+  ply_buffer.Init(ply.data(), ply.size());
+  PointCloud decoded;
+  PlyDecoder ply_decoder;
+  ASSERT_FALSE(ply_decoder.DecodeFromBuffer(&ply_buffer, &decoded).ok());
+}
+
+}  // namespace draco
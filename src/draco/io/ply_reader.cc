@@ -15,17 +15,89 @@
 #include "draco/io/ply_reader.h"
 
 #include <array>
+#include <cstring>
 #include <regex>
 
+#include "draco/core/quantization_utils.h"
 #include "draco/core/status.h"
 #include "draco/io/parser_utils.h"
 #include "draco/io/ply_property_writer.h"
 
 namespace draco {
 
+//! [YC] start: Half float properties
+namespace {
+
+// Converts the bits of an IEEE half float to a float (exact).
+float HalfToFloat(uint16_t half) {
+  const uint32_t sign = static_cast<uint32_t>(half & 0x8000) << 16;
+  const uint32_t exponent = (half >> 10) & 0x1f;
+  uint32_t mantissa = half & 0x3ff;
+  uint32_t bits;
+  if (exponent == 0x1f) {
+    bits = sign | 0x7f800000u | (mantissa << 13);  // Infinity or NaN.
+  } else if (exponent != 0) {
+    bits = sign | ((exponent + 112) << 23) | (mantissa << 13);
+  } else if (mantissa == 0) {
+    bits = sign;  // Zero.
+  } else {
+    // Subnormal half, normalized as a float.
+    uint32_t float_exponent = 113;
+    while ((mantissa & 0x400) == 0) {
+      mantissa <<= 1;
+      --float_exponent;
+    }
+    bits = sign | (float_exponent << 23) | ((mantissa & 0x3ff) << 13);
+  }
+  float value;
+  memcpy(&value, &bits, sizeof(value));
+  return value;
+}
+
+// Reads |num_values| half floats from |buffer| into |prop_data| as floats.
+void ReadHalfValues(DecoderBuffer *buffer, int64_t num_values,
+                    std::vector<uint8_t> *prop_data) {
+  for (int64_t i = 0; i < num_values; ++i) {
+    uint16_t half = 0;
+    buffer->Decode(&half);
+    const float value = HalfToFloat(half);
+    const uint8_t *const bytes = reinterpret_cast<const uint8_t *>(&value);
+    prop_data->insert(prop_data->end(), bytes, bytes + sizeof(value));
+  }
+}
+
+}  // namespace
+//! [YC] end
+
+//! [YC] start: Quantized properties
+// Reads |num_values| quantized integers of |prop| from |buffer| into its data
+// as dequantized floats, computed like AttributeQuantizationTransform does.
+void PlyReader::ReadQuantizedValues(DecoderBuffer *buffer, PlyProperty *prop,
+                                    int64_t num_values) {
+  Dequantizer dequantizer;
+  dequantizer.Init(prop->quantized_delta_);
+  for (int64_t i = 0; i < num_values; ++i) {
+    uint32_t quantized_value = 0;
+    buffer->Decode(&quantized_value,
+                   DataTypeLength(prop->quantized_data_type_));
+    const float value =
+        dequantizer.DequantizeFloat(static_cast<int32_t>(quantized_value)) +
+        prop->quantized_min_value_;
+    const uint8_t *const bytes = reinterpret_cast<const uint8_t *>(&value);
+    prop->data_.insert(prop->data_.end(), bytes, bytes + sizeof(value));
+  }
+}
+//! [YC] end
+
 PlyProperty::PlyProperty(const std::string &name, DataType data_type,
                          DataType list_type)
-    : name_(name), data_type_(data_type), list_data_type_(list_type) {
+    : name_(name),
+      data_type_(data_type),
+      list_data_type_(list_type),
+      is_half_(false),
+      quantized_data_type_(DT_INVALID),
+      quantized_min_value_(0.f),
+      quantized_delta_(0.f) {
   data_type_num_bytes_ = DataTypeLength(data_type);
   list_data_type_num_bytes_ = DataTypeLength(list_type);
 }
@@ -36,6 +108,16 @@ PlyElement::PlyElement(const std::string &name, int64_t num_entries)
 PlyReader::PlyReader() : format_(kLittleEndian) {}
 
 Status PlyReader::Read(DecoderBuffer *buffer) {
+  //! [YC] start: Header only parsing
+  DRACO_RETURN_IF_ERROR(ReadHeader(buffer));
+  if (!ParsePropertiesData(buffer)) {
+    return Status(Status::INVALID_PARAMETER, "Couldn't parse properties");
+  }
+  return OkStatus();
+}
+
+Status PlyReader::ReadHeader(DecoderBuffer *buffer) {
+  //! [YC] end
   std::string value;
   // The first line needs to by "ply".
   if (!parser::ParseString(buffer, &value) || value != "ply") {
@@ -66,11 +148,7 @@ Status PlyReader::Read(DecoderBuffer *buffer) {
   } else {
     format_ = kLittleEndian;
   }
-  DRACO_RETURN_IF_ERROR(ParseHeader(buffer));
-  if (!ParsePropertiesData(buffer)) {
-    return Status(Status::INVALID_PARAMETER, "Couldn't parse properties");
-  }
-  return OkStatus();
+  return ParseHeader(buffer);
 }
 
 Status PlyReader::ParseHeader(DecoderBuffer *buffer) {
@@ -86,8 +164,21 @@ Status PlyReader::ParseHeader(DecoderBuffer *buffer) {
     if (property_parsed) {
       continue;
     }
+    //! [YC] start: Quantized properties
+    DRACO_ASSIGN_OR_RETURN(bool comment_parsed,
+                           ParseQuantizationComment(buffer));
+    if (comment_parsed) {
+      continue;
+    }
+    //! [YC] end
     parser::SkipLine(buffer);
   }
+  //! [YC] start: Quantized properties
+  if (!quantized_components_.empty()) {
+    return Status(Status::INVALID_PARAMETER,
+                  "Quantization comment without its properties");
+  }
+  //! [YC] end
   return OkStatus();
 }
 
@@ -153,7 +244,11 @@ StatusOr<bool> PlyReader::ParseProperty(DecoderBuffer *buffer) {
   if (!property_search && !property_list_search) {
     return false;
   }
-  const DataType data_type = GetDataTypeFromString(data_type_str);
+  //! [YC] start: Half float properties
+  const bool is_half = data_type_str == "half" || data_type_str == "float16";
+  const DataType data_type =
+      is_half ? DT_FLOAT32 : GetDataTypeFromString(data_type_str);
+  //! [YC] end
   if (data_type == DT_INVALID) {
     return Status(Status::INVALID_PARAMETER, "Wrong property data type");
   }
@@ -164,14 +259,85 @@ StatusOr<bool> PlyReader::ParseProperty(DecoderBuffer *buffer) {
       return Status(Status::INVALID_PARAMETER, "Wrong property list type");
     }
   }
-  elements_.back().AddProperty(
-      PlyProperty(property_name, data_type, list_type));
+  PlyProperty property(property_name, data_type, list_type);
+  property.is_half_ = is_half;  // [YC] add: half float properties
+  //! [YC] start: Quantized properties
+  if (!quantized_components_.empty()) {
+    if (!quantized_property_name_.empty() &&
+        quantized_property_name_ != property_name) {
+      return Status(Status::INVALID_PARAMETER,
+                    "Quantization comment does not precede property " +
+                        quantized_property_name_);
+    }
+    if (property_list_search ||
+        (data_type != DT_UINT8 && data_type != DT_UINT16 &&
+         data_type != DT_UINT32)) {
+      return Status(Status::INVALID_PARAMETER,
+                    "Quantized property " + property_name +
+                        " must be an unsigned integer");
+    }
+    property = PlyProperty(property_name, DT_FLOAT32, DT_INVALID);
+    property.quantized_data_type_ = data_type;
+    property.quantized_min_value_ = quantized_components_.front().first;
+    property.quantized_delta_ = quantized_components_.front().second;
+    quantized_components_.erase(quantized_components_.begin());
+    quantized_property_name_.clear();
+  }
+  //! [YC] end
+  elements_.back().AddProperty(property);
+  *buffer = line_buffer;
+  return true;
+}
+
+//! [YC] start: Quantized properties
+StatusOr<bool> PlyReader::ParseQuantizationComment(DecoderBuffer *buffer) {
+  DecoderBuffer line_buffer(*buffer);
+  std::string line;
+  parser::ParseLine(&line_buffer, &line);
+  const std::vector<std::string> words = SplitWords(line);
+  if (words.size() < 2 || words[0] != "comment" || words[1] != "quantized") {
+    return false;
+  }
+  if (!quantized_components_.empty()) {
+    return Status(Status::INVALID_PARAMETER,
+                  "Quantization comment without its properties");
+  }
+  const int num_components =
+      words.size() >= 6 ? strtol(words[3].c_str(), nullptr, 10) : 0;
+  const int quantization_bits =
+      words.size() >= 6 ? strtol(words[4].c_str(), nullptr, 10) : 0;
+  // The same limits as AttributeQuantizationTransform::IsQuantizationValid().
+  if (num_components < 1 || quantization_bits < 1 || quantization_bits > 30 ||
+      words.size() != 6 + static_cast<size_t>(num_components)) {
+    return Status(Status::INVALID_PARAMETER, "Invalid quantization comment");
+  }
+  const float range = strtof(words[5].c_str(), nullptr);
+  const int32_t max_quantized_value =
+      (1u << static_cast<uint32_t>(quantization_bits)) - 1;
+  Dequantizer dequantizer;
+  dequantizer.Init(range, max_quantized_value);
+  // The delta of one quantized step, as computed by the Dequantizer.
+  const float delta = dequantizer.DequantizeFloat(1);
+  quantized_property_name_ = words[2];
+  for (int c = 0; c < num_components; ++c) {
+    quantized_components_.push_back(
+        std::make_pair(strtof(words[6 + c].c_str(), nullptr), delta));
+  }
   *buffer = line_buffer;
   return true;
 }
+//! [YC] end
 
 bool PlyReader::ParsePropertiesData(DecoderBuffer *buffer) {
   for (int i = 0; i < static_cast<int>(elements_.size()); ++i) {
+    //! [YC] start: Reserve here instead of in PlyElement::AddProperty
+    for (int p = 0; p < elements_[i].num_properties(); ++p) {
+      PlyProperty &prop = elements_[i].property(p);
+      if (!prop.is_list()) {
+        prop.ReserveData(elements_[i].num_entries());
+      }
+    }
+    //! [YC] end
     if (format_ == kLittleEndian) {
       if (!ParseElementData(buffer, i)) {
         return false;
@@ -199,12 +365,22 @@ bool PlyReader::ParseElementData(DecoderBuffer *buffer, int element_index) {
                                   prop.data_type_num_bytes_);
         // Store the number of entries.
         prop.list_data_.push_back(num_entries);
+        //! [YC] start: Half float properties
+        if (prop.is_half()) {
+          ReadHalfValues(buffer, num_entries, &prop.data_);
+          continue;
+        }
+        //! [YC] end
         // Read and store the actual property data
         const int64_t num_bytes_to_read =
             prop.data_type_num_bytes() * num_entries;
         prop.data_.insert(prop.data_.end(), buffer->data_head(),
                           buffer->data_head() + num_bytes_to_read);
         buffer->Advance(num_bytes_to_read);
+      } else if (prop.is_half()) {
+        ReadHalfValues(buffer, 1, &prop.data_);  // [YC] add: half floats
+      } else if (prop.is_quantized()) {
+        ReadQuantizedValues(buffer, &prop, 1);  // [YC] add: quantized values
       } else {
         // Non-list property
         prop.data_.insert(prop.data_.end(), buffer->data_head(),
@@ -240,6 +416,19 @@ bool PlyReader::ParseElementDataAscii(DecoderBuffer *buffer,
       // Read and store the actual property data.
       for (int v = 0; v < num_entries; ++v) {
         parser::SkipWhitespace(buffer);
+        //! [YC] start: Quantized properties
+        if (prop.is_quantized()) {
+          int32_t val;
+          if (!parser::ParseSignedInt(buffer, &val)) {
+            return false;
+          }
+          Dequantizer dequantizer;
+          dequantizer.Init(prop.quantized_delta_);
+          prop_writer.PushBackValue(dequantizer.DequantizeFloat(val) +
+                                    prop.quantized_min_value_);
+          continue;
+        }
+        //! [YC] end
         if (prop.data_type() == DT_FLOAT32 || prop.data_type() == DT_FLOAT64) {
           float val;
           if (!parser::ParseFloat(buffer, &val)) {
@@ -22,6 +22,7 @@
 #define DRACO_IO_PLY_READER_H_
 
 #include <map>
+#include <utility>
 #include <vector>
 
 #include "draco/core/decoder_buffer.h"
@@ -63,6 +64,16 @@ class PlyProperty {
   int data_type_num_bytes() const { return data_type_num_bytes_; }
   DataType list_data_type() const { return list_data_type_; }
   int list_data_type_num_bytes() const { return list_data_type_num_bytes_; }
+  //! [YC] start: Half float properties
+  // Half float ("half" or "float16") properties are stored as DT_FLOAT32 values
+  // converted when the file is parsed.
+  bool is_half() const { return is_half_; }
+  //! [YC] end
+  //! [YC] start: Quantized properties
+  // Integer properties described by a "comment quantized" header line are
+  // stored as DT_FLOAT32 values dequantized when the file is parsed.
+  bool is_quantized() const { return quantized_data_type_ != DT_INVALID; }
+  //! [YC] end
 
  private:
   std::string name_;
@@ -73,6 +84,13 @@ class PlyProperty {
   int data_type_num_bytes_;
   DataType list_data_type_;
   int list_data_type_num_bytes_;
+  bool is_half_;  // [YC] add: half float properties
+  //! [YC] start: Quantized properties
+  // Type of the stored quantized integers, and their dequantization.
+  DataType quantized_data_type_;
+  float quantized_min_value_;
+  float quantized_delta_;
+  //! [YC] end
 };
 
 // A single PLY element such as "vertex" or "face". Each element can store
@@ -80,13 +98,13 @@ class PlyProperty {
 class PlyElement {
  public:
   PlyElement(const std::string &name, int64_t num_entries);
+  //! [YC] start: Property data is reserved when it is parsed, so that reading
+  //! only the header does not allocate the element data.
   void AddProperty(const PlyProperty &prop) {
     property_index_[prop.name()] = static_cast<int>(properties_.size());
     properties_.emplace_back(prop);
-    if (!properties_.back().is_list()) {
-      properties_.back().ReserveData(static_cast<int>(num_entries_));
-    }
   }
+  //! [YC] end
 
   const PlyProperty *GetPropertyByName(const std::string &name) const {
     const auto it = property_index_.find(name);
@@ -116,6 +134,12 @@ class PlyReader {
  public:
   PlyReader();
   Status Read(DecoderBuffer *buffer);
+  //! [YC] start: Header only parsing
+  // Parses the header of the PLY file without reading any element data. On
+  // success |buffer| is positioned at the start of the element data.
+  Status ReadHeader(DecoderBuffer *buffer);
+  bool is_ascii() const { return format_ == kAscii; }
+  //! [YC] end
 
   const PlyElement *GetElementByName(const std::string &name) const {
     const auto it = element_index_.find(name);
@@ -137,6 +161,14 @@ class PlyReader {
   StatusOr<bool> ParseEndHeader(DecoderBuffer *buffer);
   bool ParseElement(DecoderBuffer *buffer);
   StatusOr<bool> ParseProperty(DecoderBuffer *buffer);
+  //! [YC] start: Quantized properties
+  // Parses a "comment quantized <first property> <num components> <bits>
+  // <range> <min_0> ... <min_n-1>" line written by the PlyEncoder. It applies
+  // to the next <num components> properties.
+  StatusOr<bool> ParseQuantizationComment(DecoderBuffer *buffer);
+  void ReadQuantizedValues(DecoderBuffer *buffer, PlyProperty *prop,
+                           int64_t num_values);
+  //! [YC] end
   bool ParsePropertiesData(DecoderBuffer *buffer);
   bool ParseElementData(DecoderBuffer *buffer, int element_index);
   bool ParseElementDataAscii(DecoderBuffer *buffer, int element_index);
@@ -148,6 +180,12 @@ class PlyReader {
   std::vector<PlyElement> elements_;
   std::map<std::string, int> element_index_;
   Format format_;
+  //! [YC] start: Quantized properties
+  // Name of the first property of the last "comment quantized" line, and the
+  // (min value, delta) of the properties it still applies to.
+  std::string quantized_property_name_;
+  std::vector<std::pair<float, float>> quantized_components_;
+  //! [YC] end
 };
 
 }  // namespace draco
@@ -23,6 +23,11 @@ namespace draco {
 
 StatusOr<std::unique_ptr<PointCloud>> ReadPointCloudFromFile(
     const std::string &file_name) {
+  return ReadPointCloudFromFile(file_name, Options());
+}
+
+StatusOr<std::unique_ptr<PointCloud>> ReadPointCloudFromFile(
+    const std::string &file_name, const Options &options) {
   std::unique_ptr<PointCloud> pc(new PointCloud());
   // Analyze file extension.
   const std::string extension = parser::ToLower(
@@ -40,6 +45,9 @@ StatusOr<std::unique_ptr<PointCloud>> ReadPointCloudFromFile(
   if (extension == ".ply") {
     // Wavefront PLY file format.
     PlyDecoder ply_decoder;
+    //! [YC] start: Single pass vertex decoding
+    ply_decoder.set_use_memory_mapping(options.GetBool("use_memory_mapping"));
+    //! [YC] end
     DRACO_RETURN_IF_ERROR(ply_decoder.DecodeFromFile(file_name, pc.get()));
     return std::move(pc);
   }
@@ -18,6 +18,7 @@
 #include "draco/compression/config/compression_shared.h"
 #include "draco/compression/decode.h"
 #include "draco/compression/expert_encode.h"
+#include "draco/core/options.h"
 
 namespace draco {
 
@@ -84,6 +85,14 @@ InStreamT &ReadPointCloudFromStream(std::unique_ptr<PointCloud> *point_cloud,
 StatusOr<std::unique_ptr<PointCloud>> ReadPointCloudFromFile(
     const std::string &file_name);
 
+//! [YC] start: Single pass vertex decoding
+// Reads a point cloud from a file with the given |options|. Supported options:
+//   use_memory_mapping=<bool> - memory-maps .ply inputs instead of reading
+//                               them in chunks.
+StatusOr<std::unique_ptr<PointCloud>> ReadPointCloudFromFile(
+    const std::string &file_name, const Options &options);
+//! [YC] end
+
 }  // namespace draco
 
 #endif  // DRACO_IO_POINT_CLOUD_IO_H_
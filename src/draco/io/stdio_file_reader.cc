@@ -81,6 +81,15 @@ bool StdioFileReader::ReadFileToBuffer(std::vector<uint8_t> *buffer) {
   return fread(buffer->data(), 1, file_size, file_) == file_size;
 }
 
+//! [YC] start: Chunked reading
+bool StdioFileReader::ReadChunk(void *data, size_t size) {
+  if (data == nullptr) {
+    return false;
+  }
+  return fread(data, 1, size, file_) == size;
+}
+//! [YC] end
+
 size_t StdioFileReader::GetFileSize() {
   if (fseek(file_, SEEK_SET, SEEK_END) != 0) {
     FILEREADER_LOG_ERROR("Seek to EoF failed");
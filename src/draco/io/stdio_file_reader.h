@@ -36,6 +36,11 @@ class StdioFileReader : public FileReaderInterface {
   // Returns the size of the file.
   size_t GetFileSize() override;
 
+  //! [YC] start: Chunked reading
+  // Reads the next |size| bytes of the file into |data| and returns true.
+  bool ReadChunk(void *data, size_t size) override;
+  //! [YC] end
+
  private:
   StdioFileReader(FILE *file) : file_(file) {}
 
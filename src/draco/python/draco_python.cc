@@ -0,0 +1,461 @@
+// Copyright 2024 The Draco Authors.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+//
+// Python module "pydraco" giving in-process access to the Draco point cloud
+// encoder and decoder, so that a scene can be parsed once and encoded at many
+// quantization settings without going through draco_encoder/draco_decoder.
+//
+// Example:
+//   pc = pydraco.read_point_cloud("point_cloud.ply")
+//   data = pydraco.encode(pc, qp=16, qfd=12, cl=7)
+//   out = pydraco.decode(data)
+//   rot = out.attribute(pydraco.ROT)  # numpy view, no copy
+//
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "draco/compression/decode.h"
+#include "draco/compression/encode.h"
+#include "draco/compression/expert_encode.h"
+#include "draco/io/file_utils.h"
+#include "draco/io/ply_encoder.h"
+#include "draco/io/point_cloud_io.h"
+
+namespace py = pybind11;
+
+namespace draco {
+namespace python {
+
+namespace {
+
+// Quantization settings, named after the draco_encoder flags. As in
+// draco_encoder, negative bits remove TEX_COORD, NORMAL, GENERIC and
+// F_REST_1..3 attributes and leave the other attributes unquantized, 0 keeps
+// an attribute lossless.
+struct EncodeOptions {
+  int qp = 16;
+  int qt = 10;
+  int qn = 16;
+  int qg = 8;
+  int qfd = 16;
+  int qfr1 = 16;
+  int qfr2 = 16;
+  int qfr3 = 16;
+  int qo = 16;
+  int qs = 16;
+  int qr = 16;
+  int cl = 7;
+  int threads = 1;
+  bool qr_quaternion = false;
+  int vq_frest = 0;
+  int vq_iterations = 10;
+  std::string point_order = "input";
+  bool delimit_streams = false;
+  int rans_streams = 1;
+};
+
+PointOrder ParsePointOrder(const std::string &order) {
+  if (order == "input") {
+    return POINT_ORDER_INPUT;
+  }
+  if (order == "morton") {
+    return POINT_ORDER_MORTON;
+  }
+  if (order == "hilbert") {
+    return POINT_ORDER_HILBERT;
+  }
+  throw std::invalid_argument("Unknown point order " + order + ".");
+}
+
+// Attributes that can be removed or quantized, in draco_encoder order.
+std::vector<std::pair<GeometryAttribute::Type, int>> QuantizationBits(
+    const EncodeOptions &options) {
+  return {{GeometryAttribute::POSITION, options.qp},
+          {GeometryAttribute::TEX_COORD, options.qt},
+          {GeometryAttribute::NORMAL, options.qn},
+          {GeometryAttribute::GENERIC, options.qg},
+          {GeometryAttribute::F_DC, options.qfd},
+          {GeometryAttribute::F_REST_1, options.qfr1},
+          {GeometryAttribute::F_REST_2, options.qfr2},
+          {GeometryAttribute::F_REST_3, options.qfr3},
+          {GeometryAttribute::OPACITY, options.qo},
+          {GeometryAttribute::SCALE, options.qs},
+          {GeometryAttribute::ROT, options.qr}};
+}
+
+// Whether negative bits remove attributes of |type|, see
+// DeleteSkippedAttributes() in draco_encoder.cc.
+bool IsRemovable(GeometryAttribute::Type type) {
+  switch (type) {
+    case GeometryAttribute::TEX_COORD:
+    case GeometryAttribute::NORMAL:
+    case GeometryAttribute::GENERIC:
+    case GeometryAttribute::F_REST_1:
+    case GeometryAttribute::F_REST_2:
+    case GeometryAttribute::F_REST_3:
+      return true;
+    default:
+      return false;
+  }
+}
+
+void ThrowIfError(const Status &status) {
+  if (!status.ok()) {
+    throw std::runtime_error(status.error_msg_string());
+  }
+}
+
+py::dtype DataTypeToDtype(DataType data_type) {
+  switch (data_type) {
+    case DT_INT8:
+      return py::dtype::of<int8_t>();
+    case DT_UINT8:
+      return py::dtype::of<uint8_t>();
+    case DT_INT16:
+      return py::dtype::of<int16_t>();
+    case DT_UINT16:
+      return py::dtype::of<uint16_t>();
+    case DT_INT32:
+      return py::dtype::of<int32_t>();
+    case DT_UINT32:
+      return py::dtype::of<uint32_t>();
+    case DT_INT64:
+      return py::dtype::of<int64_t>();
+    case DT_UINT64:
+      return py::dtype::of<uint64_t>();
+    case DT_FLOAT32:
+      return py::dtype::of<float>();
+    case DT_FLOAT64:
+      return py::dtype::of<double>();
+    case DT_BOOL:
+      return py::dtype::of<bool>();
+    default:
+      throw std::runtime_error("Unsupported attribute data type.");
+  }
+}
+
+// Returns the values of |att| as a (num_points, num_components) array. When
+// the attribute storage is laid out point by point the array is a view over
+// it that keeps |owner| alive, otherwise the values are gathered into a copy.
+py::array AttributeToArray(const PointCloud &pc, const PointAttribute &att,
+                           py::handle owner) {
+  const py::dtype dtype = DataTypeToDtype(att.data_type());
+  const int64_t component_size = DataTypeLength(att.data_type());
+  const int64_t num_components = att.num_components();
+  const std::vector<py::ssize_t> shape = {pc.num_points(), num_components};
+  if (att.is_mapping_identity() && att.size() == pc.num_points()) {
+    const std::vector<py::ssize_t> strides = {att.byte_stride(),
+                                              component_size};
+    return py::array(dtype, shape, strides,
+                     att.GetAddress(AttributeValueIndex(0)), owner);
+  }
+  py::array out(dtype, shape);
+  uint8_t *const out_data = static_cast<uint8_t *>(out.mutable_data());
+  const int64_t value_size = component_size * num_components;
+  for (PointIndex i(0); i < pc.num_points(); ++i) {
+    att.GetMappedValue(i, out_data + i.value() * value_size);
+  }
+  return out;
+}
+
+std::unique_ptr<PointCloud> ReadPointCloud(const std::string &file_name) {
+  py::gil_scoped_release release;
+  StatusOr<std::unique_ptr<PointCloud>> maybe_pc =
+      ReadPointCloudFromFile(file_name);
+  if (!maybe_pc.ok()) {
+    py::gil_scoped_acquire acquire;
+    ThrowIfError(maybe_pc.status());
+  }
+  return std::move(maybe_pc).value();
+}
+
+py::object Encode(const PointCloud &pc, const EncodeOptions &options,
+                  bool return_stats) {
+  if (options.qp < 0) {
+    throw std::invalid_argument("Position attribute cannot be skipped.");
+  }
+  for (const auto &type_bits : QuantizationBits(options)) {
+    if (type_bits.second > 30) {
+      throw std::invalid_argument(
+          "Maximum number of supported quantization bits is 30.");
+    }
+  }
+  if (options.cl < 0 || options.cl > 10) {
+    throw std::invalid_argument("Compression level must be in [0, 10].");
+  }
+  if (options.vq_frest < 0) {
+    throw std::invalid_argument("The codebook size must not be negative.");
+  }
+  if (options.vq_iterations < 0) {
+    throw std::invalid_argument(
+        "The number of iterations must not be negative.");
+  }
+  if (options.rans_streams != 1 && options.rans_streams != 2 &&
+      options.rans_streams != 4 && options.rans_streams != 8) {
+    throw std::invalid_argument(
+        "The number of rANS streams must be 1, 2, 4 or 8.");
+  }
+  const PointOrder point_order = ParsePointOrder(options.point_order);
+
+  EncoderBuffer buffer;
+  EncodingStats stats;
+  {
+    py::gil_scoped_release release;
+    // Skipped attributes are deleted from a copy, |pc| is reused by the caller
+    // for the next setting. Like draco_encoder, the kept attributes keep their
+    // unique ids so that both write the same bytes.
+    const PointCloud *encoded_pc = &pc;
+    PointCloud pruned_pc;
+    std::vector<GeometryAttribute::Type> skipped_types;
+    for (const auto &type_bits : QuantizationBits(options)) {
+      if (type_bits.second < 0 && IsRemovable(type_bits.first) &&
+          pc.NumNamedAttributes(type_bits.first) > 0) {
+        skipped_types.push_back(type_bits.first);
+      }
+    }
+    if (!skipped_types.empty()) {
+      pruned_pc.set_num_points(pc.num_points());
+      for (int i = 0; i < pc.num_attributes(); ++i) {
+        std::unique_ptr<PointAttribute> att(new PointAttribute());
+        att->CopyFrom(*pc.attribute(i));
+        pruned_pc.AddAttribute(std::move(att));
+      }
+      for (const GeometryAttribute::Type type : skipped_types) {
+        while (pruned_pc.NumNamedAttributes(type) > 0) {
+          pruned_pc.DeleteAttribute(pruned_pc.GetNamedAttributeId(type, 0));
+        }
+      }
+#ifdef DRACO_ATTRIBUTE_INDICES_DEDUPLICATION_SUPPORTED
+      pruned_pc.DeduplicatePointIds();
+#endif
+      encoded_pc = &pruned_pc;
+    }
+
+    // Same option setup as draco_encoder.
+    Encoder encoder;
+    for (const auto &type_bits : QuantizationBits(options)) {
+      if (type_bits.second > 0) {
+        encoder.SetAttributeQuantization(type_bits.first, type_bits.second);
+      }
+    }
+    if (options.qr > 0 && options.qr_quaternion) {
+      encoder.SetAttributeQuaternionQuantization(GeometryAttribute::ROT,
+                                                 options.qr);
+    }
+    if (options.vq_frest > 0) {
+      for (const GeometryAttribute::Type type :
+           {GeometryAttribute::F_REST_1, GeometryAttribute::F_REST_2,
+            GeometryAttribute::F_REST_3}) {
+        encoder.SetAttributeCodebook(type, options.vq_frest,
+                                     options.vq_iterations);
+      }
+    }
+    const int speed = 10 - options.cl;
+    encoder.SetSpeedOptions(speed, speed);
+    encoder.SetNumThreads(options.threads);
+    encoder.SetDelimitAttributeStreams(options.delimit_streams);
+    encoder.SetPointOrder(point_order);
+    encoder.SetInterleavedRAnsStreams(options.rans_streams);
+    ExpertEncoder expert_encoder(*encoded_pc);
+    expert_encoder.Reset(encoder.CreateExpertEncoderOptions(*encoded_pc));
+    const Status status = expert_encoder.EncodeToBuffer(&buffer);
+    if (!status.ok()) {
+      py::gil_scoped_acquire acquire;
+      ThrowIfError(status);
+    }
+    stats = expert_encoder.encoding_stats();
+  }
+
+  py::bytes data(buffer.data(), buffer.size());
+  if (!return_stats) {
+    return std::move(data);
+  }
+  py::list attributes;
+  for (const AttributeEncodingStats &att : stats.attributes) {
+    py::dict entry;
+    entry["type"] = GeometryAttribute::TypeToString(att.attribute_type);
+    entry["encoded_size"] = att.encoded_size >= 0
+                                ? py::object(py::int_(att.encoded_size))
+                                : py::object(py::none());
+    entry["quantization_time_us"] = att.quantization_time_us;
+    entry["prediction_time_us"] = att.prediction_time_us;
+    entry["entropy_coding_time_us"] = att.entropy_coding_time_us;
+    attributes.append(entry);
+  }
+  py::dict stats_dict;
+  stats_dict["attributes_size"] = stats.attributes_size;
+  stats_dict["attributes"] = attributes;
+  return py::make_tuple(data, stats_dict);
+}
+
+std::unique_ptr<PointCloud> Decode(
+    const py::buffer &data, int threads,
+    const std::vector<GeometryAttribute::Type> &skip) {
+  const py::buffer_info info = data.request();
+  py::gil_scoped_release release;
+  DecoderBuffer buffer;
+  buffer.Init(static_cast<const char *>(info.ptr), info.size * info.itemsize);
+  Decoder decoder;
+  decoder.SetNumThreads(threads);
+  for (const GeometryAttribute::Type att_type : skip) {
+    decoder.SetSkipAttribute(att_type);
+  }
+  StatusOr<std::unique_ptr<PointCloud>> maybe_pc =
+      decoder.DecodePointCloudFromBuffer(&buffer);
+  if (!maybe_pc.ok()) {
+    py::gil_scoped_acquire acquire;
+    ThrowIfError(maybe_pc.status());
+  }
+  return std::move(maybe_pc).value();
+}
+
+void WritePly(const PointCloud &pc, const std::string &file_name) {
+  bool ok;
+  {
+    py::gil_scoped_release release;
+    PlyEncoder ply_encoder;
+    ok = ply_encoder.EncodeToFile(pc, file_name);
+  }
+  if (!ok) {
+    throw std::runtime_error("Failed to write " + file_name);
+  }
+}
+
+}  // namespace
+
+PYBIND11_MODULE(pydraco, m) {
+  m.doc() = "In-process Draco point cloud encoding and decoding.";
+
+  py::enum_<GeometryAttribute::Type>(m, "AttributeType")
+      .value("POSITION", GeometryAttribute::POSITION)
+      .value("NORMAL", GeometryAttribute::NORMAL)
+      .value("COLOR", GeometryAttribute::COLOR)
+      .value("TEX_COORD", GeometryAttribute::TEX_COORD)
+      .value("GENERIC", GeometryAttribute::GENERIC)
+      .value("F_DC", GeometryAttribute::F_DC)
+      .value("F_REST_1", GeometryAttribute::F_REST_1)
+      .value("F_REST_2", GeometryAttribute::F_REST_2)
+      .value("F_REST_3", GeometryAttribute::F_REST_3)
+      .value("OPACITY", GeometryAttribute::OPACITY)
+      .value("SCALE", GeometryAttribute::SCALE)
+      .value("ROT", GeometryAttribute::ROT)
+      .export_values();
+
+  py::class_<PointCloud>(m, "PointCloud")
+      .def_property_readonly("num_points", &PointCloud::num_points)
+      .def_property_readonly("num_attributes", &PointCloud::num_attributes)
+      .def_property_readonly(
+          "attribute_types",
+          [](const PointCloud &pc) {
+            std::vector<GeometryAttribute::Type> types;
+            for (int i = 0; i < pc.num_attributes(); ++i) {
+              types.push_back(pc.attribute(i)->attribute_type());
+            }
+            return types;
+          })
+      .def(
+          "attribute",
+          [](py::object self, GeometryAttribute::Type type) {
+            const PointCloud &pc = self.cast<const PointCloud &>();
+            const PointAttribute *const att = pc.GetNamedAttribute(type);
+            if (att == nullptr) {
+              throw py::key_error(GeometryAttribute::TypeToString(type));
+            }
+            return AttributeToArray(pc, *att, self);
+          },
+          py::arg("type"),
+          "Values of the first attribute of |type| as a (num_points, "
+          "num_components) array. The array shares memory with the point "
+          "cloud whenever possible.")
+      .def(
+          "attribute_by_id",
+          [](py::object self, int att_id) {
+            const PointCloud &pc = self.cast<const PointCloud &>();
+            if (att_id < 0 || att_id >= pc.num_attributes()) {
+              throw py::index_error("Invalid attribute id.");
+            }
+            return AttributeToArray(pc, *pc.attribute(att_id), self);
+          },
+          py::arg("att_id"));
+
+  m.def("read_point_cloud", &ReadPointCloud, py::arg("file_name"),
+        "Reads a point cloud from a .ply/.obj/.drc file.");
+
+  m.def(
+      "encode",
+      [](const PointCloud &pc, int qp, int qt, int qn, int qg, int qfd,
+         int qfr1, int qfr2, int qfr3, int qo, int qs, int qr, int cl,
+         int threads, bool qr_quaternion, int vq_frest, int vq_iterations,
+         const std::string &point_order, bool delimit_streams,
+         int rans_streams, bool return_stats) {
+        EncodeOptions options;
+        options.qp = qp;
+        options.qt = qt;
+        options.qn = qn;
+        options.qg = qg;
+        options.qfd = qfd;
+        options.qfr1 = qfr1;
+        options.qfr2 = qfr2;
+        options.qfr3 = qfr3;
+        options.qo = qo;
+        options.qs = qs;
+        options.qr = qr;
+        options.cl = cl;
+        options.threads = threads;
+        options.qr_quaternion = qr_quaternion;
+        options.vq_frest = vq_frest;
+        options.vq_iterations = vq_iterations;
+        options.point_order = point_order;
+        options.delimit_streams = delimit_streams;
+        options.rans_streams = rans_streams;
+        return Encode(pc, options, return_stats);
+      },
+      py::arg("pc"), py::kw_only(), py::arg("qp") = 16, py::arg("qt") = 10,
+      py::arg("qn") = 16, py::arg("qg") = 8, py::arg("qfd") = 16,
+      py::arg("qfr1") = 16, py::arg("qfr2") = 16, py::arg("qfr3") = 16,
+      py::arg("qo") = 16, py::arg("qs") = 16, py::arg("qr") = 16,
+      py::arg("cl") = 7, py::arg("threads") = 1,
+      py::arg("qr_quaternion") = false, py::arg("vq_frest") = 0,
+      py::arg("vq_iterations") = 10, py::arg("point_order") = "input",
+      py::arg("delimit_streams") = false, py::arg("rans_streams") = 1,
+      py::arg("return_stats") = false,
+      "Encodes |pc| with the draco_encoder settings of the same names and "
+      "returns the bitstream as bytes (and the encoding stats when "
+      "return_stats is set). Flags are True/False (e.g. qr_quaternion=True "
+      "for -qr_quaternion), vq_frest=0 disables the codebooks and "
+      "point_order is \"input\", \"morton\" or \"hilbert\". |pc| is not "
+      "modified. |threads| encodes independent attributes concurrently "
+      "without changing the output.");
+
+  m.def("decode", &Decode, py::arg("data"), py::kw_only(),
+        py::arg("threads") = 1,
+        py::arg("skip") = std::vector<GeometryAttribute::Type>(),
+        "Decodes a point cloud from a bytes-like object. |threads| "
+        "decodes the attribute streams of data encoded with "
+        "draco_encoder -delimit_streams concurrently, and otherwise only "
+        "dequantizes them concurrently; the output does not change. "
+        "Attributes of the types in |skip| (e.g. [F_REST_1, F_REST_2, "
+        "F_REST_3]) are left out and their data is not decoded.");
+
+  m.def("write_ply", &WritePly, py::arg("pc"), py::arg("file_name"),
+        "Writes |pc| as a binary PLY file, like draco_decoder.");
+}
+
+}  // namespace python
+}  // namespace draco
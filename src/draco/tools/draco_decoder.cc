@@ -12,9 +12,15 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 //
+#include <algorithm>
+#include <cfloat>
 #include <cinttypes>
+#include <cstdio>
+#include <cstdlib>
 
 #include "draco/compression/decode.h"
+#include "draco/compression/point_cloud/layered_point_cloud_decoder.h"
+#include "draco/compression/point_cloud/tiled_point_cloud_decoder.h"
 #include "draco/core/cycle_timer.h"
 #include "draco/io/file_utils.h"
 #include "draco/io/obj_encoder.h"
@@ -29,9 +35,33 @@ struct Options {
 
   std::string input;
   std::string output;
+  //! [YC] start: Machine readable metrics output
+  std::string metrics_json;
+  //! [YC] end
+  //! [YC] start: Parallel attribute decoding
+  int num_threads;
+  //! [YC] end
+  //! [YC] start: Spatially tiled point clouds
+  bool use_box;
+  draco::Vector3f box_min;
+  draco::Vector3f box_max;
+  //! [YC] end
+  //! [YC] start: SH-band layered point clouds
+  int max_layers;
+  //! [YC] end
+  //! [YC] start: Selective attribute decoding
+  std::vector<draco::GeometryAttribute::Type> skipped_attributes;
+  //! [YC] end
+  //! [YC] start: Compact 3DGS output
+  draco::PlyEncoder::GaussianPrecision precision;
+  //! [YC] end
 };
 
-Options::Options() {}
+Options::Options()
+    : num_threads(1),
+      use_box(false),
+      max_layers(-1),
+      precision(draco::PlyEncoder::GAUSSIAN_PRECISION_FLOAT32) {}
 
 void Usage() {
   printf("Usage: draco_decoder [options] -i input\n");
@@ -39,18 +69,147 @@ void Usage() {
   printf("Main options:\n");
   printf("  -h | -?               show help.\n");
   printf("  -o <output>           output file name.\n");
+  //! [YC] start: add args
+  printf(
+      "  -threads <value>      number of threads decoding the attributes "
+      "(default: 1, 0 uses\n"
+      "                        all cores). Files encoded with -delimit_streams "
+      "decode their\n"
+      "                        attribute streams concurrently, other files "
+      "only dequantize\n"
+      "                        concurrently. The output does not change.\n");
+  printf(
+      "  -box <min_x> <min_y> <min_z> <max_x> <max_y> <max_z>\n"
+      "                        decode only the tiles of a tiled point cloud "
+      "that\n"
+      "                        intersect the box (default: all tiles).\n");
+  printf(
+      "  -layers <value>       decode only the base layer and the first "
+      "<value> - 1 SH\n"
+      "                        bands of a layered point cloud (default: all "
+      "layers).\n");
+  printf(
+      "  -skip <types>         comma separated attribute types left out of "
+      "the output,\n"
+      "                        e.g. F_REST_1,F_REST_2,F_REST_3. Their data is "
+      "not decoded.\n");
+  printf(
+      "  -precision <value>    precision of the F_REST, OPACITY, SCALE and "
+      "ROT\n"
+      "                        properties of a PLY output: float "
+      "(default), half\n"
+      "                        (float16) or quantized (the quantized "
+      "integers, with\n"
+      "                        their dequantization in header comments). "
+      "draco_encoder\n"
+      "                        and myScript read both back as floats, "
+      "dequantizing\n"
+      "                        quantized properties. Stock plyfile consumers "
+      "such as\n"
+      "                        the gaussian-splatting loader do not, use "
+      "float for\n"
+      "                        those.\n");
+  printf(
+      "  --metrics-json <file> write timings as JSON (a path such as "
+      "/dev/fd/3\n"
+      "                        writes to an open descriptor).\n");
+  //! [YC] end
+}
+
+//! [YC] start: Parallel attribute decoding
+int StringToInt(const std::string &s) {
+  char *end;
+  return strtol(s.c_str(), &end, 10);  // NOLINT
+}
+//! [YC] end
+
+//! [YC] start: Compact 3DGS output
+// 3DGS attributes whose precision is set by -precision.
+const draco::GeometryAttribute::Type kCompactAttributes[] = {
+    draco::GeometryAttribute::F_REST_1, draco::GeometryAttribute::F_REST_2,
+    draco::GeometryAttribute::F_REST_3, draco::GeometryAttribute::OPACITY,
+    draco::GeometryAttribute::SCALE,    draco::GeometryAttribute::ROT};
+//! [YC] end
+
+//! [YC] start: Selective attribute decoding
+// Parses a comma separated list of attribute type names such as "F_REST_1".
+bool ParseAttributeTypes(const std::string &s,
+                         std::vector<draco::GeometryAttribute::Type> *types) {
+  size_t begin = 0;
+  while (begin <= s.size()) {
+    size_t end = s.find(',', begin);
+    if (end == std::string::npos) {
+      end = s.size();
+    }
+    const std::string name = s.substr(begin, end - begin);
+    bool found = false;
+    for (int i = 0; i < draco::GeometryAttribute::NAMED_ATTRIBUTES_COUNT; ++i) {
+      const auto type = static_cast<draco::GeometryAttribute::Type>(i);
+      if (draco::GeometryAttribute::TypeToString(type) == name) {
+        types->push_back(type);
+        found = true;
+        break;
+      }
+    }
+    if (!found) {
+      printf("Unknown attribute type %s.\n", name.c_str());
+      return false;
+    }
+    begin = end + 1;
+  }
+  return true;
 }
+//! [YC] end
 
 int ReturnError(const draco::Status &status) {
   printf("Failed to decode the input file %s\n", status.error_msg());
   return -1;
 }
 
+//! [YC] start: Timings (in microseconds) and sizes reported by --metrics-json
+bool WriteMetricsJson(const std::string &path, const draco::PointCloud &pc,
+                      size_t input_size, int64_t read_us, int64_t decode_us,
+                      int64_t write_us, int64_t wall_us) {
+  FILE *const file = fopen(path.c_str(), "w");
+  if (!file) {
+    printf("Failed to open the metrics file %s.\n", path.c_str());
+    return false;
+  }
+  fprintf(file, "{\n");
+  fprintf(file, "  \"tool\": \"draco_decoder\",\n");
+  fprintf(file, "  \"num_points\": %u,\n", pc.num_points());
+  fprintf(file, "  \"input_size\": %zu,\n", input_size);
+  fprintf(file, "  \"time_us\": {\n");
+  fprintf(file, "    \"wall\": %" PRId64 ",\n", wall_us);
+  fprintf(file, "    \"read\": %" PRId64 ",\n", read_us);
+  fprintf(file, "    \"decode\": %" PRId64 ",\n", decode_us);
+  fprintf(file, "    \"write\": %" PRId64 "\n", write_us);
+  fprintf(file, "  },\n");
+  fprintf(file, "  \"attributes\": [");
+  for (int i = 0; i < pc.num_attributes(); ++i) {
+    const draco::PointAttribute *const att = pc.attribute(i);
+    fprintf(file, "%s\n    {\"id\": %d, \"type\": \"%s\", ",
+            i == 0 ? "" : ",", i,
+            draco::GeometryAttribute::TypeToString(att->attribute_type())
+                .c_str());
+    fprintf(file, "\"num_components\": %d}", att->num_components());
+  }
+  fprintf(file, "\n  ]\n");
+  fprintf(file, "}\n");
+  fclose(file);
+  return true;
+}
+//! [YC] end
+
 }  // namespace
 
 int main(int argc, char **argv) {
   Options options;
   const int argc_check = argc - 1;
+  //! [YC] start: For metrics
+  draco::CycleTimer wall_timer;
+  wall_timer.Start();
+  //! [YC] end
 
   for (int i = 1; i < argc; ++i) {
     if (!strcmp("-h", argv[i]) || !strcmp("-?", argv[i])) {
@@ -61,12 +220,54 @@ int main(int argc, char **argv) {
     } else if (!strcmp("-o", argv[i]) && i < argc_check) {
       options.output = argv[++i];
     }
+    //! [YC] start: add arg
+    else if (!strcmp("--metrics-json", argv[i]) && i < argc_check) {
+      options.metrics_json = argv[++i];
+    }
+    else if (!strcmp("-threads", argv[i]) && i < argc_check) {
+      options.num_threads = StringToInt(argv[++i]);
+    }
+    else if (!strcmp("-layers", argv[i]) && i < argc_check) {
+      options.max_layers = StringToInt(argv[++i]);
+    }
+    else if (!strcmp("-skip", argv[i]) && i < argc_check) {
+      if (!ParseAttributeTypes(argv[++i], &options.skipped_attributes)) {
+        return -1;
+      }
+    }
+    else if (!strcmp("-precision", argv[i]) && i < argc_check) {
+      const std::string precision = argv[++i];
+      if (precision == "float") {
+        options.precision = draco::PlyEncoder::GAUSSIAN_PRECISION_FLOAT32;
+      } else if (precision == "half") {
+        options.precision = draco::PlyEncoder::GAUSSIAN_PRECISION_HALF;
+      } else if (precision == "quantized") {
+        options.precision = draco::PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED;
+      } else {
+        printf("Unknown precision %s.\n", precision.c_str());
+        return -1;
+      }
+    }
+    else if (!strcmp("-box", argv[i]) && i + 6 <= argc_check) {
+      options.use_box = true;
+      for (int c = 0; c < 3; ++c) {
+        options.box_min[c] = strtof(argv[++i], nullptr);
+      }
+      for (int c = 0; c < 3; ++c) {
+        options.box_max[c] = strtof(argv[++i], nullptr);
+      }
+    }
+    //! [YC] end
   }
   if (argc < 3 || options.input.empty()) {
     Usage();
     return -1;
   }
 
+  //! [YC] start: For metrics
+  draco::CycleTimer read_timer;
+  read_timer.Start();
+  //! [YC] end
   std::vector<char> data;
   if (!draco::ReadFileToBuffer(options.input, &data)) {
     printf("Failed opening the input file.\n");
@@ -77,6 +278,9 @@ int main(int argc, char **argv) {
     printf("Empty input file.\n");
     return -1;
   }
+  //! [YC] start: For metrics
+  read_timer.Stop();
+  //! [YC] end
 
   // Create a draco decoding buffer. Note that no data is copied in this step.
   draco::DecoderBuffer buffer;
@@ -86,38 +290,121 @@ int main(int argc, char **argv) {
   // Decode the input data into a geometry.
   std::unique_ptr<draco::PointCloud> pc;
   draco::Mesh *mesh = nullptr;
-  auto type_statusor = draco::Decoder::GetEncodedGeometryType(&buffer);
-  if (!type_statusor.ok()) {
-    return ReturnError(type_statusor.status());
-  }
-  const draco::EncodedGeometryType geom_type = type_statusor.value();
-  if (geom_type == draco::TRIANGULAR_MESH) {
+  //! [YC] start: Spatially tiled point clouds
+  if (draco::TiledPointCloudDecoder::IsTiledPointCloud(buffer)) {
+    if (options.precision == draco::PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED) {
+      // Every tile is quantized with its own parameters.
+      printf(
+          "-precision quantized is not supported for tiled point clouds.\n");
+      return -1;
+    }
     timer.Start();
-    draco::Decoder decoder;
-    auto statusor = decoder.DecodeMeshFromBuffer(&buffer);
+    draco::TiledPointCloudDecoder decoder;
+    decoder.SetNumThreads(options.num_threads);
+    for (const auto att_type : options.skipped_attributes) {
+      decoder.SetSkipAttribute(att_type);
+    }
+    const draco::BoundingBox box =
+        options.use_box ? draco::BoundingBox(options.box_min, options.box_max)
+                        : draco::BoundingBox(
+                              draco::Vector3f(-FLT_MAX, -FLT_MAX, -FLT_MAX),
+                              draco::Vector3f(FLT_MAX, FLT_MAX, FLT_MAX));
+    auto statusor = decoder.DecodeBox(&buffer, box);
     if (!statusor.ok()) {
       return ReturnError(statusor.status());
     }
-    std::unique_ptr<draco::Mesh> in_mesh = std::move(statusor).value();
+    pc = std::move(statusor).value();
     timer.Stop();
-    if (in_mesh) {
-      mesh = in_mesh.get();
-      pc = std::move(in_mesh);
-    }
-  } else if (geom_type == draco::POINT_CLOUD) {
-    // printf("[YC] Failed to decode it as mesh\n"); // [YC] add: check print
-    // Failed to decode it as mesh, so let's try to decode it as a point cloud.
-    // [YC] note: Start timer
+    printf("Decoded %zu of %d tiles.\n", decoder.FindTiles(box).size(),
+           decoder.num_tiles());
+  }
+  //! [YC] end
+  //! [YC] start: SH-band layered point clouds
+  else if (draco::LayeredPointCloudDecoder::IsLayeredPointCloud(buffer)) {
+    if (options.precision == draco::PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED) {
+      printf(
+          "-precision quantized is not supported for layered point clouds.\n");
+      return -1;
+    }
     timer.Start();
-    draco::Decoder decoder;
-    auto statusor = decoder.DecodePointCloudFromBuffer(&buffer);
+    draco::LayeredPointCloudDecoder decoder;
+    decoder.SetNumThreads(options.num_threads);
+    for (const auto att_type : options.skipped_attributes) {
+      decoder.SetSkipAttribute(att_type);
+    }
+    auto statusor = decoder.Decode(&buffer, options.max_layers);
     if (!statusor.ok()) {
       return ReturnError(statusor.status());
     }
     pc = std::move(statusor).value();
-    // [YC] note: Stop timer
     timer.Stop();
+    const int num_available = decoder.NumAvailableLayers(data.size());
+    printf("Decoded %d of %d layers.\n",
+           options.max_layers >= 0 ? std::min(options.max_layers, num_available)
+                                   : num_available,
+           decoder.num_layers());
   }
+  //! [YC] end
+  //! [YC] start: Spatially tiled point clouds
+  else {
+    auto type_statusor = draco::Decoder::GetEncodedGeometryType(&buffer);
+    if (!type_statusor.ok()) {
+      return ReturnError(type_statusor.status());
+    }
+    const draco::EncodedGeometryType geom_type = type_statusor.value();
+    if (geom_type == draco::TRIANGULAR_MESH) {
+      timer.Start();
+      draco::Decoder decoder;
+      decoder.SetNumThreads(options.num_threads);  // [YC] add: parallel decoding
+      for (const auto att_type : options.skipped_attributes) {
+        decoder.SetSkipAttribute(att_type);  // [YC] add: selective decoding
+      }
+      //! [YC] start: Compact 3DGS output
+      if (options.precision ==
+          draco::PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED) {
+        for (const auto att_type : kCompactAttributes) {
+          decoder.SetSkipAttributeTransform(att_type);
+        }
+      }
+      //! [YC] end
+      auto statusor = decoder.DecodeMeshFromBuffer(&buffer);
+      if (!statusor.ok()) {
+        return ReturnError(statusor.status());
+      }
+      std::unique_ptr<draco::Mesh> in_mesh = std::move(statusor).value();
+      timer.Stop();
+      if (in_mesh) {
+        mesh = in_mesh.get();
+        pc = std::move(in_mesh);
+      }
+    } else if (geom_type == draco::POINT_CLOUD) {
+      // printf("[YC] Failed to decode it as mesh\n"); // [YC] add: check print
+      // Failed to decode it as mesh, so let's try to decode it as a point cloud.
+      // [YC] note: Start timer
+      timer.Start();
+      draco::Decoder decoder;
+      decoder.SetNumThreads(options.num_threads);  // [YC] add: parallel decoding
+      for (const auto att_type : options.skipped_attributes) {
+        decoder.SetSkipAttribute(att_type);  // [YC] add: selective decoding
+      }
+      //! [YC] start: Compact 3DGS output
+      if (options.precision ==
+          draco::PlyEncoder::GAUSSIAN_PRECISION_QUANTIZED) {
+        for (const auto att_type : kCompactAttributes) {
+          decoder.SetSkipAttributeTransform(att_type);
+        }
+      }
+      //! [YC] end
+      auto statusor = decoder.DecodePointCloudFromBuffer(&buffer);
+      if (!statusor.ok()) {
+        return ReturnError(statusor.status());
+      }
+      pc = std::move(statusor).value();
+      // [YC] note: Stop timer
+      timer.Stop();
+    }
+  }
+  //! [YC] end
 
   if (pc == nullptr) {
     printf("Failed to decode the input file.\n");
@@ -129,6 +416,10 @@ int main(int argc, char **argv) {
     options.output = options.input + ".ply";
   }
 
+  //! [YC] start: For metrics
+  draco::CycleTimer write_timer;
+  write_timer.Start();
+  //! [YC] end
   // Save the decoded geometry into a file.
   const std::string extension = draco::parser::ToLower(
       options.output.size() >= 4
@@ -150,6 +441,8 @@ int main(int argc, char **argv) {
     }
   } else if (extension == ".ply") {
     draco::PlyEncoder ply_encoder;
+    // [YC] add: compact 3DGS output
+    ply_encoder.SetGaussianPrecision(options.precision);
     if (mesh) {
       if (!ply_encoder.EncodeToFile(*mesh, options.output)) {
         printf("Failed to store the decoded mesh as PLY.\n");
@@ -184,5 +477,16 @@ int main(int argc, char **argv) {
   printf("[YC] Decode\n");
   printf("[YC] time: %" PRId64 "\n", timer.GetInMs());
   //! [YC] end
+  //! [YC] start: Write the metrics record
+  write_timer.Stop();
+  if (!options.metrics_json.empty()) {
+    wall_timer.Stop();
+    if (!WriteMetricsJson(options.metrics_json, *pc, data.size(),
+                          read_timer.GetInUs(), timer.GetInUs(),
+                          write_timer.GetInUs(), wall_timer.GetInUs())) {
+      return -1;
+    }
+  }
+  //! [YC] end
   return 0;
 }
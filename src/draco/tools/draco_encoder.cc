@@ -12,12 +12,20 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 //
+#include <array>
 #include <cinttypes>
+#include <cstdio>
 #include <cstdlib>
+#include <cstring>
+#include <map>
+#include <vector>
 
 #include "draco/compression/config/compression_shared.h"
 #include "draco/compression/encode.h"
 #include "draco/compression/expert_encode.h"
+#include "draco/compression/point_cloud/point_cloud_rate_control.h"
+#include "draco/compression/point_cloud/layered_point_cloud_encoder.h"
+#include "draco/compression/point_cloud/tiled_point_cloud_encoder.h"
 #include "draco/core/cycle_timer.h"
 #include "draco/io/file_utils.h"
 #include "draco/io/mesh_io.h"
@@ -41,6 +49,38 @@ struct Options {
   bool generic_deleted;
   int compression_level;
   bool preserve_polygons;
+  //! [YC] start: Memory-mapped input
+  bool use_memory_mapping;
+  //! [YC] end
+  //! [YC] start: Threaded attribute encoding
+  int num_threads;
+  bool delimit_streams;
+  //! [YC] end
+  //! [YC] start: Spatially tiled point clouds
+  int max_points_per_tile;
+  //! [YC] end
+  //! [YC] start: SH-band layered point clouds
+  bool layered;
+  //! [YC] end
+  //! [YC] start: Sweep mode
+  std::string sweep_settings;
+  //! [YC] end
+  //! [YC] start: Target-size rate control
+  int64_t target_size;
+  //! [YC] end
+  //! [YC] start: Space-filling curve point order
+  draco::PointOrder point_order;
+  //! [YC] end
+  //! [YC] start: Quaternion codec
+  bool rot_quaternion;
+  //! [YC] end
+  //! [YC] start: Vector quantization
+  int f_rest_codebook_size;
+  int codebook_iterations;
+  //! [YC] end
+  //! [YC] start: Interleaved rANS streams
+  int rans_streams;
+  //! [YC] end
   bool use_metadata;
   std::string input;
   std::string output;
@@ -57,6 +97,9 @@ struct Options {
   int scale_quantization_bits;
   int rot_quantization_bits;
   //! [YC] end
+  //! [YC] start: Machine readable metrics output
+  std::string metrics_json;
+  //! [YC] end
 };
 
 // setting default
@@ -71,6 +114,17 @@ Options::Options()
       generic_deleted(false),
       compression_level(7),
       preserve_polygons(false),
+      use_memory_mapping(false),
+      num_threads(1),
+      delimit_streams(false),
+      max_points_per_tile(0),
+      layered(false),
+      target_size(0),
+      point_order(draco::POINT_ORDER_INPUT),
+      rot_quaternion(false),
+      f_rest_codebook_size(0),
+      codebook_iterations(10),
+      rans_streams(1),
       use_metadata(false) ,
       //! [YC] start: Set quantization bits
       fDc_quantization_bits (16),
@@ -126,6 +180,100 @@ void Usage() {
   // mesh and polygon reconstruction information is encoded into a new generic
   // attribute.
   printf("  -preserve_polygons    encode polygon info as an attribute.\n");
+  //! [YC] start: add args
+  printf(
+      "  -threads <value>      number of threads encoding independent "
+      "attributes\n"
+      "                        (default: 1, 0 uses all cores). The output "
+      "does not change.\n");
+  printf(
+      "  -delimit_streams      store the size of every attribute stream so "
+      "that\n"
+      "                        draco_decoder -threads decodes the streams "
+      "concurrently.\n"
+      "                        Applies to the sequential encoding (-cl 0, "
+      "-layered,\n"
+      "                        -qr_quaternion or -vq_frest), the kd-tree "
+      "encoding of\n"
+      "                        -cl 1..10 ignores it.\n");
+  printf(
+      "  -tiles <value>        split a point cloud into spatial tiles of at "
+      "most <value>\n"
+      "                        points that can be decoded independently.\n");
+  printf(
+      "  -layered              store the SH bands (F_REST_1..3) as enhancement "
+      "layers after\n"
+      "                        a base layer with the other attributes, so "
+      "that a prefix\n"
+      "                        of the file decodes at a lower SH degree. "
+      "Uses the\n"
+      "                        sequential encoding.\n");
+  printf(
+      "  --sweep <settings>    encode the input once per row of a .npy or text "
+      "file with\n"
+      "                        the columns qp qn qfd qfr qo qs qr cl qt qg. "
+      "The input is\n"
+      "                        parsed once; every row writes "
+      "<output>_<suffix>.drc and\n"
+      "                        <output>_<suffix>.json, <output> defaults to "
+      "the input\n"
+      "                        without its extension. The qt and qg "
+      "columns are not\n"
+      "                        part of the file names and are ignored, "
+      "-qt and -qg apply\n"
+      "                        to every row.\n");
+  printf(
+      "  -target_size <bytes>  choose the quantization bits of the quantized "
+      "point cloud\n"
+      "                        attributes so that the output fits into "
+      "<bytes>; the -q\n"
+      "                        values only select which attributes are "
+      "quantized.\n"
+      "                        Checks the allocation with up to 6 full "
+      "encodes (plus a\n"
+      "                        few encodes of a 32768-point sample), so it "
+      "takes up to\n"
+      "                        about 6 times as long as a single encode.\n");
+  printf(
+      "  -point_order <value>  input (default), morton or hilbert: sort the "
+      "points of a\n"
+      "                        point cloud along a space-filling curve over "
+      "their positions.\n"
+      "                        Applies to the sequential encoding (-cl 0), "
+      "-tiles and\n"
+      "                        -layered; the decoded points come out in this "
+      "order.\n");
+  printf(
+      "  -qr_quaternion        encode the rotations as unit quaternions with "
+      "the smallest\n"
+      "                        three components quantized to -qr bits each "
+      "and a 2-bit\n"
+      "                        index. Uses the sequential encoding.\n");
+  printf(
+      "  -vq_frest <value>     encode each SH band (F_REST_1..3) as the "
+      "indices of a k-means\n"
+      "                        codebook with at most <value> entries "
+      "(lossy, overrides the\n"
+      "                        band quantization). Uses the sequential "
+      "encoding.\n");
+  printf(
+      "  -vq_iterations <n>    maximum number of k-means iterations "
+      "(default 10).\n");
+  printf(
+      "  -rans_streams <n>     split the entropy coded attribute values into "
+      "1 (default), 2,\n"
+      "                        4 or 8 interleaved rANS streams that decode "
+      "faster. Applies\n"
+      "                        to the sequential encoding (-cl 0).\n");
+  printf(
+      "  -mmap                 memory-map the input .ply file instead of "
+      "reading it in chunks.\n");
+  printf(
+      "  --metrics-json <file> write timings and per-attribute encoded sizes "
+      "as JSON\n"
+      "                        (a path such as /dev/fd/3 writes to an open "
+      "descriptor).\n");
+  //! [YC] end
 
   printf(
       "\nUse negative quantization values to skip the specified attribute\n");
@@ -197,7 +345,10 @@ void PrintOptions(const draco::PointCloud &pc, const Options &options) {
   //   }
   // }
   if (pc.GetNamedAttributeId(draco::GeometryAttribute::F_REST_1) >= 0) {
-    if (options.fRest_1_quantization_bits == 0) {
+    if (options.f_rest_codebook_size > 0) {
+      printf("  f_rest_1: Codebook = %d entries\n",
+             options.f_rest_codebook_size);  // [YC] add: vector quantization
+    } else if (options.fRest_1_quantization_bits == 0) {
       printf("  f_rest_1: No quantization\n");
     } else {
       printf("  f_rest_1: Quantization = %d bits\n",
@@ -207,7 +358,10 @@ void PrintOptions(const draco::PointCloud &pc, const Options &options) {
     printf("  fRest_1: Skipped\n");
   }
   if (pc.GetNamedAttributeId(draco::GeometryAttribute::F_REST_2) >= 0) {
-    if (options.fRest_2_quantization_bits == 0) {
+    if (options.f_rest_codebook_size > 0) {
+      printf("  f_rest_2: Codebook = %d entries\n",
+             options.f_rest_codebook_size);  // [YC] add: vector quantization
+    } else if (options.fRest_2_quantization_bits == 0) {
       printf("  f_rest_2: No quantization\n");
     } else {
       printf("  f_rest_2: Quantization = %d bits\n",
@@ -217,7 +371,10 @@ void PrintOptions(const draco::PointCloud &pc, const Options &options) {
     printf("  fRest_2: Skipped\n");
   }
   if (pc.GetNamedAttributeId(draco::GeometryAttribute::F_REST_3) >= 0) {
-    if (options.fRest_3_quantization_bits == 0) {
+    if (options.f_rest_codebook_size > 0) {
+      printf("  f_rest_3: Codebook = %d entries\n",
+             options.f_rest_codebook_size);  // [YC] add: vector quantization
+    } else if (options.fRest_3_quantization_bits == 0) {
       printf("  f_rest_3: No quantization\n");
     } else {
       printf("  f_rest_3: Quantization = %d bits\n",
@@ -246,16 +403,333 @@ void PrintOptions(const draco::PointCloud &pc, const Options &options) {
     if (options.rot_quantization_bits == 0) {
       printf("  Rotation: No quantization\n");
     } else {
-      printf("  Rotation: Quantization = %d bits\n",
-             options.rot_quantization_bits);
+      printf("  Rotation: Quantization = %d bits%s\n",
+             options.rot_quantization_bits,
+             options.rot_quaternion ? " (smallest three quaternion)" : "");
     }
   }
   //! [YC] end
   printf("\n");
 }
 
+//! [YC] start: Timings (in microseconds) and sizes reported by --metrics-json
+struct Metrics {
+  Metrics()
+      : wall_us(0),
+        ply_parse_us(0),
+        preprocess_us(0),
+        encode_us(0),
+        write_us(0),
+        encoded_size(0),
+        rate_control_us(0),
+        estimated_size(0),
+        num_trial_encodes(0) {}
+  int64_t wall_us;
+  int64_t ply_parse_us;
+  int64_t preprocess_us;
+  int64_t encode_us;
+  int64_t write_us;
+  size_t encoded_size;
+  // Only set with -target_size.
+  int64_t rate_control_us;
+  int64_t estimated_size;
+  int num_trial_encodes;
+};
+
+int GetQuantizationBits(const Options &options,
+                        draco::GeometryAttribute::Type type) {
+  switch (type) {
+    case draco::GeometryAttribute::POSITION:
+      return options.pos_quantization_bits;
+    case draco::GeometryAttribute::NORMAL:
+      return options.normals_quantization_bits;
+    case draco::GeometryAttribute::TEX_COORD:
+      return options.tex_coords_quantization_bits;
+    case draco::GeometryAttribute::GENERIC:
+      return options.generic_quantization_bits;
+    case draco::GeometryAttribute::F_DC:
+      return options.fDc_quantization_bits;
+    case draco::GeometryAttribute::F_REST_1:
+      return options.fRest_1_quantization_bits;
+    case draco::GeometryAttribute::F_REST_2:
+      return options.fRest_2_quantization_bits;
+    case draco::GeometryAttribute::F_REST_3:
+      return options.fRest_3_quantization_bits;
+    case draco::GeometryAttribute::OPACITY:
+      return options.opacity_quantization_bits;
+    case draco::GeometryAttribute::SCALE:
+      return options.scale_quantization_bits;
+    case draco::GeometryAttribute::ROT:
+      return options.rot_quantization_bits;
+    default:
+      return -1;
+  }
+}
+
+// Counterpart of GetQuantizationBits(), used to record the bits chosen by the
+// rate control.
+void SetQuantizationBits(draco::GeometryAttribute::Type type, int bits,
+                         Options *options) {
+  switch (type) {
+    case draco::GeometryAttribute::POSITION:
+      options->pos_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::NORMAL:
+      options->normals_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::TEX_COORD:
+      options->tex_coords_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::GENERIC:
+      options->generic_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::F_DC:
+      options->fDc_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::F_REST_1:
+      options->fRest_1_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::F_REST_2:
+      options->fRest_2_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::F_REST_3:
+      options->fRest_3_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::OPACITY:
+      options->opacity_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::SCALE:
+      options->scale_quantization_bits = bits;
+      break;
+    case draco::GeometryAttribute::ROT:
+      options->rot_quantization_bits = bits;
+      break;
+    default:
+      break;
+  }
+}
+
+// Writes one JSON record with the wall time, the per-stage split and the
+// encoded size of every attribute.
+bool WriteMetricsJson(const std::string &path, const Options &options,
+                      const draco::PointCloud &pc,
+                      const draco::EncodingStats &stats,
+                      const Metrics &metrics) {
+  FILE *const file = fopen(path.c_str(), "w");
+  if (!file) {
+    printf("Failed to open the metrics file %s.\n", path.c_str());
+    return false;
+  }
+  int64_t quantization_us = 0;
+  int64_t prediction_us = 0;
+  int64_t entropy_coding_us = 0;
+  for (const draco::AttributeEncodingStats &att : stats.attributes) {
+    quantization_us += att.quantization_time_us;
+    prediction_us += att.prediction_time_us;
+    entropy_coding_us += att.entropy_coding_time_us;
+  }
+  fprintf(file, "{\n");
+  fprintf(file, "  \"tool\": \"draco_encoder\",\n");
+  fprintf(file, "  \"num_points\": %u,\n", pc.num_points());
+  fprintf(file, "  \"compression_level\": %d,\n", options.compression_level);
+  fprintf(file, "  \"encoded_size\": %zu,\n", metrics.encoded_size);
+  fprintf(file, "  \"attributes_size\": %" PRId64 ",\n",
+          stats.attributes_size);
+  fprintf(file, "  \"time_us\": {\n");
+  fprintf(file, "    \"wall\": %" PRId64 ",\n", metrics.wall_us);
+  fprintf(file, "    \"ply_parse\": %" PRId64 ",\n", metrics.ply_parse_us);
+  fprintf(file, "    \"preprocess\": %" PRId64 ",\n", metrics.preprocess_us);
+  fprintf(file, "    \"encode\": %" PRId64 ",\n", metrics.encode_us);
+  fprintf(file, "    \"quantization\": %" PRId64 ",\n", quantization_us);
+  fprintf(file, "    \"prediction\": %" PRId64 ",\n", prediction_us);
+  fprintf(file, "    \"entropy_coding\": %" PRId64 ",\n", entropy_coding_us);
+  fprintf(file, "    \"write\": %" PRId64 ",\n", metrics.write_us);
+  fprintf(file, "    \"rate_control\": %" PRId64 "\n", metrics.rate_control_us);
+  fprintf(file, "  },\n");
+  if (options.target_size > 0) {
+    fprintf(file,
+            "  \"rate_control\": {\"target_size\": %" PRId64
+            ", \"estimated_size\": %" PRId64 ", \"trial_encodes\": %d},\n",
+            options.target_size, metrics.estimated_size,
+            metrics.num_trial_encodes);
+  }
+  fprintf(file, "  \"attributes\": [");
+  for (int i = 0; i < pc.num_attributes(); ++i) {
+    const draco::PointAttribute *const att = pc.attribute(i);
+    const draco::AttributeEncodingStats *const att_stats =
+        i < static_cast<int>(stats.attributes.size()) ? &stats.attributes[i]
+                                                      : nullptr;
+    fprintf(file, "%s\n    {", i == 0 ? "" : ",");
+    fprintf(file, "\"id\": %d, ", i);
+    fprintf(file, "\"type\": \"%s\", ",
+            draco::GeometryAttribute::TypeToString(att->attribute_type())
+                .c_str());
+    fprintf(file, "\"num_components\": %d, ", att->num_components());
+    fprintf(file, "\"quantization_bits\": %d, ",
+            GetQuantizationBits(options, att->attribute_type()));
+    if (att_stats && att_stats->encoded_size >= 0) {
+      fprintf(file, "\"encoded_size\": %" PRId64 ", ",
+              att_stats->encoded_size);
+    } else {
+      fprintf(file, "\"encoded_size\": null, ");
+    }
+    fprintf(file,
+            "\"time_us\": {\"quantization\": %" PRId64
+            ", \"prediction\": %" PRId64 ", \"entropy_coding\": %" PRId64
+            "}}",
+            att_stats ? att_stats->quantization_time_us : 0,
+            att_stats ? att_stats->prediction_time_us : 0,
+            att_stats ? att_stats->entropy_coding_time_us : 0);
+  }
+  fprintf(file, "\n  ]\n");
+  fprintf(file, "}\n");
+  fclose(file);
+  return true;
+}
+//! [YC] end
+
+//! [YC] start: Shared by single encodes and sweeps
+// Deletes the attributes skipped with negative quantization bits and records
+// which ones were deleted in |options|.
+void DeleteSkippedAttributes(draco::PointCloud *pc, Options *options) {
+  if (options->tex_coords_quantization_bits < 0) {
+    if (pc->NumNamedAttributes(draco::GeometryAttribute::TEX_COORD) > 0) {
+      options->tex_coords_deleted = true;
+    }
+    while (pc->NumNamedAttributes(draco::GeometryAttribute::TEX_COORD) > 0) {
+      pc->DeleteAttribute(
+          pc->GetNamedAttributeId(draco::GeometryAttribute::TEX_COORD, 0));
+    }
+  }
+  if (options->normals_quantization_bits < 0) {
+    if (pc->NumNamedAttributes(draco::GeometryAttribute::NORMAL) > 0) {
+      options->normals_deleted = true;
+    }
+    while (pc->NumNamedAttributes(draco::GeometryAttribute::NORMAL) > 0) {
+      pc->DeleteAttribute(
+          pc->GetNamedAttributeId(draco::GeometryAttribute::NORMAL, 0));
+    }
+  }
+  if (options->generic_quantization_bits < 0) {
+    if (pc->NumNamedAttributes(draco::GeometryAttribute::GENERIC) > 0) {
+      options->generic_deleted = true;
+    }
+    while (pc->NumNamedAttributes(draco::GeometryAttribute::GENERIC) > 0) {
+      pc->DeleteAttribute(
+          pc->GetNamedAttributeId(draco::GeometryAttribute::GENERIC, 0));
+    }
+  }
+  if (options->fRest_1_quantization_bits < 0) {
+    if (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_1) > 0) {
+      options->fRest_1_deleted = true;
+    }
+    while (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_1) > 0) {
+      pc->DeleteAttribute(
+          pc->GetNamedAttributeId(draco::GeometryAttribute::F_REST_1, 0));
+    }
+  }
+  if (options->fRest_2_quantization_bits < 0) {
+    if (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_2) > 0) {
+      options->fRest_2_deleted = true;
+    }
+    while (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_2) > 0) {
+      pc->DeleteAttribute(
+          pc->GetNamedAttributeId(draco::GeometryAttribute::F_REST_2, 0));
+    }
+  }
+  if (options->fRest_3_quantization_bits < 0) {
+    if (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_3) > 0) {
+      options->fRest_3_deleted = true;
+    }
+    while (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_3) > 0) {
+      pc->DeleteAttribute(
+          pc->GetNamedAttributeId(draco::GeometryAttribute::F_REST_3, 0));
+    }
+  }
+
+#ifdef DRACO_ATTRIBUTE_INDICES_DEDUPLICATION_SUPPORTED
+  // If any attribute has been deleted, run deduplication of point indices again
+  // as some points can be possibly combined.
+  if (options->tex_coords_deleted || options->normals_deleted ||
+      options->generic_deleted || options->fRest_1_deleted ||
+      options->fRest_2_deleted || options->fRest_3_deleted) {
+    pc->DeduplicatePointIds();
+  }
+#endif
+}
+
+// Sets the quantization, speed and threading options of |encoder|.
+void SetupEncoder(const Options &options, draco::Encoder *encoder) {
+  // Convert compression level to speed (that 0 = slowest, 10 = fastest).
+  const int speed = 10 - options.compression_level;
+
+  if (options.pos_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::POSITION,
+                                      options.pos_quantization_bits);
+  }
+  if (options.tex_coords_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::TEX_COORD,
+                                      options.tex_coords_quantization_bits);
+  }
+  if (options.normals_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::NORMAL,
+                                      options.normals_quantization_bits);
+  }
+  if (options.generic_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::GENERIC,
+                                      options.generic_quantization_bits);
+  }
+  if (options.fDc_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::F_DC, options.fDc_quantization_bits); // for now folow qn
+  }
+  // encoder->SetAttributeQuantization(draco::GeometryAttribute::F_REST, options.fRest_quantization_bits); // for now folow qn
+  if (options.fRest_1_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::F_REST_1, options.fRest_1_quantization_bits); // for now folow qn
+  }
+  if (options.fRest_2_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::F_REST_2, options.fRest_2_quantization_bits); // for now folow qn
+  }
+  if (options.fRest_3_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::F_REST_3, options.fRest_3_quantization_bits); // for now folow qn
+  }
+  if (options.opacity_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::OPACITY, options.opacity_quantization_bits); // for now folow qn
+  }
+  if (options.scale_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::SCALE, options.scale_quantization_bits); // for now folow qn
+  }
+  if (options.rot_quantization_bits > 0) {
+    encoder->SetAttributeQuantization(draco::GeometryAttribute::ROT, options.rot_quantization_bits); // for now folow qn
+  }
+
+  //! [YC] start: Quaternion codec
+  if (options.rot_quantization_bits > 0 && options.rot_quaternion) {
+    encoder->SetAttributeQuaternionQuantization(
+        draco::GeometryAttribute::ROT, options.rot_quantization_bits);
+  }
+  //! [YC] end
+  //! [YC] start: Vector quantization
+  if (options.f_rest_codebook_size > 0) {
+    for (const draco::GeometryAttribute::Type type :
+         {draco::GeometryAttribute::F_REST_1,
+          draco::GeometryAttribute::F_REST_2,
+          draco::GeometryAttribute::F_REST_3}) {
+      encoder->SetAttributeCodebook(type, options.f_rest_codebook_size,
+                                    options.codebook_iterations);
+    }
+  }
+  //! [YC] end
+
+  encoder->SetSpeedOptions(speed, speed);
+  encoder->SetNumThreads(options.num_threads);
+  encoder->SetDelimitAttributeStreams(options.delimit_streams);
+  encoder->SetPointOrder(options.point_order);
+  encoder->SetInterleavedRAnsStreams(options.rans_streams);
+}
+//! [YC] end
+
 int EncodePointCloudToFile(const draco::PointCloud &pc, const std::string &file,
-                           draco::ExpertEncoder *encoder) {
+                           draco::ExpertEncoder *encoder, Metrics *metrics) {
   draco::CycleTimer timer;
   // Encode the geometry.
   draco::EncoderBuffer buffer;
@@ -267,11 +741,21 @@ int EncodePointCloudToFile(const draco::PointCloud &pc, const std::string &file,
     return -1;
   }
   timer.Stop();
+  //! [YC] start: For metrics
+  metrics->encode_us = timer.GetInUs();
+  metrics->encoded_size = buffer.size();
+  draco::CycleTimer write_timer;
+  write_timer.Start();
+  //! [YC] end
   // Save the encoded geometry into a file.
   if (!draco::WriteBufferToFile(buffer.data(), buffer.size(), file)) {
     printf("Failed to write the output file.\n");
     return -1;
   }
+  //! [YC] start: For metrics
+  write_timer.Stop();
+  metrics->write_us = write_timer.GetInUs();
+  //! [YC] end
   printf("Encoded point cloud saved to %s (%" PRId64 " ms to encode).\n",
          file.c_str(), timer.GetInMs());
   printf("\nEncoded size = %zu bytes\n\n", buffer.size());
@@ -283,8 +767,412 @@ int EncodePointCloudToFile(const draco::PointCloud &pc, const std::string &file,
   return 0;
 }
 
+//! [YC] start: Spatially tiled point clouds
+int EncodeTiledPointCloudToFile(const draco::PointCloud &pc,
+                                const std::string &file,
+                                const draco::EncoderOptions &encoder_options,
+                                draco::TiledPointCloudEncoder *encoder,
+                                Metrics *metrics) {
+  draco::CycleTimer timer;
+  draco::EncoderBuffer buffer;
+  timer.Start();
+  const draco::Status status =
+      encoder->EncodeToBuffer(pc, encoder_options, &buffer);
+  if (!status.ok()) {
+    printf("Failed to encode the point cloud.\n");
+    printf("%s\n", status.error_msg());
+    return -1;
+  }
+  timer.Stop();
+  metrics->encode_us = timer.GetInUs();
+  metrics->encoded_size = buffer.size();
+  draco::CycleTimer write_timer;
+  write_timer.Start();
+  if (!draco::WriteBufferToFile(buffer.data(), buffer.size(), file)) {
+    printf("Failed to write the output file.\n");
+    return -1;
+  }
+  write_timer.Stop();
+  metrics->write_us = write_timer.GetInUs();
+  printf("Encoded point cloud as %zu tiles saved to %s (%" PRId64
+         " ms to encode).\n",
+         encoder->tiles().size(), file.c_str(), timer.GetInMs());
+  printf("\nEncoded size = %zu bytes\n\n", buffer.size());
+  printf("[YC] Encode\n");
+  printf("[YC] time: %" PRId64 "\n", timer.GetInMs());
+  printf("[YC] size: %zu bytes\n", buffer.size());
+  return 0;
+}
+//! [YC] end
+
+//! [YC] start: SH-band layered point clouds
+int EncodeLayeredPointCloudToFile(const draco::PointCloud &pc,
+                                  const std::string &file,
+                                  const draco::EncoderOptions &encoder_options,
+                                  draco::LayeredPointCloudEncoder *encoder,
+                                  Metrics *metrics) {
+  draco::CycleTimer timer;
+  draco::EncoderBuffer buffer;
+  timer.Start();
+  const draco::Status status =
+      encoder->EncodeToBuffer(pc, encoder_options, &buffer);
+  if (!status.ok()) {
+    printf("Failed to encode the point cloud.\n");
+    printf("%s\n", status.error_msg());
+    return -1;
+  }
+  timer.Stop();
+  metrics->encode_us = timer.GetInUs();
+  metrics->encoded_size = buffer.size();
+  draco::CycleTimer write_timer;
+  write_timer.Start();
+  if (!draco::WriteBufferToFile(buffer.data(), buffer.size(), file)) {
+    printf("Failed to write the output file.\n");
+    return -1;
+  }
+  write_timer.Stop();
+  metrics->write_us = write_timer.GetInUs();
+  printf("Encoded point cloud as %zu layers saved to %s (%" PRId64
+         " ms to encode).\n",
+         encoder->layers().size(), file.c_str(), timer.GetInMs());
+  for (const draco::PointCloudLayer &layer : encoder->layers()) {
+    printf("  %s: %" PRIu64 " bytes\n",
+           layer.attribute_type == draco::GeometryAttribute::INVALID
+               ? "base"
+               : draco::GeometryAttribute::TypeToString(layer.attribute_type)
+                     .c_str(),
+           layer.size);
+  }
+  printf("\nEncoded size = %zu bytes\n\n", buffer.size());
+  printf("[YC] Encode\n");
+  printf("[YC] time: %" PRId64 "\n", timer.GetInMs());
+  printf("[YC] size: %zu bytes\n", buffer.size());
+  return 0;
+}
+//! [YC] end
+
+//! [YC] start: Sweep mode
+// Columns of a sweep settings row, in the order of the random settings arrays.
+// The qt and qg columns are read but not used: they are not part of the file
+// names, so rows that differ only in them would write the same files.
+enum SweepColumn {
+  kSweepQp = 0,
+  kSweepQn,
+  kSweepQfd,
+  kSweepQfr,
+  kSweepQo,
+  kSweepQs,
+  kSweepQr,
+  kSweepCl,
+  kSweepQt,
+  kSweepQg,
+  kNumSweepColumns
+};
+typedef std::array<int, kNumSweepColumns> SweepRow;
+
+// Reads the rows of a 2D .npy array of floats or integers.
+bool ParseNpySettings(const std::vector<char> &data,
+                      std::vector<SweepRow> *rows) {
+  // Magic, version, header length and the header dict.
+  if (data.size() < 10 || memcmp(data.data(), "\x93NUMPY", 6) != 0) {
+    return false;
+  }
+  const uint8_t major_version = data[6];
+  const size_t len_size = major_version == 1 ? 2 : 4;
+  size_t header_len = 0;
+  for (size_t i = 0; i < len_size; ++i) {
+    header_len |= static_cast<size_t>(static_cast<uint8_t>(data[8 + i]))
+                  << (8 * i);
+  }
+  const size_t data_offset = 8 + len_size + header_len;
+  if (data_offset > data.size()) {
+    return false;
+  }
+  const std::string header(data.data() + 8 + len_size, header_len);
+  if (header.find("'fortran_order': False") == std::string::npos) {
+    printf("Error: Fortran ordered .npy files are not supported.\n");
+    return false;
+  }
+  const size_t descr_pos = header.find("'descr': '");
+  const size_t shape_pos = header.find("'shape': (");
+  if (descr_pos == std::string::npos || shape_pos == std::string::npos) {
+    return false;
+  }
+  const std::string descr = header.substr(descr_pos + 10, 3);
+  char *end;
+  const long num_rows = strtol(header.c_str() + shape_pos + 10, &end, 10);
+  while (*end == ',' || *end == ' ') {
+    ++end;
+  }
+  const long num_cols = strtol(end, &end, 10);
+  if (num_cols != kNumSweepColumns) {
+    printf("Error: Sweep settings need %d columns, got %ld.\n",
+           kNumSweepColumns, num_cols);
+    return false;
+  }
+  int value_size = 0;
+  if (descr == "<f8" || descr == "<i8") {
+    value_size = 8;
+  } else if (descr == "<f4" || descr == "<i4") {
+    value_size = 4;
+  } else {
+    printf("Error: Unsupported .npy data type %s.\n", descr.c_str());
+    return false;
+  }
+  if (data_offset + num_rows * num_cols * value_size > data.size()) {
+    return false;
+  }
+  const char *value = data.data() + data_offset;
+  rows->resize(num_rows);
+  for (SweepRow &row : *rows) {
+    for (int c = 0; c < kNumSweepColumns; ++c, value += value_size) {
+      // Truncated like numpy's astype(int).
+      if (descr == "<f8") {
+        double v;
+        memcpy(&v, value, 8);
+        row[c] = static_cast<int>(v);
+      } else if (descr == "<f4") {
+        float v;
+        memcpy(&v, value, 4);
+        row[c] = static_cast<int>(v);
+      } else if (descr == "<i8") {
+        int64_t v;
+        memcpy(&v, value, 8);
+        row[c] = static_cast<int>(v);
+      } else {
+        int32_t v;
+        memcpy(&v, value, 4);
+        row[c] = v;
+      }
+    }
+  }
+  return true;
+}
+
+// Reads the rows of a text file with whitespace or comma separated values.
+// Empty lines and lines starting with '#' are skipped.
+bool ParseTextSettings(const std::vector<char> &data,
+                       std::vector<SweepRow> *rows) {
+  const std::string text(data.begin(), data.end());
+  size_t line_start = 0;
+  while (line_start < text.size()) {
+    size_t line_end = text.find('\n', line_start);
+    if (line_end == std::string::npos) {
+      line_end = text.size();
+    }
+    std::string line = text.substr(line_start, line_end - line_start);
+    line_start = line_end + 1;
+    for (char &c : line) {
+      if (c == ',') {
+        c = ' ';
+      }
+    }
+    const size_t first = line.find_first_not_of(" \t\r");
+    if (first == std::string::npos || line[first] == '#') {
+      continue;
+    }
+    SweepRow row;
+    const char *ptr = line.c_str();
+    for (int c = 0; c < kNumSweepColumns; ++c) {
+      char *end;
+      const double v = strtod(ptr, &end);
+      if (end == ptr) {
+        printf("Error: Sweep settings need %d columns: %s\n",
+               kNumSweepColumns, line.c_str());
+        return false;
+      }
+      row[c] = static_cast<int>(v);
+      ptr = end;
+    }
+    rows->push_back(row);
+  }
+  return true;
+}
+
+bool ReadSweepSettings(const std::string &path, std::vector<SweepRow> *rows) {
+  std::vector<char> data;
+  if (!draco::ReadFileToBuffer(path, &data)) {
+    printf("Failed opening the sweep settings %s.\n", path.c_str());
+    return false;
+  }
+  rows->clear();
+  if (data.size() >= 6 && memcmp(data.data(), "\x93NUMPY", 6) == 0) {
+    if (!ParseNpySettings(data, rows)) {
+      printf("Failed parsing the sweep settings %s.\n", path.c_str());
+      return false;
+    }
+    return true;
+  }
+  return ParseTextSettings(data, rows);
+}
+
+// Same naming as make_suffix() of the sweep scripts.
+std::string MakeSweepSuffix(const SweepRow &row) {
+  char suffix[128];
+  snprintf(suffix, sizeof(suffix),
+           "qp%d_qn%d_qfd%d_qfr%d_qo%d_qs%d_qr%d_cl%d", row[kSweepQp],
+           row[kSweepQn], row[kSweepQfd], row[kSweepQfr], row[kSweepQo],
+           row[kSweepQs], row[kSweepQr], row[kSweepCl]);
+  return suffix;
+}
+
+// Copies the points and attributes of |src|. PointCloud::Copy() is only
+// available in transcoder builds.
+std::unique_ptr<draco::PointCloud> CopyPointCloud(
+    const draco::PointCloud &src) {
+  std::unique_ptr<draco::PointCloud> pc(new draco::PointCloud());
+  pc->set_num_points(src.num_points());
+  for (int i = 0; i < src.num_attributes(); ++i) {
+    std::unique_ptr<draco::PointAttribute> att(new draco::PointAttribute());
+    att->CopyFrom(*src.attribute(i));
+    pc->AddAttribute(std::move(att));
+  }
+  return pc;
+}
+
+// Encodes |pc| once per row of the sweep settings. Rows set the same options
+// as the matching command line flags, so qfr is recorded in the file names
+// only, like -qfr. Point clouds with deleted attributes are built once per
+// combination of deleted attributes and reused by the following rows.
+int RunSweep(const Options &base_options, draco::PointCloud *pc,
+             int64_t ply_parse_us) {
+  std::vector<SweepRow> rows;
+  if (!ReadSweepSettings(base_options.sweep_settings, &rows)) {
+    return -1;
+  }
+  std::string prefix = base_options.output;
+  if (prefix.empty()) {
+    prefix = base_options.input.substr(0, base_options.input.rfind('.'));
+  }
+
+  // The SH bands skipped with -qfr1/2/3 are the same for every row.
+  Options sh_options = base_options;
+  sh_options.tex_coords_quantization_bits = 0;
+  sh_options.normals_quantization_bits = 0;
+  sh_options.generic_quantization_bits = 0;
+  DeleteSkippedAttributes(pc, &sh_options);
+
+  std::map<int, std::unique_ptr<draco::PointCloud>> reduced_pcs;
+  std::vector<std::string> failed_suffixes;
+  for (size_t r = 0; r < rows.size(); ++r) {
+    const SweepRow &row = rows[r];
+    draco::CycleTimer wall_timer;
+    wall_timer.Start();
+    Metrics metrics;
+    if (r == 0) {
+      metrics.ply_parse_us = ply_parse_us;
+    }
+    Options options = sh_options;
+    options.pos_quantization_bits = row[kSweepQp];
+    options.normals_quantization_bits = row[kSweepQn];
+    options.fDc_quantization_bits = row[kSweepQfd];
+    options.opacity_quantization_bits = row[kSweepQo];
+    options.scale_quantization_bits = row[kSweepQs];
+    options.rot_quantization_bits = row[kSweepQr];
+    options.compression_level = row[kSweepCl];
+    options.tex_coords_quantization_bits =
+        base_options.tex_coords_quantization_bits;
+    options.generic_quantization_bits = base_options.generic_quantization_bits;
+    const std::string suffix = MakeSweepSuffix(row);
+    if (options.pos_quantization_bits < 0) {
+      printf("Error: Position attribute cannot be skipped (%s).\n",
+             suffix.c_str());
+      failed_suffixes.push_back(suffix);
+      continue;
+    }
+    bool valid = true;
+    for (int c = 0; c < kSweepQt; ++c) {
+      if (c != kSweepCl && row[c] > 30) {
+        valid = false;
+      }
+    }
+    if (!valid) {
+      printf(
+          "Error: The maximum number of quantization bits is 30 (%s).\n",
+          suffix.c_str());
+      failed_suffixes.push_back(suffix);
+      continue;
+    }
+
+    // Rows that skip attributes encode a reduced copy of the point cloud.
+    const int deleted_mask = (options.tex_coords_quantization_bits < 0) |
+                             (options.normals_quantization_bits < 0) << 1 |
+                             (options.generic_quantization_bits < 0) << 2;
+    const draco::PointCloud *row_pc = pc;
+    draco::CycleTimer stage_timer;
+    stage_timer.Start();
+    if (deleted_mask != 0) {
+      std::unique_ptr<draco::PointCloud> &reduced_pc =
+          reduced_pcs[deleted_mask];
+      if (reduced_pc == nullptr) {
+        reduced_pc = CopyPointCloud(*pc);
+        Options reduce_options = options;
+        DeleteSkippedAttributes(reduced_pc.get(), &reduce_options);
+      }
+      options.tex_coords_deleted = options.tex_coords_quantization_bits < 0;
+      options.normals_deleted = options.normals_quantization_bits < 0;
+      options.generic_deleted = options.generic_quantization_bits < 0;
+      row_pc = reduced_pc.get();
+    }
+    stage_timer.Stop();
+    metrics.preprocess_us = stage_timer.GetInUs();
+
+    draco::Encoder encoder;
+    SetupEncoder(options, &encoder);
+    PrintOptions(*row_pc, options);
+    draco::ExpertEncoder expert_encoder(*row_pc);
+    expert_encoder.Reset(encoder.CreateExpertEncoderOptions(*row_pc));
+
+    const std::string output = prefix + "_" + suffix + ".drc";
+    int row_ret;
+    draco::TiledPointCloudEncoder tiled_encoder;
+    const bool use_tiles = options.max_points_per_tile > 0;
+    draco::LayeredPointCloudEncoder layered_encoder;
+    if (use_tiles) {
+      tiled_encoder.SetMaxPointsPerTile(options.max_points_per_tile);
+      row_ret = EncodeTiledPointCloudToFile(*row_pc, output,
+                                            expert_encoder.options(),
+                                            &tiled_encoder, &metrics);
+    } else if (options.layered) {
+      row_ret = EncodeLayeredPointCloudToFile(*row_pc, output,
+                                              expert_encoder.options(),
+                                              &layered_encoder, &metrics);
+    } else {
+      row_ret = EncodePointCloudToFile(*row_pc, output, &expert_encoder,
+                                       &metrics);
+    }
+    if (row_ret != 0) {
+      failed_suffixes.push_back(suffix);
+      continue;
+    }
+    wall_timer.Stop();
+    metrics.wall_us = wall_timer.GetInUs() + metrics.ply_parse_us;
+    if (!WriteMetricsJson(prefix + "_" + suffix + ".json", options, *row_pc,
+                          use_tiles ? tiled_encoder.encoding_stats()
+                          : options.layered
+                              ? layered_encoder.encoding_stats()
+                              : expert_encoder.encoding_stats(),
+                          metrics)) {
+      failed_suffixes.push_back(suffix);
+    }
+  }
+  printf("Encoded %zu of %zu sweep settings.\n",
+         rows.size() - failed_suffixes.size(), rows.size());
+  if (failed_suffixes.empty()) {
+    return 0;
+  }
+  // One line, parsed by myScript/sweep.py.
+  printf("Failed sweep settings:");
+  for (const std::string &suffix : failed_suffixes) {
+    printf(" %s", suffix.c_str());
+  }
+  printf("\n");
+  return -1;
+}
+//! [YC] end
+
 int EncodeMeshToFile(const draco::Mesh &mesh, const std::string &file,
-                     draco::ExpertEncoder *encoder) {
+                     draco::ExpertEncoder *encoder, Metrics *metrics) {
   draco::CycleTimer timer;
   // Encode the geometry.
   draco::EncoderBuffer buffer;
@@ -296,11 +1184,21 @@ int EncodeMeshToFile(const draco::Mesh &mesh, const std::string &file,
     return -1;
   }
   timer.Stop();
+  //! [YC] start: For metrics
+  metrics->encode_us = timer.GetInUs();
+  metrics->encoded_size = buffer.size();
+  draco::CycleTimer write_timer;
+  write_timer.Start();
+  //! [YC] end
   // Save the encoded geometry into a file.
   if (!draco::WriteBufferToFile(buffer.data(), buffer.size(), file)) {
     printf("Failed to create the output file.\n");
     return -1;
   }
+  //! [YC] start: For metrics
+  write_timer.Stop();
+  metrics->write_us = write_timer.GetInUs();
+  //! [YC] end
   printf("Encoded mesh saved to %s (%" PRId64 " ms to encode).\n", file.c_str(),
          timer.GetInMs());
   printf("\nEncoded size = %zu bytes\n\n", buffer.size());
@@ -313,6 +1211,11 @@ int EncodeMeshToFile(const draco::Mesh &mesh, const std::string &file,
 int main(int argc, char **argv) {
   Options options;
   const int argc_check = argc - 1;
+  //! [YC] start: For metrics
+  Metrics metrics;
+  draco::CycleTimer wall_timer;
+  wall_timer.Start();
+  //! [YC] end
 
   for (int i = 1; i < argc; ++i) {
     if (!strcmp("-h", argv[i]) || !strcmp("-?", argv[i])) {
@@ -462,18 +1365,129 @@ int main(int argc, char **argv) {
     } else if (!strcmp("-preserve_polygons", argv[i])) {
       options.preserve_polygons = true;
     }
+    //! [YC] start: Memory-mapped input
+    else if (!strcmp("-mmap", argv[i])) {
+      options.use_memory_mapping = true;
+    }
+    //! [YC] end
+    //! [YC] start: Threaded attribute encoding
+    else if (!strcmp("-threads", argv[i]) && i < argc_check) {
+      options.num_threads = StringToInt(argv[++i]);
+    }
+    else if (!strcmp("-delimit_streams", argv[i])) {
+      options.delimit_streams = true;
+    }
+    //! [YC] end
+    //! [YC] start: Spatially tiled point clouds
+    else if (!strcmp("-tiles", argv[i]) && i < argc_check) {
+      options.max_points_per_tile = StringToInt(argv[++i]);
+    }
+    //! [YC] end
+    //! [YC] start: SH-band layered point clouds
+    else if (!strcmp("-layered", argv[i])) {
+      options.layered = true;
+    }
+    //! [YC] end
+    //! [YC] start: Space-filling curve point order
+    else if (!strcmp("-point_order", argv[i]) && i < argc_check) {
+      const std::string order = argv[++i];
+      if (order == "input") {
+        options.point_order = draco::POINT_ORDER_INPUT;
+      } else if (order == "morton") {
+        options.point_order = draco::POINT_ORDER_MORTON;
+      } else if (order == "hilbert") {
+        options.point_order = draco::POINT_ORDER_HILBERT;
+      } else {
+        printf("Error: unknown point order %s.\n", order.c_str());
+        return -1;
+      }
+    }
+    //! [YC] end
+    //! [YC] start: Quaternion codec
+    else if (!strcmp("-qr_quaternion", argv[i])) {
+      options.rot_quaternion = true;
+    }
+    //! [YC] end
+    //! [YC] start: Vector quantization
+    else if (!strcmp("-vq_frest", argv[i]) && i < argc_check) {
+      options.f_rest_codebook_size = StringToInt(argv[++i]);
+      if (options.f_rest_codebook_size <= 0) {
+        printf("Error: The codebook size must be positive.\n");
+        return -1;
+      }
+    } else if (!strcmp("-vq_iterations", argv[i]) && i < argc_check) {
+      options.codebook_iterations = StringToInt(argv[++i]);
+      if (options.codebook_iterations < 0) {
+        printf("Error: The number of iterations must not be negative.\n");
+        return -1;
+      }
+    }
+    //! [YC] end
+    //! [YC] start: Interleaved rANS streams
+    else if (!strcmp("-rans_streams", argv[i]) && i < argc_check) {
+      options.rans_streams = StringToInt(argv[++i]);
+      if (options.rans_streams != 1 && options.rans_streams != 2 &&
+          options.rans_streams != 4 && options.rans_streams != 8) {
+        printf("Error: The number of rANS streams must be 1, 2, 4 or 8.\n");
+        return -1;
+      }
+    }
+    //! [YC] end
+    //! [YC] start: Sweep mode
+    else if (!strcmp("--sweep", argv[i]) && i < argc_check) {
+      options.sweep_settings = argv[++i];
+    }
+    //! [YC] end
+    //! [YC] start: Target-size rate control
+    else if (!strcmp("-target_size", argv[i]) && i < argc_check) {
+      options.target_size = strtoll(argv[++i], nullptr, 10);
+      if (options.target_size <= 0) {
+        printf("Error: The target size must be a positive number of bytes.\n");
+        return -1;
+      }
+    }
+    //! [YC] end
+    //! [YC] start: add arg
+    else if (!strcmp("--metrics-json", argv[i]) && i < argc_check) {
+      options.metrics_json = argv[++i];
+    }
+    //! [YC] end
   }
   if (argc < 3 || options.input.empty()) {
     Usage();
     return -1;
   }
+  //! [YC] start: SH-band layered point clouds
+  if (options.layered && options.max_points_per_tile > 0) {
+    printf("Error: -layered and -tiles cannot be combined.\n");
+    return -1;
+  }
+  //! [YC] end
+  //! [YC] start: Delimited attribute streams
+  if (options.delimit_streams && options.compression_level > 0 &&
+      !options.layered && !options.rot_quaternion &&
+      options.f_rest_codebook_size <= 0) {
+    printf(
+        "Warning: -delimit_streams is ignored by the kd-tree encoding used "
+        "for\nquantized point clouds at -cl %d, use -cl 0 to decode the "
+        "streams concurrently.\n",
+        options.compression_level);
+  }
+  //! [YC] end
 
   std::unique_ptr<draco::PointCloud> pc;
   draco::Mesh *mesh = nullptr;
+  //! [YC] start: For metrics
+  draco::CycleTimer stage_timer;
+  stage_timer.Start();
+  //! [YC] end
   if (!options.is_point_cloud) {
     draco::Options load_options;
     load_options.SetBool("use_metadata", options.use_metadata);
     load_options.SetBool("preserve_polygons", options.preserve_polygons);
+    //! [YC] start: Memory-mapped input
+    load_options.SetBool("use_memory_mapping", options.use_memory_mapping);
+    //! [YC] end
     auto maybe_mesh = draco::ReadMeshFromFile(options.input, load_options);
     if (!maybe_mesh.ok()) {
       printf("Failed loading the input mesh: %s.\n",
@@ -483,7 +1497,11 @@ int main(int argc, char **argv) {
     mesh = maybe_mesh.value().get();
     pc = std::move(maybe_mesh).value();
   } else {
-    auto maybe_pc = draco::ReadPointCloudFromFile(options.input);
+    //! [YC] start: Memory-mapped input
+    draco::Options load_options;
+    load_options.SetBool("use_memory_mapping", options.use_memory_mapping);
+    auto maybe_pc = draco::ReadPointCloudFromFile(options.input, load_options);
+    //! [YC] end
     if (!maybe_pc.ok()) {
       printf("Failed loading the input point cloud: %s.\n",
              maybe_pc.status().error_msg());
@@ -491,6 +1509,20 @@ int main(int argc, char **argv) {
     }
     pc = std::move(maybe_pc).value();
   }
+  //! [YC] start: For metrics
+  stage_timer.Stop();
+  metrics.ply_parse_us = stage_timer.GetInUs();
+  stage_timer.Start();
+  //! [YC] end
+  //! [YC] start: Sweep mode
+  if (!options.sweep_settings.empty()) {
+    if (mesh && mesh->num_faces() > 0) {
+      printf("Error: --sweep requires a point cloud (-point_cloud).\n");
+      return -1;
+    }
+    return RunSweep(options, pc.get(), metrics.ply_parse_us);
+  }
+  //! [YC] end
 
   if (options.pos_quantization_bits < 0) {
     printf("Error: Position attribute cannot be skipped.\n");
@@ -499,122 +1531,16 @@ int main(int argc, char **argv) {
 
   // Delete attributes if needed. This needs to happen before we set any
   // quantization settings.
-  if (options.tex_coords_quantization_bits < 0) {
-    if (pc->NumNamedAttributes(draco::GeometryAttribute::TEX_COORD) > 0) {
-      options.tex_coords_deleted = true;
-    }
-    while (pc->NumNamedAttributes(draco::GeometryAttribute::TEX_COORD) > 0) {
-      pc->DeleteAttribute(
-          pc->GetNamedAttributeId(draco::GeometryAttribute::TEX_COORD, 0));
-    }
-  }
-  if (options.normals_quantization_bits < 0) {
-    if (pc->NumNamedAttributes(draco::GeometryAttribute::NORMAL) > 0) {
-      options.normals_deleted = true;
-    }
-    while (pc->NumNamedAttributes(draco::GeometryAttribute::NORMAL) > 0) {
-      pc->DeleteAttribute(
-          pc->GetNamedAttributeId(draco::GeometryAttribute::NORMAL, 0));
-    }
-  }
-  if (options.generic_quantization_bits < 0) {
-    if (pc->NumNamedAttributes(draco::GeometryAttribute::GENERIC) > 0) {
-      options.generic_deleted = true;
-    }
-    while (pc->NumNamedAttributes(draco::GeometryAttribute::GENERIC) > 0) {
-      pc->DeleteAttribute(
-          pc->GetNamedAttributeId(draco::GeometryAttribute::GENERIC, 0));
-    }
-  }
-  //! [YC] start: skip necessary SH
-  if (options.fRest_1_quantization_bits < 0) {
-    if (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_1) > 0) {
-      options.fRest_1_deleted = true;
-    }
-    while (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_1) > 0) {
-      pc->DeleteAttribute(
-          pc->GetNamedAttributeId(draco::GeometryAttribute::F_REST_1, 0));
-    }
-  }
-  if (options.fRest_2_quantization_bits < 0) {
-    if (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_2) > 0) {
-      options.fRest_2_deleted = true;
-    }
-    while (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_2) > 0) {
-      pc->DeleteAttribute(
-          pc->GetNamedAttributeId(draco::GeometryAttribute::F_REST_2, 0));
-    }
-  }
-  if (options.fRest_3_quantization_bits < 0) {
-    if (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_3) > 0) {
-      options.fRest_3_deleted = true;
-    }
-    while (pc->NumNamedAttributes(draco::GeometryAttribute::F_REST_3) > 0) {
-      pc->DeleteAttribute(
-          pc->GetNamedAttributeId(draco::GeometryAttribute::F_REST_3, 0));
-    }
-  }
+  DeleteSkippedAttributes(pc.get(), &options);  // [YC] add: shared with sweeps
+  //! [YC] start: For metrics
+  stage_timer.Stop();
+  metrics.preprocess_us = stage_timer.GetInUs();
   //! [YC] end
-  
-#ifdef DRACO_ATTRIBUTE_INDICES_DEDUPLICATION_SUPPORTED
-  // If any attribute has been deleted, run deduplication of point indices again
-  // as some points can be possibly combined.
-  if (options.tex_coords_deleted || options.normals_deleted || options.generic_deleted || 
-      options.fRest_1_deleted || options.fRest_2_deleted || options.fRest_3_deleted
-      ) {
-    pc->DeduplicatePointIds();
-  }
-#endif
-
-  //! [YC] note
-  // Convert compression level to speed (that 0 = slowest, 10 = fastest).
-  const int speed = 10 - options.compression_level;
 
   draco::Encoder encoder;
 
   // Setup encoder options.
-  if (options.pos_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::POSITION,
-                                     options.pos_quantization_bits);
-  }
-  if (options.tex_coords_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::TEX_COORD,
-                                     options.tex_coords_quantization_bits);
-  }
-  if (options.normals_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::NORMAL,
-                                     options.normals_quantization_bits);
-  }
-  if (options.generic_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::GENERIC,
-                                     options.generic_quantization_bits);
-  }
-  //! [YC] start: Set quantization bits to new attribute
-  if (options.fDc_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::F_DC, options.fDc_quantization_bits); // for now folow qn
-  }
-  // encoder.SetAttributeQuantization(draco::GeometryAttribute::F_REST, options.fRest_quantization_bits); // for now folow qn
-  if (options.fRest_1_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::F_REST_1, options.fRest_1_quantization_bits); // for now folow qn
-  }
-  if (options.fRest_2_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::F_REST_2, options.fRest_2_quantization_bits); // for now folow qn
-  }
-  if (options.fRest_3_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::F_REST_3, options.fRest_3_quantization_bits); // for now folow qn
-  }
-  if (options.opacity_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::OPACITY, options.opacity_quantization_bits); // for now folow qn
-  }
-  if (options.scale_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::SCALE, options.scale_quantization_bits); // for now folow qn
-  }
-  if (options.rot_quantization_bits > 0) {
-    encoder.SetAttributeQuantization(draco::GeometryAttribute::ROT, options.rot_quantization_bits); // for now folow qn
-  }
-  //! [YC] end
-
-  encoder.SetSpeedOptions(speed, speed);
+  SetupEncoder(options, &encoder);  // [YC] add: shared with sweeps
 
   if (options.output.empty()) {
     // Create a default output file by attaching .drc to the input file name.
@@ -644,13 +1570,99 @@ int main(int argc, char **argv) {
         poly_att_id, draco::PredictionSchemeMethod::PREDICTION_NONE);
   }
 
+  //! [YC] start: Target-size rate control
+  if (options.target_size > 0) {
+    if (input_is_mesh) {
+      printf("Error: -target_size requires a point cloud (-point_cloud).\n");
+      return -1;
+    }
+    stage_timer.Start();
+    draco::PointCloudRateControl rate_control;
+    rate_control.SetTargetSize(options.target_size);
+    draco::EncoderOptions allocated_options =
+        draco::EncoderOptions::CreateDefaultOptions();
+    const draco::Status status = rate_control.Allocate(
+        *pc, expert_encoder->options(), &allocated_options);
+    if (!status.ok()) {
+      printf("Failed to allocate the quantization bits: %s\n",
+             status.error_msg());
+      return -1;
+    }
+    expert_encoder->Reset(allocated_options);
+    stage_timer.Stop();
+    metrics.rate_control_us = stage_timer.GetInUs();
+    metrics.estimated_size = rate_control.estimated_size();
+    metrics.num_trial_encodes = rate_control.num_trial_encodes();
+    printf("Rate control for %" PRId64 " bytes (%d trial encodes):\n",
+           options.target_size, rate_control.num_trial_encodes());
+    for (int i = 0; i < pc->num_attributes(); ++i) {
+      const int bits = rate_control.quantization_bits(i);
+      if (bits < 0) {
+        continue;
+      }
+      const draco::GeometryAttribute::Type type =
+          pc->attribute(i)->attribute_type();
+      SetQuantizationBits(type, bits, &options);
+      printf("  %s: %d bits\n",
+             draco::GeometryAttribute::TypeToString(type).c_str(), bits);
+    }
+    if (rate_control.encoded_size() > options.target_size) {
+      printf("Warning: %" PRId64 " bytes at the minimum bits, above the "
+             "target.\n",
+             rate_control.encoded_size());
+    }
+    printf("\n");
+  }
+  //! [YC] end
+
   int ret = -1;
+  //! [YC] start: Spatially tiled point clouds
+  draco::TiledPointCloudEncoder tiled_encoder;
+  const bool use_tiles = !input_is_mesh && options.max_points_per_tile > 0;
+  //! [YC] end
+  //! [YC] start: SH-band layered point clouds
+  draco::LayeredPointCloudEncoder layered_encoder;
+  const bool use_layers = !input_is_mesh && options.layered;
+  //! [YC] end
 
   if (input_is_mesh) {
-    ret = EncodeMeshToFile(*mesh, options.output, expert_encoder.get());
-  } else {
-    ret = EncodePointCloudToFile(*pc, options.output, expert_encoder.get());
+    ret = EncodeMeshToFile(*mesh, options.output, expert_encoder.get(),
+                           &metrics);
+  }
+  //! [YC] start: Spatially tiled point clouds
+  else if (use_tiles) {
+    tiled_encoder.SetMaxPointsPerTile(options.max_points_per_tile);
+    ret = EncodeTiledPointCloudToFile(*pc, options.output,
+                                      expert_encoder->options(),
+                                      &tiled_encoder, &metrics);
+  }
+  //! [YC] end
+  //! [YC] start: SH-band layered point clouds
+  else if (use_layers) {
+    ret = EncodeLayeredPointCloudToFile(*pc, options.output,
+                                        expert_encoder->options(),
+                                        &layered_encoder, &metrics);
   }
+  //! [YC] end
+  else {
+    ret = EncodePointCloudToFile(*pc, options.output, expert_encoder.get(),
+                                 &metrics);
+  }
+
+  //! [YC] start: Write the metrics record
+  if (ret == 0 && !options.metrics_json.empty()) {
+    wall_timer.Stop();
+    metrics.wall_us = wall_timer.GetInUs();
+    if (!WriteMetricsJson(options.metrics_json, options, *pc,
+                          use_tiles ? tiled_encoder.encoding_stats()
+                          : use_layers
+                              ? layered_encoder.encoding_stats()
+                              : expert_encoder->encoding_stats(),
+                          metrics)) {
+      ret = -1;
+    }
+  }
+  //! [YC] end
 
   // if (ret != -1 && options.compression_level < 10) {
   //   printf(